@@ -1,3 +1,6 @@
+import argparse
+import io
+
 from pptx import Presentation
 from pptx.util import Inches, Pt
 
@@ -5,8 +8,17 @@ from pptx.util import Inches, Pt
 template_path = r"C:\Users\JOBLER\OneDrive - Sleep Number Corporation\Documents\AI TPRM MACHINE\Jan2026_AIHackathon_PresentationTemplate.pptx"
 output_path = r"C:\Users\JOBLER\OneDrive - Sleep Number Corporation\Documents\AI TPRM MACHINE\TPRM_Demo_Presentation.pptx"
 
-# Load template
-prs = Presentation(template_path)
+# Helper function to add a title slide
+def add_title_slide(prs, title, subtitle=None, layout_index=0):
+    slide = prs.slides.add_slide(prs.slide_layouts[layout_index])
+    if slide.shapes.title:
+        slide.shapes.title.text = title
+    if subtitle:
+        for shape in slide.placeholders:
+            if shape.placeholder_format.idx == 1:
+                shape.text = subtitle
+                break
+    return slide
 
 # Helper function to add a slide with title and bullet content
 def add_content_slide(prs, title, bullets, layout_index=1):
@@ -25,56 +37,97 @@ def add_content_slide(prs, title, bullets, layout_index=1):
             break
     return slide
 
-# Clear existing slides
-while len(prs.slides) > 0:
-    rId = prs.slides._sldIdLst[0].rId
-    prs.part.drop_rel(rId)
-    del prs.slides._sldIdLst[0]
-
-# Slide 1: Title
-slide = prs.slides.add_slide(prs.slide_layouts[0])
-if slide.shapes.title:
-    slide.shapes.title.text = "AI-Powered Third Party Risk Management"
-for shape in slide.placeholders:
-    if shape.placeholder_format.idx == 1:
-        shape.text = "4-Minute Demo"
-        break
-
-# Slide 2: Demo Flow
-add_content_slide(prs, "Demo: What You'll See", [
-    "Dashboard - Real-time risk posture at a glance",
-    "AI Vendor Profiling - Instant risk classification",
-    "Document Analysis - Automated finding extraction",
-    "Reporting - Executive-ready insights in seconds"
-])
-
-# Slide 3: Six AI Agents
-add_content_slide(prs, "How AI Helps: Six Specialized Agents", [
-    "Vendor Profiler - Auto-classifies risk level instantly",
-    "Security Analyzer - Extracts findings from documents",
-    "Risk Assessor - Evaluates 9 security domains",
-    "Risk Manager - Generates remediation plans",
-    "Report Generator - Creates executive summaries",
-    "Information Gatherer - Identifies documentation gaps"
-])
-
-# Slide 4: Business Value
-add_content_slide(prs, "Business Value", [
-    "90% reduction in manual document review time",
-    "Vendor onboarding reduced from days to hours",
-    "Consistent risk scoring across all vendors",
-    "Auto-mapping to SOC 2, ISO 27001, NIST, HIPAA, PCI-DSS",
-    "Scalable - more vendors without adding headcount"
-])
-
-# Slide 5: Summary
-add_content_slide(prs, "Summary", [
-    "Transforms vendor risk from reactive to proactive",
-    "AI handles review, assessment, and reporting",
-    "Team focuses on decisions, not document review",
-    "Reduces risk | Ensures compliance | Improves efficiency"
-])
-
-# Save
-prs.save(output_path)
-print(f"Presentation saved to: {output_path}")
+# Area below the title that pictures are fitted into: (left, top, width, height) in EMU
+def picture_box(prs):
+    return Inches(0.5), Inches(1.5), prs.slide_width - Inches(1), prs.slide_height - Inches(2)
+
+# Helper function to add a slide with a title and a picture scaled to fit below it;
+# size is the image's (width, height) in pixels
+def add_picture_slide(prs, title, image, size, layout_index=5):
+    slide = prs.slides.add_slide(prs.slide_layouts[layout_index])
+    if slide.shapes.title:
+        slide.shapes.title.text = title
+    left, top, max_width, max_height = picture_box(prs)
+    scale = min(max_width / size[0], max_height / size[1])
+    width, height = int(size[0] * scale), int(size[1] * scale)
+    slide.shapes.add_picture(image, left + (max_width - width) // 2, top, width, height)
+    return slide
+
+# Remove every slide, keeping masters, layouts and theme
+def clear_slides(prs):
+    while len(prs.slides) > 0:
+        rId = prs.slides._sldIdLst[0].rId
+        prs.part.drop_rel(rId)
+        del prs.slides._sldIdLst[0]
+
+# Load and clean the template once; the result is an in-memory .pptx with no
+# slides (their parts and media are not written back), so opening a copy per
+# deck is cheap
+def load_clean_template(path):
+    prs = Presentation(path)
+    clear_slides(prs)
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+# Fresh, independent presentation from a cleaned template
+def open_template(template_bytes):
+    return Presentation(io.BytesIO(template_bytes))
+
+def build_demo_deck(prs):
+    # Slide 1: Title
+    add_title_slide(prs, "AI-Powered Third Party Risk Management", "4-Minute Demo")
+
+    # Slide 2: Demo Flow
+    add_content_slide(prs, "Demo: What You'll See", [
+        "Dashboard - Real-time risk posture at a glance",
+        "AI Vendor Profiling - Instant risk classification",
+        "Document Analysis - Automated finding extraction",
+        "Reporting - Executive-ready insights in seconds"
+    ])
+
+    # Slide 3: Six AI Agents
+    add_content_slide(prs, "How AI Helps: Six Specialized Agents", [
+        "Vendor Profiler - Auto-classifies risk level instantly",
+        "Security Analyzer - Extracts findings from documents",
+        "Risk Assessor - Evaluates 9 security domains",
+        "Risk Manager - Generates remediation plans",
+        "Report Generator - Creates executive summaries",
+        "Information Gatherer - Identifies documentation gaps"
+    ])
+
+    # Slide 4: Business Value
+    add_content_slide(prs, "Business Value", [
+        "90% reduction in manual document review time",
+        "Vendor onboarding reduced from days to hours",
+        "Consistent risk scoring across all vendors",
+        "Auto-mapping to SOC 2, ISO 27001, NIST, HIPAA, PCI-DSS",
+        "Scalable - more vendors without adding headcount"
+    ])
+
+    # Slide 5: Summary
+    add_content_slide(prs, "Summary", [
+        "Transforms vendor risk from reactive to proactive",
+        "AI handles review, assessment, and reporting",
+        "Team focuses on decisions, not document review",
+        "Reduces risk | Ensures compliance | Improves efficiency"
+    ])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the TPRM demo presentation")
+    parser.add_argument("--template", default=template_path, help="Template .pptx")
+    parser.add_argument("--output", default=output_path, help="Output .pptx")
+    args = parser.parse_args()
+
+    # Load template
+    prs = Presentation(args.template)
+
+    # Clear existing slides
+    clear_slides(prs)
+
+    build_demo_deck(prs)
+
+    # Save
+    prs.save(args.output)
+    print(f"Presentation saved to: {args.output}")
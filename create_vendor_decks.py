@@ -0,0 +1,330 @@
+"""
+Bulk vendor review deck builder.
+
+Builds one presentation per deck spec from the same template as
+create_demo_pptx.py. The template is parsed and stripped of its slides once;
+each worker process receives the cleaned template as bytes and opens a fresh
+copy per deck, so a deck costs milliseconds rather than a full template load.
+
+Specs (--spec):
+  .json   a list of decks, or {"decks": [...]}
+  .jsonl  one deck per line
+  .csv    one vendor per row
+
+A deck is either explicit:
+  {"filename": "acme.pptx",
+   "slides": [{"type": "title", "title": "...", "subtitle": "..."},
+              {"type": "bullets", "title": "...", "bullets": ["..."]},
+              {"type": "diagram", "diagram": "tprm_lifecycle", "title": "..."}]}
+or a vendor row (no "slides" key) that becomes a quarterly review deck:
+  name, riskTier, overallRiskScore, businessCriticality, dataSensitivityLevel,
+  nextAssessmentDate, findings, actions (";"-separated), quarter
+Vendor decks end with a slide for each key in --diagrams.
+
+Diagram slides use the keys of DIAGRAMS in scripts/generate_tprm_diagrams.py.
+Each diagram is rasterised once per run, before the workers start, at the size
+it will occupy on the slide (--dpi), into a content-addressed cache
+(<output-dir>/.image-cache/<sha256>.png) that later runs reuse. Workers read
+each image once and python-pptx stores identical images as a single part.
+Rasterising needs cairosvg; without it the PNGs that generate_tprm_diagrams.py
+wrote to diagrams/png are used as they are.
+
+Usage:
+    python create_vendor_decks.py --spec vendors.csv --output-dir decks
+                                  [--template TEMPLATE.pptx] [--tiers CRITICAL,HIGH]
+                                  [--workers N] [--diagrams tprm_lifecycle,...] [--dpi 150]
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+
+from create_demo_pptx import (
+    add_content_slide,
+    add_picture_slide,
+    add_title_slide,
+    load_clean_template,
+    open_template,
+    picture_box,
+    template_path,
+)
+
+sys.path.insert(0, str(Path(__file__).parent / "scripts"))
+from generate_tprm_diagrams import DIAGRAMS, RENDER_OPTIONS, cairosvg, get_flowchart  # noqa: E402
+from mermaid_flowchart import layout_flowchart, render_svg  # noqa: E402
+
+DEFAULT_TIERS = "CRITICAL,HIGH"
+DEFAULT_DPI = 150
+EMU_PER_INCH = 914400
+PRERENDERED_PNG_DIR = Path(__file__).parent / "diagrams" / "png"
+
+# Set in each worker by _init_worker
+_template = None
+_layouts = None
+_images = None
+_image_bytes = {}
+
+
+def read_specs(path):
+    """Yield deck specs from a JSON, JSON-lines or CSV file."""
+    suffix = path.suffix.lower()
+    with open(path, encoding="utf-8", newline="") as f:
+        if suffix == ".csv":
+            yield from csv.DictReader(f)
+        elif suffix in (".jsonl", ".ndjson"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            data = json.load(f)
+            yield from data["decks"] if isinstance(data, dict) else data
+
+
+def _split(value):
+    if isinstance(value, list):
+        return value
+    return [item.strip() for item in (value or "").split(";") if item.strip()]
+
+
+def vendor_review_slides(row, diagrams=()):
+    """Slides for a quarterly review deck built from a vendor row."""
+    today = date.today()
+    quarter = row.get("quarter") or f"Q{(today.month - 1) // 3 + 1} {today.year}"
+    tier = (row.get("riskTier") or "UNRATED").upper()
+    # Same fallback as deck_filename, so a row without a name still gets a deck
+    name = row.get("name") or row.get("id") or "Unnamed vendor"
+
+    profile = [f"Risk tier: {tier}"]
+    if row.get("overallRiskScore"):
+        profile.append(f"Overall risk score: {row['overallRiskScore']} / 100")
+    if row.get("businessCriticality"):
+        profile.append(f"Business criticality: {row['businessCriticality'].replace('_', ' ').title()}")
+    if row.get("dataSensitivityLevel"):
+        profile.append(f"Data sensitivity: {row['dataSensitivityLevel']}")
+    if row.get("nextAssessmentDate"):
+        profile.append(f"Next assessment: {row['nextAssessmentDate']}")
+
+    return [
+        {"type": "title", "title": f"{name} - Vendor Risk Review", "subtitle": f"{quarter} | {tier} risk"},
+        {"type": "bullets", "title": "Risk Profile", "bullets": profile},
+        {"type": "bullets", "title": "Open Findings", "bullets": _split(row.get("findings")) or ["No open findings"]},
+        {"type": "bullets", "title": "Remediation Plan", "bullets": _split(row.get("actions")) or ["No open actions"]},
+    ] + [{"type": "diagram", "diagram": key} for key in diagrams]
+
+
+def deck_filename(spec):
+    name = spec.get("filename") or spec.get("name") or spec.get("id") or "deck"
+    stem = re.sub(r"[^A-Za-z0-9_.-]+", "_", Path(name).stem).strip("_") or "deck"
+    return f"{stem}.pptx"
+
+
+def png_size(data):
+    """(width, height) in pixels from a PNG header."""
+    return struct.unpack(">II", data[16:24])
+
+
+def prepare_diagram_images(keys, template_bytes, cache_dir, dpi=DEFAULT_DPI):
+    """
+    Rasterise each diagram once into the content-addressed cache.
+
+    The pixel size is the area the picture fills on a slide of this template at
+    dpi, and the cache key covers the SVG and that size, so a changed diagram,
+    template or dpi gets a new file and everything else is reused. Returns
+    {key: {"path", "size", "title"}} and the number of images rendered.
+    """
+    prs = open_template(template_bytes)
+    _, _, box_width, box_height = picture_box(prs)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    images = {}
+    rendered = 0
+    for key in sorted(keys):
+        if cairosvg is not None:
+            chart = get_flowchart(key)
+            layout = layout_flowchart(chart)
+            scale = min(box_width / layout.width, box_height / layout.height)
+            width_px = round(layout.width * scale / EMU_PER_INCH * dpi)
+            svg = render_svg(chart, layout, RENDER_OPTIONS["background"])
+            digest = hashlib.sha256(f"{width_px}\n{svg}".encode("utf-8")).hexdigest()
+            path = cache_dir / f"{digest}.png"
+            if not path.exists():
+                tmp = path.with_suffix(f".{os.getpid()}.tmp")
+                cairosvg.svg2png(bytestring=svg.encode("utf-8"), write_to=str(tmp), output_width=width_px)
+                os.replace(tmp, path)
+                rendered += 1
+        else:
+            source = PRERENDERED_PNG_DIR / f"{key}.png"
+            if not source.exists():
+                raise FileNotFoundError(
+                    f"{source} not found; install cairosvg or run "
+                    f"scripts/generate_tprm_diagrams.py --format png first")
+            data = source.read_bytes()
+            path = cache_dir / f"{hashlib.sha256(data).hexdigest()}.png"
+            if not path.exists():
+                path.write_bytes(data)
+                rendered += 1
+        with open(path, "rb") as f:
+            size = png_size(f.read(24))
+        images[key] = {"path": str(path), "size": size, "title": DIAGRAMS[key]["title"]}
+    return images, rendered
+
+
+def _diagram_keys(slides):
+    return {slide["diagram"] for slide in slides if slide.get("type") == "diagram"}
+
+
+def _init_worker(template_bytes, layouts, images):
+    global _template, _layouts, _images
+    _template = template_bytes
+    _layouts = layouts
+    _images = images
+
+
+def _image(key):
+    # Read each cached image once per worker; every deck then passes the same
+    # bytes, which python-pptx stores once per package by SHA-1
+    if key not in _image_bytes:
+        with open(_images[key]["path"], "rb") as f:
+            _image_bytes[key] = f.read()
+    return io.BytesIO(_image_bytes[key])
+
+
+def build_deck(job):
+    """Build and save one deck in a worker; returns (path, build ms, slide count)."""
+    slides, output = job
+    started = time.perf_counter()
+    prs = open_template(_template)
+    for slide in slides:
+        if slide.get("type") == "title":
+            add_title_slide(prs, slide["title"], slide.get("subtitle"), slide.get("layout", _layouts["title"]))
+        elif slide.get("type") == "diagram":
+            image = _images[slide["diagram"]]
+            add_picture_slide(prs, slide.get("title", image["title"]), _image(slide["diagram"]), image["size"],
+                              slide.get("layout", _layouts["diagram"]))
+        else:
+            add_content_slide(prs, slide["title"], slide.get("bullets", []), slide.get("layout", _layouts["content"]))
+    prs.save(output)
+    return output, (time.perf_counter() - started) * 1000, len(slides)
+
+
+def build_decks(specs, output_dir, template, workers=None, tiers=None, layouts=None,
+                diagrams=(), dpi=DEFAULT_DPI, cache_dir=None):
+    """
+    Build every deck across a process pool and return throughput statistics.
+
+    Vendor rows outside tiers are skipped; explicit decks are always built.
+    diagrams are appended to vendor decks; images are cached in cache_dir
+    (default: <output_dir>/.image-cache).
+    """
+    layouts = {"title": 0, "content": 1, "diagram": 5, **(layouts or {})}
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    template_bytes = load_clean_template(template)
+    template_ms = (time.perf_counter() - started) * 1000
+
+    jobs = []
+    skipped = 0
+    used = set()
+    for spec in specs:
+        if tiers and "slides" not in spec and (spec.get("riskTier") or "").upper() not in tiers:
+            skipped += 1
+            continue
+        filename = deck_filename(spec)
+        stem, n = filename[:-5], 2
+        while filename in used:
+            filename = f"{stem}_{n}.pptx"
+            n += 1
+        used.add(filename)
+        slides = spec["slides"] if "slides" in spec else vendor_review_slides(spec, diagrams)
+        jobs.append((slides, str(output_dir / filename)))
+
+    keys = set().union(*(_diagram_keys(slides) for slides, _ in jobs))
+    unknown = sorted(keys - DIAGRAMS.keys())
+    if unknown:
+        raise KeyError(f"unknown diagram key(s): {', '.join(unknown)}")
+    mark = time.perf_counter()
+    images, rendered = prepare_diagram_images(keys, template_bytes, cache_dir or output_dir / ".image-cache", dpi)
+    images_ms = (time.perf_counter() - mark) * 1000
+
+    timings = []
+    slides = 0
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                             initargs=(template_bytes, layouts, images)) as pool:
+        for _, ms, count in pool.map(build_deck, jobs, chunksize=max(1, len(jobs) // 64)):
+            timings.append(ms)
+            slides += count
+
+    elapsed = time.perf_counter() - started
+    timings.sort()
+    return {
+        "decks": len(timings),
+        "slides": slides,
+        "skipped": skipped,
+        "template_ms": template_ms,
+        "images": len(images),
+        "images_rendered": rendered,
+        "images_ms": images_ms,
+        "seconds": elapsed,
+        "decks_per_second": len(timings) / elapsed if elapsed else 0,
+        "mean_ms": sum(timings) / len(timings) if timings else 0,
+        "p95_ms": timings[int(len(timings) * 0.95)] if timings else 0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build vendor review decks from a JSON or CSV spec")
+    parser.add_argument("--spec", required=True, help="Deck spec (.json, .jsonl or .csv)")
+    parser.add_argument("--output-dir", default="decks", help="Directory for generated decks (default: decks)")
+    parser.add_argument("--template", default=template_path, help="Template .pptx (default: the demo template)")
+    parser.add_argument("--tiers", default=DEFAULT_TIERS,
+                        help=f"Risk tiers to build vendor decks for, or 'all' (default: {DEFAULT_TIERS})")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--title-layout", type=int, default=0, help="Template layout index for title slides")
+    parser.add_argument("--content-layout", type=int, default=1, help="Template layout index for bullet slides")
+    parser.add_argument("--diagram-layout", type=int, default=5,
+                        help="Template layout index for diagram slides (default: 5, Title Only)")
+    parser.add_argument("--diagrams", default="",
+                        help=f"Comma-separated diagram keys to add to vendor decks ({', '.join(DIAGRAMS)})")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI,
+                        help=f"Resolution diagrams are rasterised at on the slide (default: {DEFAULT_DPI})")
+    parser.add_argument("--image-cache", default=None,
+                        help="Diagram image cache directory (default: <output-dir>/.image-cache)")
+    args = parser.parse_args()
+
+    diagrams = [key.strip() for key in args.diagrams.split(",") if key.strip()]
+    unknown = [key for key in diagrams if key not in DIAGRAMS]
+    if unknown:
+        parser.error(f"unknown diagram key(s): {', '.join(unknown)}")
+
+    tiers = None if args.tiers.lower() == "all" else {t.strip().upper() for t in args.tiers.split(",")}
+    stats = build_decks(
+        read_specs(Path(args.spec)),
+        Path(args.output_dir),
+        args.template,
+        args.workers,
+        tiers,
+        {"title": args.title_layout, "content": args.content_layout, "diagram": args.diagram_layout},
+        diagrams,
+        args.dpi,
+        Path(args.image_cache) if args.image_cache else None,
+    )
+
+    print(f"Built {stats['decks']} deck(s), {stats['slides']} slides in {stats['seconds']:.2f}s "
+          f"({stats['decks_per_second']:.1f} decks/s); {stats['skipped']} vendor(s) outside {args.tiers}")
+    print(f"Template parsed once in {stats['template_ms']:.0f} ms; "
+          f"per deck {stats['mean_ms']:.1f} ms mean, {stats['p95_ms']:.1f} ms p95")
+    if stats["images"]:
+        print(f"Diagram images: {stats['images']} used, {stats['images_rendered']} rendered "
+              f"({stats['images'] - stats['images_rendered']} from cache) in {stats['images_ms']:.0f} ms")
+    print(f"Decks saved to: {args.output_dir}")
@@ -1,6 +1,8 @@
 /** @type {import('next').NextConfig} */
 const nextConfig = {
   experimental: {
+    // src/instrumentation.ts starts the OTLP exporter
+    instrumentationHook: true,
     serverActions: {
       bodySizeLimit: '50mb',
     },
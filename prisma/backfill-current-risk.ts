@@ -0,0 +1,35 @@
+/**
+ * Backfill Vendor.currentRiskTier / currentRiskScore from each vendor's
+ * latest risk profile. Run once after adding the columns; VERA keeps them in
+ * sync from then on.
+ *
+ * Usage: npm run db:backfill-risk
+ */
+
+import { PrismaClient } from '@prisma/client'
+
+const prisma = new PrismaClient()
+
+async function main() {
+  const updated = await prisma.$executeRaw`
+    UPDATE vendors v
+    SET "currentRiskTier" = latest."riskTier",
+        "currentRiskScore" = latest."overallRiskScore"
+    FROM (
+      SELECT DISTINCT ON ("vendorId") "vendorId", "riskTier", "overallRiskScore"
+      FROM risk_profiles
+      ORDER BY "vendorId", "createdAt" DESC
+    ) latest
+    WHERE latest."vendorId" = v.id`
+
+  console.log(`Updated current risk for ${updated} vendors`)
+}
+
+main()
+  .catch((e) => {
+    console.error(e)
+    process.exit(1)
+  })
+  .finally(async () => {
+    await prisma.$disconnect()
+  })
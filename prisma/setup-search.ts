@@ -0,0 +1,114 @@
+/**
+ * Full-text search setup: installs the triggers that keep each searchable
+ * table's "searchVector" column up to date, then fills it for existing rows.
+ * Prisma creates the columns and their GIN indexes (db push); it cannot
+ * manage triggers, so run this after the first push and again whenever the
+ * weights below change. Safe to re-run.
+ *
+ * Usage: npm run db:setup-search
+ */
+
+import { PrismaClient } from '@prisma/client'
+
+const prisma = new PrismaClient()
+
+const BACKFILL_BATCH_SIZE = 5000
+
+// Weighted fields per table: A (titles, names) ranks above B (categories)
+// and C (body text). Each entry is a SQL expression over the row `r`.
+// Keep in sync with the headline text in src/lib/search/fulltext.ts.
+const SEARCH_TABLES: { table: string; columns: string[]; fields: [string, 'A' | 'B' | 'C'][] }[] = [
+  {
+    table: 'vendors',
+    columns: ['name', 'legalName', 'industry', 'country'],
+    fields: [
+      ['r."name"', 'A'],
+      ['r."legalName"', 'A'],
+      ['r."industry"', 'B'],
+      ['r."country"', 'C'],
+    ],
+  },
+  {
+    table: 'risk_findings',
+    columns: ['title', 'findingType', 'findingCategory', 'description', 'snbrRiskMapping'],
+    fields: [
+      ['r."title"', 'A'],
+      ['r."findingType"', 'B'],
+      ['r."findingCategory"', 'B'],
+      ['r."snbrRiskMapping"', 'B'],
+      ['r."description"', 'C'],
+    ],
+  },
+  {
+    table: 'documents',
+    columns: ['documentName', 'documentType', 'analysisResult'],
+    fields: [
+      ['r."documentName"', 'A'],
+      [`replace(r."documentType"::text, '_', ' ')`, 'B'],
+      ['r."analysisResult"', 'C'],
+    ],
+  },
+  {
+    table: 'reports',
+    columns: ['reportName', 'reportType', 'content'],
+    fields: [
+      ['r."reportName"', 'A'],
+      [`replace(r."reportType"::text, '_', ' ')`, 'B'],
+      ['r."content"', 'C'],
+    ],
+  },
+]
+
+function vectorExpression(fields: [string, string][], row: string): string {
+  return fields
+    .map(([expression, weight]) =>
+      `setweight(to_tsvector('english', coalesce(${expression.replace(/\br\./g, `${row}.`)}, '')), '${weight}')`
+    )
+    .join(' || ')
+}
+
+async function main() {
+  await prisma.$executeRawUnsafe('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+  for (const { table, columns, fields } of SEARCH_TABLES) {
+    const fn = `${table}_search_vector`
+    await prisma.$executeRawUnsafe(`
+      CREATE OR REPLACE FUNCTION ${fn}() RETURNS trigger LANGUAGE plpgsql AS $$
+      BEGIN
+        NEW."searchVector" := ${vectorExpression(fields, 'NEW')};
+        RETURN NEW;
+      END
+      $$`)
+    await prisma.$executeRawUnsafe(`DROP TRIGGER IF EXISTS ${fn} ON ${table}`)
+    await prisma.$executeRawUnsafe(`
+      CREATE TRIGGER ${fn}
+      BEFORE INSERT OR UPDATE OF ${columns.map((c) => `"${c}"`).join(', ')} ON ${table}
+      FOR EACH ROW EXECUTE FUNCTION ${fn}()`)
+
+    // Recompute every row in batches so large tables are not locked at once
+    let lastId = ''
+    let updated = 0
+    for (;;) {
+      const batch = await prisma.$queryRawUnsafe<{ id: string }[]>(
+        `SELECT id FROM ${table} WHERE id > $1 ORDER BY id LIMIT ${BACKFILL_BATCH_SIZE}`,
+        lastId
+      )
+      if (!batch.length) break
+      updated += await prisma.$executeRawUnsafe(
+        `UPDATE ${table} t SET "searchVector" = ${vectorExpression(fields, 't')} WHERE t.id = ANY($1)`,
+        batch.map((row) => row.id)
+      )
+      lastId = batch[batch.length - 1].id
+    }
+    console.log(`${table}: trigger installed, ${updated} rows indexed`)
+  }
+}
+
+main()
+  .catch((e) => {
+    console.error(e)
+    process.exit(1)
+  })
+  .finally(async () => {
+    await prisma.$disconnect()
+  })
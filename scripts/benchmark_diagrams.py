@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Diagram Pipeline Benchmark
+
+Times the TPRM diagram generator so regressions and render backends can be
+compared with numbers rather than impressions:
+  - stages:    each stage of generate_tprm_diagrams.main() on the built-in
+               diagrams (Mermaid files, HTML viewer, SVG, PNG, index), plus a
+               no-change incremental rebuild
+  - diagrams:  parse, layout and SVG time for every built-in diagram with
+               the chosen renderer (mermaid-cli reports its own layout and
+               SVG time per diagram, plus the round trip)
+  - workloads: the full pipeline on 10, 100 and 1000 synthetic flowcharts of
+               varying size, each in a fresh process so peak RSS is its own
+
+Results are printed as a table and can be written as JSON, compared against
+an earlier JSON run, and profiled with cProfile (open the .prof file with
+snakeviz, or turn it into a flamegraph with flameprof).
+
+Usage:
+    python benchmark_diagrams.py [--json OUT.json] [--compare BASELINE.json]
+                                 [--tolerance 0.25] [--sizes 10,100,1000]
+                                 [--renderer RENDERER] [--repeat N]
+                                 [--profile OUT.prof]
+
+    --json: Write results to a file ("-" for stdout)
+    --compare: Exit non-zero if any timing is slower than the baseline by
+               more than --tolerance (a fraction, default 0.25)
+    --sizes: Synthetic workload sizes (default: 10,100,1000)
+    --renderer: Image backend - python, mermaid-cli (default: python)
+    --repeat: Repetitions per measurement; the fastest is kept (default: 3)
+    --profile: Run the largest workload under cProfile and dump stats here
+"""
+
+import io
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+import cProfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import generate_tprm_diagrams as generator
+from mermaid_flowchart import check_flowchart, layout_flowchart, render_svg
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None
+
+
+DEFAULT_SIZES = [10, 100, 1000]
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.25
+MIN_REGRESSION_MS = 5  # smaller slowdowns are timer noise on short stages
+SYNTHETIC_NODE_COUNTS = [6, 12, 24, 48]
+SHAPES = ["[{}]", "({})", "{{{}}}", "(({}))", "[({})]"]
+
+
+# =============================================================================
+# SYNTHETIC WORKLOADS
+# =============================================================================
+
+def synthetic_flowchart(nodes: int, seed: int) -> str:
+    """
+    Return a random layered flowchart with the given number of nodes.
+
+    The shape mix, edge labels, back edges and subgraphs roughly follow the
+    built-in diagrams so layout cost scales the way real diagrams do.
+    """
+    rng = random.Random(seed)
+    direction = rng.choice(["TD", "LR"])
+    lines = [f"flowchart {direction}"]
+    ids = [f"N{i}" for i in range(nodes)]
+
+    groups = max(1, nodes // 8)
+    for g in range(groups):
+        members = ids[g * 8:(g + 1) * 8]
+        if g % 2 == 0 and members:
+            lines.append(f'    subgraph G{g}["Group {g}"]')
+            lines += [f"        {n}" + rng.choice(SHAPES).format(f"Step {n}<br/>detail") for n in members]
+            lines.append("    end")
+        else:
+            lines += [f"    {n}" + rng.choice(SHAPES).format(f"Step {n}") for n in members]
+
+    for i in range(1, nodes):
+        source = ids[rng.randrange(max(0, i - 4), i)]
+        label = f"|{rng.choice(['Yes', 'No', 'High', 'Low'])}|" if rng.random() < 0.2 else ""
+        lines.append(f"    {source} -->{label} {ids[i]}")
+    for _ in range(nodes // 10):
+        a, b = sorted(rng.sample(range(nodes), 2))
+        lines.append(f"    {ids[b]} -.-> {ids[a]}")
+
+    lines.append(f"    style {ids[0]} fill:#34A853,stroke:#1e8e3e,color:#fff")
+    return "\n" + "\n".join(lines) + "\n"
+
+
+def synthetic_diagrams(count: int) -> dict:
+    return {
+        f"synthetic_{i:04d}": {
+            "title": f"Synthetic {i}",
+            "description": f"{SYNTHETIC_NODE_COUNTS[i % len(SYNTHETIC_NODE_COUNTS)]} node benchmark flowchart",
+            "mermaid": synthetic_flowchart(SYNTHETIC_NODE_COUNTS[i % len(SYNTHETIC_NODE_COUNTS)], seed=i),
+        }
+        for i in range(count)
+    }
+
+
+# =============================================================================
+# MEASUREMENT
+# =============================================================================
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where unsupported."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def _best(fn, repeat: int) -> float:
+    """Run fn repeat times and return the fastest wall time in ms."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(_ms(started))
+    return min(timings)
+
+
+def _clear_caches() -> None:
+    generator._check_source.cache_clear()
+    generator._viewer_svg.cache_clear()
+
+
+def time_stages(output_dir: Path, renderer: str) -> dict:
+    """
+    Time one cold build of every stage in main() order, then a no-change rebuild.
+
+    Generator output is swallowed so only the numbers are printed.
+    """
+    _clear_caches()
+    manifest = generator.BuildManifest(output_dir, force=True)
+    formats = ["svg"] + (["png"] if generator.cairosvg is not None or renderer == "mermaid-cli" else [])
+    stages = {}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        generator.generate_mermaid_files(output_dir, manifest)
+        stages["mermaid"] = _ms(started)
+
+        started = time.perf_counter()
+        generator.generate_html_viewer(output_dir, manifest)
+        stages["html"] = _ms(started)
+
+        for fmt in formats:
+            started = time.perf_counter()
+            generator.render_images(output_dir, [fmt], manifest=manifest, renderer=renderer)
+            stages[fmt] = _ms(started)
+
+        started = time.perf_counter()
+        generator.generate_index(output_dir, manifest)
+        manifest.save()
+        stages["index"] = _ms(started)
+
+        # Incremental: a fresh process would reparse, so start from cold caches.
+        _clear_caches()
+        started = time.perf_counter()
+        manifest = generator.BuildManifest(output_dir)
+        generator.generate_mermaid_files(output_dir, manifest)
+        generator.generate_html_viewer(output_dir, manifest)
+        generator.render_images(output_dir, formats, manifest=manifest, renderer=renderer)
+        generator.generate_index(output_dir, manifest)
+        stages["incremental"] = _ms(started)
+
+    stages["total"] = round(sum(v for k, v in stages.items() if k != "incremental"), 2)
+    return stages
+
+
+def time_diagrams(repeat: int, renderer: str = generator.DEFAULT_RENDERER) -> dict:
+    """Parse, layout and SVG timings for each built-in diagram (fastest of repeat runs)."""
+    if renderer == "mermaid-cli":
+        return time_diagrams_mermaid_cli(repeat)
+    results = {}
+    for name, diagram in generator.DIAGRAMS.items():
+        source = diagram['mermaid'].strip()
+        chart, diagnostics = check_flowchart(source)
+        if chart is None:
+            results[name] = {"error": str(diagnostics[0])}
+            continue
+        layout = layout_flowchart(chart)
+        results[name] = {
+            "nodes": len(chart.nodes),
+            "edges": len(chart.edges),
+            "parseMs": _best(lambda: check_flowchart(source), repeat),
+            "layoutMs": _best(lambda: layout_flowchart(chart), repeat),
+            "svgMs": _best(lambda: render_svg(chart, layout), repeat),
+        }
+    return results
+
+
+def time_diagrams_mermaid_cli(repeat: int) -> dict:
+    """
+    Layout, SVG and round-trip timings from one warm mermaid-cli worker.
+
+    The worker reports its own layout and SVG times; wallMs adds the
+    protocol round trip. The browser start-up is excluded.
+    """
+    output_dir = Path(tempfile.mkdtemp(prefix="tprm-bench-"))
+    results = {}
+    try:
+        with generator.MermaidRenderPool(1) as pool:
+            for name, diagram in generator.DIAGRAMS.items():
+                job = {"name": name, "definition": diagram['mermaid'].strip(),
+                       "svg": str(output_dir / f"{name}.svg"), "png": None, **generator.RENDER_OPTIONS}
+                runs = [pool.render([job])[name] for _ in range(repeat)]
+                failed = next((run for run in runs if not run.get("ok")), None)
+                if failed:
+                    results[name] = {"error": failed.get("error", "not rendered")}
+                    continue
+                results[name] = {
+                    "layoutMs": min(run["timings"]["layoutMs"] for run in runs),
+                    "svgMs": min(run["timings"]["svgMs"] for run in runs),
+                    "wallMs": min(run["wallMs"] for run in runs),
+                }
+    except (FileNotFoundError, RuntimeError) as e:
+        return {name: {"error": f"mermaid-cli unavailable ({e})"} for name in generator.DIAGRAMS}
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    return results
+
+
+def run_workload(count: int, renderer: str, profile: str = None) -> dict:
+    """
+    Build the full pipeline for count synthetic diagrams.
+
+    Meant to run in a fresh worker process: it replaces the generator's
+    DIAGRAMS and reports that process's own peak RSS.
+    """
+    generator.DIAGRAMS.clear()
+    generator.DIAGRAMS.update(synthetic_diagrams(count))
+    nodes = sum(len(check_flowchart(d['mermaid'].strip())[0].nodes) for d in generator.DIAGRAMS.values())
+
+    output_dir = Path(tempfile.mkdtemp(prefix="tprm-bench-"))
+    profiler = cProfile.Profile() if profile else None
+    try:
+        if profiler:
+            profiler.enable()
+        stages = time_stages(output_dir, renderer)
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(profile)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    return {
+        "diagrams": count,
+        "nodes": nodes,
+        "stages": stages,
+        "totalMs": stages["total"],
+        "perDiagramMs": round(stages["total"] / count, 3),
+        "peakRssMb": peak_rss_mb(),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Return a description of every timing more than tolerance slower than the baseline."""
+    pairs = [(f"stage {k}", v, baseline.get("stages", {}).get(k)) for k, v in results["stages"].items()]
+    old_workloads = {w["diagrams"]: w for w in baseline.get("workloads", [])}
+    for workload in results["workloads"]:
+        old = old_workloads.get(workload["diagrams"], {})
+        pairs.append((f"workload {workload['diagrams']}", workload["totalMs"], old.get("totalMs")))
+
+    regressions = []
+    for label, new, old in pairs:
+        if new is None or not old or new - old < MIN_REGRESSION_MS:
+            continue
+        if new > old * (1 + tolerance):
+            regressions.append(f"{label}: {old:.1f} ms -> {new:.1f} ms (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the TPRM diagram generation pipeline"
+    )
+    parser.add_argument(
+        "--json",
+        type=str,
+        default=None,
+        help='Write results as JSON to this file ("-" for stdout)'
+    )
+    parser.add_argument(
+        "--compare",
+        type=str,
+        default=None,
+        help="Baseline JSON from an earlier run; exit 1 on regressions"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"Allowed slowdown against the baseline as a fraction (default: {DEFAULT_TOLERANCE})"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=str,
+        default=",".join(str(s) for s in DEFAULT_SIZES),
+        help="Comma-separated synthetic workload sizes (default: 10,100,1000)"
+    )
+    parser.add_argument(
+        "--renderer",
+        type=str,
+        choices=["python", "mermaid-cli"],
+        default=generator.DEFAULT_RENDERER,
+        help="Image backend to benchmark (default: python)"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help=f"Repetitions per per-diagram measurement (default: {DEFAULT_REPEAT})"
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        help="Profile the largest workload with cProfile and write the stats here"
+    )
+
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    log = sys.stderr if args.json == "-" else sys.stdout
+
+    results = {
+        "version": 1,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "renderer": args.renderer,
+        "cairosvg": generator.cairosvg is not None,
+    }
+
+    output_dir = Path(tempfile.mkdtemp(prefix="tprm-bench-"))
+    try:
+        results["stages"] = time_stages(output_dir, args.renderer)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    results["diagrams"] = time_diagrams(max(1, args.repeat), args.renderer)
+
+    results["workloads"] = []
+    for size in sizes:
+        profile = args.profile if args.profile and size == max(sizes) else None
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            results["workloads"].append(pool.submit(run_workload, size, args.renderer, profile).result())
+
+    print(f"\n{'='*60}", file=log)
+    print(f"TPRM Diagram Pipeline Benchmark ({args.renderer} renderer)", file=log)
+    print(f"{'='*60}", file=log)
+    print("\nStages (built-in diagrams, cold build):", file=log)
+    for stage, ms in results["stages"].items():
+        print(f"  {stage:<12} {ms:>10.1f} ms", file=log)
+    print(f"\nDiagrams ({args.renderer} renderer, fastest of repeats):", file=log)
+    if args.renderer == "mermaid-cli":
+        print(f"  {'name':<22} {'layout':>8} {'svg':>8} {'total':>8}", file=log)
+    else:
+        print(f"  {'name':<22} {'nodes':>5} {'parse':>8} {'layout':>8} {'svg':>8}", file=log)
+    for name, row in results["diagrams"].items():
+        if "error" in row:
+            print(f"  {name:<22} {row['error']}", file=log)
+        elif args.renderer == "mermaid-cli":
+            print(f"  {name:<22} {row['layoutMs']:>6.1f}ms {row['svgMs']:>6.1f}ms {row['wallMs']:>6.1f}ms", file=log)
+        else:
+            print(f"  {name:<22} {row['nodes']:>5} {row['parseMs']:>6.2f}ms {row['layoutMs']:>6.2f}ms "
+                  f"{row['svgMs']:>6.2f}ms", file=log)
+    print("\nSynthetic workloads:", file=log)
+    print(f"  {'diagrams':>8} {'nodes':>7} {'total':>11} {'per diagram':>12} {'peak RSS':>10}", file=log)
+    for w in results["workloads"]:
+        rss = f"{w['peakRssMb']:.1f} MB" if w["peakRssMb"] is not None else "n/a"
+        print(f"  {w['diagrams']:>8} {w['nodes']:>7} {w['totalMs']:>9.1f}ms {w['perDiagramMs']:>10.2f}ms "
+              f"{rss:>10}", file=log)
+    if args.profile:
+        print(f"\ncProfile stats written to {args.profile}", file=log)
+
+    if args.json == "-":
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n", encoding='utf-8')
+        print(f"\nResults written to {args.json}", file=log)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        regressions = compare(results, baseline, args.tolerance)
+        print(f"\nCompared with {args.compare}: {len(regressions)} regression(s)", file=log)
+        for regression in regressions:
+            print(f"  {regression}", file=log)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
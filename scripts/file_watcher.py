@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+File Watcher
+
+Minimal change notification for the diagram generator's --watch mode, with no
+third-party dependencies. On Linux the kernel's inotify API is used through
+ctypes; elsewhere (or if inotify is unavailable) files are polled by mtime.
+
+Directories are watched rather than files, so editors that save by writing a
+temporary file and renaming it over the original are still seen. Bursts of
+events (one save often produces several) are debounced into a single batch.
+
+Usage:
+    with FileWatcher([Path("generate_tprm_diagrams.py"), Path("diagrams/mermaid")]) as watcher:
+        while True:
+            changed = watcher.wait()
+"""
+
+import os
+import sys
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+from pathlib import Path
+
+
+DEBOUNCE_SECONDS = 0.1
+POLL_SECONDS = 0.25
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class _Inotify:
+    """Directory watches through the Linux inotify API."""
+
+    def __init__(self, directories: list):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories = {}
+        for directory in directories:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"cannot watch {directory}")
+            self.directories[wd] = directory
+
+    def read(self, timeout: float) -> set:
+        """Return the paths touched within timeout seconds (None blocks)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        paths = set()
+        offset = 0
+        while offset < len(data):
+            wd, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if name and wd in self.directories:
+                paths.add(self.directories[wd] / os.fsdecode(name))
+        return paths
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class _Poller:
+    """Fallback that compares modification times of every file in the directories."""
+
+    def __init__(self, directories: list):
+        self.directories = directories
+        self.snapshot = self._scan()
+
+    def _scan(self) -> dict:
+        mtimes = {}
+        for directory in self.directories:
+            try:
+                for entry in os.scandir(directory):
+                    if entry.is_file():
+                        mtimes[Path(entry.path)] = entry.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+        return mtimes
+
+    def read(self, timeout: float) -> set:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self._scan()
+            changed = {p for p in current.keys() | self.snapshot.keys()
+                       if current.get(p) != self.snapshot.get(p)}
+            self.snapshot = current
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(POLL_SECONDS if deadline is None else min(POLL_SECONDS, max(0, deadline - time.monotonic())))
+
+    def close(self) -> None:
+        pass
+
+
+class FileWatcher:
+    """
+    Report changes to a set of files and directories.
+
+    A file path matches only that file; a directory path matches every file
+    directly inside it.
+    """
+
+    def __init__(self, paths: list, debounce: float = DEBOUNCE_SECONDS, polling: bool = False):
+        self.files = {Path(p).resolve() for p in paths if not Path(p).is_dir()}
+        self.trees = {Path(p).resolve() for p in paths if Path(p).is_dir()}
+        self.debounce = debounce
+        directories = sorted(self.trees | {f.parent for f in self.files})
+
+        self.backend = None
+        if not polling and sys.platform.startswith("linux"):
+            try:
+                self.backend = _Inotify(directories)
+            except (OSError, AttributeError):
+                self.backend = None
+        if self.backend is None:
+            self.backend = _Poller(directories)
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if isinstance(self.backend, _Inotify) else "polling"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _relevant(self, paths: set) -> set:
+        return {p for p in paths if p in self.files or p.parent in self.trees}
+
+    def wait(self) -> set:
+        """
+        Block until watched files change, then return every path changed
+        during the burst, once no further events arrive for the debounce period.
+        """
+        changed = set()
+        while not changed:
+            changed = self._relevant(self.backend.read(None))
+        while True:
+            more = self._relevant(self.backend.read(self.debounce))
+            if not more:
+                return changed
+            changed |= more
+
+    def close(self) -> None:
+        self.backend.close()
@@ -6,23 +6,93 @@ Generates visual process flow diagrams from TPRM documentation.
 Outputs:
   - Mermaid diagram files (.mmd)
   - HTML viewer with interactive diagrams
-  - PNG/SVG images (requires mermaid-cli: npm install -g @mermaid-js/mermaid-cli)
+  - SVG images (in-process Python renderer, or mermaid-cli)
+  - PNG images (requires cairosvg or mermaid-cli: npm install -g @mermaid-js/mermaid-cli)
 
 Usage:
     python generate_tprm_diagrams.py [--output-dir OUTPUT_DIR] [--format FORMAT]
+                                     [--workers N] [--renderer RENDERER]
+                                     [--viewer VIEWER] [--definitions DIR]
+                                     [--watch] [--force] [--dry-run] [--validate]
 
     --output-dir: Directory for output files (default: ./diagrams)
     --format: Output format - html, mermaid, png, svg, all (default: all)
+    --workers: Mermaid render workers, one headless browser each (default: 2)
+    --renderer: Image backend - python, mermaid-cli (default: python)
+    --viewer: HTML viewer mode - inline, files, mermaid (default: inline)
+    --definitions: Directory of .mmd files overriding/adding diagram definitions
+    --watch: Rebuild changed diagrams as definitions are edited; open viewers
+             update in place
+    --validate: Check all diagram definitions and exit (non-zero on errors)
+    --force: Rebuild every artifact, ignoring the build manifest
+    --dry-run: List stale artifacts without building anything
+
+Artifacts are rebuilt only when their inputs change; input hashes are kept in
+<output-dir>/.build-manifest.json.
 """
 
 import os
+import re
 import sys
+import ast
+import html
 import argparse
+import shutil
 import subprocess
 import json
+import hashlib
+import functools
+import contextlib
+import io
+import queue
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
 
+from file_watcher import FileWatcher
+from mermaid_flowchart import (
+    Flowchart,
+    MermaidSyntaxError,
+    UNSUPPORTED,
+    check_flowchart,
+    layout_flowchart,
+    render_svg,
+)
+
+# Optional: enables PNG output without mermaid-cli. The import raises OSError
+# rather than ImportError when the package is installed but libcairo is not.
+try:
+    import cairosvg
+except (ImportError, OSError):
+    cairosvg = None
+
+
+RENDER_WORKER = Path(__file__).parent / "mermaid_render_worker.js"
+FLOWCHART_RENDERER = Path(__file__).parent / "mermaid_flowchart.py"
+DEFAULT_RENDER_WORKERS = 2
+DEFAULT_RENDERER = "python"
+RENDER_OPTIONS = {"width": 1200, "background": "white"}
+
+# HTML viewer modes: pre-rendered SVG embedded in the page ("inline") or
+# loaded from svg/ ("files"), both hydrated on scroll; "mermaid" renders every
+# diagram client-side at page load.
+VIEWER_MODES = ("inline", "files", "mermaid")
+DEFAULT_VIEWER = "inline"
+MERMAID_CDN = "https://cdn.jsdelivr.net/npm/mermaid/dist/mermaid.min.js"
+VIEWER_PATCH = "viewer-patch.js"
+
+# External definitions: diagrams/mermaid/01_tprm_lifecycle.mmd -> "tprm_lifecycle".
+DEFINITION_PREFIX = re.compile(r"^\d+_")
+DEFINITION_TITLE = re.compile(r"^%%\{\s*title:\s*(.*?)\s*\}%%$")
+# First line of every .mmd written by generate_mermaid_files, with a hash of
+# the rest of the file; an unedited copy of a built-in is not an override.
+GENERATED_MARKER = re.compile(r"^%% generated by generate_tprm_diagrams\.py \(([0-9a-f]{16})\); edit to override %%$")
+
+# Replaced with the build time when a page is written, so timestamps never
+# make an otherwise unchanged page look stale.
+GENERATED_PLACEHOLDER = "@@GENERATED@@"
+
 
 # =============================================================================
 # TPRM PROCESS DIAGRAMS - Mermaid Definitions
@@ -470,35 +540,415 @@ def ensure_directory(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
-def generate_mermaid_files(output_dir: Path) -> list:
+@functools.lru_cache(maxsize=1024)
+def _check_source(source: str):
+    chart, diagnostics = check_flowchart(source)
+    # Mermaid syntax the Python renderer does not parse is only an error when
+    # there is no mermaid-cli to render it instead
+    if chart is None and diagnostics[0].message.startswith(UNSUPPORTED) and mermaid_cli_available():
+        return check_flowchart(source, fallback=True)
+    return chart, diagnostics
+
+
+def get_flowchart(name: str) -> Flowchart:
+    """
+    Return the parsed model of a diagram in DIAGRAMS.
+
+    Models are cached by source text, so validation, rendering and any other
+    output share a single parse. Raises MermaidSyntaxError for invalid source.
+    """
+    chart, diagnostics = _check_source(DIAGRAMS[name]['mermaid'].strip())
+    if chart is None:
+        raise MermaidSyntaxError(diagnostics[0].message, diagnostics[0].line)
+    return chart
+
+
+def read_builtin_diagrams(script: Path = Path(__file__)) -> dict:
+    """
+    Read the DIAGRAMS literal from this script's source without importing it,
+    so --watch picks up edits to the built-in definitions. Raises SyntaxError
+    or ValueError while the file is mid-edit.
+    """
+    tree = ast.parse(script.read_text(encoding='utf-8'), filename=str(script))
+    for statement in tree.body:
+        if isinstance(statement, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id == "DIAGRAMS" for target in statement.targets
+        ):
+            return ast.literal_eval(statement.value)
+    raise ValueError(f"DIAGRAMS not found in {script}")
+
+
+def load_definitions(directory: Path) -> dict:
+    """
+    Load external diagram definitions from <directory>/*.mmd.
+
+    The diagram name is the file name without a leading "NN_" ordering
+    prefix. Title and description come from the header written by
+    generate_mermaid_files ("%%{ title: ... }%%" then "%% ... %%") when present.
+    Files generate_mermaid_files wrote that have not been edited since are
+    skipped, so the built-in definition they were copied from stays in effect.
+    """
+    definitions = {}
+    for path in sorted(directory.glob("*.mmd")):
+        name = DEFINITION_PREFIX.sub("", path.stem)
+        text = path.read_text(encoding='utf-8')
+        first, _, rest = text.partition("\n")
+        marker = GENERATED_MARKER.match(first.strip())
+        if marker and marker.group(1) == content_hash("mermaid", rest)[:16]:
+            continue
+        lines = (rest if marker else text).splitlines()
+        title = description = None
+        while lines and (not lines[0].strip() or lines[0].startswith("%%")):
+            line = lines.pop(0).strip()
+            header = DEFINITION_TITLE.match(line)
+            if header:
+                title = header.group(1)
+            elif line.startswith("%%") and line.endswith("%%") and len(line) > 4 and description is None:
+                description = line[2:-2].strip()
+        if name in definitions:
+            print(f"  Warning: {name} is defined by both {definitions[name]['source']} and {path}; using {path.name}")
+        definitions[name] = {
+            "title": title,
+            "description": description,
+            "mermaid": "\n" + "\n".join(lines).strip() + "\n",
+            "source": str(path),
+        }
+    return definitions
+
+
+def resolve_diagrams(builtin: dict, definitions_dir: Path = None) -> dict:
+    """Overlay external definitions on the built-in diagrams."""
+    diagrams = {name: dict(diagram) for name, diagram in builtin.items()}
+    if definitions_dir is None or not definitions_dir.is_dir():
+        return diagrams
+    for name, external in load_definitions(definitions_dir).items():
+        base = diagrams.get(name, {})
+        diagrams[name] = {
+            "title": external["title"] or base.get("title") or name.replace("_", " ").title(),
+            "description": external["description"] or base.get("description", ""),
+            "mermaid": external["mermaid"],
+            "source": external["source"],
+        }
+    return diagrams
+
+
+def validate_diagrams(names: list = None) -> dict:
+    """Validate diagrams without rendering; returns {name: [Diagnostic, ...]}."""
+    return {
+        name: _check_source(DIAGRAMS[name]['mermaid'].strip())[1]
+        for name in (names or DIAGRAMS)
+    }
+
+
+def has_errors(diagnostics: list) -> bool:
+    return any(d.severity == "error" for d in diagnostics)
+
+
+def python_supported(name: str) -> bool:
+    """Whether the Python renderer can parse a diagram; mermaid-cli renders the rest."""
+    return _check_source(DIAGRAMS[name]['mermaid'].strip())[0] is not None
+
+
+def print_diagnostics(name: str, diagnostics: list) -> None:
+    for diagnostic in diagnostics:
+        print(f"  {name}: {diagnostic}")
+
+
+def content_hash(*parts) -> str:
+    """Return a stable SHA-256 digest of JSON-serialisable build inputs."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _file_digest(path: Path) -> str:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+    except OSError:
+        return "missing"
+
+
+# `npm root -g` per npm executable. Running npm costs a few hundred ms, so the
+# answers are kept in the build manifest and reused by later runs.
+NPM_ROOTS = {}
+
+
+def npm_global_root() -> str:
+    """Global node_modules directory of the npm on PATH, or "" without npm."""
+    npm = shutil.which("npm")
+    if not npm:
+        return ""
+    if npm not in NPM_ROOTS:
+        try:
+            result = subprocess.run([npm, "root", "-g"], capture_output=True, text=True, timeout=30)
+            NPM_ROOTS[npm] = result.stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            NPM_ROOTS[npm] = ""
+    return NPM_ROOTS[npm]
+
+
+def _mermaid_cli_package():
+    """package.json of the mermaid-cli the worker would load: local installs first."""
+    roots = [Path(__file__).parent.parent / "node_modules", Path.cwd() / "node_modules"]
+    for root in roots:
+        package = root / "@mermaid-js" / "mermaid-cli" / "package.json"
+        if package.is_file():
+            return package
+    global_root = npm_global_root()
+    package = Path(global_root) / "@mermaid-js" / "mermaid-cli" / "package.json"
+    return package if global_root and package.is_file() else None
+
+
+@functools.lru_cache(maxsize=1)
+def mermaid_cli_version() -> str:
+    """Version of the @mermaid-js/mermaid-cli the render worker would load, or "missing"."""
+    package = _mermaid_cli_package()
+    if package is None:
+        return "missing"
+    try:
+        return json.loads(package.read_text(encoding='utf-8')).get("version", "unknown")
+    except (json.JSONDecodeError, OSError):
+        return "unknown"
+
+
+def mermaid_cli_available() -> bool:
+    return mermaid_cli_version() != "missing"
+
+
+@functools.lru_cache(maxsize=None)
+def renderer_version(backend: str) -> str:
+    """
+    Identify the code that renders images for a backend, so upgrading or
+    editing a renderer makes its images stale: a hash of the Python renderer
+    module, or the mermaid-cli version plus a hash of the worker script.
+    """
+    if backend == "python":
+        return _file_digest(FLOWCHART_RENDERER)
+    return f"{mermaid_cli_version()}+{_file_digest(RENDER_WORKER)}"
+
+
+def write_text_if_changed(filepath: Path, content: str) -> bool:
+    """Write a text file only if its content differs, leaving the mtime alone otherwise."""
+    if filepath.exists() and filepath.read_text(encoding='utf-8') == content:
+        return False
+    filepath.write_text(content, encoding='utf-8')
+    return True
+
+
+class BuildManifest:
+    """
+    Content-hash manifest of generated artifacts.
+
+    Stored as ``.build-manifest.json`` in the output directory, it maps each
+    artifact (path relative to the output directory) to a hash of the inputs
+    it was built from: diagram source, render options and, for images, the
+    renderer version. An artifact is stale when its file is missing or its
+    input hash has changed.
+    """
+
+    FILENAME = ".build-manifest.json"
+
+    def __init__(self, output_dir: Path, force: bool = False, dry_run: bool = False):
+        self.output_dir = output_dir
+        self.path = output_dir / self.FILENAME
+        self.force = force
+        self.dry_run = dry_run
+        self.entries = {}
+        self.up_to_date = 0
+        self.planned = 0
+
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding='utf-8'))
+                self.entries = data.get("artifacts", {})
+                for npm, root in data.get("npmRoots", {}).items():
+                    NPM_ROOTS.setdefault(npm, root)
+            except (json.JSONDecodeError, OSError, AttributeError):
+                self.entries = {}
+
+    def _key(self, artifact: Path) -> str:
+        return artifact.relative_to(self.output_dir).as_posix()
+
+    def needs_build(self, artifact: Path, digest: str) -> bool:
+        """
+        Return True if the artifact must be (re)built now.
+
+        Up-to-date artifacts are counted and skipped. In dry-run mode stale
+        artifacts are reported but never built.
+        """
+        entry = self.entries.get(self._key(artifact))
+        if not self.force and artifact.exists() and entry and entry.get("hash") == digest:
+            self.up_to_date += 1
+            return False
+
+        if self.dry_run:
+            self.planned += 1
+            print(f"  Would create: {artifact}")
+            return False
+
+        return True
+
+    def record(self, artifact: Path, digest: str) -> None:
+        """Record that an artifact was built from inputs with the given hash."""
+        self.entries[self._key(artifact)] = {"hash": digest}
+
+    def save(self) -> None:
+        """Persist the manifest (never in dry-run mode)."""
+        if self.dry_run:
+            return
+        content = json.dumps(
+            {"version": 1, "artifacts": self.entries, "npmRoots": NPM_ROOTS}, indent=2, sort_keys=True
+        )
+        write_text_if_changed(self.path, content + "\n")
+
+
+def generate_mermaid_files(output_dir: Path, manifest: BuildManifest = None) -> list:
     """Generate individual Mermaid diagram files."""
+    manifest = manifest or BuildManifest(output_dir, force=True)
     mermaid_dir = output_dir / "mermaid"
     ensure_directory(mermaid_dir)
 
     generated = []
     for name, diagram in DIAGRAMS.items():
+        source = diagram.get("source")
+        if source and Path(source).resolve().parent == mermaid_dir.resolve():
+            continue  # the external definition is its own .mmd artifact
         filepath = mermaid_dir / f"{name}.mmd"
         content = f"%%{{ title: {diagram['title']} }}%%\n"
         content += f"%% {diagram['description']} %%\n\n"
         content += diagram['mermaid'].strip()
+        content = f"%% generated by generate_tprm_diagrams.py ({content_hash('mermaid', content)[:16]}); " \
+                  f"edit to override %%\n{content}"
 
-        filepath.write_text(content, encoding='utf-8')
+        digest = content_hash("mermaid", content)
+        if not manifest.needs_build(filepath, digest):
+            continue
+
+        write_text_if_changed(filepath, content)
+        manifest.record(filepath, digest)
         generated.append(filepath)
         print(f"  Created: {filepath}")
 
     return generated
 
 
-def generate_html_viewer(output_dir: Path) -> Path:
-    """Generate HTML file with all diagrams rendered via Mermaid.js."""
+@functools.lru_cache(maxsize=256)
+def _viewer_svg(source: str):
+    """Lay out and render one definition; cached so rebuilds only redo changed diagrams."""
+    chart, diagnostics = _check_source(source)
+    if chart is None:
+        return None, [str(d) for d in diagnostics]
+    if has_errors(diagnostics):
+        return None, [str(d) for d in diagnostics if d.severity == "error"]
+    layout = layout_flowchart(chart)
+    return (round(layout.width), round(layout.height), render_svg(chart, layout, RENDER_OPTIONS["background"])), []
+
+
+def viewer_entries(names: list = None) -> list:
+    """
+    Lay out every diagram for the HTML viewer.
+
+    Returns one dict per diagram with its navigation metadata, the rendered
+    SVG and its size, or the validation errors when it cannot be rendered
+    (with "unsupported" set when only Mermaid.js can render it).
+    """
+    entries = []
+    for name in (DIAGRAMS if names is None else names):
+        diagram = DIAGRAMS[name]
+        entry = {
+            "id": name,
+            "title": diagram['title'],
+            "description": diagram['description'],
+            "anchor": f"TPRM_Diagrams.html#{name}",
+            "svg": f"svg/{name}.svg",
+            "mermaid": f"mermaid/{name}.mmd",
+            "width": None,
+            "height": None,
+            "errors": [],
+            "unsupported": not python_supported(name),
+        }
+        rendered, entry["errors"] = _viewer_svg(diagram['mermaid'].strip())
+        if rendered:
+            entry["width"], entry["height"], entry["markup"] = rendered
+        entries.append(entry)
+    return entries
+
+
+def generate_viewer_index(output_dir: Path, entries: list, manifest: BuildManifest = None) -> Path:
+    """Write diagrams.json, the navigation index shared by the viewer and other tools."""
+    manifest = manifest or BuildManifest(output_dir, force=True)
+    index = {
+        "version": 1,
+        "diagrams": [
+            {key: value for key, value in entry.items() if key != "markup"}
+            for entry in entries
+        ],
+    }
+    content = json.dumps(index, indent=2) + "\n"
+
+    filepath = output_dir / "diagrams.json"
+    digest = content_hash("viewer-index", content)
+    if manifest.needs_build(filepath, digest):
+        write_text_if_changed(filepath, content)
+        manifest.record(filepath, digest)
+        print(f"  Created: {filepath}")
+    return filepath
+
+
+def _diagram_frame(entry: dict, viewer: str) -> str:
+    """Return the placeholder a lazy viewer hydrates once it scrolls into view."""
+    if entry["errors"]:
+        errors = "".join(f"<li>{html.escape(error)}</li>" for error in entry["errors"])
+        intro = ("This diagram can only be rendered with Mermaid; use Edit / Source below."
+                 if entry["unsupported"] else "This diagram has errors:")
+        return f'<div class="diagram-error"><p>{intro}</p><ul>{errors}</ul></div>'
+
+    # Reserve the final size up front so hydrating a diagram never shifts the page.
+    size = f'aspect-ratio: {entry["width"]} / {entry["height"]}; width: min(100%, {entry["width"]}px);'
+    if viewer == "files":
+        return (f'<div class="diagram-frame" style="{size}" data-src="{entry["svg"]}" '
+                f'data-title="{html.escape(entry["title"])}"></div>')
+    return f'<div class="diagram-frame" style="{size}"><template>{entry["markup"]}</template></div>'
+
+
+def _diagram_content(entry: dict, viewer: str) -> str:
+    """Return the markup inside a section's .diagram-content for the given viewer."""
+    if viewer == "mermaid":
+        return f"""<div class="mermaid">
+{DIAGRAMS[entry["id"]]['mermaid']}
+                </div>"""
+    return _diagram_frame(entry, viewer)
+
+
+def generate_html_viewer(
+    output_dir: Path,
+    manifest: BuildManifest = None,
+    viewer: str = DEFAULT_VIEWER,
+    live: bool = False,
+) -> Path:
+    """
+    Generate the HTML viewer for all diagrams.
+
+    The "inline" and "files" viewers ship diagrams pre-rendered by the Python
+    renderer and only insert them into the page as they scroll into view;
+    Mermaid.js is fetched the first time someone opens a diagram's source.
+    "files" expects svg/<name>.svg next to the page. The "mermaid" viewer
+    renders every diagram with Mermaid.js at page load. diagrams.json is
+    written alongside for navigation.
+
+    With live=True (used by --watch) the page also polls viewer-patch.js and
+    swaps in diagrams changed since it was loaded.
+    """
+    manifest = manifest or BuildManifest(output_dir, force=True)
+    entries = viewer_entries()
+    generate_viewer_index(output_dir, entries, manifest)
+    runtime = f'\n    <script src="{MERMAID_CDN}"></script>' if viewer == "mermaid" else ""
 
     html_content = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>TPRM Process Flow Diagrams</title>
-    <script src="https://cdn.jsdelivr.net/npm/mermaid/dist/mermaid.min.js"></script>
+    <title>TPRM Process Flow Diagrams</title>""" + runtime + """
     <style>
         :root {
             --bg-primary: #1a1a2e;
@@ -612,6 +1062,57 @@ def generate_html_viewer(output_dir: Path) -> Path:
             min-width: 100%;
         }
 
+        .diagram-frame {
+            max-width: 100%;
+        }
+
+        .diagram-frame svg,
+        .diagram-frame img {
+            display: block;
+            width: 100%;
+            height: auto;
+        }
+
+        .diagram-error {
+            color: #b00020;
+        }
+
+        .diagram-source {
+            padding: 1rem 1.5rem;
+            background: var(--bg-card);
+            border-top: 1px solid var(--border);
+        }
+
+        .diagram-source summary {
+            cursor: pointer;
+            color: var(--text-secondary);
+        }
+
+        .diagram-source textarea {
+            width: 100%;
+            min-height: 16rem;
+            margin: 1rem 0;
+            padding: 0.75rem;
+            font-family: Consolas, 'Courier New', monospace;
+            font-size: 0.85rem;
+            background: var(--bg-primary);
+            color: var(--text-primary);
+            border: 1px solid var(--border);
+            border-radius: 4px;
+        }
+
+        .live-preview:not(:empty) {
+            margin-top: 1rem;
+            padding: 1rem;
+            background: #ffffff;
+            color: #333333;
+            overflow-x: auto;
+        }
+
+        .nav a.active {
+            background: var(--accent);
+        }
+
         .controls {
             padding: 1rem 1.5rem;
             background: var(--bg-card);
@@ -670,7 +1171,7 @@ def generate_html_viewer(output_dir: Path) -> Path:
     <div class="header">
         <h1>TPRM Process Flow Diagrams</h1>
         <p>Third Party Risk Management - Visual Process Documentation</p>
-        <p style="margin-top: 0.5rem; font-size: 0.9rem;">Generated: """ + datetime.now().strftime("%Y-%m-%d %H:%M") + """</p>
+        <p style="margin-top: 0.5rem; font-size: 0.9rem;">Generated: """ + GENERATED_PLACEHOLDER + """</p>
     </div>
 
     <nav class="nav">
@@ -688,7 +1189,19 @@ def generate_html_viewer(output_dir: Path) -> Path:
 """
 
     # Add diagram sections
-    for name, diagram in DIAGRAMS.items():
+    for entry in entries:
+        name = entry["id"]
+        diagram = DIAGRAMS[name]
+        content = _diagram_content(entry, viewer)
+        source = ""
+        if viewer != "mermaid":
+            source = f"""
+            <details class="diagram-source" ontoggle="if (this.open) loadMermaid()">
+                <summary>Edit / Source</summary>
+                <textarea spellcheck="false">{html.escape(diagram['mermaid'].strip())}</textarea>
+                <button class="btn btn-primary" onclick="renderLive('{name}')">Render with Mermaid</button>
+                <div class="live-preview"></div>
+            </details>"""
         html_content += f"""
         <section id="{name}" class="diagram-section">
             <div class="diagram-header">
@@ -696,14 +1209,12 @@ def generate_html_viewer(output_dir: Path) -> Path:
                 <p>{diagram['description']}</p>
             </div>
             <div class="diagram-content">
-                <div class="mermaid">
-{diagram['mermaid']}
-                </div>
+                {content}
             </div>
             <div class="controls">
                 <button class="btn btn-secondary" onclick="downloadSVG('{name}')">Download SVG</button>
                 <button class="btn btn-primary" onclick="downloadPNG('{name}')">Download PNG</button>
-            </div>
+            </div>{source}
         </section>
 """
 
@@ -714,7 +1225,10 @@ def generate_html_viewer(output_dir: Path) -> Path:
         <p>TPRM Process Documentation - AI TPRM Machine</p>
         <p>For use with Lucidchart import or standalone viewing</p>
     </footer>
+"""
 
+    if viewer == "mermaid":
+        html_content += """
     <script>
         mermaid.initialize({
             startOnLoad: true,
@@ -771,95 +1285,549 @@ def generate_html_viewer(output_dir: Path) -> Path:
             }
         }
     </script>
-</body>
-</html>
 """
+    else:
+        index = json.dumps([{"id": e["id"], "title": e["title"]} for e in entries])
+        html_content += """
+    <script type="application/json" id="diagram-index">""" + index.replace("</", "<\\/") + """</script>
+    <script>
+        const DIAGRAM_INDEX = JSON.parse(document.getElementById('diagram-index').textContent);
+        const MERMAID_CDN = '""" + MERMAID_CDN + """';
+        let mermaidLoading = null;
+
+        // Pre-rendered diagrams stay out of the DOM until they approach the viewport.
+        function hydrate(frame) {
+            if (!frame || frame.dataset.loaded) {
+                return;
+            }
+            const template = frame.querySelector('template');
+            if (template) {
+                frame.replaceChildren(template.content.cloneNode(true));
+            } else if (frame.dataset.src) {
+                const img = document.createElement('img');
+                img.src = frame.dataset.src;
+                img.alt = frame.dataset.title;
+                frame.replaceChildren(img);
+            }
+            frame.dataset.loaded = 'true';
+        }
 
-    filepath = output_dir / "TPRM_Diagrams.html"
-    filepath.write_text(html_content, encoding='utf-8')
-    print(f"  Created: {filepath}")
+        const lazyObserver = new IntersectionObserver((entries) => {
+            entries.forEach((entry) => {
+                if (entry.isIntersecting) {
+                    hydrate(entry.target);
+                    lazyObserver.unobserve(entry.target);
+                }
+            });
+        }, { rootMargin: '400px 0px' });
+
+        const navObserver = new IntersectionObserver((entries) => {
+            entries.forEach((entry) => {
+                if (!entry.isIntersecting) {
+                    return;
+                }
+                document.querySelectorAll('.nav a').forEach((link) => {
+                    link.classList.toggle('active', link.getAttribute('href') === '#' + entry.target.id);
+                });
+            });
+        }, { rootMargin: '-40% 0px -55% 0px' });
+
+        DIAGRAM_INDEX.forEach((diagram) => {
+            const section = document.getElementById(diagram.id);
+            const frame = section.querySelector('.diagram-frame');
+            if (frame) {
+                lazyObserver.observe(frame);
+            }
+            navObserver.observe(section);
+        });
 
-    return filepath
+        // Mermaid.js is only fetched when a source view is opened.
+        function loadMermaid() {
+            if (!mermaidLoading) {
+                mermaidLoading = new Promise((resolve, reject) => {
+                    const script = document.createElement('script');
+                    script.src = MERMAID_CDN;
+                    script.onload = () => {
+                        mermaid.initialize({
+                            startOnLoad: false,
+                            theme: 'default',
+                            flowchart: {
+                                useMaxWidth: true,
+                                htmlLabels: true,
+                                curve: 'basis'
+                            },
+                            securityLevel: 'loose'
+                        });
+                        resolve(mermaid);
+                    };
+                    script.onerror = () => {
+                        mermaidLoading = null;
+                        reject(new Error('Could not load Mermaid.js from ' + MERMAID_CDN));
+                    };
+                    document.head.appendChild(script);
+                });
+            }
+            return mermaidLoading;
+        }
 
+        async function renderLive(diagramId) {
+            const section = document.getElementById(diagramId);
+            const source = section.querySelector('.diagram-source textarea').value;
+            const preview = section.querySelector('.live-preview');
+            try {
+                const mermaid = await loadMermaid();
+                const { svg } = await mermaid.render('live-' + diagramId, source);
+                preview.innerHTML = svg;
+            } catch (error) {
+                preview.textContent = error.message;
+            }
+        }
 
-def generate_png_images(output_dir: Path) -> list:
-    """Generate PNG images using mermaid-cli (mmdc)."""
-    png_dir = output_dir / "png"
-    ensure_directory(png_dir)
+        async function diagramSvg(diagramId) {
+            const frame = document.querySelector('#' + diagramId + ' .diagram-frame');
+            if (!frame) {
+                return null;
+            }
+            hydrate(frame);
+            const svg = frame.querySelector('svg');
+            if (svg) {
+                return new XMLSerializer().serializeToString(svg);
+            }
+            const response = await fetch(frame.dataset.src);
+            return response.text();
+        }
 
-    mermaid_dir = output_dir / "mermaid"
-    generated = []
+        function save(href, filename) {
+            const a = document.createElement('a');
+            a.href = href;
+            a.download = filename;
+            a.click();
+        }
 
-    # Check if mmdc is available
-    try:
-        subprocess.run(["mmdc", "--version"], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("  Warning: mermaid-cli (mmdc) not found.")
-        print("  Install with: npm install -g @mermaid-js/mermaid-cli")
-        print("  Skipping PNG generation.")
-        return generated
+        async function downloadSVG(diagramId) {
+            const svgData = await diagramSvg(diagramId);
+            if (svgData) {
+                const url = URL.createObjectURL(new Blob([svgData], {type: 'image/svg+xml'}));
+                save(url, diagramId + '.svg');
+                URL.revokeObjectURL(url);
+            }
+        }
 
-    for name in DIAGRAMS.keys():
-        input_file = mermaid_dir / f"{name}.mmd"
-        output_file = png_dir / f"{name}.png"
+        async function downloadPNG(diagramId) {
+            const svgData = await diagramSvg(diagramId);
+            if (svgData) {
+                const img = new Image();
+                img.onload = function() {
+                    const canvas = document.createElement('canvas');
+                    const ctx = canvas.getContext('2d');
+                    canvas.width = img.naturalWidth * 2;
+                    canvas.height = img.naturalHeight * 2;
+                    ctx.scale(2, 2);
+                    ctx.fillStyle = 'white';
+                    ctx.fillRect(0, 0, img.naturalWidth, img.naturalHeight);
+                    ctx.drawImage(img, 0, 0);
+                    save(canvas.toDataURL('image/png'), diagramId + '.png');
+                };
+                img.src = 'data:image/svg+xml;base64,' + btoa(unescape(encodeURIComponent(svgData)));
+            }
+        }
+    </script>
+"""
 
-        try:
-            subprocess.run([
-                "mmdc",
-                "-i", str(input_file),
-                "-o", str(output_file),
-                "-b", "white",
-                "-w", "1200"
-            ], capture_output=True, check=True)
-            generated.append(output_file)
-            print(f"  Created: {output_file}")
-        except subprocess.CalledProcessError as e:
-            print(f"  Error generating {name}.png: {e}")
+    if live:
+        html_content += """
+    <script>
+        // Watch mode: poll the patch file written by --watch (a script tag,
+        // so this also works for pages opened from disk) and swap changed
+        // diagrams in place.
+        let viewerVersion = null;
+
+        function applyViewerPatch(patch) {
+            // The page already shows everything up to the patch present at load.
+            if (viewerVersion === null) {
+                viewerVersion = patch.version;
+                return;
+            }
+            if (patch.version <= viewerVersion) {
+                return;
+            }
+            viewerVersion = patch.version;
+            if (patch.reload) {
+                location.reload();
+                return;
+            }
+            patch.diagrams.forEach((diagram) => {
+                const section = document.getElementById(diagram.id);
+                if (!section) {
+                    return;
+                }
+                section.querySelector('.diagram-header h2').textContent = diagram.title;
+                section.querySelector('.diagram-header p').textContent = diagram.description;
+                const content = section.querySelector('.diagram-content');
+                content.innerHTML = diagram.content;
+                const frame = content.querySelector('.diagram-frame');
+                if (frame) {
+                    if (frame.dataset.src) {
+                        frame.dataset.src += '?v=' + patch.version;
+                    }
+                    hydrate(frame);
+                }
+                const textarea = section.querySelector('.diagram-source textarea');
+                if (textarea) {
+                    textarea.value = diagram.source;
+                }
+                if (window.mermaid && content.querySelector('.mermaid')) {
+                    mermaid.run({ nodes: content.querySelectorAll('.mermaid') });
+                }
+            });
+        }
 
-    return generated
+        setInterval(() => {
+            const script = document.createElement('script');
+            script.src = '""" + VIEWER_PATCH + """?t=' + Date.now();
+            script.onload = script.onerror = () => script.remove();
+            document.head.appendChild(script);
+        }, 500);
+    </script>
+"""
 
+    html_content += """</body>
+</html>
+"""
 
-def generate_svg_images(output_dir: Path) -> list:
-    """Generate SVG images using mermaid-cli (mmdc)."""
-    svg_dir = output_dir / "svg"
-    ensure_directory(svg_dir)
+    filepath = output_dir / "TPRM_Diagrams.html"
+    digest = content_hash("html", html_content)
+    if manifest.needs_build(filepath, digest):
+        generated_at = datetime.now().strftime("%Y-%m-%d %H:%M")
+        write_text_if_changed(filepath, html_content.replace(GENERATED_PLACEHOLDER, generated_at))
+        manifest.record(filepath, digest)
+        print(f"  Created: {filepath}")
 
-    mermaid_dir = output_dir / "mermaid"
-    generated = []
+    return filepath
 
-    # Check if mmdc is available
-    try:
-        subprocess.run(["mmdc", "--version"], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("  Warning: mermaid-cli (mmdc) not found.")
-        print("  Install with: npm install -g @mermaid-js/mermaid-cli")
-        print("  Skipping SVG generation.")
-        return generated
 
-    for name in DIAGRAMS.keys():
-        input_file = mermaid_dir / f"{name}.mmd"
-        output_file = svg_dir / f"{name}.svg"
+class MermaidRenderPool:
+    """
+    Pool of long-lived Mermaid render workers.
+
+    Each worker is a ``node scripts/mermaid_render_worker.js`` process holding
+    one headless browser, so rendering N diagrams costs one browser start per
+    worker instead of one per diagram and format. Jobs are spread across the
+    workers by a shared queue.
+    """
+
+    def __init__(self, workers: int = DEFAULT_RENDER_WORKERS):
+        self.size = max(1, workers)
+        self.processes = []
+        self.error = None  # set by callers that keep a pool which failed to start
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self) -> None:
+        """Launch the workers and wait until each browser is ready."""
+        for _ in range(self.size):
+            process = subprocess.Popen(
+                ["node", str(RENDER_WORKER)],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+            )
+            self.processes.append(process)
+
+        for process in self.processes:
+            message = self._read_message(process)
+            if not message or not message.get("ready"):
+                error = (message or {}).get("error", "worker exited during start-up")
+                self.close()
+                raise RuntimeError(error)
+
+    def close(self) -> None:
+        """Shut down all workers."""
+        self._stop(self.processes)
+        self.processes = []
+
+    @staticmethod
+    def _stop(processes: list) -> None:
+        for process in processes:
+            if process.stdin and not process.stdin.closed:
+                # Flushing a buffered request to a dead worker raises BrokenPipeError
+                with contextlib.suppress(OSError):
+                    process.stdin.close()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    def render(self, jobs: list) -> dict:
+        """
+        Render every job and return the worker results keyed by diagram name.
+
+        A worker that dies stops taking jobs and the others drain the queue.
+        Its in-flight job, and every job left over if all workers died, is
+        returned with ok False and "lost" True so the caller can render it
+        another way; a pool with no workers left sets ``error``.
+        """
+        pending = queue.Queue()
+        for job in jobs:
+            pending.put(job)
+
+        results = {}
+        dead = []
+        lock = threading.Lock()
+
+        def lost(job, error):
+            return {"name": job["name"], "ok": False, "lost": True, "error": error, "timings": None}
+
+        def drain(process):
+            while True:
+                try:
+                    job = pending.get_nowait()
+                except queue.Empty:
+                    return
+                started = time.perf_counter()
+                try:
+                    process.stdin.write(json.dumps(job) + "\n")
+                    process.stdin.flush()
+                    result = self._read_message(process)
+                except (OSError, ValueError) as e:  # ValueError: pipe already closed
+                    result = lost(job, f"worker exited ({e})")
+                result = result or lost(job, "worker exited")
+                result["wallMs"] = round((time.perf_counter() - started) * 1000)
+                with lock:
+                    results[job["name"]] = result
+                    if result.get("lost"):
+                        dead.append(process)
+                if result.get("lost"):
+                    return
+
+        threads = [threading.Thread(target=drain, args=(p,)) for p in self.processes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        while True:
+            try:
+                job = pending.get_nowait()
+            except queue.Empty:
+                break
+            results[job["name"]] = lost(job, "no render worker left")
+
+        if dead:
+            self._stop(dead)
+            self.processes = [p for p in self.processes if p not in dead]
+            if not self.processes:
+                self.error = "all render workers exited"
+
+        return results
+
+    @staticmethod
+    def _read_message(process):
+        """Read the next protocol line from a worker, skipping any other output."""
+        for line in process.stdout:
+            line = line.strip()
+            if line.startswith("{"):
+                try:
+                    return json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+        return None
+
+
+def render_in_process(jobs: list) -> list:
+    """
+    Render jobs with the pure-Python flowchart renderer.
+
+    SVG is always available; PNG requires the optional cairosvg package.
+    Returns a (job, result) pair per job in the same shape as the worker pool.
+    """
+    completed = []
+    for job in jobs:
+        started = time.perf_counter()
+        timings = {"layoutMs": 0, "svgMs": 0, "pngMs": 0}
+        try:
+            chart = get_flowchart(job["name"])
+            svg = render_svg(chart, layout_flowchart(chart), job["background"])
+            timings["layoutMs"] = round((time.perf_counter() - started) * 1000, 1)
+
+            if job["svg"]:
+                mark = time.perf_counter()
+                write_text_if_changed(Path(job["svg"]), svg)
+                timings["svgMs"] = round((time.perf_counter() - mark) * 1000, 1)
+            if job["png"]:
+                mark = time.perf_counter()
+                cairosvg.svg2png(bytestring=svg.encode('utf-8'), write_to=job["png"],
+                                 output_width=job["width"])
+                timings["pngMs"] = round((time.perf_counter() - mark) * 1000, 1)
+            result = {"name": job["name"], "ok": True, "error": None, "timings": timings}
+        except MermaidSyntaxError as e:
+            result = {"name": job["name"], "ok": False, "error": str(e), "timings": None}
+        result["wallMs"] = round((time.perf_counter() - started) * 1000, 1)
+        completed.append((job, result))
+    return completed
+
+
+def fall_back_in_process(completed: list, digests: dict) -> list:
+    """
+    Re-render jobs lost by a dying render worker with the Python renderer,
+    where it can produce every format the job asks for. The artifacts are
+    recorded under the "python" backend, so the next run renders them with
+    mermaid-cli again.
+    """
+    lost = [job for job, result in completed if result.get("lost") and python_supported(job["name"])]
+    fallback = [job for job in lost if not job["png"] or cairosvg is not None]
+    if not fallback:
+        return completed
+    print(f"  Warning: render worker exited; rendering {len(fallback)} diagram(s) in-process instead.")
+    for job in fallback:
+        for fmt in ("svg", "png"):
+            if job[fmt]:
+                digests[(job["name"], fmt)] = content_hash(
+                    fmt, job["definition"], RENDER_OPTIONS, "python", renderer_version("python")
+                )
+    names = {job["name"] for job in fallback}
+    kept = [(job, result) for job, result in completed if job["name"] not in names]
+    return kept + render_in_process(fallback)
+
+
+def render_images(
+    output_dir: Path,
+    formats: list,
+    workers: int = DEFAULT_RENDER_WORKERS,
+    manifest: BuildManifest = None,
+    renderer: str = DEFAULT_RENDERER,
+    pool: "MermaidRenderPool" = None,
+) -> list:
+    """
+    Render SVG and/or PNG images for every stale, valid diagram.
+
+    With the "python" renderer SVG is produced in-process (and PNG too when
+    cairosvg is installed); anything left goes to the Mermaid worker pool,
+    which writes both formats from the same layout pass. Per-diagram timings
+    are reported once the batch has finished. No worker is started when the
+    pool has nothing to do; a running pool can be passed in to keep it warm
+    across calls.
+    """
+    manifest = manifest or BuildManifest(output_dir, force=True)
+    backends = {
+        "svg": renderer,
+        "png": "python" if renderer == "python" and cairosvg is not None else "mermaid-cli",
+    }
+    dirs = {}
+    for fmt in formats:
+        dirs[fmt] = output_dir / fmt
+        ensure_directory(dirs[fmt])
+
+    # Fail fast: invalid diagrams never reach a renderer or a browser.
+    diagnostics = validate_diagrams()
+    for name, found in diagnostics.items():
+        if has_errors(found):
+            print_diagnostics(name, found)
+            print(f"  Skipping {name}: fix the errors above to render it.")
+
+    jobs = {"python": [], "mermaid-cli": []}
+    digests = {}
+    for name, diagram in DIAGRAMS.items():
+        if has_errors(diagnostics[name]):
+            continue
+        supported = python_supported(name)
+        if not supported and "python" in (backends[fmt] for fmt in formats):
+            print_diagnostics(name, diagnostics[name])
+            print(f"  Rendering {name} with mermaid-cli instead.")
+        definition = diagram['mermaid'].strip()
+        for backend in jobs:
+            job = {"name": name, "definition": definition, "svg": None, "png": None, **RENDER_OPTIONS}
+            for fmt in formats:
+                if (backends[fmt] if supported else "mermaid-cli") != backend:
+                    continue
+                output_file = dirs[fmt] / f"{name}.{fmt}"
+                digest = content_hash(fmt, definition, RENDER_OPTIONS, backend, renderer_version(backend))
+                if manifest.needs_build(output_file, digest):
+                    job[fmt] = str(output_file)
+                    digests[(name, fmt)] = digest
+            if job["svg"] or job["png"]:
+                jobs[backend].append(job)
+
+    generated = []
+    started = time.perf_counter()
+    completed = render_in_process(jobs["python"])
 
+    pool_jobs = jobs["mermaid-cli"]
+    if pool_jobs:
         try:
-            subprocess.run([
-                "mmdc",
-                "-i", str(input_file),
-                "-o", str(output_file),
-                "-b", "white"
-            ], capture_output=True, check=True)
+            if pool is None:
+                if not mermaid_cli_available():
+                    raise FileNotFoundError("@mermaid-js/mermaid-cli not found")
+                with MermaidRenderPool(min(workers, len(pool_jobs))) as pool:
+                    results = pool.render(pool_jobs)
+            elif pool.error:
+                raise RuntimeError(pool.error)
+            else:
+                results = pool.render(pool_jobs)
+            completed += [(job, results.get(job["name"], {})) for job in pool_jobs]
+            completed = fall_back_in_process(completed, digests)
+        except (FileNotFoundError, RuntimeError) as e:
+            skipped = sorted({fmt.upper() for job in pool_jobs for fmt in ("svg", "png") if job[fmt]})
+            print(f"  Warning: Mermaid render worker unavailable ({e}).")
+            print("  Install with: npm install -g @mermaid-js/mermaid-cli")
+            print(f"  Skipping mermaid-cli {'/'.join(skipped)} generation.")
+
+    for job, result in completed:
+        if not result.get("ok"):
+            print(f"  Error generating {job['name']}: {result.get('error', 'not rendered')}")
+            continue
+
+        timings = result["timings"]
+        detail = f"layout {timings['layoutMs']} ms"
+        for fmt in formats:
+            if not job[fmt]:
+                continue
+            output_file = Path(job[fmt])
+            manifest.record(output_file, digests[(job['name'], fmt)])
             generated.append(output_file)
-            print(f"  Created: {output_file}")
-        except subprocess.CalledProcessError as e:
-            print(f"  Error generating {name}.svg: {e}")
+            detail += f", {fmt} {timings[fmt + 'Ms']} ms"
+        print(f"  Rendered: {job['name']} ({detail}, total {result['wallMs']} ms)")
+
+    if completed:
+        elapsed = time.perf_counter() - started
+        print(f"  {len(generated)} image(s) in {elapsed:.2f}s")
 
     return generated
 
 
-def generate_index(output_dir: Path) -> Path:
+def generate_png_images(
+    output_dir: Path,
+    workers: int = DEFAULT_RENDER_WORKERS,
+    manifest: BuildManifest = None,
+    renderer: str = DEFAULT_RENDERER,
+) -> list:
+    """Generate PNG images (cairosvg when available, otherwise the Mermaid render pool)."""
+    return render_images(output_dir, ["png"], workers, manifest, renderer)
+
+
+def generate_svg_images(
+    output_dir: Path,
+    workers: int = DEFAULT_RENDER_WORKERS,
+    manifest: BuildManifest = None,
+    renderer: str = DEFAULT_RENDERER,
+) -> list:
+    """Generate SVG images with the in-process renderer or the Mermaid render pool."""
+    return render_images(output_dir, ["svg"], workers, manifest, renderer)
+
+
+def generate_index(output_dir: Path, manifest: BuildManifest = None) -> Path:
     """Generate an index file listing all diagrams."""
+    manifest = manifest or BuildManifest(output_dir, force=True)
     index_content = f"""# TPRM Process Diagrams
 
-Generated: {datetime.now().strftime("%Y-%m-%d %H:%M")}
+Generated: {GENERATED_PLACEHOLDER}
 
 ## Diagrams
 
@@ -876,7 +1844,9 @@ Generated: {datetime.now().strftime("%Y-%m-%d %H:%M")}
     index_content += """
 ## Viewing Options
 
-1. **HTML Viewer**: Open `TPRM_Diagrams.html` in a browser for interactive viewing with download options
+1. **HTML Viewer**: Open `TPRM_Diagrams.html` in a browser for interactive viewing with download options.
+   Diagrams are pre-rendered and load as you scroll; Mermaid.js is only fetched when you open
+   a diagram's "Edit / Source" view. `diagrams.json` lists every diagram for navigation.
 
 2. **Mermaid Files**: Import `.mmd` files into:
    - [Mermaid Live Editor](https://mermaid.live)
@@ -899,18 +1869,167 @@ python generate_tprm_diagrams.py --output-dir ./diagrams --format all
 
 - `--format html`: HTML viewer only
 - `--format mermaid`: Mermaid source files only
-- `--format png`: PNG images (requires mermaid-cli)
-- `--format svg`: SVG images (requires mermaid-cli)
+- `--format png`: PNG images (requires cairosvg or mermaid-cli)
+- `--format svg`: SVG images (built-in Python renderer)
 - `--format all`: All formats (default)
+- `--workers N`: Number of render workers, one headless browser each (default: 2)
+- `--renderer mermaid-cli`: Render SVG with mermaid-cli instead of the built-in renderer
+- `--viewer inline`: HTML viewer with SVG embedded in the page (default)
+- `--viewer files`: HTML viewer loading `svg/*.svg` (serve over HTTP for downloads)
+- `--viewer mermaid`: HTML viewer rendering every diagram with Mermaid.js at page load
+- `--definitions DIR`: Load `.mmd` definitions from DIR (e.g. `diagrams/mermaid`), overriding built-in diagrams of the same name; generated files count only once edited
+- `--watch`: Keep running; rebuild only the diagrams whose definitions change and update open viewers in place
+- `--validate`: Check diagram definitions without generating anything
+- `--force`: Rebuild everything, ignoring `.build-manifest.json`
+- `--dry-run`: List stale artifacts without building them
+
+Only artifacts whose inputs changed since the last run are rebuilt; the
+content hashes are kept in `.build-manifest.json`.
+
+### Per-Vendor Diagrams
+
+```bash
+python vendor_diagrams.py vendors.jsonl --output-dir ./diagrams --workers 8
+```
+
+Renders a personalised risk tier matrix and onboarding flow for every vendor
+in a JSON-lines or CSV export into `vendors/<shard>/<vendor-id>/`. Interrupted
+runs resume from `vendors/.journal`.
 """
 
     filepath = output_dir / "README.md"
-    filepath.write_text(index_content, encoding='utf-8')
-    print(f"  Created: {filepath}")
+    digest = content_hash("index", index_content)
+    if manifest.needs_build(filepath, digest):
+        generated_at = datetime.now().strftime("%Y-%m-%d %H:%M")
+        write_text_if_changed(filepath, index_content.replace(GENERATED_PLACEHOLDER, generated_at))
+        manifest.record(filepath, digest)
+        print(f"  Created: {filepath}")
 
     return filepath
 
 
+def run_build(output_dir: Path, args, manifest: BuildManifest, pool=None, live: bool = False) -> None:
+    """Run every generation stage selected by the command-line options and save the manifest."""
+    if args.format in ["mermaid", "all"]:
+        print("Generating Mermaid files...")
+        generate_mermaid_files(output_dir, manifest)
+        print()
+
+    if args.format in ["html", "all"]:
+        print("Generating HTML viewer...")
+        generate_html_viewer(output_dir, manifest, args.viewer, live)
+        print()
+
+    image_formats = [f for f in ("svg", "png") if args.format in [f, "all"]]
+    if args.format == "html" and args.viewer == "files":
+        image_formats.append("svg")
+    if image_formats:
+        print(f"Generating {'/'.join(f.upper() for f in image_formats)} images...")
+        render_images(output_dir, image_formats, args.workers, manifest, args.renderer, pool)
+        print()
+
+    print("Generating index...")
+    generate_index(output_dir, manifest)
+    manifest.save()
+
+
+def write_viewer_patch(output_dir: Path, names: list, viewer: str, reload: bool = False) -> int:
+    """
+    Write viewer-patch.js for pages opened in --watch mode.
+
+    The patch carries the new section content of each changed diagram and a
+    version the page uses to apply it once. reload asks pages to reload
+    instead, for changes that add or remove sections.
+    """
+    version = time.time_ns() // 1_000_000
+    diagrams = []
+    for entry in viewer_entries(names) if not reload else []:
+        diagrams.append({
+            "id": entry["id"],
+            "title": entry["title"],
+            "description": entry["description"],
+            "content": _diagram_content(entry, viewer),
+            "source": DIAGRAMS[entry["id"]]['mermaid'].strip(),
+        })
+    patch = {"version": version, "reload": reload, "diagrams": diagrams}
+    (output_dir / VIEWER_PATCH).write_text(f"applyViewerPatch({json.dumps(patch)});\n", encoding='utf-8')
+    return version
+
+
+def watch(output_dir: Path, definitions_dir: Path, args) -> None:
+    """
+    Rebuild continuously as diagram definitions change.
+
+    The built-in definitions are re-read from this script and the external
+    ones from definitions_dir on every change; only diagrams whose
+    definition changed are re-rendered (everything else is up to date in the
+    build manifest), and open viewers are patched through viewer-patch.js.
+    A mermaid-cli worker pool, when used, stays running between rebuilds.
+    """
+    script = Path(__file__).resolve()
+    paths = [script] + ([definitions_dir] if definitions_dir and definitions_dir.is_dir() else [])
+
+    manifest = BuildManifest(output_dir, force=args.force)
+    pool = None
+    png_needs_pool = args.format in ["png", "all"] and cairosvg is None
+    svg_needs_pool = args.format in ["svg", "all"] and args.renderer == "mermaid-cli"
+    if (png_needs_pool or svg_needs_pool) and mermaid_cli_available():
+        pool = MermaidRenderPool(args.workers)
+        try:
+            pool.start()
+        except (FileNotFoundError, RuntimeError) as e:
+            pool.error = str(e)
+
+    run_build(output_dir, args, manifest, pool, live=True)
+    write_viewer_patch(output_dir, [], args.viewer)
+
+    reported = set()
+    try:
+        with FileWatcher(paths) as watcher:
+            print(f"Watching {', '.join(str(p) for p in paths)} ({watcher.mode}); Ctrl+C to stop.\n")
+            while True:
+                changed = watcher.wait()
+                started = time.perf_counter()
+                try:
+                    diagrams = resolve_diagrams(read_builtin_diagrams(script), definitions_dir)
+                except (SyntaxError, ValueError, OSError) as e:
+                    print(f"  Definitions not reloaded: {e}")
+                    continue
+
+                names = [name for name in diagrams if DIAGRAMS.get(name) != diagrams[name]]
+                removed = [name for name in DIAGRAMS if name not in diagrams]
+                if not names and not removed:
+                    continue
+
+                reload = list(diagrams) != list(DIAGRAMS)
+                DIAGRAMS.clear()
+                DIAGRAMS.update(diagrams)
+                for name in names:
+                    print_diagnostics(name, validate_diagrams([name])[name])
+
+                # Keep the console to one line per rebuild, but surface new problems.
+                log = io.StringIO()
+                with contextlib.redirect_stdout(log):
+                    run_build(output_dir, args, BuildManifest(output_dir), pool, live=True)
+                for line in log.getvalue().splitlines():
+                    if any(word in line for word in ("Error", "Warning", "Skipping")) and line not in reported:
+                        reported.add(line)
+                        print(line)
+                write_viewer_patch(output_dir, names, args.viewer, reload)
+
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                touched = ", ".join(names + [f"-{name}" for name in removed])
+                print(f"[{datetime.now():%H:%M:%S}] Rebuilt {touched} in {elapsed_ms:.0f} ms "
+                      f"({len(changed)} file(s) changed)")
+    except KeyboardInterrupt:
+        print("\nStopping watch; writing final viewer...")
+        run_build(output_dir, args, BuildManifest(output_dir), pool)
+        (output_dir / VIEWER_PATCH).unlink(missing_ok=True)
+    finally:
+        if pool:
+            pool.close()
+
+
 # =============================================================================
 # MAIN
 # =============================================================================
@@ -932,8 +2051,58 @@ def main():
         default="all",
         help="Output format (default: all)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_RENDER_WORKERS,
+        help=f"Number of Mermaid render workers (default: {DEFAULT_RENDER_WORKERS})"
+    )
+    parser.add_argument(
+        "--renderer",
+        type=str,
+        choices=["python", "mermaid-cli"],
+        default=DEFAULT_RENDERER,
+        help="Image backend: in-process Python renderer or mermaid-cli (default: python)"
+    )
+    parser.add_argument(
+        "--viewer",
+        type=str,
+        choices=VIEWER_MODES,
+        default=DEFAULT_VIEWER,
+        help="HTML viewer: pre-rendered SVG inline or from svg/ files, "
+             "or client-side Mermaid (default: inline)"
+    )
+    parser.add_argument(
+        "--definitions",
+        type=str,
+        default=None,
+        help="Directory of external .mmd definitions overriding or adding to the built-in diagrams"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and rebuild diagrams whose definitions change"
+    )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="Check every diagram definition and exit without generating anything"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild every artifact, ignoring the build manifest"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="List stale artifacts without building anything"
+    )
 
     args = parser.parse_args()
+    started = time.perf_counter()
+    if args.watch and (args.dry_run or args.validate):
+        parser.error("--watch cannot be combined with --dry-run or --validate")
 
     # Resolve output directory
     script_dir = Path(__file__).parent.parent
@@ -941,7 +2110,29 @@ def main():
     if not output_dir.is_absolute():
         output_dir = script_dir / output_dir
 
+    definitions_dir = Path(args.definitions) if args.definitions else None
+    if definitions_dir and not definitions_dir.is_absolute():
+        definitions_dir = script_dir / definitions_dir
+    if definitions_dir:
+        if not definitions_dir.is_dir():
+            parser.error(f"--definitions: {definitions_dir} is not a directory")
+        resolved = resolve_diagrams(DIAGRAMS, definitions_dir)
+        DIAGRAMS.clear()
+        DIAGRAMS.update(resolved)
+
+    if args.validate:
+        results = validate_diagrams()
+        for name, diagnostics in results.items():
+            print_diagnostics(DIAGRAMS[name].get("source", name), diagnostics)
+        failed = [name for name, diagnostics in results.items() if has_errors(diagnostics)]
+        print(f"Validated {len(results)} diagram(s): {len(failed)} with errors")
+        sys.exit(1 if failed else 0)
+
     ensure_directory(output_dir)
+    if args.watch:
+        watch(output_dir, definitions_dir, args)
+        return
+    manifest = BuildManifest(output_dir, force=args.force, dry_run=args.dry_run)
 
     print(f"\n{'='*60}")
     print("TPRM Process Flow Diagram Generator")
@@ -950,32 +2141,14 @@ def main():
     print(f"Format: {args.format}")
     print(f"{'='*60}\n")
 
-    # Generate based on format
-    if args.format in ["mermaid", "all"]:
-        print("Generating Mermaid files...")
-        generate_mermaid_files(output_dir)
-        print()
-
-    if args.format in ["html", "all"]:
-        print("Generating HTML viewer...")
-        generate_html_viewer(output_dir)
-        print()
-
-    if args.format in ["png", "all"]:
-        print("Generating PNG images...")
-        generate_png_images(output_dir)
-        print()
-
-    if args.format in ["svg", "all"]:
-        print("Generating SVG images...")
-        generate_svg_images(output_dir)
-        print()
-
-    print("Generating index...")
-    generate_index(output_dir)
+    run_build(output_dir, args, manifest)
 
+    elapsed_ms = (time.perf_counter() - started) * 1000
     print(f"\n{'='*60}")
-    print("Generation complete!")
+    if args.dry_run:
+        print(f"Dry run: {manifest.planned} artifact(s) stale, {manifest.up_to_date} up to date")
+    else:
+        print(f"Generation complete! ({manifest.up_to_date} up to date, {elapsed_ms:.0f} ms)")
     print(f"{'='*60}")
     print(f"\nOpen {output_dir / 'TPRM_Diagrams.html'} in a browser to view diagrams.")
     print(f"See {output_dir / 'README.md'} for usage instructions.\n")
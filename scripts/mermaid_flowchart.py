@@ -0,0 +1,1174 @@
+#!/usr/bin/env python3
+"""
+Mermaid Flowchart Renderer
+
+Pure-Python renderer for the Mermaid flowchart subset used by the TPRM
+process diagrams. No Node.js or headless browser is required.
+
+Pipeline:
+  1. parse_flowchart()  - Mermaid source -> Flowchart (nodes, edges, subgraphs)
+  2. layout_flowchart() - layered (Sugiyama-style) layout: cycle removal,
+                          longest-path ranking, barycentric crossing reduction
+                          and iterative coordinate assignment
+  3. render_svg()       - Layout -> standalone SVG document
+
+validate_flowchart() checks a parsed Flowchart for mistakes that would
+otherwise only surface at render time (undefined style targets, duplicate
+ids, dangling edges, unreachable nodes).
+
+Supported syntax:
+  - flowchart/graph header with TD, TB, BT, LR or RL
+  - node shapes: [rect], (round), ([stadium]), [[subroutine]], [(cylinder)],
+    ((circle)), {diamond}, {{hexagon}}; quoted labels; <br/> line breaks
+  - edges: -->, ---, -.->, -.-, ==>, ===, with |labels| or "-- label -->",
+    circle (--o) and cross (--x) ends, two-way (<-->), chains and & groups
+  - subgraph ID["Label"] ... end (nested), direction, style, %% comments
+  - classDef, class and the A:::class shorthand
+
+Usage:
+    python mermaid_flowchart.py INPUT.mmd [OUTPUT.svg]
+    python mermaid_flowchart.py --validate INPUT.mmd [INPUT.mmd ...]
+"""
+
+import re
+import sys
+import html
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+# =============================================================================
+# MODEL
+# =============================================================================
+
+DIRECTIONS = ("TD", "TB", "BT", "LR", "RL")
+
+
+class MermaidSyntaxError(ValueError):
+    """Raised when a flowchart definition cannot be parsed."""
+
+    def __init__(self, message: str, line: int = 0, text: str = ""):
+        self.line = line
+        self.text = text
+        super().__init__(f"line {line}: {message}" + (f" -> {text!r}" if text else ""))
+
+
+class UnsupportedSyntaxError(MermaidSyntaxError):
+    """Raised for valid Mermaid syntax outside the subset this renderer parses."""
+
+
+@dataclass
+class Node:
+    id: str
+    label: str
+    shape: str = "rect"
+    subgraph: Optional[str] = None
+    line: int = 0
+    explicit: bool = False  # given a shape and label somewhere
+    declared: bool = False  # given a shape or listed on a line of its own
+
+
+@dataclass
+class Edge:
+    source: str
+    target: str
+    label: str = ""
+    dotted: bool = False
+    thick: bool = False
+    head: str = "arrow"  # marker at the target end: "arrow", "circle", "cross" or ""
+    tail: str = ""  # marker at the source end, for two-way edges
+    line: int = 0
+
+
+@dataclass
+class Subgraph:
+    id: str
+    label: str
+    parent: Optional[str] = None
+    direction: Optional[str] = None
+    line: int = 0
+
+
+@dataclass
+class Style:
+    target: str
+    properties: Dict[str, str]
+    line: int = 0
+
+
+@dataclass
+class Flowchart:
+    direction: str = "TD"
+    nodes: Dict[str, Node] = field(default_factory=dict)
+    edges: List[Edge] = field(default_factory=list)
+    subgraphs: Dict[str, Subgraph] = field(default_factory=dict)
+    styles: List[Style] = field(default_factory=list)
+    classes: Dict[str, Dict[str, str]] = field(default_factory=dict)  # classDef name -> properties
+    class_refs: List[Tuple[str, str, int]] = field(default_factory=list)  # (id, class, line)
+    redefinitions: List[Tuple[str, int]] = field(default_factory=list)  # (id, line)
+
+    def members(self, subgraph_id: str) -> List[str]:
+        """Return every node inside a subgraph, including nested subgraphs."""
+        inside = {subgraph_id}
+        for sub in self.subgraphs.values():
+            parent = sub.parent
+            while parent:
+                if parent == subgraph_id:
+                    inside.add(sub.id)
+                    break
+                parent = self.subgraphs[parent].parent
+        return [n.id for n in self.nodes.values() if n.subgraph in inside]
+
+    def ancestry(self, subgraph_id: Optional[str]) -> Tuple[str, ...]:
+        """Return the chain of subgraph ids from the outermost down to subgraph_id."""
+        chain = []
+        while subgraph_id:
+            chain.append(subgraph_id)
+            subgraph_id = self.subgraphs[subgraph_id].parent
+        return tuple(reversed(chain))
+
+
+# =============================================================================
+# PARSER
+# =============================================================================
+
+# Longest openers first so "[(" wins over "[" and "((" over "(".
+NODE_SHAPES = [
+    ("[(", ")]", "cylinder"),
+    ("((", "))", "circle"),
+    ("([", "])", "stadium"),
+    ("[[", "]]", "subroutine"),
+    ("{{", "}}", "hexagon"),
+    ("[", "]", "rect"),
+    ("(", ")", "round"),
+    ("{", "}", "diamond"),
+    (">", "]", "asymmetric"),
+]
+
+# Hyphens are allowed inside ids but never trailing, so "A-->B" splits cleanly.
+NODE_ID = re.compile(r"[A-Za-z0-9_]+(?:-[A-Za-z0-9_]+)*")
+# An edge is a line ("--", "-.-", "==") with optional end markers; o and x
+# ends must be followed by a space so "--oB" is not read as "--o B".
+EDGE_OPERATOR = re.compile(r"\s*(?P<tail>[<ox])?(?P<body>-\.+-|==+|--+)(?P<head>>|[ox](?=\s))?\s*")
+# The same with the label inside: "-- label -->", "-. label .->", "== label ==>".
+EDGE_TEXT = re.compile(
+    r"\s*(?P<tail>[<ox])?(?:--\s+(?P<solid>[^|]+?)\s*--+|-\.\s+(?P<dotted>[^|]+?)\s*\.+-|"
+    r"==\s+(?P<thick>[^|]+?)\s*==+)(?P<head>>|[ox](?=\s))?\s*"
+)
+EDGE_LABEL = re.compile(r"\|([^|]*)\|\s*")
+EDGE_ENDS = {"<": "arrow", ">": "arrow", "o": "circle", "x": "cross"}
+CLASS_SHORTHAND = re.compile(r":::([\w\-]+)")
+HEADER = re.compile(r"^(?:flowchart|graph)(?:\s+(TD|TB|BT|LR|RL))?\s*;?$", re.IGNORECASE)
+SUBGRAPH = re.compile(
+    r'^subgraph\s+(?:"(?P<quoted>[^"]*)"|(?P<id>[\w\-]+)\s*(?:\[\s*"?(?P<label>[^\]"]*)"?\s*\])?)\s*$'
+)
+DIRECTION = re.compile(r"^direction\s+(TD|TB|BT|LR|RL)\s*$")
+STYLE = re.compile(r"^style\s+([\w\-]+)\s+(.+?);?$")
+CLASS_DEF = re.compile(r"^classDef\s+([\w\-,]+)\s+(.+?);?$")
+CLASS = re.compile(r"^class\s+(.+?)\s+([\w\-]+)\s*;?$")
+IGNORED = re.compile(r"^(linkStyle|click)\b")
+# Other Mermaid diagram types and flowchart statements this renderer skips
+# support for; mermaid-cli can still render them.
+OTHER_DIAGRAM = re.compile(
+    r"^(sequenceDiagram|classDiagram|stateDiagram(-v2)?|erDiagram|gantt|pie|journey|gitGraph|"
+    r"mindmap|timeline|quadrantChart|requirementDiagram|C4\w+|[a-z]+-beta)\b"
+)
+UNSUPPORTED_STATEMENT = re.compile(r"^(accTitle|accDescr)\b")
+# What may follow a node when a line uses an edge or node syntax the parser
+# does not know (e.g. "~~~", "--->>", "A@{ shape: ... }"), as opposed to
+# plain garbage after a node id
+UNKNOWN_OPERATOR = re.compile(r"[-=.~<>@]")
+DANGLING_OPERATOR = re.compile(r"[-=.~<][-=.~<>ox]*\s*$")
+
+
+def _parse_node(text: str, pos: int, line: int) -> Tuple[str, Optional[str], Optional[str], int]:
+    """Parse ``ID`` or ``ID<shape>label<close>`` at pos; return (id, label, shape, end)."""
+    match = NODE_ID.match(text, pos)
+    if not match:
+        raise MermaidSyntaxError("expected node id", line, text[pos:])
+    node_id = match.group(0)
+    pos = match.end()
+
+    for opener, closer, shape in NODE_SHAPES:
+        if not text.startswith(opener, pos):
+            continue
+        start = pos + len(opener)
+        if text.startswith('"', start):
+            quote_end = text.find('"', start + 1)
+            if quote_end < 0 or not text.startswith(closer, quote_end + 1):
+                raise MermaidSyntaxError(f"unterminated quoted label for {node_id}", line, text[pos:])
+            return node_id, text[start + 1:quote_end], shape, quote_end + 1 + len(closer)
+        end = text.find(closer, start)
+        if end < 0:
+            raise MermaidSyntaxError(f"missing {closer!r} for node {node_id}", line, text[pos:])
+        return node_id, text[start:end].strip(), shape, end + len(closer)
+
+    return node_id, None, None, pos
+
+
+def _parse_group(text: str, pos: int, line: int) -> Tuple[list, int]:
+    """Parse one or more nodes (each with an optional ``:::class``) joined by ``&``."""
+    group = []
+    while True:
+        pos = _skip_spaces(text, pos)
+        node_id, label, shape, pos = _parse_node(text, pos, line)
+        match = CLASS_SHORTHAND.match(text, pos)
+        if match:
+            pos = match.end()
+        group.append((node_id, label, shape, match.group(1) if match else None))
+        pos = _skip_spaces(text, pos)
+        if not text.startswith("&", pos):
+            return group, pos
+        pos += 1
+
+
+def _skip_spaces(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos] in " \t":
+        pos += 1
+    return pos
+
+
+def _parse_operator(text: str, pos: int, line: int) -> Tuple[dict, int]:
+    """Parse an edge operator and its label at pos; return (Edge fields, end)."""
+    match = EDGE_TEXT.match(text, pos)
+    if match:
+        kind = next(k for k in ("solid", "dotted", "thick") if match.group(k) is not None)
+        label = match.group(kind).strip()
+    else:
+        match = EDGE_OPERATOR.match(text, pos)
+        # "--" and "==" only open a labelled edge; on their own they need an end
+        if not match or (match.group("body") in ("--", "==") and not match.group("head")):
+            rest = text[pos:].strip()
+            if DANGLING_OPERATOR.match(rest):
+                raise MermaidSyntaxError("edge has no target", line, rest)
+            if UNKNOWN_OPERATOR.match(rest):
+                raise UnsupportedSyntaxError("unsupported edge or node syntax", line, rest)
+            raise MermaidSyntaxError("expected edge operator", line, rest)
+        body = match.group("body")
+        kind = "dotted" if "." in body else "thick" if body.startswith("=") else "solid"
+        label = ""
+    if match.group("tail") and not match.group("head"):
+        raise MermaidSyntaxError("two-way edge needs a marker at both ends", line, text[pos:])
+    pos = match.end()
+    if not label:
+        labelled = EDGE_LABEL.match(text, pos)
+        if labelled:
+            label = labelled.group(1).strip()
+            pos = labelled.end()
+    return {
+        "label": label,
+        "dotted": kind == "dotted",
+        "thick": kind == "thick",
+        "head": EDGE_ENDS.get(match.group("head"), ""),
+        "tail": EDGE_ENDS.get(match.group("tail"), ""),
+    }, pos
+
+
+def _properties(text: str) -> Dict[str, str]:
+    """Parse ``key:value,key:value`` style properties."""
+    properties = {}
+    for part in text.split(","):
+        key, _, value = part.partition(":")
+        if key.strip() and value.strip():
+            properties[key.strip()] = value.strip()
+    return properties
+
+
+def parse_flowchart(source: str) -> Flowchart:
+    """Parse a Mermaid flowchart definition into a Flowchart model."""
+    chart = Flowchart()
+    stack: List[str] = []
+    header_seen = False
+
+    def touch(node_id, label, shape, cls, line):
+        node = chart.nodes.get(node_id)
+        if node is None:
+            node = Node(node_id, node_id, subgraph=stack[-1] if stack else None, line=line)
+            chart.nodes[node_id] = node
+        if shape is not None:
+            if node.explicit:
+                chart.redefinitions.append((node_id, line))
+            node.label, node.shape, node.explicit, node.declared = label, shape, True, True
+        if cls:
+            chart.class_refs.append((node_id, cls, line))
+
+    for number, raw in enumerate(source.splitlines(), start=1):
+        line = raw.strip()
+        if not line or line.startswith("%%"):
+            continue
+
+        if not header_seen:
+            match = HEADER.match(line)
+            if not match:
+                if OTHER_DIAGRAM.match(line):
+                    raise UnsupportedSyntaxError("only flowcharts are supported", number, line)
+                raise MermaidSyntaxError("expected 'flowchart <direction>' header", number, line)
+            chart.direction = (match.group(1) or "TD").upper()
+            header_seen = True
+            continue
+
+        if line == "end":
+            if not stack:
+                raise MermaidSyntaxError("'end' without matching subgraph", number, line)
+            stack.pop()
+            continue
+
+        if line.startswith("subgraph"):
+            match = SUBGRAPH.match(line)
+            if not match:
+                raise MermaidSyntaxError("invalid subgraph header", number, line)
+            sub_id = match.group("id") or match.group("quoted")
+            label = match.group("label") or match.group("quoted") or sub_id
+            if sub_id in chart.subgraphs:
+                chart.redefinitions.append((sub_id, number))
+            chart.subgraphs[sub_id] = Subgraph(sub_id, label, stack[-1] if stack else None, line=number)
+            stack.append(sub_id)
+            continue
+
+        match = DIRECTION.match(line)
+        if match:
+            if stack:
+                chart.subgraphs[stack[-1]].direction = match.group(1)
+            else:
+                chart.direction = match.group(1)
+            continue
+
+        match = STYLE.match(line)
+        if match:
+            chart.styles.append(Style(match.group(1), _properties(match.group(2)), number))
+            continue
+
+        match = CLASS_DEF.match(line)
+        if match:
+            for name in filter(None, match.group(1).split(",")):
+                chart.classes[name] = _properties(match.group(2))
+            continue
+
+        match = CLASS.match(line)
+        if match:
+            for target in match.group(1).split(","):
+                if target.strip():
+                    chart.class_refs.append((target.strip(), match.group(2), number))
+            continue
+
+        if IGNORED.match(line):
+            continue
+        if UNSUPPORTED_STATEMENT.match(line):
+            raise UnsupportedSyntaxError("unsupported statement", number, line)
+
+        text = line.rstrip(";")
+        group, pos = _parse_group(text, 0, number)
+        for node_id, label, shape, cls in group:
+            touch(node_id, label, shape, cls, number)
+        if pos >= len(text):
+            for node_id, *_ in group:
+                chart.nodes[node_id].declared = True
+
+        while pos < len(text):
+            edge, pos = _parse_operator(text, pos, number)
+            targets, pos = _parse_group(text, pos, number)
+            for node_id, node_label, shape, cls in targets:
+                touch(node_id, node_label, shape, cls, number)
+            for source_id, *_ in group:
+                for target_id, *_ in targets:
+                    chart.edges.append(Edge(source_id, target_id, line=number, **edge))
+            group = targets
+
+    if not header_seen:
+        raise MermaidSyntaxError("empty definition")
+    if stack:
+        raise MermaidSyntaxError(f"subgraph {stack[-1]!r} is never closed", chart.subgraphs[stack[-1]].line)
+
+    # Bare references to a subgraph id (e.g. "A --> PARALLEL") are edges to
+    # the subgraph itself, not implicit nodes.
+    for sub_id in chart.subgraphs:
+        node = chart.nodes.get(sub_id)
+        if node is not None and not node.explicit:
+            del chart.nodes[sub_id]
+
+    return chart
+
+
+# =============================================================================
+# VALIDATION
+# =============================================================================
+
+@dataclass
+class Diagnostic:
+    severity: str  # "error" blocks rendering, "warning" does not
+    message: str
+    line: int = 0
+
+    def __str__(self) -> str:
+        where = f"line {self.line}: " if self.line else ""
+        return f"{self.severity}: {where}{self.message}"
+
+
+def validate_flowchart(chart: Flowchart) -> List[Diagnostic]:
+    """
+    Check a parsed flowchart for structural mistakes.
+
+    Errors: duplicate node/subgraph ids, style or class lines targeting
+    unknown ids, edges touching an empty subgraph. Warnings: classes with no
+    classDef, ids used in edges but declared nowhere (usually a typo),
+    nodes with no connections in a diagram that has edges, and cycles that
+    no path from an entry node reaches.
+    """
+    diagnostics = []
+
+    for ref, line in chart.redefinitions:
+        diagnostics.append(Diagnostic("error", f"duplicate id {ref!r} (already defined)", line))
+    for node in chart.nodes.values():
+        if node.id in chart.subgraphs:
+            diagnostics.append(Diagnostic("error", f"node id {node.id!r} is also a subgraph id", node.line))
+
+    for style in chart.styles:
+        if style.target not in chart.nodes and style.target not in chart.subgraphs:
+            diagnostics.append(Diagnostic("error", f"style targets undefined id {style.target!r}", style.line))
+    for target, cls, line in chart.class_refs:
+        if target not in chart.nodes and target not in chart.subgraphs:
+            diagnostics.append(Diagnostic("error", f"class {cls!r} assigned to undefined id {target!r}", line))
+        elif cls not in chart.classes:
+            diagnostics.append(Diagnostic("warning", f"class {cls!r} has no classDef", line))
+
+    for edge in chart.edges:
+        for ref in (edge.source, edge.target):
+            if ref in chart.subgraphs and not chart.members(ref):
+                diagnostics.append(Diagnostic("error", f"edge connects to empty subgraph {ref!r}", edge.line))
+
+    for node in chart.nodes.values():
+        if not node.declared:
+            where = f" (placed in subgraph {node.subgraph!r} by that edge)" if node.subgraph else ""
+            diagnostics.append(Diagnostic(
+                "warning", f"node {node.id!r} is only used in edges and declared nowhere{where}", node.line
+            ))
+
+    if not chart.edges:
+        return diagnostics
+
+    # Edges to or from a subgraph connect every member of it.
+    succ = {n: set() for n in chart.nodes}
+    has_pred = set()
+    for edge in chart.edges:
+        sources = [edge.source] if edge.source in chart.nodes else chart.members(edge.source)
+        targets = [edge.target] if edge.target in chart.nodes else chart.members(edge.target)
+        for u in sources:
+            for v in targets:
+                if u != v:
+                    succ[u].add(v)
+                    has_pred.add(v)
+
+    for node in chart.nodes.values():
+        if not succ[node.id] and node.id not in has_pred:
+            diagnostics.append(Diagnostic("warning", f"node {node.id!r} is not connected to the flow", node.line))
+
+    # A connected part with entry nodes must reach all of its nodes from them;
+    # a part that is one closed loop (e.g. a lifecycle) has no entry and is fine.
+    neighbours = {n: set(succ[n]) for n in chart.nodes}
+    for u in chart.nodes:
+        for v in succ[u]:
+            neighbours[v].add(u)
+    seen = set()
+    for start in chart.nodes:
+        if start in seen:
+            continue
+        component, frontier = set(), [start]
+        while frontier:
+            node = frontier.pop()
+            if node not in component:
+                component.add(node)
+                frontier.extend(neighbours[node])
+        seen |= component
+
+        reached, frontier = set(), [n for n in component if n not in has_pred]
+        if not frontier:
+            continue
+        while frontier:
+            node = frontier.pop()
+            if node not in reached:
+                reached.add(node)
+                frontier.extend(succ[node])
+        for node_id in sorted(component - reached, key=lambda n: chart.nodes[n].line):
+            diagnostics.append(Diagnostic(
+                "warning", f"node {node_id!r} is unreachable (inside a cycle with no entry)",
+                chart.nodes[node_id].line,
+            ))
+
+    return diagnostics
+
+
+# Prefix of the diagnostic for valid Mermaid this renderer does not parse
+UNSUPPORTED = "not supported by the Python renderer"
+
+
+def check_flowchart(source: str, fallback: bool = False) -> Tuple[Optional[Flowchart], List[Diagnostic]]:
+    """
+    Parse and validate a definition; the chart is None when parsing fails.
+
+    A syntax error is always an error. Valid Mermaid that this renderer does
+    not parse is an error too, unless another renderer can take the diagram
+    (fallback=True, e.g. mermaid-cli is installed), when it is a warning.
+    """
+    try:
+        chart = parse_flowchart(source)
+    except UnsupportedSyntaxError as e:
+        message = str(e).split(": ", 1)[-1] if e.line else str(e)
+        severity = "warning" if fallback else "error"
+        return None, [Diagnostic(severity, f"{UNSUPPORTED}: {message}", e.line)]
+    except MermaidSyntaxError as e:
+        message = str(e).split(": ", 1)[-1] if e.line else str(e)
+        return None, [Diagnostic("error", message, e.line)]
+    return chart, validate_flowchart(chart)
+
+
+# =============================================================================
+# LAYOUT
+# =============================================================================
+
+FONT_SIZE = 14
+CHAR_WIDTH = 8.0
+LINE_HEIGHT = 18
+NODE_SPACING = 40
+DUMMY_SPACING = 16
+RANK_SPACING = 60
+CLUSTER_PADDING = 16
+CLUSTER_TITLE = 24
+MARGIN = 20
+CROSSING_SWEEPS = 4
+POSITION_SWEEPS = 8
+
+LINE_BREAK = re.compile(r"<br\s*/?>", re.IGNORECASE)
+
+
+def label_lines(label: str) -> List[str]:
+    """Split a Mermaid label on <br/> tags."""
+    return [part.strip() for part in LINE_BREAK.split(label)] or [""]
+
+
+def measure_label(label: str) -> Tuple[float, float]:
+    """Approximate rendered (width, height) of a label."""
+    lines = label_lines(label)
+    return max(len(line) for line in lines) * CHAR_WIDTH, len(lines) * LINE_HEIGHT
+
+
+def node_size(node: Node) -> Tuple[float, float]:
+    """Return (width, height) of a node's shape."""
+    text_w, text_h = measure_label(node.label)
+    if node.shape == "diamond":
+        side = text_w + text_h + 24
+        return side, side
+    if node.shape == "circle":
+        diameter = max(text_w, text_h) + 28
+        return diameter, diameter
+    if node.shape == "cylinder":
+        return text_w + 32, text_h + 36
+    if node.shape == "hexagon":
+        return text_w + 52, text_h + 20
+    return text_w + 32, text_h + 20
+
+
+@dataclass
+class Layout:
+    width: float
+    height: float
+    nodes: Dict[str, Tuple[float, float, float, float]]  # id -> (cx, cy, w, h)
+    clusters: Dict[str, Tuple[float, float, float, float]]  # id -> (x0, y0, x1, y1)
+    edges: List[Tuple[Edge, List[Tuple[float, float]]]]
+
+
+def _endpoints(chart: Flowchart, ref: str, as_target: bool) -> List[str]:
+    """Resolve an edge endpoint (node or subgraph id) to layout nodes."""
+    if ref in chart.nodes:
+        return [ref]
+    members = chart.members(ref) if ref in chart.subgraphs else []
+    inside = set(members)
+    boundary = []
+    for member in members:
+        linked = any(
+            (e.target == member and e.source in inside) if as_target else (e.source == member and e.target in inside)
+            for e in chart.edges
+        )
+        if not linked:
+            boundary.append(member)
+    return boundary or members
+
+
+def _remove_cycles(order: List[str], succ: Dict[str, List[str]]) -> set:
+    """Return the set of (u, v) edges to reverse so the graph becomes acyclic."""
+    state = {}
+    reversed_edges = set()
+    for root in order:
+        if root in state:
+            continue
+        state[root] = 1
+        stack = [(root, iter(succ[root]))]
+        while stack:
+            node, children = stack[-1]
+            advanced = False
+            for child in children:
+                if state.get(child) == 1:
+                    reversed_edges.add((node, child))
+                elif child not in state:
+                    state[child] = 1
+                    stack.append((child, iter(succ[child])))
+                    advanced = True
+                    break
+            if not advanced:
+                state[node] = 2
+                stack.pop()
+    return reversed_edges
+
+
+def _assign_ranks(order: List[str], edges: List[Tuple[str, str]]) -> Dict[str, int]:
+    """Longest-path layering, then pull sources down next to their successors."""
+    succ = {n: [] for n in order}
+    indegree = {n: 0 for n in order}
+    for u, v in edges:
+        succ[u].append(v)
+        indegree[v] += 1
+
+    rank = {n: 0 for n in order}
+    ready = [n for n in order if indegree[n] == 0]
+    while ready:
+        node = ready.pop(0)
+        for child in succ[node]:
+            rank[child] = max(rank[child], rank[node] + 1)
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                ready.append(child)
+
+    has_pred = {v for _, v in edges}
+    for node in order:
+        if node not in has_pred and succ[node]:
+            rank[node] = min(rank[c] for c in succ[node]) - 1
+    return rank
+
+
+def layout_flowchart(chart: Flowchart) -> Layout:
+    """Compute positions for nodes, subgraph boxes and edge routes."""
+    vertical = chart.direction in ("TD", "TB", "BT")
+    sizes = {}
+    for node in chart.nodes.values():
+        w, h = node_size(node)
+        sizes[node.id] = (w, h) if vertical else (h, w)  # (along order axis, along rank axis)
+
+    cluster_of = {n.id: chart.ancestry(n.subgraph) for n in chart.nodes.values()}
+    order = list(chart.nodes)
+
+    # Layout edges: subgraph endpoints expand to their boundary members.
+    pairs = []
+    for edge in chart.edges:
+        for u in _endpoints(chart, edge.source, as_target=False):
+            for v in _endpoints(chart, edge.target, as_target=True):
+                if u != v and (u, v) not in pairs:
+                    pairs.append((u, v))
+
+    succ = {n: [] for n in order}
+    for u, v in pairs:
+        succ[u].append(v)
+    flipped = _remove_cycles(order, succ)
+    dag = [(v, u) if (u, v) in flipped else (u, v) for u, v in pairs]
+    dag = list(dict.fromkeys(p for p in dag if p[0] != p[1]))
+    rank = _assign_ranks(order, dag)
+
+    # Split long edges with dummy nodes so every DAG edge spans one rank.
+    chains = {}
+    preds = {n: [] for n in order}
+    succs = {n: [] for n in order}
+    for u, v in dag:
+        chain = [u]
+        common = _common_prefix(cluster_of[u], cluster_of[v])
+        for r in range(rank[u] + 1, rank[v]):
+            dummy = f"\0{u}\0{v}\0{r}"
+            rank[dummy] = r
+            sizes[dummy] = (DUMMY_SPACING, 0)
+            cluster_of[dummy] = common
+            preds[dummy], succs[dummy] = [], []
+            chain.append(dummy)
+        chain.append(v)
+        for a, b in zip(chain, chain[1:]):
+            succs[a].append(b)
+            preds[b].append(a)
+        chains[(u, v)] = chain
+
+    layers: List[List[str]] = [[] for _ in range(max(rank.values(), default=0) + 1)]
+    for node in list(order) + [d for d in rank if d not in chart.nodes]:
+        layers[rank[node]].append(node)
+
+    # Crossing reduction: barycenter sweeps, keeping subgraph members together.
+    position = {}
+    for layer in layers:
+        for i, node in enumerate(layer):
+            position[node] = i
+    for sweep in range(CROSSING_SWEEPS * 2):
+        downward = sweep % 2 == 0
+        sequence = layers[1:] if downward else layers[-2::-1]
+        for layer in sequence:
+            neighbours = preds if downward else succs
+            barycenter = {}
+            for node in layer:
+                linked = [position[n] for n in neighbours[node]]
+                barycenter[node] = sum(linked) / len(linked) if linked else position[node]
+            layer[:] = _cluster_sort(layer, barycenter, cluster_of, 0)
+            for i, node in enumerate(layer):
+                position[node] = i
+
+    # Coordinate assignment along the order axis.
+    def separation(a, b):
+        gap = DUMMY_SPACING if a not in chart.nodes or b not in chart.nodes else NODE_SPACING
+        common = len(_common_prefix(cluster_of[a], cluster_of[b]))
+        gap += CLUSTER_PADDING * (len(cluster_of[a]) + len(cluster_of[b]) - 2 * common)
+        if not vertical:
+            # Subgraph titles sit on the top edge, which is the order axis here.
+            gap += CLUSTER_TITLE * (len(cluster_of[b]) - common)
+        return (sizes[a][0] + sizes[b][0]) / 2 + gap
+
+    coord = {}
+    for layer in layers:
+        x = 0.0
+        for i, node in enumerate(layer):
+            if i:
+                x += separation(layer[i - 1], node)
+            coord[node] = x
+        shift = x / 2
+        for node in layer:
+            coord[node] -= shift
+
+    for sweep in range(POSITION_SWEEPS):
+        downward = sweep % 2 == 0
+        sequence = layers[1:] if downward else layers[-2::-1]
+        neighbours = preds if downward else succs
+        for layer in sequence:
+            desired = {}
+            for node in layer:
+                linked = [coord[n] for n in neighbours[node]]
+                desired[node] = sum(linked) / len(linked) if linked else coord[node]
+            placed = {}
+            for i, node in enumerate(layer):
+                placed[node] = desired[node]
+                if i:
+                    placed[node] = max(placed[node], placed[layer[i - 1]] + separation(layer[i - 1], node))
+            drift = sum(placed[n] - desired[n] for n in layer) / len(layer)
+            for node in layer:
+                coord[node] = placed[node] - drift
+
+    _separate_clusters(chart, layers, rank, coord, sizes, cluster_of, vertical)
+
+    # Coordinates along the rank axis. Gaps grow by the borders (and, top to
+    # bottom, titles) of the subgraphs that close or open between two ranks.
+    span = {}
+    for node in chart.nodes:
+        for sub_id in cluster_of[node]:
+            low, high = span.get(sub_id, (rank[node], rank[node]))
+            span[sub_id] = (min(low, rank[node]), max(high, rank[node]))
+    opening_size = CLUSTER_PADDING + (CLUSTER_TITLE if vertical else 0)
+
+    def boundary_gap(upper, lower):
+        closing = max((sum(1 for s in cluster_of[n] if span[s][1] == rank[n]) for n in upper if n in chart.nodes), default=0)
+        opening = max((sum(1 for s in cluster_of[n] if span[s][0] == rank[n]) for n in lower if n in chart.nodes), default=0)
+        return closing * CLUSTER_PADDING + opening * opening_size
+
+    rank_extent = [max((sizes[n][1] for n in layer), default=0) for layer in layers]
+    rank_coord = []
+    cursor = 0.0
+    for i, extent in enumerate(rank_extent):
+        if i:
+            gap = RANK_SPACING + boundary_gap(layers[i - 1], layers[i])
+            cursor += rank_extent[i - 1] / 2 + gap + extent / 2
+        rank_coord.append(cursor)
+
+    flip = -1 if chart.direction in ("BT", "RL") else 1
+
+    def to_xy(node):
+        along = coord[node]
+        across = rank_coord[rank[node]] * flip
+        return (along, across) if vertical else (across, along)
+
+    boxes = {}
+    for node in chart.nodes.values():
+        cx, cy = to_xy(node.id)
+        w, h = node_size(node)
+        boxes[node.id] = (cx, cy, w, h)
+
+    clusters = _cluster_boxes(chart, boxes)
+
+    # Normalise so the drawing starts at the margin.
+    extents = [(cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2) for cx, cy, w, h in boxes.values()]
+    extents += list(clusters.values())
+    min_x = min((e[0] for e in extents), default=0) - MARGIN
+    min_y = min((e[1] for e in extents), default=0) - MARGIN
+    max_x = max((e[2] for e in extents), default=0) + MARGIN
+    max_y = max((e[3] for e in extents), default=0) + MARGIN
+
+    boxes = {k: (cx - min_x, cy - min_y, w, h) for k, (cx, cy, w, h) in boxes.items()}
+    clusters = {k: (x0 - min_x, y0 - min_y, x1 - min_x, y1 - min_y) for k, (x0, y0, x1, y1) in clusters.items()}
+
+    def point(node):
+        x, y = to_xy(node)
+        return x - min_x, y - min_y
+
+    routes = []
+    for edge in chart.edges:
+        routes.append((edge, _route(chart, edge, chains, flipped, boxes, clusters, point)))
+
+    return Layout(max_x - min_x, max_y - min_y, boxes, clusters, routes)
+
+
+def _common_prefix(a: tuple, b: tuple) -> tuple:
+    prefix = []
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        prefix.append(x)
+    return tuple(prefix)
+
+
+def _cluster_sort(nodes: List[str], key: Dict[str, float], cluster_of: Dict[str, tuple], depth: int) -> List[str]:
+    """Order nodes by barycenter while keeping members of a subgraph contiguous."""
+    groups: Dict[Optional[str], List[str]] = {}
+    singles = []
+    for node in nodes:
+        path = cluster_of[node]
+        if len(path) > depth:
+            groups.setdefault(path[depth], []).append(node)
+        else:
+            singles.append(node)
+
+    items = [(key[n], [n]) for n in singles]
+    for members in groups.values():
+        mean = sum(key[n] for n in members) / len(members)
+        items.append((mean, _cluster_sort(members, key, cluster_of, depth + 1)))
+    items.sort(key=lambda item: item[0])
+    return [node for _, members in items for node in members]
+
+
+def _separate_clusters(chart, layers, rank, coord, sizes, cluster_of, vertical, path=()) -> Tuple[float, float]:
+    """
+    Shift the blocks inside a subgraph (path, or the whole chart) apart along
+    the order axis so their boxes never intersect.
+
+    A block is a child subgraph, moved as a unit once its own blocks are
+    separated, or a node directly inside. Per-layer separation only keeps
+    nodes on the same rank apart, but a subgraph box spans every rank between
+    its first and last member, so blocks whose rank spans overlap are placed
+    one after another here. Returns the order-axis extent of the contents.
+    """
+    depth = len(path)
+    blocks: Dict[str, List[str]] = {}
+    for node in rank:
+        inside = cluster_of[node]
+        if inside[:depth] == path:
+            blocks.setdefault(inside[depth] if len(inside) > depth else node, []).append(node)
+
+    extent, span = {}, {}
+    for key, members in blocks.items():
+        span[key] = (min(rank[n] for n in members), max(rank[n] for n in members))
+        if key in chart.subgraphs and cluster_of[members[0]][depth:depth + 1] == (key,):
+            lo, hi = _separate_clusters(chart, layers, rank, coord, sizes, cluster_of, vertical, path + (key,))
+            lo -= CLUSTER_PADDING + (0 if vertical else CLUSTER_TITLE)
+            hi += CLUSTER_PADDING
+            title = len(chart.subgraphs[key].label) * CHAR_WIDTH + 2 * CLUSTER_PADDING
+            if vertical and hi - lo < title:
+                grow = (title - (hi - lo)) / 2
+                lo, hi = lo - grow, hi + grow
+            extent[key] = [lo, hi]
+        else:
+            extent[key] = [coord[key] - sizes[key][0] / 2, coord[key] + sizes[key][0] / 2]
+
+    # Keep the left-to-right order the layers already agree on; blocks the
+    # layers do not order (or order inconsistently) follow their position.
+    block_of = {n: key for key, members in blocks.items() for n in members}
+    after = {key: set() for key in blocks}
+    before_count = {key: 0 for key in blocks}
+    for layer in layers:
+        keys = [block_of[n] for n in layer if n in block_of]
+        for a, b in zip(keys, keys[1:]):
+            if a != b and b not in after[a]:
+                after[a].add(b)
+                before_count[b] += 1
+    centre = {key: sum(extent[key]) / 2 for key in blocks}
+    ordered, remaining = [], set(blocks)
+    while remaining:
+        ready = [k for k in remaining if before_count[k] == 0] or list(remaining)
+        key = min(ready, key=lambda k: centre[k])
+        ordered.append(key)
+        remaining.discard(key)
+        for successor in after[key]:
+            before_count[successor] -= 1
+
+    placed = []
+    for key in ordered:
+        dummy = key not in chart.nodes and key not in chart.subgraphs
+        shift = 0.0
+        for other, other_dummy in placed:
+            if span[other][0] <= span[key][1] and span[key][0] <= span[other][1]:
+                gap = DUMMY_SPACING if dummy or other_dummy else NODE_SPACING
+                shift = max(shift, extent[other][1] + gap - extent[key][0])
+        if shift > 0:
+            for node in blocks[key]:
+                coord[node] += shift
+            extent[key][0] += shift
+            extent[key][1] += shift
+        placed.append((key, dummy))
+
+    return min(e[0] for e in extent.values()), max(e[1] for e in extent.values())
+
+
+def _cluster_boxes(chart: Flowchart, boxes: dict) -> Dict[str, Tuple[float, float, float, float]]:
+    """Bounding boxes for subgraphs, innermost first so parents enclose children."""
+    clusters = {}
+    depth = {s: len(chart.ancestry(s)) for s in chart.subgraphs}
+    for sub_id in sorted(chart.subgraphs, key=lambda s: -depth[s]):
+        parts = []
+        for node in chart.nodes.values():
+            if node.subgraph == sub_id:
+                cx, cy, w, h = boxes[node.id]
+                parts.append((cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2))
+        for child in chart.subgraphs.values():
+            if child.parent == sub_id and child.id in clusters:
+                parts.append(clusters[child.id])
+        if not parts:
+            continue
+        title_w = len(chart.subgraphs[sub_id].label) * CHAR_WIDTH + 2 * CLUSTER_PADDING
+        x0 = min(p[0] for p in parts) - CLUSTER_PADDING
+        x1 = max(p[2] for p in parts) + CLUSTER_PADDING
+        if x1 - x0 < title_w:
+            grow = (title_w - (x1 - x0)) / 2
+            x0, x1 = x0 - grow, x1 + grow
+        y0 = min(p[1] for p in parts) - CLUSTER_PADDING - CLUSTER_TITLE
+        y1 = max(p[3] for p in parts) + CLUSTER_PADDING
+        clusters[sub_id] = (x0, y0, x1, y1)
+    return clusters
+
+
+def _route(chart, edge, chains, flipped, boxes, clusters, point) -> List[Tuple[float, float]]:
+    """Polyline for an edge, clipped to the shapes it connects."""
+    source, target = edge.source, edge.target
+
+    if source in chart.nodes and target in chart.nodes and source != target:
+        key = (target, source) if (source, target) in flipped else (source, target)
+        chain = chains.get(key, [key[0], key[1]])
+        points = [point(n) for n in chain]
+        if key != (source, target):
+            points.reverse()
+    elif source == target and source in boxes:
+        cx, cy, w, h = boxes[source]
+        right = cx + w / 2
+        return [(right, cy - 8), (right + 24, cy - 16), (right + 24, cy + 16), (right, cy + 8)]
+    else:
+        points = [_anchor(source, boxes, clusters), _anchor(target, boxes, clusters)]
+
+    points[0] = _clip(source, chart, boxes, clusters, points[0], points[1])
+    points[-1] = _clip(target, chart, boxes, clusters, points[-1], points[-2])
+    return points
+
+
+def _anchor(ref, boxes, clusters):
+    if ref in boxes:
+        return boxes[ref][0], boxes[ref][1]
+    x0, y0, x1, y1 = clusters.get(ref, (0, 0, 0, 0))
+    return (x0 + x1) / 2, (y0 + y1) / 2
+
+
+def _clip(ref, chart, boxes, clusters, inside, toward):
+    """Move ``inside`` (the shape centre) to where the segment leaves the shape."""
+    dx, dy = toward[0] - inside[0], toward[1] - inside[1]
+    if dx == 0 and dy == 0:
+        return inside
+
+    if ref in boxes:
+        cx, cy, w, h = boxes[ref]
+        shape = chart.nodes[ref].shape
+    elif ref in clusters:
+        x0, y0, x1, y1 = clusters[ref]
+        cx, cy, w, h = (x0 + x1) / 2, (y0 + y1) / 2, x1 - x0, y1 - y0
+        shape = "rect"
+    else:
+        return inside
+
+    if shape == "circle":
+        scale = (w / 2) / (dx * dx + dy * dy) ** 0.5
+    elif shape == "diamond":
+        scale = 1 / (abs(dx) / (w / 2) + abs(dy) / (h / 2))
+    else:
+        scale = min((w / 2) / abs(dx) if dx else float("inf"), (h / 2) / abs(dy) if dy else float("inf"))
+    scale = min(scale, 1.0)
+    return cx + dx * scale, cy + dy * scale
+
+
+# =============================================================================
+# SVG OUTPUT
+# =============================================================================
+
+DEFAULT_NODE_STYLE = {"fill": "#ECECFF", "stroke": "#9370DB", "stroke-width": "1px", "color": "#333333"}
+CLUSTER_STYLE = {"fill": "#FFFFDE", "stroke": "#AAAA33"}
+EDGE_COLOR = "#333333"
+STYLE_ATTRIBUTES = ("fill", "stroke", "stroke-width", "stroke-dasharray")
+
+
+def _fmt(value: float) -> str:
+    return f"{value:.1f}".rstrip("0").rstrip(".")
+
+
+def _text(cx: float, cy: float, label: str, color: str, weight: str = "normal") -> str:
+    lines = label_lines(label)
+    top = cy - (len(lines) - 1) * LINE_HEIGHT / 2
+    spans = "".join(
+        f'<tspan x="{_fmt(cx)}" y="{_fmt(top + i * LINE_HEIGHT)}">{html.escape(line)}</tspan>'
+        for i, line in enumerate(lines)
+    )
+    return (
+        f'<text text-anchor="middle" dominant-baseline="central" fill="{html.escape(color)}" '
+        f'font-weight="{weight}">{spans}</text>'
+    )
+
+
+def _shape(node: Node, box: tuple, attrs: str) -> str:
+    cx, cy, w, h = box
+    x, y = cx - w / 2, cy - h / 2
+    if node.shape == "circle":
+        return f'<circle cx="{_fmt(cx)}" cy="{_fmt(cy)}" r="{_fmt(w / 2)}" {attrs}/>'
+    if node.shape == "diamond":
+        points = f"{_fmt(cx)},{_fmt(y)} {_fmt(x + w)},{_fmt(cy)} {_fmt(cx)},{_fmt(y + h)} {_fmt(x)},{_fmt(cy)}"
+        return f'<polygon points="{points}" {attrs}/>'
+    if node.shape == "hexagon":
+        inset = 16
+        points = " ".join(f"{_fmt(px)},{_fmt(py)}" for px, py in [
+            (x + inset, y), (x + w - inset, y), (x + w, cy), (x + w - inset, y + h), (x + inset, y + h), (x, cy)
+        ])
+        return f'<polygon points="{points}" {attrs}/>'
+    if node.shape == "cylinder":
+        ry = 8
+        body = h - 2 * ry
+        path = (
+            f"M{_fmt(x)},{_fmt(y + ry)} a{_fmt(w / 2)},{ry} 0 0 0 {_fmt(w)},0 "
+            f"a{_fmt(w / 2)},{ry} 0 0 0 {_fmt(-w)},0 l0,{_fmt(body)} "
+            f"a{_fmt(w / 2)},{ry} 0 0 0 {_fmt(w)},0 l0,{_fmt(-body)}"
+        )
+        return f'<path d="{path}" {attrs}/>'
+    radius = {"round": 8, "stadium": h / 2}.get(node.shape, 0)
+    rect = f'<rect x="{_fmt(x)}" y="{_fmt(y)}" width="{_fmt(w)}" height="{_fmt(h)}" rx="{_fmt(radius)}" {attrs}/>'
+    if node.shape == "subroutine":
+        rect += (
+            f'<line x1="{_fmt(x + 8)}" y1="{_fmt(y)}" x2="{_fmt(x + 8)}" y2="{_fmt(y + h)}" {attrs}/>'
+            f'<line x1="{_fmt(x + w - 8)}" y1="{_fmt(y)}" x2="{_fmt(x + w - 8)}" y2="{_fmt(y + h)}" {attrs}/>'
+        )
+    return rect
+
+
+def _midpoint(points: List[Tuple[float, float]]) -> Tuple[float, float]:
+    lengths = [((b[0] - a[0]) ** 2 + (b[1] - a[1]) ** 2) ** 0.5 for a, b in zip(points, points[1:])]
+    remaining = sum(lengths) / 2
+    for (a, b), length in zip(zip(points, points[1:]), lengths):
+        if remaining <= length and length:
+            t = remaining / length
+            return a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t
+        remaining -= length
+    return points[-1]
+
+
+def render_svg(chart: Flowchart, layout: Layout, background: str = "white") -> str:
+    """Serialise a laid-out flowchart as a standalone SVG document."""
+    # Precedence: classDef default (nodes only), then classes in order, then style lines
+    styles = {}
+    for target, cls, _ in chart.class_refs:
+        styles.setdefault(target, {}).update(chart.classes.get(cls, {}))
+    for style in chart.styles:
+        styles.setdefault(style.target, {}).update(style.properties)
+    node_default = {**DEFAULT_NODE_STYLE, **chart.classes.get("default", {})}
+
+    width, height = _fmt(layout.width), _fmt(layout.height)
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="trebuchet ms, verdana, arial, sans-serif" '
+        f'font-size="{FONT_SIZE}">',
+        '<defs><marker id="arrowhead" viewBox="0 0 10 10" refX="9" refY="5" markerWidth="8" '
+        f'markerHeight="8" orient="auto-start-reverse"><path d="M0,0 L10,5 L0,10 z" fill="{EDGE_COLOR}"/></marker>'
+        '<marker id="circlehead" viewBox="0 0 10 10" refX="9" refY="5" markerWidth="7" markerHeight="7" '
+        f'orient="auto-start-reverse"><circle cx="5" cy="5" r="4" fill="white" stroke="{EDGE_COLOR}"/></marker>'
+        '<marker id="crosshead" viewBox="0 0 10 10" refX="5" refY="5" markerWidth="8" markerHeight="8" '
+        f'orient="auto-start-reverse"><path d="M1,1 L9,9 M1,9 L9,1" stroke="{EDGE_COLOR}" stroke-width="2"/></marker>'
+        '</defs>',
+    ]
+    if background and background != "transparent":
+        out.append(f'<rect width="100%" height="100%" fill="{html.escape(background)}"/>')
+
+    depth = {s: len(chart.ancestry(s)) for s in layout.clusters}
+    for sub_id in sorted(layout.clusters, key=lambda s: depth[s]):
+        x0, y0, x1, y1 = layout.clusters[sub_id]
+        style = {**CLUSTER_STYLE, **styles.get(sub_id, {})}
+        out.append(
+            f'<g class="cluster" id="cluster-{html.escape(sub_id)}">'
+            f'<rect x="{_fmt(x0)}" y="{_fmt(y0)}" width="{_fmt(x1 - x0)}" height="{_fmt(y1 - y0)}" rx="4" '
+            f'fill="{html.escape(style["fill"])}" stroke="{html.escape(style["stroke"])}"/>'
+            + _text((x0 + x1) / 2, y0 + CLUSTER_TITLE / 2 + 4, chart.subgraphs[sub_id].label,
+                    style.get("color", "#333333"), "bold")
+            + "</g>"
+        )
+
+    for edge, points in layout.edges:
+        path = "M" + " L".join(f"{_fmt(x)},{_fmt(y)}" for x, y in points)
+        dash = ' stroke-dasharray="3 3"' if edge.dotted else ""
+        marker = f' marker-end="url(#{edge.head}head)"' if edge.head else ""
+        marker += f' marker-start="url(#{edge.tail}head)"' if edge.tail else ""
+        stroke = "3" if edge.thick else "1.5"
+        out.append(
+            f'<path class="edge" d="{path}" fill="none" stroke="{EDGE_COLOR}" stroke-width="{stroke}" '
+            f'stroke-linejoin="round"{dash}{marker}/>'
+        )
+
+    for edge, points in layout.edges:
+        if not edge.label:
+            continue
+        mx, my = _midpoint(points)
+        text_w, text_h = measure_label(edge.label)
+        out.append(
+            f'<g class="edge-label"><rect x="{_fmt(mx - text_w / 2 - 4)}" y="{_fmt(my - text_h / 2 - 2)}" '
+            f'width="{_fmt(text_w + 8)}" height="{_fmt(text_h + 4)}" fill="#E8E8E8"/>'
+            + _text(mx, my, edge.label, "#333333") + "</g>"
+        )
+
+    for node in chart.nodes.values():
+        style = {**node_default, **styles.get(node.id, {})}
+        attrs = " ".join(f'{key}="{html.escape(style[key])}"' for key in STYLE_ATTRIBUTES if key in style)
+        cx, cy, _, _ = layout.nodes[node.id]
+        out.append(
+            f'<g class="node" id="{html.escape(node.id)}">'
+            + _shape(node, layout.nodes[node.id], attrs)
+            + _text(cx, cy, node.label, style["color"])
+            + "</g>"
+        )
+
+    out.append("</svg>")
+    return "\n".join(out) + "\n"
+
+
+def flowchart_to_svg(source: str, background: str = "white") -> str:
+    """Parse, lay out and render a Mermaid flowchart in one call."""
+    chart = parse_flowchart(source)
+    return render_svg(chart, layout_flowchart(chart), background)
+
+
+def main():
+    if len(sys.argv) >= 3 and sys.argv[1] == "--validate":
+        failed = False
+        for path in sys.argv[2:]:
+            chart, diagnostics = check_flowchart(Path(path).read_text(encoding='utf-8'))
+            for diagnostic in diagnostics:
+                print(f"{path}: {diagnostic}")
+            failed = failed or chart is None or any(d.severity == "error" for d in diagnostics)
+        sys.exit(1 if failed else 0)
+
+    if len(sys.argv) not in (2, 3):
+        print(__doc__)
+        sys.exit(1)
+    svg = flowchart_to_svg(Path(sys.argv[1]).read_text(encoding='utf-8'))
+    if len(sys.argv) == 3:
+        Path(sys.argv[2]).write_text(svg, encoding='utf-8')
+    else:
+        sys.stdout.write(svg)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+/**
+ * Mermaid Render Worker
+ *
+ * Long-lived renderer used by scripts/generate_tprm_diagrams.py. It launches a
+ * single headless browser and renders every diagram it is sent, so a full
+ * regeneration pays the Chromium start-up cost once per worker rather than once
+ * per diagram and format. SVG and PNG are produced from the same layout pass:
+ * the diagram is laid out once by Mermaid and the resulting SVG is rasterised.
+ *
+ * Protocol (one JSON object per line):
+ *   stdout on start-up: {"ready": true}
+ *   stdin:  {"name": "...", "definition": "...", "svg": "out.svg" | null,
+ *            "png": "out.png" | null, "width": 1200, "background": "white"}
+ *   stdout: {"name": "...", "ok": true, "error": null,
+ *            "timings": {"layoutMs": 0, "svgMs": 0, "pngMs": 0}}
+ *
+ * Usage:
+ *   node scripts/mermaid_render_worker.js
+ *
+ * Requirements:
+ *   npm install @mermaid-js/mermaid-cli   (locally or with -g)
+ */
+
+const { execSync } = require('child_process');
+const fs = require('fs');
+const path = require('path');
+const readline = require('readline');
+const { createRequire } = require('module');
+const { pathToFileURL } = require('url');
+
+const DEFAULT_HEIGHT = 800;
+
+function findMermaidCli() {
+    const roots = [
+        path.join(__dirname, '..', 'node_modules'),
+        path.join(process.cwd(), 'node_modules'),
+    ];
+    try {
+        roots.push(execSync('npm root -g', { stdio: ['ignore', 'pipe', 'ignore'] }).toString().trim());
+    } catch (error) {
+        // npm not on PATH - only local installs can be used
+    }
+
+    for (const root of roots) {
+        const entry = path.join(root, '@mermaid-js', 'mermaid-cli', 'src', 'index.js');
+        if (fs.existsSync(entry)) {
+            return entry;
+        }
+    }
+    throw new Error('@mermaid-js/mermaid-cli not found');
+}
+
+function send(message) {
+    process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+async function renderJob(browser, renderMermaid, job) {
+    const width = job.width || 1200;
+    const background = job.background || 'white';
+    const timings = { layoutMs: 0, svgMs: 0, pngMs: 0 };
+
+    let start = Date.now();
+    const { data } = await renderMermaid(browser, job.definition, 'svg', {
+        viewport: { width, height: DEFAULT_HEIGHT, deviceScaleFactor: 1 },
+        backgroundColor: background,
+    });
+    const svg = Buffer.from(data).toString('utf8');
+    timings.layoutMs = Date.now() - start;
+
+    if (job.svg) {
+        start = Date.now();
+        fs.writeFileSync(job.svg, svg, 'utf8');
+        timings.svgMs = Date.now() - start;
+    }
+
+    if (job.png) {
+        start = Date.now();
+        const page = await browser.newPage();
+        try {
+            await page.setViewport({ width, height: DEFAULT_HEIGHT, deviceScaleFactor: 1 });
+            await page.setContent(
+                `<!DOCTYPE html><html><body style="margin:0;background:${background}">${svg}</body></html>`
+            );
+            const element = await page.$('svg');
+            await element.screenshot({ path: job.png, omitBackground: false });
+        } finally {
+            await page.close();
+        }
+        timings.pngMs = Date.now() - start;
+    }
+
+    return timings;
+}
+
+async function main() {
+    const entry = findMermaidCli();
+    const { renderMermaid } = await import(pathToFileURL(entry).href);
+    const puppeteer = createRequire(entry)('puppeteer');
+
+    const browser = await puppeteer.launch({ headless: true });
+    send({ ready: true });
+
+    const input = readline.createInterface({ input: process.stdin });
+    for await (const line of input) {
+        if (!line.trim()) {
+            continue;
+        }
+
+        let job;
+        try {
+            job = JSON.parse(line);
+            const timings = await renderJob(browser, renderMermaid, job);
+            send({ name: job.name, ok: true, error: null, timings });
+        } catch (error) {
+            send({ name: job ? job.name : null, ok: false, error: error.message, timings: null });
+        }
+    }
+
+    await browser.close();
+}
+
+main().catch((error) => {
+    send({ ready: false, error: error.message });
+    process.exit(1);
+});
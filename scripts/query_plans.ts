@@ -0,0 +1,722 @@
+/**
+ * Query Plan & Latency Harness
+ *
+ * Runs the read queries behind the hot routes and agents (dashboard, vendors,
+ * findings, documents, RITA, DORA, MARS) against a large synthetic portfolio,
+ * times them and captures the EXPLAIN ANALYZE plan of every SQL statement
+ * Prisma issues for them. Exits non-zero when a plan falls back to a
+ * sequential scan on a large table (unless the query is expected to scan it),
+ * when a statement's plan cannot be captured, or with --compare, when a p95
+ * is slower than the baseline.
+ *
+ * Point DATABASE_URL at a disposable database: --seed inserts the synthetic
+ * portfolio (ids prefixed "synth-") and --cleanup removes it. Run
+ * db:setup-search first so the search triggers index the seeded rows.
+ *
+ * Usage:
+ *   npm run db:query-plans -- [--seed] [--vendors 5000] [--repeat 20]
+ *                             [--json OUT.json] [--compare BASELINE.json]
+ *                             [--tolerance 0.5] [--only vendors] [--cleanup]
+ *
+ *   --seed: Insert the synthetic portfolio if it is not there yet
+ *   --vendors: Synthetic vendors to seed (default 5000); each gets ~10
+ *              findings, 6 documents, 2 profiles and assessments, 5 actions
+ *   --repeat: Timed runs per query; p50/p95 are over these (default 20)
+ *   --json: Write results, including plans, to a file
+ *   --compare: Fail if a p95 is slower than the baseline by more than
+ *              --tolerance (a fraction, default 0.5)
+ *   --only: Run only queries whose group or name contains this text
+ *   --cleanup: Delete the synthetic portfolio and exit
+ */
+
+import { writeFileSync, readFileSync } from 'fs'
+import { Prisma, PrismaClient } from '@prisma/client'
+
+const DEFAULT_VENDORS = 5000
+const DEFAULT_REPEAT = 20
+const DEFAULT_TOLERANCE = 0.5
+const MIN_REGRESSION_MS = 2 // smaller slowdowns are timer noise
+const CHUNK = 5000
+const DAY_MS = 24 * 60 * 60 * 1000
+const SYNTH = 'synth-'
+
+// Tables big enough that a sequential scan is a regression
+const LARGE_TABLES = [
+  'vendors',
+  'risk_profiles',
+  'risk_assessments',
+  'documents',
+  'risk_findings',
+  'remediation_actions',
+  'notifications',
+  'agent_activity_log',
+]
+
+const prisma = new PrismaClient({ log: [{ emit: 'event', level: 'query' }] })
+
+interface QueryCase {
+  group: string
+  name: string
+  // Large tables this query legitimately reads in full (e.g. portfolio aggregates)
+  allowSeqScan?: string[]
+  run: (ctx: Context) => Promise<unknown>
+}
+
+interface Context {
+  vendorId: string
+  cursor: { name: string; id: string }
+}
+
+interface Statement {
+  sql: string
+  params: string
+}
+
+// ============================================
+// QUERY SET (mirrors the routes and agents)
+// ============================================
+
+const openFindings = { status: { not: 'CLOSED' as const } }
+
+const QUERIES: QueryCase[] = [
+  // GET /api/dashboard (served from the metrics snapshot)
+  {
+    group: 'dashboard',
+    name: 'snapshot',
+    allowSeqScan: LARGE_TABLES, // dashboard_metrics is tiny; nothing large may appear
+    run: () => prisma.dashboardMetric.findMany(),
+  },
+  {
+    group: 'dashboard',
+    name: 'recent activity',
+    run: () =>
+      prisma.agentActivityLog.findMany({
+        orderBy: { createdAt: 'desc' },
+        take: 10,
+        select: { id: true, agentName: true, activityType: true, createdAt: true },
+      }),
+  },
+  // Dashboard reconciliation (worker, every few minutes)
+  {
+    group: 'dashboard',
+    name: 'reconcile: findings by severity',
+    allowSeqScan: ['risk_findings'],
+    run: () => prisma.riskFinding.groupBy({ by: ['severity'], _count: true, where: openFindings }),
+  },
+  {
+    group: 'dashboard',
+    name: 'reconcile: tiers of active vendors',
+    allowSeqScan: ['risk_profiles', 'vendors'],
+    run: () =>
+      prisma.riskProfile.groupBy({
+        by: ['riskTier'],
+        _count: true,
+        where: { vendor: { status: 'ACTIVE' } },
+      }),
+  },
+  {
+    group: 'dashboard',
+    name: 'reconcile: recent assessments',
+    run: () =>
+      prisma.riskAssessment.count({ where: { createdAt: { gte: new Date(Date.now() - 30 * DAY_MS) } } }),
+  },
+  {
+    group: 'dashboard',
+    name: 'reconcile: overdue actions',
+    run: () =>
+      prisma.remediationAction.count({
+        where: {
+          OR: [
+            { status: 'OVERDUE' },
+            { status: { in: ['OPEN', 'IN_PROGRESS'] }, dueDate: { lt: new Date() } },
+          ],
+        },
+      }),
+  },
+  {
+    group: 'dashboard',
+    name: 'reconcile: expiring documents',
+    run: () =>
+      prisma.document.count({
+        where: {
+          expirationDate: { lte: new Date(Date.now() + 30 * DAY_MS), gt: new Date() },
+          status: { not: 'EXPIRED' },
+        },
+      }),
+  },
+
+  // GET /api/vendors
+  {
+    group: 'vendors',
+    name: 'list: first page',
+    run: () => vendorPage({}),
+  },
+  {
+    group: 'vendors',
+    name: 'list: tier filter',
+    run: () => vendorPage({ currentRiskTier: 'CRITICAL', status: 'ACTIVE' }),
+  },
+  {
+    group: 'vendors',
+    name: 'list: keyset page',
+    run: ({ cursor }) => vendorPage({}, cursor),
+  },
+  {
+    group: 'vendors',
+    name: 'list: search',
+    run: () =>
+      vendorPage({
+        OR: [
+          { name: { contains: 'vendor 0001', mode: 'insensitive' } },
+          { industry: { contains: 'vendor 0001', mode: 'insensitive' } },
+        ],
+      }),
+  },
+  {
+    group: 'vendors',
+    name: 'detail',
+    run: ({ vendorId }) =>
+      prisma.vendor.findUnique({
+        where: { id: vendorId },
+        include: {
+          riskProfiles: { orderBy: { createdAt: 'desc' } },
+          riskAssessments: { orderBy: { createdAt: 'desc' }, take: 5 },
+          documents: { where: { isCurrent: true } },
+          riskFindings: { where: openFindings },
+        },
+      }),
+  },
+
+  // GET /api/findings
+  {
+    group: 'findings',
+    name: 'list: all open',
+    allowSeqScan: ['risk_findings'], // most findings are open; count reads them all
+    run: () => findingsPage({}),
+  },
+  {
+    group: 'findings',
+    name: 'list: by vendor',
+    run: ({ vendorId }) => findingsPage({ vendorId }),
+  },
+  {
+    group: 'findings',
+    name: 'list: critical',
+    run: () => findingsPage({ severity: 'CRITICAL' }),
+  },
+
+  // GET /api/documents
+  {
+    group: 'documents',
+    name: 'by vendor',
+    run: ({ vendorId }) =>
+      prisma.document.findMany({
+        where: { vendorId },
+        include: {
+          vendor: { select: { id: true, name: true } },
+          _count: { select: { riskFindings: true } },
+        },
+        orderBy: { uploadDate: 'desc' },
+      }),
+  },
+  {
+    group: 'documents',
+    name: 'current version of type',
+    run: ({ vendorId }) =>
+      prisma.document.findMany({
+        where: { vendorId, documentType: 'SOC2_TYPE2', isCurrent: true },
+      }),
+  },
+
+  // GET /api/search (inner ranked query of lib/search/fulltext.ts)
+  {
+    group: 'search',
+    name: 'findings full text',
+    run: () => prisma.$queryRaw`
+      SELECT f.id, ts_rank_cd(f."searchVector", websearch_to_tsquery('english', ${'synthetic finding'}), 32) AS rank
+      FROM risk_findings f
+      WHERE f."searchVector" @@ websearch_to_tsquery('english', ${'synthetic finding'})
+      ORDER BY rank DESC
+      LIMIT ${20}`,
+  },
+
+  // RITA
+  {
+    group: 'rita',
+    name: 'vendor report data',
+    run: ({ vendorId }) =>
+      prisma.vendor.findUnique({
+        where: { id: vendorId },
+        include: {
+          riskProfiles: { orderBy: { createdAt: 'desc' }, take: 1 },
+          riskAssessments: { orderBy: { createdAt: 'desc' }, take: 5 },
+          riskFindings: { where: openFindings },
+          documents: { where: { isCurrent: true } },
+        },
+      }),
+  },
+  {
+    group: 'rita',
+    name: 'portfolio tiers',
+    allowSeqScan: ['vendors'], // counts every vendor; an index-only scan is not guaranteed
+    run: () => prisma.vendor.groupBy({ by: ['currentRiskTier'], _count: true }),
+  },
+  {
+    group: 'rita',
+    name: 'portfolio top critical',
+    run: () =>
+      prisma.vendor.findMany({
+        where: { currentRiskTier: 'CRITICAL', currentRiskScore: { not: null } },
+        orderBy: [{ currentRiskScore: 'desc' }, { id: 'desc' }],
+        take: 5,
+        select: { name: true, currentRiskScore: true },
+      }),
+  },
+  {
+    group: 'rita',
+    name: 'in-progress assessments',
+    run: () => prisma.riskAssessment.count({ where: { assessmentStatus: 'IN_PROGRESS' } }),
+  },
+
+  // DORA
+  {
+    group: 'dora',
+    name: 'vendor inventory',
+    run: ({ vendorId }) =>
+      Promise.all([
+        prisma.document.findMany({ where: { vendorId }, orderBy: { uploadDate: 'desc' } }),
+        prisma.riskProfile.findFirst({ where: { vendorId }, orderBy: { createdAt: 'desc' } }),
+      ]),
+  },
+  {
+    // Mirrors one page of DORAAgent.checkPortfolioInventory
+    group: 'dora',
+    name: 'portfolio inventory page',
+    run: () => prisma.$queryRaw`
+      WITH page AS (
+        SELECT id FROM vendors
+        WHERE status = 'ACTIVE' AND id > ${''}
+        ORDER BY id
+        LIMIT ${1000}
+      ),
+      tier AS (
+        SELECT DISTINCT ON ("vendorId") "vendorId", "riskTier"::text AS "riskTier"
+        FROM risk_profiles
+        WHERE "vendorId" IN (SELECT id FROM page)
+        ORDER BY "vendorId", "createdAt" DESC
+      )
+      SELECT page.id, tier."riskTier", COUNT(d.id)::int AS "documentCount",
+        COUNT(d.id) FILTER (WHERE d."expirationDate" <= ${new Date(Date.now() + 30 * DAY_MS)})::int AS "expiringCount"
+      FROM page
+      LEFT JOIN tier ON tier."vendorId" = page.id
+      LEFT JOIN documents d ON d."vendorId" = page.id
+      GROUP BY page.id, tier."riskTier"
+      ORDER BY page.id`,
+  },
+
+  // MARS
+  {
+    group: 'mars',
+    name: 'overdue batch',
+    run: () =>
+      prisma.remediationAction.findMany({
+        where: { status: { in: ['OPEN', 'IN_PROGRESS'] }, dueDate: { lt: new Date() }, id: { gt: '' } },
+        select: { id: true, findingId: true, title: true, priority: true, dueDate: true, vendor: { select: { name: true } } },
+        orderBy: { id: 'asc' },
+        take: 500,
+      }),
+  },
+  {
+    group: 'mars',
+    name: 'vendor remediation status',
+    run: ({ vendorId }) => prisma.remediationAction.findMany({ where: { vendorId } }),
+  },
+]
+
+function vendorPage(where: Prisma.VendorWhereInput, cursor?: { name: string; id: string }) {
+  const pageWhere: Prisma.VendorWhereInput = cursor
+    ? { AND: [where, { OR: [{ name: { gt: cursor.name } }, { name: cursor.name, id: { gt: cursor.id } }] }] }
+    : where
+  return Promise.all([
+    prisma.vendor.findMany({
+      where: pageWhere,
+      include: {
+        _count: { select: { riskFindings: { where: openFindings }, documents: true } },
+      },
+      orderBy: [{ name: 'asc' }, { id: 'asc' }],
+      take: 20,
+    }),
+    prisma.vendor.count({ where }),
+  ])
+}
+
+function findingsPage(filter: Prisma.RiskFindingWhereInput) {
+  const where = { ...filter, ...openFindings }
+  return Promise.all([
+    prisma.riskFinding.findMany({
+      where,
+      include: {
+        vendor: { select: { id: true, name: true } },
+        document: { select: { id: true, documentType: true, documentName: true } },
+        remediationActions: { where: { status: { not: 'CLOSED' } } },
+      },
+      orderBy: [{ severity: 'asc' }, { createdAt: 'desc' }],
+      take: 50,
+    }),
+    prisma.riskFinding.count({ where }),
+  ])
+}
+
+// ============================================
+// SYNTHETIC PORTFOLIO
+// ============================================
+
+// Deterministic so runs are comparable. mulberry32: 32-bit integer math via
+// Math.imul, so the sequence does not degrade as a float LCG would.
+let seed = 42
+function random(): number {
+  seed = (seed + 0x6d2b79f5) | 0
+  let t = Math.imul(seed ^ (seed >>> 15), 1 | seed)
+  t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t
+  return ((t ^ (t >>> 14)) >>> 0) / 4294967296
+}
+
+function pick<T>(items: readonly T[]): T {
+  return items[Math.floor(random() * items.length)]
+}
+
+async function insertChunked<T>(rows: T[], insert: (chunk: T[]) => Promise<unknown>) {
+  for (let i = 0; i < rows.length; i += CHUNK) {
+    await insert(rows.slice(i, i + CHUNK))
+  }
+}
+
+async function seedPortfolio(vendorCount: number) {
+  const existing = await prisma.vendor.count({ where: { id: { startsWith: SYNTH } } })
+  if (existing) {
+    console.log(`Synthetic portfolio present (${existing} vendors); not seeding`)
+    return
+  }
+  if (process.env.NODE_ENV === 'production') {
+    throw new Error('Refusing to seed synthetic data with NODE_ENV=production')
+  }
+
+  const tiers = ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW'] as const
+  const severities = ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW', 'INFORMATIONAL'] as const
+  const findingStatuses = ['OPEN', 'OPEN', 'OPEN', 'IN_REMEDIATION', 'RESOLVED', 'CLOSED'] as const
+  const actionStatuses = ['OPEN', 'IN_PROGRESS', 'OVERDUE', 'VERIFIED', 'CLOSED'] as const
+  const docTypes = ['SOC2_TYPE2', 'PENTEST', 'ISO27001', 'SIG_QUESTIONNAIRE', 'INSURANCE_CERTIFICATE', 'PRIVACY_POLICY'] as const
+  const vendorStatuses = ['ACTIVE', 'ACTIVE', 'ACTIVE', 'PENDING', 'INACTIVE'] as const
+  const now = Date.now()
+  const daysFromNow = (days: number) => new Date(now + days * DAY_MS)
+
+  const vendors: Prisma.VendorCreateManyInput[] = []
+  const profiles: Prisma.RiskProfileCreateManyInput[] = []
+  const assessments: Prisma.RiskAssessmentCreateManyInput[] = []
+  const documents: Prisma.DocumentCreateManyInput[] = []
+  const findings: Prisma.RiskFindingCreateManyInput[] = []
+  const actions: Prisma.RemediationActionCreateManyInput[] = []
+  const activity: Prisma.AgentActivityLogCreateManyInput[] = []
+
+  for (let v = 0; v < vendorCount; v++) {
+    const vendorId = `${SYNTH}v${v}`
+    const tier = pick(tiers)
+    const score = Math.floor(random() * 100)
+    vendors.push({
+      id: vendorId,
+      name: `Synthetic Vendor ${String(v).padStart(6, '0')}`,
+      industry: pick(['Cloud', 'Payments', 'Logistics', 'Analytics', 'Manufacturing']),
+      status: pick(vendorStatuses),
+      currentRiskTier: tier,
+      currentRiskScore: score,
+    })
+    for (let p = 0; p < 2; p++) {
+      profiles.push({
+        id: `${vendorId}-p${p}`,
+        vendorId,
+        riskTier: p === 1 ? tier : pick(tiers),
+        overallRiskScore: score,
+        nextAssessmentDate: daysFromNow(random() * 365),
+        createdAt: daysFromNow(p - 400),
+      })
+      assessments.push({
+        id: `${vendorId}-a${p}`,
+        vendorId,
+        assessmentType: p ? 'ANNUAL' : 'INITIAL',
+        assessmentStatus: pick(['COMPLETE', 'IN_PROGRESS', 'APPROVED'] as const),
+        createdAt: daysFromNow(-random() * 365),
+      })
+    }
+    docTypes.forEach((documentType, d) => {
+      documents.push({
+        id: `${vendorId}-d${d}`,
+        vendorId,
+        documentType,
+        documentName: `${documentType}.pdf`,
+        status: pick(['PENDING', 'RECEIVED', 'ANALYZED', 'EXPIRED'] as const),
+        expirationDate: daysFromNow(random() * 400 - 30),
+        uploadDate: daysFromNow(-random() * 365),
+      })
+    })
+    for (let f = 0; f < 10; f++) {
+      const findingId = `${vendorId}-f${f}`
+      findings.push({
+        id: findingId,
+        vendorId,
+        documentId: `${vendorId}-d${f % docTypes.length}`,
+        severity: pick(severities),
+        status: pick(findingStatuses),
+        title: `Synthetic finding ${f}`,
+        createdAt: daysFromNow(-random() * 365),
+      })
+      if (f % 2 === 0) {
+        actions.push({
+          id: `${findingId}-r`,
+          findingId,
+          vendorId,
+          actionType: 'REMEDIATE',
+          title: `Remediate synthetic finding ${f}`,
+          status: pick(actionStatuses),
+          priority: pick(['CRITICAL', 'HIGH', 'MEDIUM', 'LOW'] as const),
+          dueDate: daysFromNow(random() * 120 - 60),
+        })
+      }
+    }
+    for (let a = 0; a < 4; a++) {
+      activity.push({
+        agentName: pick(['VERA', 'CARA', 'DORA', 'SARA', 'RITA', 'MARS']),
+        activityType: 'SYNTHETIC',
+        entityType: 'Vendor',
+        entityId: vendorId,
+        status: 'SUCCESS',
+        createdAt: daysFromNow(-random() * 90),
+      })
+    }
+  }
+
+  const started = Date.now()
+  await insertChunked(vendors, (data) => prisma.vendor.createMany({ data }))
+  await insertChunked(profiles, (data) => prisma.riskProfile.createMany({ data }))
+  await insertChunked(assessments, (data) => prisma.riskAssessment.createMany({ data }))
+  await insertChunked(documents, (data) => prisma.document.createMany({ data }))
+  await insertChunked(findings, (data) => prisma.riskFinding.createMany({ data }))
+  await insertChunked(actions, (data) => prisma.remediationAction.createMany({ data }))
+  await insertChunked(activity, (data) => prisma.agentActivityLog.createMany({ data }))
+  await prisma.$executeRawUnsafe('ANALYZE')
+
+  const rows = vendors.length + profiles.length + assessments.length + documents.length +
+    findings.length + actions.length + activity.length
+  console.log(`Seeded ${vendorCount} synthetic vendors (${rows} rows) in ${((Date.now() - started) / 1000).toFixed(1)}s`)
+}
+
+async function cleanupPortfolio() {
+  // Everything else cascades from the vendor
+  const logs = await prisma.agentActivityLog.deleteMany({ where: { activityType: 'SYNTHETIC' } })
+  const vendors = await prisma.vendor.deleteMany({ where: { id: { startsWith: SYNTH } } })
+  console.log(`Removed ${vendors.count} synthetic vendors and ${logs.count} activity rows`)
+}
+
+// ============================================
+// MEASUREMENT
+// ============================================
+
+let capture: Statement[] | null = null
+prisma.$on('query', (event) => {
+  if (capture) capture.push({ sql: event.query, params: event.params })
+})
+
+const TIMESTAMP = /^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(\.\d+)?( UTC|Z)?$/
+
+// Logged params are JSON; dates come back as strings and are revived
+function parseParams(params: string): unknown[] {
+  const values = JSON.parse(params) as unknown[]
+  return values.map((value) =>
+    typeof value === 'string' && TIMESTAMP.test(value)
+      ? new Date(value.replace(' UTC', 'Z').replace(' ', 'T'))
+      : value
+  )
+}
+
+interface PlanNode {
+  'Node Type': string
+  'Relation Name'?: string
+  'Index Name'?: string
+  Plans?: PlanNode[]
+}
+
+function scans(node: PlanNode, out: string[] = []): string[] {
+  if (node['Relation Name']) {
+    out.push(`${node['Node Type']} on ${node['Relation Name']}${node['Index Name'] ? ` using ${node['Index Name']}` : ''}`)
+  }
+  for (const child of node.Plans || []) scans(child, out)
+  return out
+}
+
+function percentile(sorted: number[], p: number): number {
+  const index = Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1)
+  return Math.round(sorted[Math.max(0, index)] * 100) / 100
+}
+
+interface QueryResult {
+  group: string
+  name: string
+  p50Ms: number
+  p95Ms: number
+  scans: string[]
+  seqScans: string[]
+  plans: unknown[]
+  explainErrors: string[]
+}
+
+async function measure(query: QueryCase, ctx: Context, repeat: number): Promise<QueryResult> {
+  // Capture the statements from a warm-up run
+  capture = []
+  await query.run(ctx)
+  const statements = capture
+  capture = null
+
+  const timings: number[] = []
+  for (let i = 0; i < repeat; i++) {
+    const start = performance.now()
+    await query.run(ctx)
+    timings.push(performance.now() - start)
+  }
+  timings.sort((a, b) => a - b)
+
+  const plans: unknown[] = []
+  const allScans: string[] = []
+  const explainErrors: string[] = []
+  for (const statement of statements) {
+    // Only reads are explained; EXPLAIN ANALYZE executes the statement
+    if (!/^\s*(SELECT|WITH)\b/i.test(statement.sql)) continue
+    try {
+      const [row] = await prisma.$queryRawUnsafe<{ 'QUERY PLAN': { Plan: PlanNode }[] }[]>(
+        `EXPLAIN (ANALYZE, FORMAT JSON) ${statement.sql}`,
+        ...parseParams(statement.params)
+      )
+      const plan = row['QUERY PLAN'][0]
+      plans.push({ sql: statement.sql, plan })
+      allScans.push(...scans(plan.Plan))
+    } catch (error) {
+      explainErrors.push(`${statement.sql.slice(0, 80)}...: ${error instanceof Error ? error.message : error}`)
+    }
+  }
+
+  const allowed = new Set(query.allowSeqScan || [])
+  const seqScans = allScans.filter((scan) => {
+    const match = scan.match(/^Seq Scan on (\w+)/)
+    return match && LARGE_TABLES.includes(match[1]) && !allowed.has(match[1])
+  })
+
+  return {
+    group: query.group,
+    name: query.name,
+    p50Ms: percentile(timings, 50),
+    p95Ms: percentile(timings, 95),
+    scans: Array.from(new Set(allScans)),
+    seqScans: Array.from(new Set(seqScans)),
+    plans,
+    explainErrors,
+  }
+}
+
+function argValue(args: string[], flag: string): string | undefined {
+  const index = args.indexOf(flag)
+  return index >= 0 ? args[index + 1] : undefined
+}
+
+async function main() {
+  const args = process.argv.slice(2)
+  if (args.includes('--cleanup')) {
+    await cleanupPortfolio()
+    return 0
+  }
+
+  const repeat = Number(argValue(args, '--repeat')) || DEFAULT_REPEAT
+  const tolerance = Number(argValue(args, '--tolerance')) || DEFAULT_TOLERANCE
+  const only = argValue(args, '--only')
+  if (args.includes('--seed')) {
+    await seedPortfolio(Number(argValue(args, '--vendors')) || DEFAULT_VENDORS)
+  }
+
+  const vendorCount = await prisma.vendor.count()
+  const sample = await prisma.vendor.findFirst({
+    where: { riskFindings: { some: {} } },
+    orderBy: { id: 'asc' },
+    select: { id: true },
+  })
+  const middle = await prisma.vendor.findFirst({
+    orderBy: [{ name: 'asc' }, { id: 'asc' }],
+    skip: Math.floor(vendorCount / 2),
+    select: { id: true, name: true },
+  })
+  if (!sample || !middle) {
+    console.error('No vendors with findings; run with --seed against a disposable database')
+    return 1
+  }
+  const ctx: Context = { vendorId: sample.id, cursor: middle }
+
+  console.log(`${vendorCount} vendors, ${repeat} runs per query\n`)
+  console.log(`${'query'.padEnd(48)} ${'p50 ms'.padStart(8)} ${'p95 ms'.padStart(8)}  plan`)
+
+  const results: QueryResult[] = []
+  for (const query of QUERIES) {
+    if (only && !`${query.group} ${query.name}`.includes(only)) continue
+    const result = await measure(query, ctx, repeat)
+    results.push(result)
+    const flag = result.seqScans.length ? '  SEQ SCAN' : ''
+    console.log(
+      `${`${result.group}: ${result.name}`.padEnd(48)} ${result.p50Ms.toFixed(2).padStart(8)} ${result.p95Ms.toFixed(2).padStart(8)}  ` +
+        `${result.scans.join(', ') || '-'}${flag}`
+    )
+    for (const error of result.explainErrors) console.log(`    explain failed: ${error}`)
+  }
+
+  const failures: string[] = []
+  for (const result of results) {
+    for (const scan of result.seqScans) failures.push(`${result.group}: ${result.name}: ${scan}`)
+    // An unexplained statement could be hiding a sequential scan
+    for (const error of result.explainErrors) {
+      failures.push(`${result.group}: ${result.name}: explain failed: ${error}`)
+    }
+  }
+
+  const baselinePath = argValue(args, '--compare')
+  if (baselinePath) {
+    const baseline = JSON.parse(readFileSync(baselinePath, 'utf8')) as { results: QueryResult[] }
+    for (const result of results) {
+      const before = baseline.results.find((r) => r.group === result.group && r.name === result.name)
+      if (!before) continue
+      const slower = result.p95Ms - before.p95Ms
+      if (slower > MIN_REGRESSION_MS && result.p95Ms > before.p95Ms * (1 + tolerance)) {
+        failures.push(`${result.group}: ${result.name}: p95 ${before.p95Ms}ms -> ${result.p95Ms}ms`)
+      }
+    }
+  }
+
+  const jsonPath = argValue(args, '--json')
+  if (jsonPath) {
+    writeFileSync(jsonPath, JSON.stringify({ vendors: vendorCount, repeat, date: new Date(), results }, null, 2))
+    console.log(`\nWrote ${jsonPath}`)
+  }
+
+  if (failures.length) {
+    console.log(`\n${failures.length} failure(s):`)
+    failures.forEach((failure) => console.log(`  - ${failure}`))
+    return 1
+  }
+  console.log('\nNo plan or latency regressions')
+  return 0
+}
+
+main()
+  .then((code) => {
+    process.exitCode = code
+  })
+  .catch((e) => {
+    console.error(e)
+    process.exitCode = 1
+  })
+  .finally(async () => {
+    await prisma.$disconnect()
+  })
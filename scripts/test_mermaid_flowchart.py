@@ -0,0 +1,79 @@
+"""
+Layout and validation checks for the TPRM diagrams.
+
+Run from the scripts directory:
+    python -m pytest test_mermaid_flowchart.py
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from generate_tprm_diagrams import DIAGRAMS, get_flowchart
+from mermaid_flowchart import check_flowchart, layout_flowchart
+
+SCRIPTS = Path(__file__).parent
+
+
+def _intersects(a, b) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+@pytest.mark.parametrize("name", list(DIAGRAMS))
+def test_sibling_cluster_boxes_do_not_intersect(name):
+    chart = get_flowchart(name)
+    layout = layout_flowchart(chart)
+    clusters = list(layout.clusters)
+    for i, a in enumerate(clusters):
+        for b in clusters[i + 1:]:
+            nested = a in chart.ancestry(b) or b in chart.ancestry(a)
+            assert nested or not _intersects(layout.clusters[a], layout.clusters[b]), (a, b)
+
+
+@pytest.mark.parametrize("name", list(DIAGRAMS))
+def test_nodes_are_drawn_only_inside_their_own_clusters(name):
+    chart = get_flowchart(name)
+    layout = layout_flowchart(chart)
+    for node_id, (cx, cy, w, h) in layout.nodes.items():
+        box = (cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2)
+        own = chart.ancestry(chart.nodes[node_id].subgraph)
+        for sub_id, cluster in layout.clusters.items():
+            assert sub_id in own or not _intersects(box, cluster), (node_id, sub_id)
+
+
+@pytest.mark.parametrize("source", [
+    "flowchart TD\n    A[Start] --> B[End\n",
+    "flowchart TD\n    A[Start] -->\n",
+    "flowchart TD\n    A[Start] --\n",
+])
+def test_syntax_errors_are_errors_even_with_a_fallback(source):
+    chart, diagnostics = check_flowchart(source, fallback=True)
+    assert chart is None
+    assert [d.severity for d in diagnostics] == ["error"]
+
+
+def test_unsupported_syntax_is_a_warning_only_with_a_fallback():
+    source = "flowchart TD\n    A ~~~ B\n"
+    assert check_flowchart(source)[1][0].severity == "error"
+    assert check_flowchart(source, fallback=True)[1][0].severity == "warning"
+
+
+def test_declared_bare_ids_are_not_reported_as_undefined():
+    chart, diagnostics = check_flowchart(
+        "flowchart TD\n    subgraph S\n        A\n    end\n    A --> B\n    B\n    A --> C\n"
+    )
+    undeclared = [d.message for d in diagnostics if "declared nowhere" in d.message]
+    assert undeclared == ["node 'C' is only used in edges and declared nowhere"]
+
+
+def test_validate_fails_on_a_malformed_definition(tmp_path):
+    (tmp_path / "broken.mmd").write_text("flowchart TD\n    A[Start] --> B[End\n", encoding="utf-8")
+    for command in (
+        ["generate_tprm_diagrams.py", "--validate", "--definitions", str(tmp_path)],
+        ["mermaid_flowchart.py", "--validate", str(tmp_path / "broken.mmd")],
+    ):
+        result = subprocess.run([sys.executable, *command], cwd=SCRIPTS, capture_output=True, text=True)
+        assert result.returncode == 1, result.stdout + result.stderr
+        assert "missing ']' for node B" in result.stdout
@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+Per-Vendor Diagram Generator
+
+Renders personalised TPRM diagrams for every vendor in a portfolio export:
+  - risk_tier_matrix:  the Risk Tier Decision Matrix filled in with the
+                       vendor's factor scores, its tier highlighted
+  - vendor_onboarding: the onboarding flow with the vendor's current stage
+                       highlighted
+
+The export is streamed row by row and rendered across a process pool with a
+bounded number of batches in flight, so memory stays flat for any portfolio
+size. Every finished batch is appended to <output-dir>/vendors/.journal; an
+interrupted run picks up where it stopped, and a vendor is only re-rendered
+when its data (or the base diagram) changes or its output files are missing.
+The journal is compacted on load to the latest entry per vendor diagram.
+
+Output tree (sharded by a hash of the vendor id):
+    <output-dir>/vendors/<shard>/<vendor-id>/<diagram>.svg|.png
+
+Input (JSON lines or CSV, one Vendor joined with its current RiskProfile per
+row; camelCase column names as in prisma/schema.prisma):
+    id, name, status, riskTier                          required: id
+    dataSensitivityScore, accessLevelScore,             1-5; when absent they are
+    criticalityScore, financialExposureScore            derived from the columns below
+    dataSensitivityLevel, hasPiiAccess, hasPhiAccess, hasPciAccess,
+    systemIntegrations, businessCriticality, annualSpend
+    onboardingStage                                     see ONBOARDING_STAGES
+
+Usage:
+    python vendor_diagrams.py EXPORT [--output-dir OUTPUT_DIR] [--format FORMAT]
+                              [--diagrams NAMES] [--workers N] [--batch-size N]
+                              [--force]
+
+    EXPORT: .jsonl/.ndjson or .csv file
+    --output-dir: Directory for output files (default: ./diagrams)
+    --format: svg, png, all (default: svg; png requires cairosvg)
+    --diagrams: Comma-separated diagram names (default: all per-vendor diagrams)
+    --workers: Render processes (default: CPU count)
+    --batch-size: Vendors per task sent to a worker (default: 50)
+    --force: Re-render everything, ignoring the journal
+"""
+
+import os
+import sys
+import csv
+import json
+import hashlib
+import argparse
+import dataclasses
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from generate_tprm_diagrams import (
+    DIAGRAMS,
+    RENDER_OPTIONS,
+    cairosvg,
+    content_hash,
+    ensure_directory,
+    get_flowchart,
+    renderer_version,
+)
+from mermaid_flowchart import Flowchart, Style, Subgraph, layout_flowchart, render_svg
+
+
+DEFAULT_BATCH_SIZE = 50
+JOURNAL = ".journal"
+FRAME = "VENDOR"
+
+HIGHLIGHT = {"stroke": "#000000", "stroke-width": "4px"}
+DIMMED = {"fill": "#E0E0E0", "stroke": "#BDBDBD", "color": "#757575"}
+
+# Total factor score (4-20) -> tier, as drawn in the risk_tier_matrix diagram.
+TIER_THRESHOLDS = [(18, "CRITICAL"), (15, "HIGH"), (10, "MEDIUM"), (4, "LOW")]
+TIER_NODES = {"CRITICAL": "T1", "HIGH": "T2", "MEDIUM": "T3", "LOW": "T4"}
+FACTOR_NODES = {
+    "dataSensitivity": ("F1", "Data Sensitivity"),
+    "accessLevel": ("F2", "Access Level"),
+    "criticality": ("F3", "Business Criticality"),
+    "financialExposure": ("F4", "Financial Exposure"),
+}
+
+# onboardingStage -> node in the vendor_onboarding diagram. due_diligence
+# depends on the tier and is resolved in onboarding_chart().
+ONBOARDING_STAGES = {
+    "request": "A",
+    "review": "B",
+    "questionnaire": "C",
+    "questionnaire_received": "D",
+    "tiering": "E",
+    "due_diligence": None,
+    "approval": "J",
+    "rejected": "K",
+    "contract": "L",
+    "provisioning": "M",
+    "monitoring": "N",
+    "active": "END2",
+}
+STATUS_STAGES = {"PENDING": "review", "ACTIVE": "active"}
+DUE_DILIGENCE_NODES = {"CRITICAL": "G", "HIGH": "G", "MEDIUM": "H", "LOW": "I"}
+
+SENSITIVITY_LEVELS = {"public": 1, "internal": 2, "confidential": 3, "restricted": 4, "highly confidential": 5}
+CRITICALITY_SCORES = {"MISSION_CRITICAL": 5, "BUSINESS_CRITICAL": 4, "IMPORTANT": 3, "STANDARD": 2}
+SPEND_THRESHOLDS = [(5_000_000, 5), (1_000_000, 4), (250_000, 3), (50_000, 2)]
+
+
+# =============================================================================
+# INPUT
+# =============================================================================
+
+def read_rows(path: Path):
+    """Yield export rows one at a time from a JSON-lines or CSV file."""
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.suffix.lower() == ".csv":
+            yield from csv.DictReader(f)
+            return
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"  Skipping line {number}: {e}")
+
+
+def _int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "t", "1", "yes")
+    return bool(value)
+
+
+def _list(value) -> list:
+    if isinstance(value, list):
+        return value
+    if not value:
+        return []
+    # CSV exports write Postgres arrays as {a,b} or a;b
+    return [item for item in str(value).strip("{}").replace(";", ",").split(",") if item.strip()]
+
+
+def _clamp(score: int) -> int:
+    return max(1, min(5, score))
+
+
+def factor_scores(row: dict) -> dict:
+    """Return the four 1-5 risk factor scores, deriving any that the export lacks."""
+    scores = {
+        "dataSensitivity": _int(row.get("dataSensitivityScore")),
+        "accessLevel": _int(row.get("accessLevelScore")),
+        "criticality": _int(row.get("criticalityScore")),
+        "financialExposure": _int(row.get("financialExposureScore")),
+    }
+
+    if scores["dataSensitivity"] is None:
+        level = SENSITIVITY_LEVELS.get(str(row.get("dataSensitivityLevel") or "").strip().lower())
+        flags = sum(_bool(row.get(key)) for key in ("hasPiiAccess", "hasPhiAccess", "hasPciAccess"))
+        scores["dataSensitivity"] = level or 1 + 2 * flags
+    if scores["accessLevel"] is None:
+        scores["accessLevel"] = 1 + len(_list(row.get("systemIntegrations")))
+    if scores["criticality"] is None:
+        scores["criticality"] = CRITICALITY_SCORES.get(row.get("businessCriticality"), 1)
+    if scores["financialExposure"] is None:
+        spend = _int(row.get("annualSpend")) or 0
+        scores["financialExposure"] = next((s for limit, s in SPEND_THRESHOLDS if spend >= limit), 1)
+
+    return {key: _clamp(value) for key, value in scores.items()}
+
+
+def vendor_fields(row: dict) -> dict:
+    """Normalise an export row to the inputs the per-vendor diagrams depend on."""
+    status = (row.get("status") or "").upper()
+    return {
+        "name": " ".join(str(row.get("name") or row["id"]).split()),
+        "status": status,
+        "riskTier": (row.get("riskTier") or "").upper() or None,
+        "scores": factor_scores(row),
+        "stage": (row.get("onboardingStage") or STATUS_STAGES.get(status) or "").lower() or None,
+    }
+
+
+def shard_dir(root: Path, vendor_id: str) -> Path:
+    safe_id = "".join(c if c.isalnum() or c in "-_." else "_" for c in vendor_id)
+    shard = hashlib.sha1(vendor_id.encode('utf-8')).hexdigest()[:2]
+    return root / shard / safe_id
+
+
+# =============================================================================
+# PER-VENDOR DIAGRAMS
+# =============================================================================
+
+def tier_for_score(total: int) -> str:
+    return next(tier for limit, tier in TIER_THRESHOLDS if total >= limit)
+
+
+def _personalise(base: Flowchart, title: str, labels: dict, styles: dict) -> Flowchart:
+    """
+    Copy a parsed base diagram with new node labels and extra styles, framed
+    in a subgraph titled with the vendor name. The base model is never mutated.
+    """
+    nodes = {}
+    for node_id, node in base.nodes.items():
+        changes = {"subgraph": node.subgraph or FRAME}
+        if node_id in labels:
+            changes["label"] = labels[node_id]
+        nodes[node_id] = dataclasses.replace(node, **changes)
+
+    subgraphs = {FRAME: Subgraph(FRAME, title)}
+    for sub_id, sub in base.subgraphs.items():
+        subgraphs[sub_id] = dataclasses.replace(sub, parent=sub.parent or FRAME)
+
+    extra = [Style(target, properties) for target, properties in styles.items()]
+    return dataclasses.replace(base, nodes=nodes, subgraphs=subgraphs, styles=base.styles + extra)
+
+
+def risk_matrix_chart(fields: dict) -> Flowchart:
+    scores = fields["scores"]
+    total = sum(scores.values())
+    tier = tier_for_score(total)
+
+    labels = {
+        node_id: f"{caption}<br/>{scores[key]} / 5"
+        for key, (node_id, caption) in FACTOR_NODES.items()
+    }
+    labels["SCORE"] = f"TOTAL SCORE<br/>{total} / 20"
+    if fields["riskTier"] and fields["riskTier"] != tier:
+        labels["SCORE"] += f"<br/>Recorded tier: {fields['riskTier']}"
+
+    styles = {node_id: DIMMED for name, node_id in TIER_NODES.items() if name != tier}
+    styles[TIER_NODES[tier]] = HIGHLIGHT
+    return _personalise(get_flowchart("risk_tier_matrix"), fields["name"], labels, styles)
+
+
+def onboarding_chart(fields: dict) -> Flowchart:
+    stage = fields["stage"]
+    current = ONBOARDING_STAGES.get(stage)
+    if stage == "due_diligence":
+        current = DUE_DILIGENCE_NODES.get(fields["riskTier"], "H")
+
+    title = fields["name"] + (f" - {stage.replace('_', ' ')}" if stage in ONBOARDING_STAGES else "")
+    styles = {current: HIGHLIGHT} if current else {}
+    return _personalise(get_flowchart("vendor_onboarding"), title, {}, styles)
+
+
+VENDOR_DIAGRAMS = {
+    "risk_tier_matrix": risk_matrix_chart,
+    "vendor_onboarding": onboarding_chart,
+}
+
+
+# =============================================================================
+# RENDERING
+# =============================================================================
+
+def _write_atomic(path: Path, data) -> None:
+    """Write via a temporary file so an interrupted run never leaves a partial artifact."""
+    tmp = path.with_name(path.name + ".tmp")
+    if isinstance(data, str):
+        tmp.write_text(data, encoding='utf-8')
+    else:
+        tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def render_batch(jobs: list) -> list:
+    """
+    Render a batch of (digest, key, diagram, fields, outputs) jobs in a worker process.
+
+    Returns (digest, key, error) per job; error is None on success.
+    """
+    results = []
+    for digest, key, diagram, fields, outputs in jobs:
+        try:
+            chart = VENDOR_DIAGRAMS[diagram](fields)
+            svg = render_svg(chart, layout_flowchart(chart), RENDER_OPTIONS["background"])
+            Path(outputs["svg"] or outputs["png"]).parent.mkdir(parents=True, exist_ok=True)
+            if outputs["svg"]:
+                _write_atomic(Path(outputs["svg"]), svg)
+            if outputs["png"]:
+                png = cairosvg.svg2png(bytestring=svg.encode('utf-8'), output_width=RENDER_OPTIONS["width"])
+                _write_atomic(Path(outputs["png"]), png)
+            results.append((digest, key, None))
+        except Exception as e:  # report per job; one bad row must not sink the batch
+            results.append((digest, key, f"{type(e).__name__}: {e}"))
+    return results
+
+
+def load_journal(path: Path) -> set:
+    """
+    Return the digests of every job completed by earlier runs.
+
+    Each line is "<digest>\t<key>", keyed by vendor folder and diagram. Only
+    the last digest per key is current, so superseded lines (and bare digests
+    from older journals) are dropped and the file is rewritten when any were
+    found.
+    """
+    if not path.exists():
+        return set()
+    latest = {}
+    lines = 0
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            lines += 1
+            digest, _, key = line.strip().partition("\t")
+            if key:
+                latest.pop(key, None)
+                latest[key] = digest
+    if lines > len(latest):
+        _write_atomic(path, "".join(f"{digest}\t{key}\n" for key, digest in latest.items()))
+    return set(latest.values())
+
+
+def iter_jobs(rows, root: Path, diagrams: list, formats: list, done: set, stats: dict):
+    """Turn export rows into render jobs, skipping those in the journal whose outputs still exist."""
+    sources = {name: DIAGRAMS[name]['mermaid'] for name in diagrams}
+    for row in rows:
+        if not row.get("id"):
+            stats["invalid"] += 1
+            continue
+        stats["vendors"] += 1
+        fields = vendor_fields(row)
+        folder = shard_dir(root, str(row["id"]))
+        for diagram in diagrams:
+            digest = content_hash("vendor", row["id"], diagram, fields, formats, sources[diagram], RENDER_OPTIONS,
+                                  renderer_version("python"))
+            outputs = {fmt: str(folder / f"{diagram}.{fmt}") if fmt in formats else None for fmt in ("svg", "png")}
+            if digest in done and all(os.path.exists(p) for p in outputs.values() if p):
+                stats["skipped"] += 1
+                continue
+            key = (folder / diagram).relative_to(root).as_posix()
+            yield digest, key, diagram, fields, outputs
+
+
+def _batches(jobs, size: int):
+    batch = []
+    for job in jobs:
+        batch.append(job)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate_vendor_diagrams(
+    export: Path,
+    output_dir: Path,
+    diagrams: list = None,
+    formats: list = None,
+    workers: int = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    force: bool = False,
+) -> dict:
+    """
+    Stream an export through a process pool and render per-vendor diagrams.
+
+    At most two batches per worker are in flight at once, so neither the rows
+    nor the results of a large export are ever held in memory together.
+    Returns counters for the run.
+    """
+    diagrams = diagrams or list(VENDOR_DIAGRAMS)
+    formats = formats or ["svg"]
+    workers = workers or os.cpu_count() or 1
+    root = output_dir / "vendors"
+    ensure_directory(root)
+
+    journal_path = root / JOURNAL
+    done = set() if force else load_journal(journal_path)
+    stats = {"vendors": 0, "invalid": 0, "skipped": 0, "rendered": 0, "failed": 0}
+    batches = _batches(iter_jobs(read_rows(export), root, diagrams, formats, done, stats), batch_size)
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(journal_path, "a", encoding='utf-8') as journal:
+        in_flight = set()
+        exhausted = False
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < 2 * workers:
+                batch = next(batches, None)
+                if batch is None:
+                    exhausted = True
+                else:
+                    in_flight.add(pool.submit(render_batch, batch))
+            if not in_flight:
+                break
+
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                for digest, key, error in future.result():
+                    if error:
+                        stats["failed"] += 1
+                        print(f"  Error: {error}")
+                    else:
+                        stats["rendered"] += 1
+                        journal.write(f"{digest}\t{key}\n")
+            journal.flush()
+
+            elapsed = time.perf_counter() - started
+            print(f"  {stats['vendors']} vendors read, {stats['rendered']} rendered, "
+                  f"{stats['skipped']} up to date, {stats['failed']} failed "
+                  f"({stats['rendered'] / elapsed:.0f}/s)", end="\r")
+
+    print()
+    stats["seconds"] = round(time.perf_counter() - started, 2)
+    return stats
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate per-vendor TPRM diagrams from a portfolio export"
+    )
+    parser.add_argument(
+        "export",
+        type=str,
+        help="Vendor/RiskProfile export (.jsonl, .ndjson or .csv)"
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=str,
+        default="./diagrams",
+        help="Output directory for generated files (default: ./diagrams)"
+    )
+    parser.add_argument(
+        "--format",
+        type=str,
+        choices=["svg", "png", "all"],
+        default="svg",
+        help="Output format (default: svg)"
+    )
+    parser.add_argument(
+        "--diagrams",
+        type=str,
+        default=",".join(VENDOR_DIAGRAMS),
+        help=f"Comma-separated per-vendor diagrams (default: {','.join(VENDOR_DIAGRAMS)})"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of render processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Vendors per worker task (default: {DEFAULT_BATCH_SIZE})"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-render every vendor, ignoring the journal"
+    )
+
+    args = parser.parse_args()
+
+    diagrams = [name.strip() for name in args.diagrams.split(",") if name.strip()]
+    unknown = [name for name in diagrams if name not in VENDOR_DIAGRAMS]
+    if unknown:
+        parser.error(f"unknown diagram(s): {', '.join(unknown)}")
+
+    formats = ["svg", "png"] if args.format == "all" else [args.format]
+    if "png" in formats and cairosvg is None:
+        parser.error("PNG output requires cairosvg (pip install cairosvg)")
+
+    export = Path(args.export)
+    if not export.exists():
+        parser.error(f"export not found: {export}")
+
+    script_dir = Path(__file__).parent.parent
+    output_dir = Path(args.output_dir)
+    if not output_dir.is_absolute():
+        output_dir = script_dir / output_dir
+
+    print(f"\n{'='*60}")
+    print("TPRM Per-Vendor Diagram Generator")
+    print(f"{'='*60}")
+    print(f"Export: {export}")
+    print(f"Output directory: {output_dir / 'vendors'}")
+    print(f"Diagrams: {', '.join(diagrams)} ({'/'.join(f.upper() for f in formats)})")
+    print(f"{'='*60}\n")
+
+    stats = generate_vendor_diagrams(
+        export, output_dir, diagrams, formats, args.workers, args.batch_size, args.force
+    )
+
+    print(f"\n{'='*60}")
+    print(f"Vendors: {stats['vendors']} ({stats['invalid']} rows without an id skipped)")
+    print(f"Rendered: {stats['rendered']}, up to date: {stats['skipped']}, failed: {stats['failed']}")
+    print(f"Time: {stats['seconds']}s")
+    print(f"{'='*60}\n")
+    sys.exit(1 if stats["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -125,12 +125,19 @@ export default function AgentsPage() {
     try {
       const res = await fetch('/api/orchestrator', { method: 'PATCH' })
       if (res.ok) {
-        const data = await res.json()
+        // The cycle runs on the background worker; poll until it finishes
+        const { statusUrl } = await res.json()
+        let job = await (await fetch(statusUrl)).json()
+        while (job.status === 'QUEUED' || job.status === 'RUNNING') {
+          await new Promise((resolve) => setTimeout(resolve, 2000))
+          job = await (await fetch(statusUrl)).json()
+        }
+        if (job.status !== 'SUCCEEDED') throw new Error(job.lastError)
         alert(
           `Maintenance cycle completed:\n` +
-            `- Overdue escalations: ${data.maintenance.overdueEscalations}\n` +
-            `- Expiring documents: ${data.maintenance.expiringDocuments}\n` +
-            `- Upcoming assessments: ${data.maintenance.upcomingAssessments}`
+            `- Overdue escalations: ${job.result.overdueEscalations}\n` +
+            `- Expiring documents: ${job.result.expiringDocuments}\n` +
+            `- Upcoming assessments: ${job.result.upcomingAssessments}`
         )
       }
     } catch (error) {
@@ -255,11 +262,16 @@ export default function AgentsPage() {
               <ul className="space-y-1 text-sm font-mono text-gray-600">
                 <li>POST /api/agents/vera - Risk profiling</li>
                 <li>POST /api/agents/cara - Assessment</li>
-                <li>POST /api/agents/sara - Document analysis</li>
+                <li>POST /api/agents/sara - Document analysis (?stream=1 for live findings)</li>
                 <li>POST /api/agents/rita - Report generation</li>
                 <li>POST /api/agents/mars - Remediation</li>
                 <li>POST /api/orchestrator - Full workflow</li>
+                <li>POST /api/orchestrator/batch - Bulk onboarding (JSON or CSV)</li>
                 <li>PATCH /api/orchestrator - Maintenance</li>
+                <li>GET /api/jobs/:id - Workflow job status</li>
+                <li>GET /api/search?q= - Search vendors, findings, documents, reports</li>
+                <li>GET /api/metrics - Prometheus metrics</li>
+                <li>GET :9464/metrics - Worker Prometheus metrics (METRICS_PORT)</li>
               </ul>
             </div>
           </div>
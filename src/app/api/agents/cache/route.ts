@@ -0,0 +1,13 @@
+import { NextResponse } from 'next/server'
+import { llmCache } from '@/lib/agents'
+
+// LLM response cache hit/miss metrics
+export async function GET() {
+  return NextResponse.json({ cache: llmCache.stats() })
+}
+
+// Drop the in-memory tier (persistent entries expire by TTL)
+export async function DELETE() {
+  llmCache.clear()
+  return NextResponse.json({ success: true, cache: llmCache.stats() })
+}
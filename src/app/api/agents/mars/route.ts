@@ -1,5 +1,6 @@
 import { NextRequest, NextResponse } from 'next/server'
 import { mars } from '@/lib/agents'
+import type { EscalationResult } from '@/lib/agents/mars'
 import prisma from '@/lib/db'
 import { z } from 'zod'
 
@@ -110,14 +111,21 @@ export async function PUT(request: NextRequest) {
   }
 }
 
-// Check overdue actions
+// Check overdue actions. The response lists every escalation made, so unlike
+// the maintenance cycle this collects them all.
 export async function GET() {
   try {
-    const result = await mars.checkOverdueActions()
+    const escalations: EscalationResult[] = []
+    const result = await mars.checkOverdueActions((batch) => {
+      escalations.push(...batch)
+    })
 
     return NextResponse.json({
       success: result.success,
-      escalations: result.data || [],
+      escalations,
+      escalated: result.data?.escalated || 0,
+      byLevel: result.data?.byLevel,
+      batches: result.data?.batches,
       error: result.error,
     })
   } catch (error) {
@@ -1,5 +1,5 @@
 import { NextRequest, NextResponse } from 'next/server'
-import { sara } from '@/lib/agents'
+import { sara, type SecurityFinding } from '@/lib/agents'
 import prisma from '@/lib/db'
 import { z } from 'zod'
 
@@ -52,8 +52,7 @@ export async function POST(request: NextRequest) {
       `This is a placeholder for the actual document content.\n` +
       `In production, this would be extracted from the uploaded file.`
 
-    // Execute SARA agent
-    const result = await sara.execute({
+    const input = {
       vendorId: validated.vendorId,
       documentId: validated.documentId,
       documentType: document.documentType,
@@ -63,15 +62,72 @@ export async function POST(request: NextRequest) {
         riskTier: document.vendor.riskProfiles[0]?.riskTier || 'MEDIUM',
         dataAccess: document.vendor.riskProfiles[0]?.dataTypesAccessed || [],
       },
-    })
+    }
 
-    if (!result.success) {
-      // Revert document status on failure
-      await prisma.document.update({
-        where: { id: validated.documentId },
-        data: { status: 'RECEIVED' },
+    // Execute SARA agent, reverting the document status on failure
+    const analyze = async (onFinding?: (finding: SecurityFinding) => void) => {
+      const result = await sara.execute(input, { onFinding })
+      if (!result.success) {
+        await prisma.document.update({
+          where: { id: validated.documentId },
+          data: { status: 'RECEIVED' },
+        })
+      }
+      return result
+    }
+
+    // With ?stream=1 (or Accept: text/event-stream) the response is a
+    // server-sent event stream: a "finding" event for each finding as soon as
+    // the model has written it, then "done" with the saved analysis or
+    // "error". For a long document split into parts, streamed findings are
+    // provisional and "done" has the merged list.
+    const streaming =
+      request.nextUrl.searchParams.get('stream') === '1' ||
+      (request.headers.get('accept') || '').includes('text/event-stream')
+
+    if (streaming) {
+      const encoder = new TextEncoder()
+      const stream = new ReadableStream({
+        async start(controller) {
+          // The client may disconnect at any point; the analysis still finishes
+          let open = true
+          const send = (event: string, data: unknown) => {
+            if (!open) return
+            try {
+              controller.enqueue(encoder.encode(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`))
+            } catch {
+              open = false
+            }
+          }
+
+          try {
+            const result = await analyze((finding) => send('finding', finding))
+            if (result.success) {
+              send('done', { success: true, analysis: result.data, processingTimeMs: result.processingTimeMs })
+            } else {
+              send('error', { error: result.error || 'Agent execution failed' })
+            }
+          } catch (error) {
+            console.error('SARA agent error:', error)
+            send('error', { error: 'Failed to execute document analysis' })
+          } finally {
+            if (open) controller.close()
+          }
+        },
       })
 
+      return new Response(stream, {
+        headers: {
+          'Content-Type': 'text/event-stream',
+          'Cache-Control': 'no-cache, no-transform',
+          Connection: 'keep-alive',
+        },
+      })
+    }
+
+    const result = await analyze()
+
+    if (!result.success) {
       return NextResponse.json(
         { error: result.error || 'Agent execution failed' },
         { status: 500 }
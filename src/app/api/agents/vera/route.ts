@@ -1,6 +1,7 @@
 import { NextRequest, NextResponse } from 'next/server'
 import { vera } from '@/lib/agents'
 import prisma from '@/lib/db'
+import { recordVendorStatus } from '@/lib/dashboard/metrics'
 import { z } from 'zod'
 
 const profileRequestSchema = z.object({
@@ -60,6 +61,7 @@ export async function POST(request: NextRequest) {
       where: { id: validated.vendorId },
       data: { status: 'ACTIVE' },
     })
+    await recordVendorStatus(validated.vendorId, vendor.status, 'ACTIVE')
 
     return NextResponse.json({
       success: true,
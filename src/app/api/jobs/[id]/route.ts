@@ -0,0 +1,38 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { getJob, type JobCheckpoint } from '@/lib/jobs/queue'
+
+// Status of a queued workflow job
+export async function GET(
+  request: NextRequest,
+  { params }: { params: { id: string } }
+) {
+  try {
+    const job = await getJob(params.id)
+
+    if (!job) {
+      return NextResponse.json({ error: 'Job not found' }, { status: 404 })
+    }
+
+    const checkpoint = (job.checkpoint as unknown as JobCheckpoint) || {}
+
+    return NextResponse.json({
+      id: job.id,
+      type: job.type,
+      status: job.status,
+      attempts: job.attempts,
+      maxAttempts: job.maxAttempts,
+      completedStages: Object.keys(checkpoint),
+      runAt: job.runAt,
+      lastError: job.lastError,
+      result: job.result,
+      createdAt: job.createdAt,
+      completedAt: job.completedAt,
+    })
+  } catch (error) {
+    console.error('Error fetching job:', error)
+    return NextResponse.json(
+      { error: 'Failed to fetch job' },
+      { status: 500 }
+    )
+  }
+}
@@ -0,0 +1,27 @@
+import { NextResponse } from 'next/server'
+import { registry } from '@/lib/telemetry/metrics'
+// Registers the LLM rate limiter and cache gauges
+import '@/lib/agents'
+
+export const dynamic = 'force-dynamic'
+
+// Prometheus scrape endpoint for this server process: agent, LLM, stage,
+// workflow and Prisma query latency histograms, token counters and gauges.
+// Workflows run in the worker, which serves its own registry on METRICS_PORT
+// (see src/worker.ts); scrape both.
+export async function GET() {
+  try {
+    return new NextResponse(registry.render(), {
+      headers: {
+        'Content-Type': 'text/plain; version=0.0.4; charset=utf-8',
+        'Cache-Control': 'no-store',
+      },
+    })
+  } catch (error) {
+    console.error('Metrics error:', error)
+    return NextResponse.json(
+      { error: 'Failed to render metrics' },
+      { status: 500 }
+    )
+  }
+}
@@ -0,0 +1,85 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { getBatchCounts, getBatchSummary } from '@/lib/jobs/batch'
+
+const POLL_MS = 2000
+
+// Batch progress. With ?stream=1 (or Accept: text/event-stream) the response
+// is a server-sent event stream: a "progress" event with job counts whenever
+// they change, then a "done" event with the full summary once every job has
+// finished.
+export async function GET(
+  request: NextRequest,
+  { params }: { params: { id: string } }
+) {
+  try {
+    const streaming =
+      request.nextUrl.searchParams.get('stream') === '1' ||
+      (request.headers.get('accept') || '').includes('text/event-stream')
+
+    if (!streaming) {
+      const summary = await getBatchSummary(params.id)
+      if (!summary) {
+        return NextResponse.json({ error: 'Batch not found' }, { status: 404 })
+      }
+      return NextResponse.json(summary)
+    }
+
+    const initial = await getBatchCounts(params.id)
+    if (!initial.total) {
+      return NextResponse.json({ error: 'Batch not found' }, { status: 404 })
+    }
+
+    const encoder = new TextEncoder()
+    const stream = new ReadableStream({
+      async start(controller) {
+        // The client may disconnect at any point; stop quietly
+        let open = true
+        const send = (event: string, data: unknown) => {
+          if (!open) return
+          try {
+            controller.enqueue(encoder.encode(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`))
+          } catch {
+            open = false
+          }
+        }
+
+        try {
+          let counts = initial
+          let last = ''
+          while (open && !request.signal.aborted) {
+            const current = JSON.stringify(counts)
+            if (current !== last) {
+              send('progress', counts)
+              last = current
+            }
+            if (counts.done) {
+              send('done', await getBatchSummary(params.id))
+              break
+            }
+            await new Promise((resolve) => setTimeout(resolve, POLL_MS))
+            counts = await getBatchCounts(params.id)
+          }
+        } catch (error) {
+          console.error('Batch progress stream error:', error)
+          send('error', { error: 'Failed to fetch batch progress' })
+        } finally {
+          if (open) controller.close()
+        }
+      },
+    })
+
+    return new Response(stream, {
+      headers: {
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache, no-transform',
+        Connection: 'keep-alive',
+      },
+    })
+  } catch (error) {
+    console.error('Error fetching batch:', error)
+    return NextResponse.json(
+      { error: 'Failed to fetch batch' },
+      { status: 500 }
+    )
+  }
+}
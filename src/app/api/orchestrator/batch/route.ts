@@ -0,0 +1,110 @@
+import { randomUUID } from 'crypto'
+import { NextRequest, NextResponse } from 'next/server'
+import { enqueueOnboardingBatch, vendorsFromCsv, type BatchRejection } from '@/lib/jobs/batch'
+import { z } from 'zod'
+
+const MAX_BATCH_SIZE = 1000
+
+const batchVendorSchema = z
+  .object({
+    vendorId: z.string().optional(),
+    vendorName: z.string().optional(),
+    dataTypesAccessed: z.array(z.string()).default([]),
+    systemIntegrations: z.array(z.string()).default([]),
+    hasPiiAccess: z.boolean().default(false),
+    hasPhiAccess: z.boolean().default(false),
+    hasPciAccess: z.boolean().default(false),
+    businessCriticality: z.enum([
+      'MISSION_CRITICAL',
+      'BUSINESS_CRITICAL',
+      'IMPORTANT',
+      'STANDARD',
+    ]),
+  })
+  .refine((v) => v.vendorId || v.vendorName, { message: 'vendorId or vendorName is required' })
+
+const batchRequestSchema = z.object({
+  vendors: z.array(z.unknown()).min(1).max(MAX_BATCH_SIZE),
+})
+
+async function readVendors(request: NextRequest): Promise<unknown[]> {
+  const contentType = request.headers.get('content-type') || ''
+
+  if (contentType.includes('multipart/form-data')) {
+    const form = await request.formData()
+    const file = form.get('file')
+    if (!file || typeof file === 'string') throw new Error('Missing CSV file')
+    return vendorsFromCsv(await file.text())
+  }
+  if (contentType.includes('text/csv')) {
+    return vendorsFromCsv(await request.text())
+  }
+  return batchRequestSchema.parse(await request.json()).vendors
+}
+
+// Bulk vendor onboarding: a JSON list ({ vendors: [...] }) or a CSV upload
+// (multipart field "file", or a text/csv body). Each vendor becomes an
+// onboarding job; progress is at statusUrl. Re-posting with the same
+// Idempotency-Key continues the same batch without duplicating jobs.
+export async function POST(request: NextRequest) {
+  try {
+    const rows = await readVendors(request)
+    if (!rows.length || rows.length > MAX_BATCH_SIZE) {
+      return NextResponse.json(
+        { error: `A batch must contain between 1 and ${MAX_BATCH_SIZE} vendors` },
+        { status: 400 }
+      )
+    }
+
+    const rejected: BatchRejection[] = []
+    const vendors = []
+    const rowNumbers = []
+    for (let i = 0; i < rows.length; i++) {
+      const parsed = batchVendorSchema.safeParse(rows[i])
+      if (parsed.success) {
+        vendors.push(parsed.data)
+        rowNumbers.push(i + 1)
+      } else {
+        const row = rows[i] as { vendorId?: string; vendorName?: string } | null
+        rejected.push({
+          row: i + 1,
+          vendor: row?.vendorId || row?.vendorName || '',
+          error: parsed.error.errors.map((e) => `${e.path.join('.') || 'row'}: ${e.message}`).join('; '),
+        })
+      }
+    }
+
+    const batchId = request.headers.get('idempotency-key') || randomUUID()
+    const batch = await enqueueOnboardingBatch(batchId, vendors)
+
+    return NextResponse.json(
+      {
+        batchId,
+        queued: batch.queued,
+        created: batch.created,
+        rejected: [
+          ...rejected,
+          // Map rows of the validated subset back to input row numbers
+          ...batch.rejected.map((r) => ({ ...r, row: rowNumbers[r.row - 1] })),
+        ].sort((a, b) => a.row - b.row),
+        statusUrl: `/api/orchestrator/batch/${batchId}`,
+      },
+      { status: batch.created ? 202 : 200 }
+    )
+  } catch (error) {
+    if (error instanceof z.ZodError) {
+      return NextResponse.json(
+        { error: 'Validation failed', details: error.errors },
+        { status: 400 }
+      )
+    }
+    if (error instanceof Error && error.message === 'Missing CSV file') {
+      return NextResponse.json({ error: error.message }, { status: 400 })
+    }
+    console.error('Batch onboarding error:', error)
+    return NextResponse.json(
+      { error: 'Failed to queue onboarding batch' },
+      { status: 500 }
+    )
+  }
+}
@@ -1,6 +1,7 @@
 import { NextRequest, NextResponse } from 'next/server'
-import { orchestrator } from '@/lib/agents'
+import type { WorkflowJob } from '@prisma/client'
 import prisma from '@/lib/db'
+import { enqueueJob } from '@/lib/jobs/queue'
 import { z } from 'zod'
 
 const onboardRequestSchema = z.object({
@@ -24,6 +25,26 @@ const documentProcessSchema = z.object({
   documentContent: z.string().optional(),
 })
 
+// Workflows run on the background worker (npm run worker); callers poll
+// statusUrl. Repeating a request with the same Idempotency-Key header returns
+// the original job instead of starting another run.
+function idempotencyKey(request: NextRequest, scope: string): string | undefined {
+  const key = request.headers.get('idempotency-key')
+  return key ? `${scope}:${key}` : undefined
+}
+
+function accepted(job: WorkflowJob, created: boolean) {
+  return NextResponse.json(
+    {
+      jobId: job.id,
+      status: job.status,
+      created,
+      statusUrl: `/api/jobs/${job.id}`,
+    },
+    { status: created ? 202 : 200 }
+  )
+}
+
 // Full vendor onboarding workflow
 export async function POST(request: NextRequest) {
   try {
@@ -39,8 +60,8 @@ export async function POST(request: NextRequest) {
       return NextResponse.json({ error: 'Vendor not found' }, { status: 404 })
     }
 
-    // Execute full onboarding workflow
-    const result = await orchestrator.onboardVendor({
+    // Queue full onboarding workflow
+    const { job, created } = await enqueueJob('ONBOARD_VENDOR', {
       vendorId: validated.vendorId,
       vendorName: vendor.name,
       industry: vendor.industry || undefined,
@@ -51,12 +72,9 @@ export async function POST(request: NextRequest) {
       hasPciAccess: validated.hasPciAccess,
       businessCriticality: validated.businessCriticality,
       annualSpend: vendor.annualSpend ? Number(vendor.annualSpend) : undefined,
-    })
+    }, { idempotencyKey: idempotencyKey(request, 'onboard') })
 
-    return NextResponse.json({
-      success: result.overallSuccess,
-      workflow: result,
-    })
+    return accepted(job, created)
   } catch (error) {
     if (error instanceof z.ZodError) {
       return NextResponse.json(
@@ -66,7 +84,7 @@ export async function POST(request: NextRequest) {
     }
     console.error('Orchestrator error:', error)
     return NextResponse.json(
-      { error: 'Failed to execute onboarding workflow' },
+      { error: 'Failed to queue onboarding workflow' },
       { status: 500 }
     )
   }
@@ -90,17 +108,14 @@ export async function PUT(request: NextRequest) {
     const content = validated.documentContent ||
       `Document: ${document.documentName}\nType: ${document.documentType}`
 
-    const result = await orchestrator.processDocument(
-      validated.vendorId,
-      validated.documentId,
-      document.documentType,
-      content
-    )
+    const { job, created } = await enqueueJob('PROCESS_DOCUMENT', {
+      vendorId: validated.vendorId,
+      documentId: validated.documentId,
+      documentType: document.documentType,
+      documentContent: content,
+    }, { idempotencyKey: idempotencyKey(request, 'document') })
 
-    return NextResponse.json({
-      success: result.overallSuccess,
-      workflow: result,
-    })
+    return accepted(job, created)
   } catch (error) {
     if (error instanceof z.ZodError) {
       return NextResponse.json(
@@ -110,25 +125,25 @@ export async function PUT(request: NextRequest) {
     }
     console.error('Document processing error:', error)
     return NextResponse.json(
-      { error: 'Failed to process document' },
+      { error: 'Failed to queue document processing' },
       { status: 500 }
     )
   }
 }
 
 // Maintenance cycle
-export async function PATCH() {
+export async function PATCH(request: NextRequest) {
   try {
-    const result = await orchestrator.runMaintenanceCycle()
-
-    return NextResponse.json({
-      success: true,
-      maintenance: result,
+    const { job, created } = await enqueueJob('MAINTENANCE', {}, {
+      idempotencyKey: idempotencyKey(request, 'maintenance'),
+      maxAttempts: 1,
     })
+
+    return accepted(job, created)
   } catch (error) {
     console.error('Maintenance error:', error)
     return NextResponse.json(
-      { error: 'Failed to run maintenance cycle' },
+      { error: 'Failed to queue maintenance cycle' },
       { status: 500 }
     )
   }
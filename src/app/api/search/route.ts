@@ -0,0 +1,52 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { search, SEARCH_TYPES, type SearchType } from '@/lib/search/fulltext'
+
+const MAX_QUERY_LENGTH = 200
+const MAX_LIMIT = 50
+
+// Ranked full-text search across vendors, findings, documents and reports.
+//   ?q=         query; websearch syntax ("phrase", OR, -word)
+//   ?types=     comma-separated subset of vendor,finding,document,report
+//   ?vendorId=  restrict to one vendor
+//   ?prefix=1   type-ahead: match the last word as a prefix
+//   ?limit=     hits to return (default 20, max 50)
+// Each hit's snippet is HTML with matches wrapped in <mark>.
+export async function GET(request: NextRequest) {
+  try {
+    const searchParams = request.nextUrl.searchParams
+    const q = (searchParams.get('q') || '').trim()
+    const typesParam = searchParams.get('types')
+    const vendorId = searchParams.get('vendorId') || undefined
+    const prefix = searchParams.get('prefix') === '1'
+    const limit = Math.min(MAX_LIMIT, Math.max(1, parseInt(searchParams.get('limit') || '20') || 20))
+
+    if (!q) {
+      return NextResponse.json({ error: 'q is required' }, { status: 400 })
+    }
+    if (q.length > MAX_QUERY_LENGTH) {
+      return NextResponse.json(
+        { error: `q must be at most ${MAX_QUERY_LENGTH} characters` },
+        { status: 400 }
+      )
+    }
+
+    const types = typesParam ? typesParam.split(',').map((t) => t.trim()) : []
+    const unknown = types.filter((t) => !(SEARCH_TYPES as readonly string[]).includes(t))
+    if (unknown.length) {
+      return NextResponse.json(
+        { error: `Unknown search type(s): ${unknown.join(', ')}` },
+        { status: 400 }
+      )
+    }
+
+    const results = await search(q, { types: types as SearchType[], vendorId, prefix, limit })
+
+    return NextResponse.json({ query: q, prefix, results })
+  } catch (error) {
+    console.error('Search error:', error)
+    return NextResponse.json(
+      { error: 'Search failed' },
+      { status: 500 }
+    )
+  }
+}
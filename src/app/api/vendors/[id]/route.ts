@@ -1,5 +1,6 @@
 import { NextRequest, NextResponse } from 'next/server'
 import prisma from '@/lib/db'
+import { recordVendorStatus } from '@/lib/dashboard/metrics'
 import { z } from 'zod'
 
 const updateVendorSchema = z.object({
@@ -93,6 +94,7 @@ export async function PUT(
       where: { id: params.id },
       data: updateData,
     })
+    await recordVendorStatus(vendor.id, existingVendor.status, vendor.status)
 
     // Create audit trail
     await prisma.auditTrail.create({
@@ -139,6 +141,7 @@ export async function DELETE(
       where: { id: params.id },
       data: { status: 'TERMINATED' },
     })
+    await recordVendorStatus(params.id, vendor.status, 'TERMINATED')
 
     // Create audit trail
     await prisma.auditTrail.create({
@@ -1,5 +1,7 @@
 import { NextRequest, NextResponse } from 'next/server'
+import type { Prisma, RiskTier, VendorStatus } from '@prisma/client'
 import prisma from '@/lib/db'
+import { recordVendorStatus } from '@/lib/dashboard/metrics'
 import { z } from 'zod'
 
 const vendorSchema = z.object({
@@ -20,21 +22,57 @@ const vendorSchema = z.object({
   annualSpend: z.number().optional(),
 })
 
+const RISK_TIERS = ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW']
+const MAX_LIMIT = 100
+
+// Keyset cursor: the (name, id) of the last vendor on the previous page
+function encodeCursor(vendor: { name: string; id: string }): string {
+  return Buffer.from(JSON.stringify([vendor.name, vendor.id])).toString('base64url')
+}
+
+function decodeCursor(cursor: string): { name: string; id: string } | null {
+  try {
+    const [name, id] = JSON.parse(Buffer.from(cursor, 'base64url').toString())
+    return typeof name === 'string' && typeof id === 'string' ? { name, id } : null
+  } catch {
+    return null
+  }
+}
+
+// Vendors ordered by (name, id). Pass pagination.nextCursor back as ?cursor=
+// for the next page; ?page= still works but gets slower the deeper it goes.
+// Tier filtering uses the vendor's denormalized currentRiskTier, so the
+// filter, the page and the total all come from indexed queries.
 export async function GET(request: NextRequest) {
   try {
     const searchParams = request.nextUrl.searchParams
     const status = searchParams.get('status')
     const riskTier = searchParams.get('riskTier')
     const search = searchParams.get('search')
-    const page = parseInt(searchParams.get('page') || '1')
-    const limit = parseInt(searchParams.get('limit') || '20')
+    const cursorParam = searchParams.get('cursor')
+    const page = Math.max(1, parseInt(searchParams.get('page') || '1') || 1)
+    const limit = Math.min(MAX_LIMIT, Math.max(1, parseInt(searchParams.get('limit') || '20') || 20))
+
+    const cursor = cursorParam ? decodeCursor(cursorParam) : null
+    if (cursorParam && !cursor) {
+      return NextResponse.json({ error: 'Invalid cursor' }, { status: 400 })
+    }
+    if (riskTier && !RISK_TIERS.includes(riskTier)) {
+      return NextResponse.json({ error: 'Invalid risk tier' }, { status: 400 })
+    }
 
-    const where: any = {}
+    const where: Prisma.VendorWhereInput = {}
 
     if (status) {
-      where.status = status
+      where.status = status as VendorStatus
     }
 
+    if (riskTier) {
+      where.currentRiskTier = riskTier as RiskTier
+    }
+
+    // Substring matches; the trigram indexes on name and industry keep the
+    // ILIKE off a sequential scan. /api/search does ranked full-text search.
     if (search) {
       where.OR = [
         { name: { contains: search, mode: 'insensitive' } },
@@ -42,14 +80,24 @@ export async function GET(request: NextRequest) {
       ]
     }
 
+    const pageWhere: Prisma.VendorWhereInput = cursor
+      ? {
+          AND: [
+            where,
+            {
+              OR: [
+                { name: { gt: cursor.name } },
+                { name: cursor.name, id: { gt: cursor.id } },
+              ],
+            },
+          ],
+        }
+      : where
+
     const [vendors, total] = await Promise.all([
       prisma.vendor.findMany({
-        where,
+        where: pageWhere,
         include: {
-          riskProfiles: {
-            orderBy: { createdAt: 'desc' },
-            take: 1,
-          },
           _count: {
             select: {
               riskFindings: { where: { status: { not: 'CLOSED' } } },
@@ -57,28 +105,24 @@ export async function GET(request: NextRequest) {
             },
           },
         },
-        orderBy: { name: 'asc' },
-        skip: (page - 1) * limit,
+        orderBy: [{ name: 'asc' }, { id: 'asc' }],
+        skip: cursor ? 0 : (page - 1) * limit,
         take: limit,
       }),
       prisma.vendor.count({ where }),
     ])
 
-    // Filter by risk tier if specified (post-query filter due to relation)
-    let filteredVendors = vendors
-    if (riskTier) {
-      filteredVendors = vendors.filter(
-        (v) => v.riskProfiles[0]?.riskTier === riskTier
-      )
-    }
+    const last = vendors[vendors.length - 1]
+    const nextCursor = vendors.length === limit && last ? encodeCursor(last) : null
 
     return NextResponse.json({
-      vendors: filteredVendors,
+      vendors,
       pagination: {
-        page,
+        page: cursor ? undefined : page,
         limit,
         total,
         totalPages: Math.ceil(total / limit),
+        nextCursor,
       },
     })
   } catch (error) {
@@ -119,6 +163,7 @@ export async function POST(request: NextRequest) {
         status: 'PENDING',
       },
     })
+    await recordVendorStatus(vendor.id, null, vendor.status)
 
     // Create audit trail
     await prisma.auditTrail.create({
@@ -1,6 +1,6 @@
 'use client'
 
-import { useEffect, useState } from 'react'
+import { useEffect, useRef, useState } from 'react'
 import Link from 'next/link'
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card'
 import { Button } from '@/components/ui/button'
@@ -21,10 +21,8 @@ interface Vendor {
   name: string
   industry: string | null
   status: string
-  riskProfiles: {
-    riskTier: string
-    overallRiskScore: number | null
-  }[]
+  currentRiskTier: string | null
+  currentRiskScore: number | null
   _count: {
     riskFindings: number
     documents: number
@@ -35,17 +33,30 @@ export default function VendorsPage() {
   const [vendors, setVendors] = useState<Vendor[]>([])
   const [loading, setLoading] = useState(true)
   const [search, setSearch] = useState('')
+  const [total, setTotal] = useState(0)
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
 
+  const latestRequest = useRef(0)
+
+  // Search runs server-side (trigram-indexed), debounced while typing
   useEffect(() => {
-    fetchVendors()
-  }, [])
+    const timer = setTimeout(() => fetchVendors(), search ? 300 : 0)
+    return () => clearTimeout(timer)
+  }, [search])
 
-  const fetchVendors = async () => {
+  const fetchVendors = async (cursor?: string) => {
+    const request = ++latestRequest.current
     try {
-      const res = await fetch('/api/vendors')
-      if (res.ok) {
+      const params = new URLSearchParams()
+      if (search) params.set('search', search)
+      if (cursor) params.set('cursor', cursor)
+      const res = await fetch(`/api/vendors?${params}`)
+      // Drop responses to searches the user has already typed past
+      if (res.ok && request === latestRequest.current) {
         const data = await res.json()
-        setVendors(data.vendors || [])
+        setVendors((current) => (cursor ? [...current, ...data.vendors] : data.vendors || []))
+        setTotal(data.pagination?.total || 0)
+        setNextCursor(data.pagination?.nextCursor || null)
       }
     } catch (error) {
       console.error('Failed to fetch vendors:', error)
@@ -54,10 +65,6 @@ export default function VendorsPage() {
     }
   }
 
-  const filteredVendors = vendors.filter((vendor) =>
-    vendor.name.toLowerCase().includes(search.toLowerCase())
-  )
-
   const getRiskBadgeVariant = (tier: string) => {
     switch (tier) {
       case 'CRITICAL':
@@ -129,7 +136,7 @@ export default function VendorsPage() {
         <CardHeader>
           <CardTitle className="flex items-center gap-2">
             <Building2 className="h-5 w-5" />
-            Vendor List ({filteredVendors.length})
+            Vendor List ({total})
           </CardTitle>
         </CardHeader>
         <CardContent>
@@ -137,67 +144,72 @@ export default function VendorsPage() {
             <div className="flex items-center justify-center h-32">
               <div className="animate-spin rounded-full h-8 w-8 border-b-2 border-blue-600" />
             </div>
-          ) : filteredVendors.length > 0 ? (
-            <Table>
-              <TableHeader>
-                <TableRow>
-                  <TableHead>Vendor Name</TableHead>
-                  <TableHead>Industry</TableHead>
-                  <TableHead>Risk Tier</TableHead>
-                  <TableHead>Risk Score</TableHead>
-                  <TableHead>Status</TableHead>
-                  <TableHead>Open Findings</TableHead>
-                  <TableHead>Documents</TableHead>
-                  <TableHead></TableHead>
-                </TableRow>
-              </TableHeader>
-              <TableBody>
-                {filteredVendors.map((vendor) => (
-                  <TableRow key={vendor.id}>
-                    <TableCell className="font-medium">{vendor.name}</TableCell>
-                    <TableCell>{vendor.industry || '-'}</TableCell>
-                    <TableCell>
-                      {vendor.riskProfiles[0] ? (
-                        <Badge
-                          variant={getRiskBadgeVariant(
-                            vendor.riskProfiles[0].riskTier
-                          )}
-                        >
-                          {vendor.riskProfiles[0].riskTier}
-                        </Badge>
-                      ) : (
-                        <Badge variant="outline">Not Assessed</Badge>
-                      )}
-                    </TableCell>
-                    <TableCell>
-                      {vendor.riskProfiles[0]?.overallRiskScore ?? '-'}
-                    </TableCell>
-                    <TableCell>
-                      <Badge variant={getStatusBadgeVariant(vendor.status)}>
-                        {vendor.status}
-                      </Badge>
-                    </TableCell>
-                    <TableCell>
-                      {vendor._count.riskFindings > 0 ? (
-                        <Badge variant="destructive">
-                          {vendor._count.riskFindings}
-                        </Badge>
-                      ) : (
-                        <span className="text-gray-400">0</span>
-                      )}
-                    </TableCell>
-                    <TableCell>{vendor._count.documents}</TableCell>
-                    <TableCell>
-                      <Link href={`/vendors/${vendor.id}`}>
-                        <Button variant="ghost" size="sm">
-                          View
-                        </Button>
-                      </Link>
-                    </TableCell>
+          ) : vendors.length > 0 ? (
+            <>
+              <Table>
+                <TableHeader>
+                  <TableRow>
+                    <TableHead>Vendor Name</TableHead>
+                    <TableHead>Industry</TableHead>
+                    <TableHead>Risk Tier</TableHead>
+                    <TableHead>Risk Score</TableHead>
+                    <TableHead>Status</TableHead>
+                    <TableHead>Open Findings</TableHead>
+                    <TableHead>Documents</TableHead>
+                    <TableHead></TableHead>
                   </TableRow>
-                ))}
-              </TableBody>
-            </Table>
+                </TableHeader>
+                <TableBody>
+                  {vendors.map((vendor) => (
+                    <TableRow key={vendor.id}>
+                      <TableCell className="font-medium">{vendor.name}</TableCell>
+                      <TableCell>{vendor.industry || '-'}</TableCell>
+                      <TableCell>
+                        {vendor.currentRiskTier ? (
+                          <Badge variant={getRiskBadgeVariant(vendor.currentRiskTier)}>
+                            {vendor.currentRiskTier}
+                          </Badge>
+                        ) : (
+                          <Badge variant="outline">Not Assessed</Badge>
+                        )}
+                      </TableCell>
+                      <TableCell>
+                        {vendor.currentRiskScore ?? '-'}
+                      </TableCell>
+                      <TableCell>
+                        <Badge variant={getStatusBadgeVariant(vendor.status)}>
+                          {vendor.status}
+                        </Badge>
+                      </TableCell>
+                      <TableCell>
+                        {vendor._count.riskFindings > 0 ? (
+                          <Badge variant="destructive">
+                            {vendor._count.riskFindings}
+                          </Badge>
+                        ) : (
+                          <span className="text-gray-400">0</span>
+                        )}
+                      </TableCell>
+                      <TableCell>{vendor._count.documents}</TableCell>
+                      <TableCell>
+                        <Link href={`/vendors/${vendor.id}`}>
+                          <Button variant="ghost" size="sm">
+                            View
+                          </Button>
+                        </Link>
+                      </TableCell>
+                    </TableRow>
+                  ))}
+                </TableBody>
+              </Table>
+              {nextCursor && (
+                <div className="flex justify-center pt-4">
+                  <Button variant="outline" onClick={() => fetchVendors(nextCursor)}>
+                    Load more
+                  </Button>
+                </div>
+              )}
+            </>
           ) : (
             <div className="text-center py-12">
               <Building2 className="h-12 w-12 text-gray-300 mx-auto mb-4" />
@@ -0,0 +1,7 @@
+// Next.js calls register() once per server process at startup
+export async function register() {
+  if (process.env.NEXT_RUNTIME === 'nodejs') {
+    const { startTelemetryExport } = await import('@/lib/telemetry/otlp')
+    startTelemetryExport('tprm-web')
+  }
+}
@@ -2,14 +2,61 @@ import { ChatOpenAI } from '@langchain/openai'
 import { ChatAnthropic } from '@langchain/anthropic'
 import { HumanMessage, SystemMessage } from '@langchain/core/messages'
 import prisma from '@/lib/db'
+import { BulkWriter } from './bulk-writer'
+import { IncrementalJSONParser } from './json-stream'
+import { agentCacheTtlMs, cacheKey, llmCache } from './llm-cache'
+import { rateLimiter } from './rate-limiter'
 import type { AgentConfig, AgentName, AgentResult, AgentLogEntry } from './types'
+import {
+  agentDuration,
+  jsonParseDuration,
+  llmQueueWait,
+  llmRequestDuration,
+  llmTimeToFirstToken,
+  llmTokens,
+} from '@/lib/telemetry/metrics'
+import { startSpan, withSpan, type Span } from '@/lib/telemetry/tracing'
+
+export interface InvokeOptions {
+  cache?: boolean
+  cacheIf?: (response: string) => boolean
+}
+
+interface TokenUsage {
+  prompt: number
+  completion: number
+}
+
+// Provider-reported usage; where it lives depends on the provider and the
+// LangChain version, and some report none
+function tokenUsage(message: unknown): TokenUsage | null {
+  const m = message as {
+    usage_metadata?: { input_tokens?: number; output_tokens?: number }
+    response_metadata?: {
+      tokenUsage?: { promptTokens?: number; completionTokens?: number }
+      usage?: { input_tokens?: number; output_tokens?: number }
+    }
+  }
+  const usage = m?.usage_metadata || m?.response_metadata?.usage
+  if (usage?.input_tokens !== undefined) {
+    return { prompt: usage.input_tokens, completion: usage.output_tokens || 0 }
+  }
+  const openai = m?.response_metadata?.tokenUsage
+  if (openai?.promptTokens !== undefined) {
+    return { prompt: openai.promptTokens, completion: openai.completionTokens || 0 }
+  }
+  return null
+}
 
 export abstract class BaseAgent {
   protected config: AgentConfig
   protected llm: ChatOpenAI | ChatAnthropic
+  protected modelName = ''
+  private cacheTtlMs: number
 
   constructor(config: AgentConfig) {
     this.config = config
+    this.cacheTtlMs = agentCacheTtlMs(config.name, config.cacheTtlMs)
     this.llm = this.initializeLLM()
   }
 
@@ -17,45 +64,251 @@ export abstract class BaseAgent {
     const useAnthropic = process.env.ANTHROPIC_API_KEY && !process.env.OPENAI_API_KEY
 
     if (useAnthropic) {
+      this.modelName = this.config.model.includes('claude')
+        ? this.config.model
+        : 'claude-3-sonnet-20240229'
       return new ChatAnthropic({
-        modelName: this.config.model.includes('claude')
-          ? this.config.model
-          : 'claude-3-sonnet-20240229',
+        modelName: this.modelName,
         temperature: this.config.temperature,
         maxTokens: this.config.maxTokens,
         anthropicApiKey: process.env.ANTHROPIC_API_KEY,
+        // Retries go through the shared rate limiter instead
+        maxRetries: 0,
       })
     }
 
+    this.modelName = this.config.model.includes('gpt')
+      ? this.config.model
+      : 'gpt-4-turbo'
     return new ChatOpenAI({
-      modelName: this.config.model.includes('gpt')
-        ? this.config.model
-        : 'gpt-4-turbo',
+      modelName: this.modelName,
       temperature: this.config.temperature,
       maxTokens: this.config.maxTokens,
       openAIApiKey: process.env.OPENAI_API_KEY,
+      maxRetries: 0,
     })
   }
 
   protected abstract getSystemPrompt(): string
 
-  protected async invoke(userPrompt: string): Promise<string> {
-    const messages = [
-      new SystemMessage(this.getSystemPrompt()),
-      new HumanMessage(userPrompt),
-    ]
+  /**
+   * Send a prompt to the provider. Identical prompts within the agent's
+   * cache TTL (see agentCacheTtlMs) are answered from the LLM response cache; pass
+   * { cache: false } to always call the provider. Responses rejected by
+   * cacheIf are returned but not cached.
+   */
+  protected async invoke(userPrompt: string, options: InvokeOptions = {}): Promise<string> {
+    const systemPrompt = this.getSystemPrompt()
+    return this.traceLLM('llm.invoke', (span) =>
+      this.cached(systemPrompt, userPrompt, options, async () => {
+        span.setAttribute('llm.cache_hit', false)
+        const response = await this.schedule(span, this.estimateTokens(systemPrompt, userPrompt), () =>
+          this.llm.invoke([
+            new SystemMessage(systemPrompt),
+            new HumanMessage(userPrompt),
+          ])
+        )
+        const content = response.content as string
+        this.recordTokens(span, tokenUsage(response), systemPrompt + userPrompt, content)
+        return content
+      })
+    )
+  }
+
+  /**
+   * Run an LLM request in a span and record its latency. The request counts
+   * as a cache hit unless the provider call sets llm.cache_hit to false.
+   */
+  private traceLLM(name: string, run: (span: Span) => Promise<string>): Promise<string> {
+    const labels = { agent: this.config.name, model: this.modelName }
+    return withSpan(
+      name,
+      async (span) => {
+        const start = performance.now()
+        try {
+          return await run(span)
+        } finally {
+          llmRequestDuration.observe(
+            { ...labels, cache: span.attributes['llm.cache_hit'] ? 'hit' : 'miss' },
+            (performance.now() - start) / 1000
+          )
+        }
+      },
+      { kind: 'client', attributes: { 'llm.agent': labels.agent, 'llm.model': labels.model, 'llm.cache_hit': true } }
+    )
+  }
+
+  // Through the shared rate limiter, recording queueing time and attempts
+  private schedule<T>(span: Span, estimatedTokens: number, call: () => Promise<T>): Promise<T> {
+    const queuedAt = performance.now()
+    let attempts = 0
+    return rateLimiter.schedule(estimatedTokens, () => {
+      if (!attempts) {
+        const waitMs = performance.now() - queuedAt
+        span.setAttribute('llm.queue_wait_ms', Math.round(waitMs))
+        llmQueueWait.observe({ agent: this.config.name }, waitMs / 1000)
+      }
+      span.setAttribute('llm.attempts', ++attempts)
+      return call()
+    })
+  }
+
+  private recordTokens(span: Span, usage: TokenUsage | null, prompt: string, completion: string): void {
+    const tokens = usage || {
+      prompt: Math.ceil(prompt.length / 4),
+      completion: Math.ceil(completion.length / 4),
+    }
+    span.setAttribute('llm.prompt_tokens', tokens.prompt)
+    span.setAttribute('llm.completion_tokens', tokens.completion)
+    span.setAttribute('llm.tokens_estimated', !usage)
+    const labels = { agent: this.config.name, model: this.modelName }
+    llmTokens.inc({ ...labels, type: 'prompt' }, tokens.prompt)
+    llmTokens.inc({ ...labels, type: 'completion' }, tokens.completion)
+  }
+
+  // What a call counts against the provider's tokens-per-minute limit:
+  // roughly four characters per prompt token, plus the completion budget
+  private estimateTokens(systemPrompt: string, userPrompt: string): number {
+    return Math.ceil((systemPrompt.length + userPrompt.length) / 4) + this.config.maxTokens
+  }
+
+  private async cached(
+    systemPrompt: string,
+    userPrompt: string,
+    options: InvokeOptions,
+    call: () => Promise<string>
+  ): Promise<string> {
+    const ttlMs = options.cache === false ? 0 : this.cacheTtlMs
+    if (ttlMs <= 0) return call()
 
-    const response = await this.llm.invoke(messages)
-    return response.content as string
+    const key = cacheKey({
+      agentName: this.config.name,
+      model: this.modelName,
+      temperature: this.config.temperature,
+      systemPrompt,
+      userPrompt,
+    })
+    return llmCache.getOrCreate(
+      key,
+      ttlMs,
+      { agentName: this.config.name, model: this.modelName },
+      call,
+      options.cacheIf
+    )
   }
 
-  protected async invokeWithJSON<T>(userPrompt: string): Promise<T> {
-    const jsonPrompt = `${userPrompt}
+  protected async invokeWithJSON<T>(userPrompt: string, options: InvokeOptions = {}): Promise<T> {
+    const response = await this.invoke(this.jsonPrompt(userPrompt), {
+      cacheIf: (value) => this.isJSON(value),
+      ...options,
+    })
+
+    return this.parseJSONTimed<T>(response)
+  }
+
+  /**
+   * Streaming variant of invokeWithJSON. Tokens are parsed as they arrive and
+   * every element of the arrays at `paths` (e.g. ['findings']) is passed to
+   * onElement as soon as it closes. The handler may return a promise (say, a
+   * database write); all of them are awaited before the parsed response is
+   * returned, and a rejected one fails the call. Cached responses are replayed
+   * through the same handler.
+   */
+  protected async invokeWithJSONStream<T>(
+    userPrompt: string,
+    paths: string[],
+    onElement: (path: string, value: unknown, index: number) => void | Promise<void>,
+    options: InvokeOptions = {}
+  ): Promise<T> {
+    const systemPrompt = this.getSystemPrompt()
+    const prompt = this.jsonPrompt(userPrompt)
+    const pending: Promise<void>[] = []
+    const failures: unknown[] = []
+    const parser = new IncrementalJSONParser(paths, (path, value, index) => {
+      pending.push(
+        Promise.resolve()
+          .then(() => onElement(path, value, index))
+          .catch((error) => {
+            failures.push(error)
+          })
+      )
+    })
+    let streamed = false
+
+    const response = await this.traceLLM('llm.stream', (span) =>
+      this.cached(systemPrompt, prompt, { cacheIf: (value) => this.isJSON(value), ...options }, async () => {
+        streamed = true
+        span.setAttribute('llm.cache_hit', false)
+        let sentAt = 0
+        // Only opening the stream is retried; a stream that fails midway fails the call
+        const stream = await this.schedule(span, this.estimateTokens(systemPrompt, prompt), () => {
+          sentAt = performance.now()
+          return this.llm.stream([
+            new SystemMessage(systemPrompt),
+            new HumanMessage(prompt),
+          ])
+        })
+        const reader = stream.getReader()
+        let usage: TokenUsage | null = null
+        let firstToken = true
+        while (true) {
+          const { done, value } = await reader.read()
+          if (done) break
+          usage = tokenUsage(value) || usage
+          if (typeof value.content === 'string' && value.content) {
+            if (firstToken) {
+              firstToken = false
+              const ttftMs = performance.now() - sentAt
+              span.setAttribute('llm.time_to_first_token_ms', Math.round(ttftMs))
+              llmTimeToFirstToken.observe({ agent: this.config.name, model: this.modelName }, ttftMs / 1000)
+            }
+            parser.write(value.content)
+          }
+        }
+        this.recordTokens(span, usage, systemPrompt + prompt, parser.text)
+        return parser.text
+      })
+    )
+
+    if (!streamed) parser.write(response)
+    await Promise.all(pending)
+    if (failures.length) throw failures[0]
+    return this.parseJSONTimed<T>(response)
+  }
+
+  // parseJSON with a span and timing, to tell slow or failing JSON
+  // extraction apart from provider latency
+  private parseJSONTimed<T>(response: string): T {
+    const span = startSpan('llm.parse_json', {
+      attributes: { 'llm.agent': this.config.name, 'llm.response_chars': response.length },
+    })
+    try {
+      return this.parseJSON<T>(response)
+    } catch (error) {
+      span.recordError(error)
+      throw error
+    } finally {
+      jsonParseDuration.observe({ agent: this.config.name }, span.end() / 1000)
+    }
+  }
+
+  private jsonPrompt(userPrompt: string): string {
+    return `${userPrompt}
 
 IMPORTANT: Respond ONLY with valid JSON. Do not include any text before or after the JSON object.`
+  }
 
-    const response = await this.invoke(jsonPrompt)
+  // Never cache a response that cannot be parsed
+  private isJSON(response: string): boolean {
+    try {
+      this.parseJSON(response)
+      return true
+    } catch {
+      return false
+    }
+  }
 
+  private parseJSON<T>(response: string): T {
     // Extract JSON from response (handle markdown code blocks)
     let jsonStr = response
     const jsonMatch = response.match(/```(?:json)?\s*([\s\S]*?)```/)
@@ -87,18 +340,27 @@ IMPORTANT: Respond ONLY with valid JSON. Do not include any text before or after
     }
   }
 
+  /**
+   * Batch this run's inserts into a single transaction; see BulkWriter.
+   */
+  protected createWriter(): BulkWriter {
+    return new BulkWriter(this.config.name)
+  }
+
   protected createResult<T>(
     success: boolean,
     data: T | undefined,
     error: string | undefined,
     startTime: number
   ): AgentResult<T> {
+    const processingTimeMs = Date.now() - startTime
+    agentDuration.observe({ agent: this.config.name, success: String(success) }, processingTimeMs / 1000)
     return {
       success,
       data,
       error,
       agentName: this.config.name,
-      processingTimeMs: Date.now() - startTime,
+      processingTimeMs,
       timestamp: new Date(),
     }
   }
@@ -0,0 +1,163 @@
+/**
+ * Bulk Writer
+ *
+ * Collects the rows an agent run produces (findings, remediation actions,
+ * document records, notifications, activity log entries) and writes them
+ * with one createMany per table plus any queued updates, all in a single
+ * transaction. A 40-finding analysis becomes one round trip instead of 40+.
+ *
+ * IDs are generated client-side when a row is queued, so callers get them
+ * back immediately without createManyAndReturn. They use the same cuid format
+ * as the schema's @default(cuid()), so ids stay uniform and roughly time-ordered
+ * alongside rows created elsewhere.
+ */
+
+import { randomInt } from 'crypto'
+import { hostname } from 'os'
+import type { Prisma } from '@prisma/client'
+import prisma from '@/lib/db'
+import { invalidateDashboard, metricDelta, metricKeys, type MetricDeltas } from '@/lib/dashboard/metrics'
+import type { AgentLogEntry, AgentName } from './types'
+
+type WithoutId<T> = Omit<T, 'id'>
+
+// cuid v1, as generated by Prisma: 'c', timestamp, per-process counter,
+// host/process fingerprint, random block, all base 36
+const CUID_BLOCK = 36 ** 4
+let cuidCounter = 0
+
+function pad(value: number, size: number): string {
+  return value.toString(36).padStart(size, '0').slice(-size)
+}
+
+const cuidFingerprint = (() => {
+  const host = hostname()
+  const hostId = host.split('').reduce((sum, char) => sum + char.charCodeAt(0), host.length + 36)
+  return pad(process.pid, 2) + pad(hostId, 2)
+})()
+
+function cuid(): string {
+  cuidCounter = (cuidCounter + 1) % CUID_BLOCK
+  return (
+    'c' +
+    Date.now().toString(36) +
+    pad(cuidCounter, 4) +
+    cuidFingerprint +
+    pad(randomInt(CUID_BLOCK), 4) +
+    pad(randomInt(CUID_BLOCK), 4)
+  )
+}
+
+export interface BulkWriteResult {
+  findings: number
+  actions: number
+  documents: number
+  notifications: number
+  activities: number
+  operations: number
+}
+
+export class BulkWriter {
+  private findings: Prisma.RiskFindingCreateManyInput[] = []
+  private actions: Prisma.RemediationActionCreateManyInput[] = []
+  private documents: Prisma.DocumentCreateManyInput[] = []
+  private notifications: Prisma.NotificationCreateManyInput[] = []
+  private activities: Prisma.AgentActivityLogCreateManyInput[] = []
+  private operations: Prisma.PrismaPromise<unknown>[] = []
+
+  constructor(private agentName: AgentName) {}
+
+  addFinding(data: WithoutId<Prisma.RiskFindingCreateManyInput>): string {
+    const id = cuid()
+    this.findings.push({ ...data, id })
+    return id
+  }
+
+  addAction(data: WithoutId<Prisma.RemediationActionCreateManyInput>): string {
+    const id = cuid()
+    this.actions.push({ ...data, id })
+    return id
+  }
+
+  addDocument(data: WithoutId<Prisma.DocumentCreateManyInput>): string {
+    const id = cuid()
+    this.documents.push({ ...data, id })
+    return id
+  }
+
+  addNotification(data: WithoutId<Prisma.NotificationCreateManyInput>): string {
+    const id = cuid()
+    this.notifications.push({ ...data, id })
+    return id
+  }
+
+  logActivity(entry: Omit<AgentLogEntry, 'agentName'>): void {
+    this.activities.push({ ...entry, agentName: this.agentName })
+  }
+
+  /**
+   * Queue an update or other single query to run in the same transaction.
+   * Prisma queries are lazy, so pass the query itself, not an awaited result,
+   * e.g. writer.add(prisma.document.update({ ... })).
+   */
+  add(operation: Prisma.PrismaPromise<unknown>): void {
+    this.operations.push(operation)
+  }
+
+  /**
+   * Write everything queued so far in one transaction and empty the queues.
+   * Rows are inserted parents first (documents, findings, actions) so foreign
+   * keys between rows of the same batch resolve.
+   *
+   * Call this once, at the end of a run, so the run's writes land together or
+   * not at all. Only runs that page through unbounded input (DORA's inventory,
+   * MARS escalations) commit per page, where each page stands on its own.
+   */
+  async commit(): Promise<BulkWriteResult> {
+    const batch = {
+      documents: this.documents,
+      findings: this.findings,
+      actions: this.actions,
+      notifications: this.notifications,
+      activities: this.activities,
+      operations: this.operations,
+    }
+    this.documents = []
+    this.findings = []
+    this.actions = []
+    this.notifications = []
+    this.activities = []
+    this.operations = []
+
+    const queries: Prisma.PrismaPromise<unknown>[] = []
+    if (batch.documents.length) queries.push(prisma.document.createMany({ data: batch.documents }))
+    if (batch.findings.length) queries.push(prisma.riskFinding.createMany({ data: batch.findings }))
+    if (batch.actions.length) queries.push(prisma.remediationAction.createMany({ data: batch.actions }))
+    if (batch.notifications.length) queries.push(prisma.notification.createMany({ data: batch.notifications }))
+    queries.push(...batch.operations)
+    if (batch.activities.length) queries.push(prisma.agentActivityLog.createMany({ data: batch.activities }))
+
+    // Dashboard counters move with the rows they count
+    const deltas: MetricDeltas = {}
+    for (const finding of batch.findings) {
+      if (finding.status === 'CLOSED') continue
+      const key = metricKeys.openFindings(finding.severity)
+      deltas[key] = (deltas[key] || 0) + 1
+    }
+    const metrics = metricDelta(deltas)
+    if (metrics) queries.push(metrics)
+
+    if (queries.length === 1) await queries[0]
+    else if (queries.length > 1) await prisma.$transaction(queries)
+    if (metrics) invalidateDashboard()
+
+    return {
+      findings: batch.findings.length,
+      actions: batch.actions.length,
+      documents: batch.documents.length,
+      notifications: batch.notifications.length,
+      activities: batch.activities.length,
+      operations: batch.operations.length,
+    }
+  }
+}
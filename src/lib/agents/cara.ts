@@ -13,6 +13,7 @@
 
 import { BaseAgent } from './base-agent'
 import prisma from '@/lib/db'
+import { metricKeys, recordMetrics } from '@/lib/dashboard/metrics'
 import type { AgentConfig, AgentResult, AssessmentInput, AssessmentOutput } from './types'
 
 const CARA_CONFIG: AgentConfig = {
@@ -137,6 +138,7 @@ Provide a detailed assessment in the following JSON format:
           recommendations: result.recommendations.join('\n\n'),
         },
       })
+      await recordMetrics({ [metricKeys.recentAssessments]: 1 })
 
       // Log activity
       await this.logActivity({
@@ -0,0 +1,136 @@
+/**
+ * Document Chunker
+ *
+ * Splits long security documents (SOC 2 reports, pen tests, questionnaires)
+ * into overlapping chunks for map-reduce analysis.
+ *
+ * Text is first cut at page breaks (form feeds, or "Page N" footer lines)
+ * and section headings, then packed into chunks of at most maxChars.
+ * Each chunk starts with the tail of the previous one so findings that
+ * straddle a boundary are seen whole at least once, and carries a label
+ * (section and page range) used as the source reference.
+ */
+
+export interface DocumentChunk {
+  index: number
+  label: string
+  content: string
+}
+
+export interface ChunkOptions {
+  maxChars?: number
+  overlapChars?: number
+}
+
+export const DEFAULT_CHUNK_CHARS = 24000
+export const DEFAULT_OVERLAP_CHARS = 1500
+
+const PAGE_LINE = /^\s*-?\s*Page\s+(\d+)(?:\s+of\s+\d+)?\s*-?\s*$/i
+const SECTION_HEADING =
+  /^(?:(?:Section|SECTION|Part|PART)\s+[\dIVX]+\b.*|[IVX]+\.\s+[A-Z].{2,80}|\d+(?:\.\d+)*\.?\s+[A-Z][^.]{2,80}|[A-Z][A-Z0-9 ,&'()/-]{4,80})$/
+
+interface Segment {
+  page: number
+  section?: string
+  text: string
+}
+
+function segments(content: string): Segment[] {
+  const result: Segment[] = []
+  let page = 1
+  let section: string | undefined
+  let lines: string[] = []
+
+  const flush = () => {
+    const text = lines.join('\n')
+    if (text.trim()) result.push({ page, section, text })
+    lines = []
+  }
+
+  for (const rawLine of content.split('\n')) {
+    const parts = rawLine.split('\f')
+    for (let i = 0; i < parts.length; i++) {
+      if (i > 0) {
+        flush()
+        page++
+      }
+      const line = parts[i]
+      const pageMatch = line.match(PAGE_LINE)
+      if (pageMatch) {
+        // "Page N" lines are read as footers: what follows is page N + 1
+        flush()
+        page = Number(pageMatch[1]) + 1
+        continue
+      }
+      const trimmed = line.trim()
+      if (trimmed && SECTION_HEADING.test(trimmed)) {
+        flush()
+        section = trimmed.slice(0, 80)
+      }
+      lines.push(line)
+    }
+  }
+  flush()
+  return result
+}
+
+function hardSplit(segment: Segment, maxChars: number): Segment[] {
+  if (segment.text.length <= maxChars) return [segment]
+  const pieces: Segment[] = []
+  let rest = segment.text
+  while (rest.length > maxChars) {
+    // Prefer a paragraph, then a line, then a sentence boundary
+    let cut = rest.lastIndexOf('\n\n', maxChars)
+    if (cut < maxChars / 2) cut = rest.lastIndexOf('\n', maxChars)
+    if (cut < maxChars / 2) cut = rest.lastIndexOf('. ', maxChars) + 1
+    if (cut < maxChars / 2) cut = maxChars
+    pieces.push({ ...segment, text: rest.slice(0, cut) })
+    rest = rest.slice(cut)
+  }
+  if (rest.trim()) pieces.push({ ...segment, text: rest })
+  return pieces
+}
+
+function labelFor(parts: Segment[]): string {
+  const first = parts[0].page
+  const last = parts[parts.length - 1].page
+  const pages = first === last ? `Page ${first}` : `Pages ${first}-${last}`
+  const section = parts.find((p) => p.section)?.section
+  return section ? `${section} (${pages})` : pages
+}
+
+export function chunkDocument(content: string, options: ChunkOptions = {}): DocumentChunk[] {
+  const maxChars = options.maxChars ?? DEFAULT_CHUNK_CHARS
+  const overlapChars = Math.min(options.overlapChars ?? DEFAULT_OVERLAP_CHARS, Math.floor(maxChars / 4))
+
+  if (content.length <= maxChars) {
+    return [{ index: 0, label: 'Full document', content }]
+  }
+
+  const chunks: DocumentChunk[] = []
+  let current: Segment[] = []
+  let size = 0
+  let overlap = ''
+
+  const emit = () => {
+    if (!current.length) return
+    const body = current.map((s) => s.text).join('\n')
+    chunks.push({
+      index: chunks.length,
+      label: labelFor(current),
+      content: overlap ? `[...continued]\n${overlap}\n${body}` : body,
+    })
+    overlap = body.slice(-overlapChars)
+    current = []
+    size = 0
+  }
+
+  for (const segment of segments(content).flatMap((s) => hardSplit(s, maxChars - overlapChars))) {
+    if (size + segment.text.length > maxChars - overlapChars) emit()
+    current.push(segment)
+    size += segment.text.length + 1
+  }
+  emit()
+
+  return chunks
+}
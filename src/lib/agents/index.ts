@@ -14,12 +14,32 @@ export { mars, MARSAgent } from './mars'
 
 // Orchestrator
 export { orchestrator, AgentOrchestrator } from './orchestrator'
+export type { WorkflowResult } from './orchestrator'
+export { runWorkflow } from './workflow'
+export type { Stage, StageCheckpoint, StageOutcome, StageRecord, WorkflowOptions, WorkflowRun } from './workflow'
 
 // Types
 export * from './types'
 
 // Base Agent (for extension)
 export { BaseAgent } from './base-agent'
+export type { InvokeOptions } from './base-agent'
+
+// Bulk persistence for agent runs
+export { BulkWriter } from './bulk-writer'
+export type { BulkWriteResult } from './bulk-writer'
+
+// Document chunking (SARA map-reduce analysis)
+export { chunkDocument } from './document-chunker'
+export type { DocumentChunk, ChunkOptions } from './document-chunker'
+
+// Shared provider rate limiter
+export { rateLimiter, RateLimiter, TokenBucket } from './rate-limiter'
+export type { RateLimits, RateLimiterStats } from './rate-limiter'
+
+// LLM response cache
+export { llmCache, LLMCache, FileCacheStore, PrismaCacheStore } from './llm-cache'
+export type { CacheStats, CacheStore } from './llm-cache'
 
 /**
  * Agent Summary:
@@ -0,0 +1,136 @@
+/**
+ * Incremental JSON Parser
+ *
+ * Scans LLM output as it streams and reports each element of the watched
+ * arrays as soon as it closes, e.g. one finding of
+ * {"findings": [{...}, {...}]} at a time, long before the full document has
+ * arrived. Paths are object keys joined with '.', and '[]' for an array
+ * element: 'findings', 'actions', 'sections[].items'. The empty path '' is a
+ * top-level array.
+ *
+ * Any text before the first '{' or '[' (such as a ```json fence) is skipped.
+ * The complete text is still parsed with JSON.parse at the end, so a response
+ * that turns out to be invalid fails exactly as before.
+ */
+
+export type JSONElementHandler = (path: string, value: unknown, index: number) => void
+
+interface Frame {
+  type: 'object' | 'array'
+  path: string
+  key: string | null
+  expectKey: boolean
+  elementStart: number | null
+  elementCount: number
+}
+
+export class IncrementalJSONParser {
+  private buffer = ''
+  private pos = 0
+  private started = false
+  private inString = false
+  private escaped = false
+  private stringStart = 0
+  private stack: Frame[] = []
+  private watched: Set<string>
+
+  constructor(paths: string[], private onElement: JSONElementHandler) {
+    this.watched = new Set(paths)
+  }
+
+  /** Full text received so far */
+  get text(): string {
+    return this.buffer
+  }
+
+  write(chunk: string): void {
+    this.buffer += chunk
+    const text = this.buffer
+
+    for (; this.pos < text.length; this.pos++) {
+      const ch = text[this.pos]
+
+      if (!this.started) {
+        if (ch !== '{' && ch !== '[') continue
+        this.started = true
+      }
+
+      if (this.inString) {
+        if (this.escaped) {
+          this.escaped = false
+        } else if (ch === '\\') {
+          this.escaped = true
+        } else if (ch === '"') {
+          this.inString = false
+          const frame = this.top()
+          if (frame && frame.type === 'object' && frame.expectKey) {
+            frame.key = JSON.parse(text.slice(this.stringStart, this.pos + 1))
+          }
+        }
+        continue
+      }
+
+      if (ch === ' ' || ch === '\n' || ch === '\r' || ch === '\t') continue
+
+      const frame = this.top()
+      if (frame && frame.type === 'array' && frame.elementStart === null && ch !== ']' && ch !== ',') {
+        frame.elementStart = this.pos
+      }
+
+      switch (ch) {
+        case '"':
+          this.inString = true
+          this.stringStart = this.pos
+          break
+        case '{':
+        case '[':
+          this.stack.push({
+            type: ch === '{' ? 'object' : 'array',
+            path: this.childPath(frame),
+            key: null,
+            expectKey: ch === '{',
+            elementStart: null,
+            elementCount: 0,
+          })
+          break
+        case ':':
+          if (frame && frame.type === 'object') frame.expectKey = false
+          break
+        case ',':
+          if (frame && frame.type === 'object') frame.expectKey = true
+          else if (frame) this.closeElement(frame)
+          break
+        case '}':
+        case ']':
+          if (frame && frame.type === 'array') this.closeElement(frame)
+          this.stack.pop()
+          break
+      }
+    }
+  }
+
+  private top(): Frame | undefined {
+    return this.stack[this.stack.length - 1]
+  }
+
+  private childPath(parent: Frame | undefined): string {
+    if (!parent) return ''
+    if (parent.type === 'array') return `${parent.path}[]`
+    return parent.path ? `${parent.path}.${parent.key}` : parent.key || ''
+  }
+
+  private closeElement(frame: Frame): void {
+    if (frame.elementStart === null) return
+    const raw = this.buffer.slice(frame.elementStart, this.pos).trim()
+    frame.elementStart = null
+    if (!this.watched.has(frame.path)) return
+    // A malformed element is left for the final parse to report
+    let value: unknown
+    try {
+      value = JSON.parse(raw)
+    } catch {
+      return
+    }
+    this.onElement(frame.path, value, frame.elementCount++)
+  }
+}
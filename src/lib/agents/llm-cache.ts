@@ -0,0 +1,293 @@
+/**
+ * LLM Response Cache
+ *
+ * Caches provider completions for BaseAgent.invoke, keyed on agent name,
+ * model, temperature and a hash of the system and user prompts.
+ *
+ * Tiers:
+ * - Memory: LRU with per-entry expiry, always on unless LLM_CACHE=off
+ * - Persistent (optional): LLM_CACHE=file (LLM_CACHE_DIR) or LLM_CACHE=postgres
+ *   (llm_response_cache table); hits are promoted into memory
+ *
+ * TTL is per agent: LLM_CACHE_TTL_MS_<AGENT> (e.g. LLM_CACHE_TTL_MS_SARA), else
+ * AgentConfig.cacheTtlMs. On by default for the low-temperature calls that are
+ * repeated on identical inputs: VERA profiling and DORA document requests
+ * (1 h), RITA reports (15 min). SARA, CARA and MARS default to off; their
+ * prompts rarely repeat (new document content, fresh assessments, one prompt
+ * per finding id).
+ * Concurrent identical requests share one provider call.
+ */
+
+import { createHash } from 'crypto'
+import { promises as fs } from 'fs'
+import path from 'path'
+import prisma from '@/lib/db'
+import { registry } from '@/lib/telemetry/metrics'
+import type { AgentName } from './types'
+
+const DEFAULT_MAX_ENTRIES = 500
+const DEFAULT_CACHE_DIR = './.cache/llm'
+
+export interface CacheEntry {
+  value: string
+  expiresAt: number
+}
+
+export interface CacheStore {
+  get(key: string): Promise<CacheEntry | null>
+  set(key: string, entry: CacheEntry, meta: { agentName: AgentName; model: string }): Promise<void>
+}
+
+export interface CacheStats {
+  hits: number
+  memoryHits: number
+  persistentHits: number
+  misses: number
+  sharedInFlight: number
+  evictions: number
+  size: number
+  hitRate: number
+  byAgent: Record<string, { hits: number; misses: number }>
+}
+
+export interface CacheKeyParts {
+  agentName: AgentName
+  model: string
+  temperature: number
+  systemPrompt: string
+  userPrompt: string
+}
+
+export function cacheKey(parts: CacheKeyParts): string {
+  const prompts = createHash('sha256')
+    .update(parts.systemPrompt)
+    .update('\0')
+    .update(parts.userPrompt)
+    .digest('hex')
+  return createHash('sha256')
+    .update(`${parts.agentName}\0${parts.model}\0${parts.temperature}\0${prompts}`)
+    .digest('hex')
+}
+
+/**
+ * One JSON file per entry; expired files are removed when read.
+ */
+export class FileCacheStore implements CacheStore {
+  constructor(private dir: string) {}
+
+  private file(key: string): string {
+    return path.join(this.dir, key.slice(0, 2), `${key}.json`)
+  }
+
+  async get(key: string): Promise<CacheEntry | null> {
+    try {
+      const entry = JSON.parse(await fs.readFile(this.file(key), 'utf8')) as CacheEntry
+      if (entry.expiresAt > Date.now()) return entry
+      await fs.rm(this.file(key), { force: true })
+    } catch {
+      // Missing or unreadable entries are misses
+    }
+    return null
+  }
+
+  async set(key: string, entry: CacheEntry): Promise<void> {
+    const file = this.file(key)
+    const tmp = `${file}.${process.pid}.tmp`
+    await fs.mkdir(path.dirname(file), { recursive: true })
+    await fs.writeFile(tmp, JSON.stringify(entry))
+    await fs.rename(tmp, file)
+  }
+}
+
+/**
+ * Entries in the llm_response_cache table, shared by every app instance.
+ */
+export class PrismaCacheStore implements CacheStore {
+  async get(key: string): Promise<CacheEntry | null> {
+    const row = await prisma.llmResponseCache.findUnique({ where: { key } })
+    if (!row) return null
+    if (row.expiresAt.getTime() <= Date.now()) {
+      await prisma.llmResponseCache.deleteMany({ where: { key, expiresAt: { lte: new Date() } } })
+      return null
+    }
+    return { value: row.response, expiresAt: row.expiresAt.getTime() }
+  }
+
+  async set(key: string, entry: CacheEntry, meta: { agentName: AgentName; model: string }): Promise<void> {
+    const expiresAt = new Date(entry.expiresAt)
+    await prisma.llmResponseCache.upsert({
+      where: { key },
+      create: { key, agentName: meta.agentName, model: meta.model, response: entry.value, expiresAt },
+      update: { response: entry.value, expiresAt },
+    })
+  }
+}
+
+export class LLMCache {
+  private entries = new Map<string, CacheEntry>()
+  private inFlight = new Map<string, Promise<string>>()
+  private counters = { memoryHits: 0, persistentHits: 0, misses: 0, sharedInFlight: 0, evictions: 0 }
+  private byAgent: Record<string, { hits: number; misses: number }> = {}
+
+  constructor(
+    private maxEntries: number = DEFAULT_MAX_ENTRIES,
+    private store: CacheStore | null = null,
+    private enabled: boolean = true
+  ) {}
+
+  /**
+   * Return the cached completion for key, or call produce and cache its result
+   * for ttlMs. Failures, and results rejected by cacheIf, are never cached.
+   */
+  async getOrCreate(
+    key: string,
+    ttlMs: number,
+    meta: { agentName: AgentName; model: string },
+    produce: () => Promise<string>,
+    cacheIf: (value: string) => boolean = () => true
+  ): Promise<string> {
+    if (!this.enabled || ttlMs <= 0) return produce()
+
+    const cached = this.getMemory(key)
+    if (cached !== undefined) {
+      this.counters.memoryHits++
+      this.record(meta.agentName, true)
+      return cached
+    }
+
+    const pending = this.inFlight.get(key)
+    if (pending) {
+      this.counters.sharedInFlight++
+      this.record(meta.agentName, true)
+      return pending
+    }
+
+    const request = this.load(key, ttlMs, meta, produce, cacheIf)
+    this.inFlight.set(key, request)
+    try {
+      return await request
+    } finally {
+      this.inFlight.delete(key)
+    }
+  }
+
+  private async load(
+    key: string,
+    ttlMs: number,
+    meta: { agentName: AgentName; model: string },
+    produce: () => Promise<string>,
+    cacheIf: (value: string) => boolean
+  ): Promise<string> {
+    if (this.store) {
+      const stored = await this.store.get(key).catch((error) => {
+        console.error('LLM cache read failed:', error)
+        return null
+      })
+      if (stored) {
+        this.counters.persistentHits++
+        this.record(meta.agentName, true)
+        this.setMemory(key, stored)
+        return stored.value
+      }
+    }
+
+    this.counters.misses++
+    this.record(meta.agentName, false)
+    const value = await produce()
+    if (!cacheIf(value)) return value
+    const entry = { value, expiresAt: Date.now() + ttlMs }
+    this.setMemory(key, entry)
+    if (this.store) {
+      await this.store.set(key, entry, meta).catch((error) => {
+        console.error('LLM cache write failed:', error)
+      })
+    }
+    return value
+  }
+
+  private getMemory(key: string): string | undefined {
+    const entry = this.entries.get(key)
+    if (!entry) return undefined
+    if (entry.expiresAt <= Date.now()) {
+      this.entries.delete(key)
+      return undefined
+    }
+    // Re-insert so Map order tracks recency
+    this.entries.delete(key)
+    this.entries.set(key, entry)
+    return entry.value
+  }
+
+  private setMemory(key: string, entry: CacheEntry): void {
+    this.entries.delete(key)
+    this.entries.set(key, entry)
+    while (this.entries.size > this.maxEntries) {
+      const oldest = this.entries.keys().next().value as string
+      this.entries.delete(oldest)
+      this.counters.evictions++
+    }
+  }
+
+  private record(agentName: AgentName, hit: boolean): void {
+    const agent = (this.byAgent[agentName] ??= { hits: 0, misses: 0 })
+    if (hit) agent.hits++
+    else agent.misses++
+  }
+
+  stats(): CacheStats {
+    const hits = this.counters.memoryHits + this.counters.persistentHits + this.counters.sharedInFlight
+    const total = hits + this.counters.misses
+    return {
+      ...this.counters,
+      hits,
+      size: this.entries.size,
+      hitRate: total ? hits / total : 0,
+      byAgent: { ...this.byAgent },
+    }
+  }
+
+  clear(): void {
+    this.entries.clear()
+  }
+}
+
+/**
+ * Cache lifetime for an agent: LLM_CACHE_TTL_MS_<AGENT> when set (0 turns it
+ * off), otherwise the agent's configured default.
+ */
+export function agentCacheTtlMs(agentName: AgentName, configured = 0): number {
+  const value = process.env[`LLM_CACHE_TTL_MS_${agentName}`]
+  return value ? Math.max(Number(value) || 0, 0) : configured
+}
+
+function createStore(): CacheStore | null {
+  switch (process.env.LLM_CACHE) {
+    case 'file':
+      return new FileCacheStore(process.env.LLM_CACHE_DIR || DEFAULT_CACHE_DIR)
+    case 'postgres':
+      return new PrismaCacheStore()
+    default:
+      return null
+  }
+}
+
+const globalForCache = globalThis as unknown as {
+  llmCache: LLMCache | undefined
+}
+
+export const llmCache =
+  globalForCache.llmCache ??
+  new LLMCache(
+    Number(process.env.LLM_CACHE_MAX_ENTRIES) || DEFAULT_MAX_ENTRIES,
+    createStore(),
+    process.env.LLM_CACHE !== 'off'
+  )
+
+if (process.env.NODE_ENV !== 'production') globalForCache.llmCache = llmCache
+
+registry.gauge('tprm_llm_cache_entries', 'Entries in the in-memory LLM response cache', () => [
+  { labels: {}, value: llmCache.stats().size },
+])
+registry.gauge('tprm_llm_cache_hit_ratio', 'LLM response cache hit rate since process start', () => [
+  { labels: {}, value: llmCache.stats().hitRate },
+])
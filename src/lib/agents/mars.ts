@@ -13,6 +13,7 @@
  */
 
 import { BaseAgent } from './base-agent'
+import type { Prisma } from '@prisma/client'
 import prisma from '@/lib/db'
 import type { AgentConfig, AgentResult, RemediationInput, RemediationPlan } from './types'
 
@@ -24,7 +25,10 @@ const MARS_CONFIG: AgentConfig = {
   maxTokens: 3000,
 }
 
-interface EscalationResult {
+// Overdue actions escalated per transaction in checkOverdueActions
+const ESCALATION_BATCH_SIZE = 500
+
+export interface EscalationResult {
   findingId: string
   escalated: boolean
   escalationLevel: number
@@ -32,6 +36,12 @@ interface EscalationResult {
   nextAction: string
 }
 
+interface EscalationSummary {
+  escalated: number
+  byLevel: Record<number, number>
+  batches: number
+}
+
 interface RemediationStatus {
   vendorId: string
   totalActions: number
@@ -117,47 +127,44 @@ Create a remediation plan in the following JSON format:
       const result = await this.invokeWithJSON<RemediationPlan>(prompt)
       result.findingId = input.findingId
 
-      // Save remediation actions to database
+      // Save actions, finding status, notification and log in one transaction
+      const writer = this.createWriter()
       for (const action of result.actions) {
-        await prisma.remediationAction.create({
-          data: {
-            findingId: input.findingId,
-            vendorId: input.vendorId,
-            actionType: action.actionType as any,
-            title: action.title,
-            description: action.description,
-            assignedTo: action.assignedTo,
-            ownerType: action.ownerType as any,
-            priority: action.priority as any,
-            status: 'OPEN',
-            dueDate: new Date(action.dueDate),
-            managedBy: 'MARS',
-          },
+        action.id = writer.addAction({
+          findingId: input.findingId,
+          vendorId: input.vendorId,
+          actionType: action.actionType as any,
+          title: action.title,
+          description: action.description,
+          assignedTo: action.assignedTo,
+          ownerType: action.ownerType as any,
+          priority: action.priority as any,
+          status: 'OPEN',
+          dueDate: new Date(action.dueDate),
+          managedBy: 'MARS',
         })
       }
 
       // Update finding status
-      await prisma.riskFinding.update({
+      writer.add(prisma.riskFinding.update({
         where: { id: input.findingId },
         data: { status: 'IN_REMEDIATION' },
-      })
+      }))
 
       // Create notification for vendor
-      await prisma.notification.create({
-        data: {
-          recipientType: 'VENDOR',
-          recipientId: input.vendorId,
-          notificationType: 'REMEDIATION_REQUIRED',
-          title: `Remediation Required: ${input.finding.title}`,
-          message: `A ${input.finding.severity} severity finding requires your attention. Please review and address within the specified timeline.`,
-          relatedEntityType: 'RiskFinding',
-          relatedEntityId: input.findingId,
-          sentBy: 'MARS',
-          status: 'PENDING',
-        },
+      writer.addNotification({
+        recipientType: 'VENDOR',
+        recipientId: input.vendorId,
+        notificationType: 'REMEDIATION_REQUIRED',
+        title: `Remediation Required: ${input.finding.title}`,
+        message: `A ${input.finding.severity} severity finding requires your attention. Please review and address within the specified timeline.`,
+        relatedEntityType: 'RiskFinding',
+        relatedEntityId: input.findingId,
+        sentBy: 'MARS',
+        status: 'PENDING',
       })
 
-      await this.logActivity({
+      writer.logActivity({
         activityType: 'REMEDIATION_PLAN',
         entityType: 'RiskFinding',
         entityId: input.findingId,
@@ -167,6 +174,7 @@ Create a remediation plan in the following JSON format:
         status: 'SUCCESS',
         processingTimeMs: Date.now() - startTime,
       })
+      await writer.commit()
 
       return this.createResult(true, result, undefined, startTime)
     } catch (error) {
@@ -185,78 +193,122 @@ Create a remediation plan in the following JSON format:
     }
   }
 
-  async checkOverdueActions(): Promise<AgentResult<EscalationResult[]>> {
+  /**
+   * Escalate overdue open actions in keyset-paginated batches of
+   * ESCALATION_BATCH_SIZE. Each batch selects only the columns it needs and
+   * is written in one transaction: a single status update, then a multi-row
+   * notification insert for the actions that update actually changed.
+   * Escalations are passed to onBatch as they are made rather than collected,
+   * so memory stays flat however large the backlog.
+   */
+  async checkOverdueActions(
+    onBatch?: (escalations: EscalationResult[]) => void | Promise<void>
+  ): Promise<AgentResult<EscalationSummary>> {
     const startTime = Date.now()
 
     try {
-      const overdueActions = await prisma.remediationAction.findMany({
-        where: {
-          status: { in: ['OPEN', 'IN_PROGRESS'] },
-          dueDate: { lt: new Date() },
-        },
-        include: {
-          finding: true,
-          vendor: true,
-        },
-      })
-
-      const escalationResults: EscalationResult[] = []
-
-      for (const action of overdueActions) {
-        const daysOverdue = Math.floor(
-          (Date.now() - action.dueDate!.getTime()) / (24 * 60 * 60 * 1000)
-        )
-
-        let escalationLevel = 1
-        if (action.priority === 'CRITICAL' || daysOverdue > 30) {
-          escalationLevel = 4
-        } else if (action.priority === 'HIGH' || daysOverdue > 14) {
-          escalationLevel = 3
-        } else if (daysOverdue > 7) {
-          escalationLevel = 2
-        }
-
-        // Update action status
-        await prisma.remediationAction.update({
-          where: { id: action.id },
-          data: { status: 'OVERDUE' },
+      const now = new Date()
+      const summary: EscalationSummary = { escalated: 0, byLevel: { 1: 0, 2: 0, 3: 0, 4: 0 }, batches: 0 }
+      let cursor = ''
+
+      while (true) {
+        // Escalated actions become OVERDUE and drop out of this filter; the
+        // id cursor keeps the scan moving past any that could not be updated
+        const overdueActions = await prisma.remediationAction.findMany({
+          where: {
+            status: { in: ['OPEN', 'IN_PROGRESS'] },
+            dueDate: { lt: now },
+            id: { gt: cursor },
+          },
+          select: {
+            id: true,
+            findingId: true,
+            title: true,
+            priority: true,
+            dueDate: true,
+            vendor: { select: { name: true } },
+          },
+          orderBy: { id: 'asc' },
+          take: ESCALATION_BATCH_SIZE,
         })
+        if (!overdueActions.length) break
 
-        // Create escalation notification
-        await prisma.notification.create({
-          data: {
-            recipientType: 'INTERNAL',
-            notificationType: 'ESCALATION',
-            title: `[ESCALATION L${escalationLevel}] Overdue Action: ${action.title}`,
-            message: `Remediation action for ${action.vendor.name} is ${daysOverdue} days overdue. Priority: ${action.priority}`,
-            relatedEntityType: 'RemediationAction',
-            relatedEntityId: action.id,
-            sentBy: 'MARS',
-            status: 'PENDING',
-          },
+        const candidates = overdueActions.map((action) => {
+          const daysOverdue = Math.floor(
+            (now.getTime() - action.dueDate!.getTime()) / (24 * 60 * 60 * 1000)
+          )
+
+          let escalationLevel = 1
+          if (action.priority === 'CRITICAL' || daysOverdue > 30) {
+            escalationLevel = 4
+          } else if (action.priority === 'HIGH' || daysOverdue > 14) {
+            escalationLevel = 3
+          } else if (daysOverdue > 7) {
+            escalationLevel = 2
+          }
+
+          return {
+            id: action.id,
+            escalationLevel,
+            notification: {
+              recipientType: 'INTERNAL',
+              notificationType: 'ESCALATION',
+              title: `[ESCALATION L${escalationLevel}] Overdue Action: ${action.title}`,
+              message: `Remediation action for ${action.vendor.name} is ${daysOverdue} days overdue. Priority: ${action.priority}`,
+              relatedEntityType: 'RemediationAction',
+              relatedEntityId: action.id,
+              sentBy: 'MARS',
+              status: 'PENDING',
+            } satisfies Prisma.NotificationCreateManyInput,
+            escalation: {
+              findingId: action.findingId,
+              escalated: true,
+              escalationLevel,
+              notificationsSent: [`Level ${escalationLevel} escalation`],
+              nextAction: `Review and follow up within ${24 / escalationLevel} hours`,
+            } satisfies EscalationResult,
+          }
         })
 
-        escalationResults.push({
-          findingId: action.findingId,
-          escalated: true,
-          escalationLevel,
-          notificationsSent: [`Level ${escalationLevel} escalation`],
-          nextAction: `Review and follow up within ${24 / escalationLevel} hours`,
+        // The status guard skips actions closed since the select; only the
+        // rows the update returns are notified
+        const escalated = await prisma.$transaction(async (tx) => {
+          const updated = await tx.$queryRaw<{ id: string }[]>`
+            UPDATE remediation_actions
+            SET status = 'OVERDUE', "updatedAt" = now()
+            WHERE id = ANY(${candidates.map((c) => c.id)})
+              AND status IN ('OPEN', 'IN_PROGRESS')
+            RETURNING id`
+          const updatedIds = new Set(updated.map((row) => row.id))
+          const batch = candidates.filter((c) => updatedIds.has(c.id))
+          if (batch.length) {
+            await tx.notification.createMany({ data: batch.map((c) => c.notification) })
+          }
+          return batch
         })
+
+        const escalations = escalated.map((c) => c.escalation)
+        for (const { escalationLevel } of escalated) summary.byLevel[escalationLevel]++
+        summary.escalated += escalations.length
+        summary.batches++
+        if (onBatch) await onBatch(escalations)
+
+        cursor = overdueActions[overdueActions.length - 1].id
+        if (overdueActions.length < ESCALATION_BATCH_SIZE) break
       }
 
       await this.logActivity({
         activityType: 'OVERDUE_CHECK',
-        actionTaken: `Checked overdue actions, escalated ${escalationResults.length}`,
-        outputSummary: `Found ${overdueActions.length} overdue actions`,
+        actionTaken: `Checked overdue actions, escalated ${summary.escalated}`,
+        outputSummary: `Found ${summary.escalated} overdue actions in ${summary.batches} batches`,
         status: 'SUCCESS',
         processingTimeMs: Date.now() - startTime,
       })
 
-      return this.createResult(true, escalationResults, undefined, startTime)
+      return this.createResult(true, summary, undefined, startTime)
     } catch (error) {
       const errorMessage = error instanceof Error ? error.message : 'Unknown error'
-      return this.createResult<EscalationResult[]>(false, undefined, errorMessage, startTime)
+      return this.createResult<EscalationSummary>(false, undefined, errorMessage, startTime)
     }
   }
 
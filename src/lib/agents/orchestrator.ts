@@ -4,7 +4,10 @@
  * Coordinates the workflow between all TPRM agents:
  * VERA -> CARA -> DORA -> SARA -> RITA -> MARS
  *
- * Handles the end-to-end vendor risk management lifecycle
+ * Handles the end-to-end vendor risk management lifecycle. Workflows are
+ * dependency graphs of stages (see workflow.ts): independent stages run
+ * concurrently, per-item fan-out is bounded by WORKFLOW_CONCURRENCY, and each
+ * stage reports its start time and duration.
  */
 
 import { vera, VERAAgent } from './vera'
@@ -13,8 +16,17 @@ import { dora, DORAAgent } from './dora'
 import { sara, SARAAgent } from './sara'
 import { rita, RITAAgent } from './rita'
 import { mars, MARSAgent } from './mars'
+import {
+  runWorkflow,
+  type Stage,
+  type StageOutcome,
+  type WorkflowOptions,
+  type WorkflowRun,
+} from './workflow'
 import prisma from '@/lib/db'
-import type { AgentResult, VendorProfileInput, VendorProfileOutput } from './types'
+import { reconcileMetrics } from '@/lib/dashboard/metrics'
+import { mapWithConcurrency } from '@/lib/utils'
+import type { SecurityAnalysisOutput, VendorProfileInput, VendorProfileOutput } from './types'
 
 export interface WorkflowResult {
   vendorId: string
@@ -24,11 +36,17 @@ export interface WorkflowResult {
     success: boolean
     summary: string
     timestamp: Date
+    startedAt?: Date
+    durationMs?: number
   }[]
   overallSuccess: boolean
   nextActions: string[]
+  totalMs?: number
 }
 
+// Upper bound on concurrent agent calls when a stage fans out (e.g. MARS per finding)
+const WORKFLOW_CONCURRENCY = Number(process.env.WORKFLOW_CONCURRENCY) || 4
+
 export class AgentOrchestrator {
   private vera: VERAAgent
   private cara: CARAAgent
@@ -48,151 +66,159 @@ export class AgentOrchestrator {
 
   /**
    * Execute full onboarding workflow for a new vendor
+   *
+   *   VERA -+-> CARA (Critical/High only) -+-> RITA
+   *         +-> DORA (has contact email) --+
+   *
+   * CARA and DORA depend only on VERA's tier and run concurrently.
    */
-  async onboardVendor(input: VendorProfileInput): Promise<WorkflowResult> {
-    const stages: WorkflowResult['stages'] = []
+  async onboardVendor(input: VendorProfileInput, options: WorkflowOptions = {}): Promise<WorkflowResult> {
     const nextActions: string[] = []
 
-    // Stage 1: VERA - Risk Profiling
-    const veraResult = await this.vera.execute(input)
-    stages.push({
-      stage: 'Risk Profiling',
-      agent: 'VERA',
-      success: veraResult.success,
-      summary: veraResult.success
-        ? `Risk Tier: ${veraResult.data?.riskTier}, Score: ${veraResult.data?.overallRiskScore}`
-        : veraResult.error || 'Failed',
-      timestamp: new Date(),
-    })
-
-    if (!veraResult.success || !veraResult.data) {
-      return {
-        vendorId: input.vendorId,
-        stages,
-        overallSuccess: false,
-        nextActions: ['Review and retry vendor profiling'],
-      }
-    }
-
-    // Stage 2: CARA - Assessment (for Critical/High risk)
-    if (['CRITICAL', 'HIGH'].includes(veraResult.data.riskTier)) {
-      const vendor = await prisma.vendor.findUnique({
-        where: { id: input.vendorId },
-      })
-
-      if (vendor) {
-        const riskProfile = await prisma.riskProfile.findFirst({
-          where: { vendorId: input.vendorId },
-          orderBy: { createdAt: 'desc' },
-        })
-
-        const caraResult = await this.cara.execute({
-          vendorId: input.vendorId,
-          riskProfileId: riskProfile?.id || '',
-          assessmentType: 'INITIAL',
-          vendorInfo: {
-            name: vendor.name,
-            industry: vendor.industry || 'Unknown',
-            country: vendor.country || 'Unknown',
-            annualSpend: Number(vendor.annualSpend) || 0,
-          },
-        })
-
-        stages.push({
-          stage: 'Detailed Assessment',
-          agent: 'CARA',
-          success: caraResult.success,
-          summary: caraResult.success
-            ? `Overall Score: ${caraResult.data?.overallScore}/5, Rating: ${caraResult.data?.riskRating}`
-            : caraResult.error || 'Failed',
-          timestamp: new Date(),
-        })
-
-        if (caraResult.success && caraResult.data) {
-          nextActions.push(...(caraResult.data.requiredDocuments.map(
-            (doc) => `Collect document: ${doc}`
-          )))
-        }
-      }
-    }
-
-    // Stage 3: DORA - Document Request
+    // Shared context, loaded once
     const vendor = await prisma.vendor.findUnique({
       where: { id: input.vendorId },
     })
-
-    if (vendor?.primaryContactEmail) {
-      const requiredDocs = this.getRequiredDocuments(veraResult.data.riskTier)
-      const dueDate = new Date()
-      dueDate.setDate(dueDate.getDate() + 14)
-
-      const doraResult = await this.dora.createDocumentRequest({
-        vendorId: input.vendorId,
-        vendorName: vendor.name,
-        vendorEmail: vendor.primaryContactEmail,
-        requiredDocuments: requiredDocs,
-        dueDate,
-      })
-
-      stages.push({
-        stage: 'Document Request',
+    const profileOf = (outcomes: Record<string, StageOutcome>) =>
+      outcomes.vera.data as VendorProfileOutput
+
+    const stages: Stage<null>[] = [
+      {
+        // Stage 1: VERA - Risk Profiling
+        id: 'vera',
+        name: 'Risk Profiling',
+        agent: 'VERA',
+        run: async () => {
+          const veraResult = await this.vera.execute(input)
+          return {
+            success: veraResult.success && !!veraResult.data,
+            summary: veraResult.success
+              ? `Risk Tier: ${veraResult.data?.riskTier}, Score: ${veraResult.data?.overallRiskScore}`
+              : veraResult.error || 'Failed',
+            data: veraResult.data,
+          }
+        },
+      },
+      {
+        // Stage 2: CARA - Assessment (for Critical/High risk)
+        id: 'cara',
+        name: 'Detailed Assessment',
+        agent: 'CARA',
+        dependsOn: ['vera'],
+        when: (_, outcomes) => !!vendor && ['CRITICAL', 'HIGH'].includes(profileOf(outcomes).riskTier),
+        run: async (_, outcomes) => {
+          const caraResult = await this.cara.execute({
+            vendorId: input.vendorId,
+            riskProfileId: profileOf(outcomes).riskProfileId || '',
+            assessmentType: 'INITIAL',
+            vendorInfo: {
+              name: vendor!.name,
+              industry: vendor!.industry || 'Unknown',
+              country: vendor!.country || 'Unknown',
+              annualSpend: Number(vendor!.annualSpend) || 0,
+            },
+          })
+
+          return {
+            success: caraResult.success,
+            summary: caraResult.success
+              ? `Overall Score: ${caraResult.data?.overallScore}/5, Rating: ${caraResult.data?.riskRating}`
+              : caraResult.error || 'Failed',
+            data: caraResult.data,
+          }
+        },
+      },
+      {
+        // Stage 3: DORA - Document Request
+        id: 'dora',
+        name: 'Document Request',
         agent: 'DORA',
-        success: doraResult.success,
-        summary: doraResult.success
-          ? `Requested ${requiredDocs.length} documents`
-          : doraResult.error || 'Failed',
-        timestamp: new Date(),
-      })
-
-      if (doraResult.success) {
-        nextActions.push('Monitor document collection status')
-        nextActions.push('Follow up with vendor if documents not received')
-      }
-    }
+        dependsOn: ['vera'],
+        when: () => !!vendor?.primaryContactEmail,
+        run: async (_, outcomes) => {
+          const requiredDocs = this.getRequiredDocuments(profileOf(outcomes).riskTier)
+          const dueDate = new Date()
+          dueDate.setDate(dueDate.getDate() + 14)
+
+          const doraResult = await this.dora.createDocumentRequest({
+            vendorId: input.vendorId,
+            vendorName: vendor!.name,
+            vendorEmail: vendor!.primaryContactEmail!,
+            requiredDocuments: requiredDocs,
+            dueDate,
+          })
+
+          return {
+            success: doraResult.success,
+            summary: doraResult.success
+              ? `Requested ${requiredDocs.length} documents`
+              : doraResult.error || 'Failed',
+          }
+        },
+      },
+      {
+        // Generate initial report once the assessment and requests are recorded
+        id: 'rita',
+        name: 'Initial Report',
+        agent: 'RITA',
+        dependsOn: ['vera'],
+        after: ['cara', 'dora'],
+        run: async () => {
+          const ritaResult = await this.rita.execute({
+            vendorId: input.vendorId,
+            reportType: 'DETAILED_ASSESSMENT',
+            includeFindings: true,
+            includeTrends: false,
+          })
+          return {
+            success: ritaResult.success,
+            summary: ritaResult.success
+              ? `Generated ${ritaResult.data?.reportType} report`
+              : ritaResult.error || 'Failed',
+          }
+        },
+      },
+    ]
 
-    // Generate initial report
-    const ritaResult = await this.rita.execute({
-      vendorId: input.vendorId,
-      reportType: 'DETAILED_ASSESSMENT',
-      includeFindings: true,
-      includeTrends: false,
-    })
+    const run = await runWorkflow(stages, null, { name: 'onboard_vendor', ...options })
+    const { outcomes } = run
 
-    stages.push({
-      stage: 'Initial Report',
-      agent: 'RITA',
-      success: ritaResult.success,
-      summary: ritaResult.success
-        ? `Generated ${ritaResult.data?.reportType} report`
-        : ritaResult.error || 'Failed',
-      timestamp: new Date(),
-    })
+    if (!outcomes.vera.success) {
+      return this.toResult(input.vendorId, run, false, ['Review and retry vendor profiling'])
+    }
+
+    // Next actions in stage order, independent of completion order
+    const assessment = outcomes.cara?.data as { requiredDocuments: string[] } | undefined
+    if (outcomes.cara?.success && assessment) {
+      nextActions.push(...assessment.requiredDocuments.map((doc) => `Collect document: ${doc}`))
+    }
+    if (outcomes.dora?.success) {
+      nextActions.push('Monitor document collection status')
+      nextActions.push('Follow up with vendor if documents not received')
+    }
 
     // Determine overall success
-    const overallSuccess = stages.filter((s) => s.success).length >= stages.length * 0.75
+    const overallSuccess = run.records.filter((s) => s.success).length >= run.records.length * 0.75
 
     if (overallSuccess) {
-      nextActions.push(`Schedule ${veraResult.data.assessmentFrequency} review`)
+      nextActions.push(`Schedule ${profileOf(outcomes).assessmentFrequency} review`)
     }
 
-    return {
-      vendorId: input.vendorId,
-      stages,
-      overallSuccess,
-      nextActions,
-    }
+    return this.toResult(input.vendorId, run, overallSuccess, nextActions)
   }
 
   /**
    * Process uploaded document through analysis pipeline
+   *
+   *   SARA -> MARS (one plan per critical/high finding, fanned out) -> RITA
    */
   async processDocument(
     vendorId: string,
     documentId: string,
     documentType: string,
-    documentContent: string
+    documentContent: string,
+    options: WorkflowOptions = {}
   ): Promise<WorkflowResult> {
-    const stages: WorkflowResult['stages'] = []
     const nextActions: string[] = []
 
     // Get vendor context
@@ -218,111 +244,149 @@ export class AgentOrchestrator {
       }
     }
 
-    // Stage 1: SARA - Security Analysis
-    const saraResult = await this.sara.execute({
-      vendorId,
-      documentId,
-      documentType,
-      documentContent,
-      vendorContext: {
-        name: vendor.name,
-        riskTier: vendor.riskProfiles[0]?.riskTier || 'MEDIUM',
-        dataAccess: vendor.riskProfiles[0]?.dataTypesAccessed || [],
+    const analysisOf = (outcomes: Record<string, StageOutcome>) =>
+      outcomes.sara.data as SecurityAnalysisOutput
+    const criticalHighOf = (outcomes: Record<string, StageOutcome>) =>
+      analysisOf(outcomes).findings.filter(
+        (f) => f.severity === 'CRITICAL' || f.severity === 'HIGH'
+      )
+
+    const stages: Stage<null>[] = [
+      {
+        // Stage 1: SARA - Security Analysis
+        id: 'sara',
+        name: 'Security Analysis',
+        agent: 'SARA',
+        run: async () => {
+          const saraResult = await this.sara.execute({
+            vendorId,
+            documentId,
+            documentType,
+            documentContent,
+            vendorContext: {
+              name: vendor.name,
+              riskTier: vendor.riskProfiles[0]?.riskTier || 'MEDIUM',
+              dataAccess: vendor.riskProfiles[0]?.dataTypesAccessed || [],
+            },
+          })
+          return {
+            success: saraResult.success && !!saraResult.data,
+            summary: saraResult.success
+              ? `Found ${saraResult.data?.findings.length} findings`
+              : saraResult.error || 'Failed',
+            data: saraResult.data,
+          }
+        },
       },
-    })
+      {
+        // Stage 2: MARS - Create remediation for critical/high findings, concurrently.
+        // Each plan is reported as its own stage row. A plan commits its actions
+        // atomically, so findings that already have actions were planned by an
+        // earlier attempt and are not planned again when the stage is retried.
+        id: 'mars',
+        name: 'Remediation Planning',
+        agent: 'MARS',
+        dependsOn: ['sara'],
+        expand: true,
+        when: (_, outcomes) => criticalHighOf(outcomes).length > 0,
+        run: async (_, outcomes) => {
+          const findings = criticalHighOf(outcomes).filter((f) => f.id)
+          const planned = new Map(
+            (await prisma.remediationAction.groupBy({
+              by: ['findingId'],
+              where: { findingId: { in: findings.map((f) => f.id!) } },
+              _count: { _all: true },
+            })).map((row) => [row.findingId, row._count._all])
+          )
+          const results = await mapWithConcurrency(findings, WORKFLOW_CONCURRENCY, (finding) =>
+            planned.has(finding.id!) ? Promise.resolve(null) : this.mars.execute({
+              findingId: finding.id!,
+              vendorId,
+              finding: {
+                title: finding.title,
+                severity: finding.severity,
+                description: finding.description || '',
+              },
+              vendorContact: {
+                name: vendor.primaryContactName || 'Vendor Contact',
+                email: vendor.primaryContactEmail || '',
+              },
+            })
+          )
+
+          return {
+            success: results.every((r) => !r || r.success),
+            summary: `Created plans for ${results.filter((r) => !r || r.success).length} of ${results.length} findings`,
+            records: results.map((marsResult, i) => ({
+              stage: `Remediation Plan: ${findings[i].title.substring(0, 30)}...`,
+              agent: 'MARS',
+              success: !marsResult || marsResult.success,
+              summary: !marsResult
+                ? `Already planned (${planned.get(findings[i].id!)} actions)`
+                : marsResult.success
+                  ? `Created ${marsResult.data?.actions.length} actions`
+                  : marsResult.error || 'Failed',
+            })),
+          }
+        },
+      },
+      {
+        // Stage 3: RITA - Generate updated report
+        id: 'rita',
+        name: 'Report Update',
+        agent: 'RITA',
+        dependsOn: ['sara'],
+        after: ['mars'],
+        run: async () => {
+          const ritaResult = await this.rita.execute({
+            vendorId,
+            reportType: 'DETAILED_ASSESSMENT',
+            includeFindings: true,
+            includeTrends: false,
+          })
+          return {
+            success: ritaResult.success,
+            summary: ritaResult.success
+              ? 'Assessment report updated'
+              : ritaResult.error || 'Failed',
+          }
+        },
+      },
+    ]
 
-    stages.push({
-      stage: 'Security Analysis',
-      agent: 'SARA',
-      success: saraResult.success,
-      summary: saraResult.success
-        ? `Found ${saraResult.data?.findings.length} findings`
-        : saraResult.error || 'Failed',
-      timestamp: new Date(),
-    })
+    const run = await runWorkflow(stages, null, { name: 'process_document', ...options })
+    const { outcomes } = run
 
-    if (!saraResult.success || !saraResult.data) {
-      return {
-        vendorId,
-        stages,
-        overallSuccess: false,
-        nextActions: ['Review document format and retry analysis'],
-      }
+    if (!outcomes.sara.success) {
+      return this.toResult(vendorId, run, false, ['Review document format and retry analysis'])
     }
 
-    // Stage 2: MARS - Create remediation for critical/high findings
-    const criticalHighFindings = saraResult.data.findings.filter(
-      (f) => f.severity === 'CRITICAL' || f.severity === 'HIGH'
-    )
-
-    if (criticalHighFindings.length > 0) {
-      // Get the created findings from database
-      const dbFindings = await prisma.riskFinding.findMany({
-        where: {
-          vendorId,
-          documentId,
-          severity: { in: ['CRITICAL', 'HIGH'] },
-        },
-      })
-
-      for (const finding of dbFindings) {
-        const marsResult = await this.mars.execute({
-          findingId: finding.id,
-          vendorId,
-          finding: {
-            title: finding.title,
-            severity: finding.severity,
-            description: finding.description || '',
-          },
-          vendorContact: {
-            name: vendor.primaryContactName || 'Vendor Contact',
-            email: vendor.primaryContactEmail || '',
-          },
-        })
-
-        stages.push({
-          stage: `Remediation Plan: ${finding.title.substring(0, 30)}...`,
-          agent: 'MARS',
-          success: marsResult.success,
-          summary: marsResult.success
-            ? `Created ${marsResult.data?.actions.length} actions`
-            : marsResult.error || 'Failed',
-          timestamp: new Date(),
-        })
-      }
-
-      nextActions.push(`Follow up on ${criticalHighFindings.length} critical/high findings`)
+    const criticalHighCount = criticalHighOf(outcomes).length
+    if (criticalHighCount > 0) {
+      nextActions.push(`Follow up on ${criticalHighCount} critical/high findings`)
     }
 
-    // Stage 3: RITA - Generate updated report
-    const ritaResult = await this.rita.execute({
-      vendorId,
-      reportType: 'DETAILED_ASSESSMENT',
-      includeFindings: true,
-      includeTrends: false,
-    })
-
-    stages.push({
-      stage: 'Report Update',
-      agent: 'RITA',
-      success: ritaResult.success,
-      summary: ritaResult.success
-        ? 'Assessment report updated'
-        : ritaResult.error || 'Failed',
-      timestamp: new Date(),
-    })
-
-    const overallSuccess = stages.filter((s) => s.success).length >= stages.length * 0.8
+    const overallSuccess = run.records.filter((s) => s.success).length >= run.records.length * 0.8
 
-    if (saraResult.data.complianceGaps.length > 0) {
-      nextActions.push(`Address ${saraResult.data.complianceGaps.length} compliance gaps`)
+    if (analysisOf(outcomes).complianceGaps.length > 0) {
+      nextActions.push(`Address ${analysisOf(outcomes).complianceGaps.length} compliance gaps`)
     }
 
+    return this.toResult(vendorId, run, overallSuccess, nextActions)
+  }
+
+  private toResult(
+    vendorId: string,
+    run: WorkflowRun,
+    overallSuccess: boolean,
+    nextActions: string[]
+  ): WorkflowResult {
     return {
       vendorId,
-      stages,
+      stages: run.records,
       overallSuccess,
       nextActions,
+      totalMs: run.totalMs,
     }
   }
 
@@ -333,24 +397,20 @@ export class AgentOrchestrator {
     overdueEscalations: number
     expiringDocuments: number
     upcomingAssessments: number
+    vendorsChecked: number
+    vendorsWithMissingDocuments: number
   }> {
     // Check overdue remediation actions
     const overdueResult = await this.mars.checkOverdueActions()
-    const overdueEscalations = overdueResult.data?.length || 0
+    const overdueEscalations = overdueResult.data?.escalated || 0
 
-    // Check document inventory across all active vendors
-    const vendors = await prisma.vendor.findMany({
-      where: { status: 'ACTIVE' },
-      select: { id: true },
-    })
-
-    let expiringDocuments = 0
-    for (const vendor of vendors) {
-      const inventoryResult = await this.dora.checkDocumentInventory(vendor.id)
-      if (inventoryResult.success && inventoryResult.data) {
-        expiringDocuments += inventoryResult.data.expiringDocuments.length
-      }
+    // Check document inventory across all active vendors (set-based, paged)
+    const inventoryResult = await this.dora.checkPortfolioInventory()
+    if (!inventoryResult.success) {
+      console.error('Portfolio inventory check failed:', inventoryResult.error)
     }
+    const inventory = inventoryResult.data
+    const expiringDocuments = inventory?.expiringDocuments || 0
 
     // Check upcoming assessments
     const nextMonth = new Date()
@@ -361,10 +421,15 @@ export class AgentOrchestrator {
       },
     })
 
+    // Escalations and expiry change dashboard counts; refresh them now
+    await reconcileMetrics().catch((error) => console.error('Dashboard reconciliation failed:', error))
+
     return {
       overdueEscalations,
       expiringDocuments,
       upcomingAssessments,
+      vendorsChecked: inventory?.vendorsChecked || 0,
+      vendorsWithMissingDocuments: inventory?.vendorsWithMissingDocuments || 0,
     }
   }
 
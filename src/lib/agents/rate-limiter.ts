@@ -0,0 +1,207 @@
+/**
+ * Provider Rate Limiter
+ *
+ * Every LLM call made by an agent goes through one limiter per process. It
+ * holds two token buckets sized to the provider's limits, requests per minute
+ * (LLM_RPM) and tokens per minute (LLM_TPM), and starts a call only when both
+ * have room, in arrival order. A call is charged its prompt estimate plus the
+ * agent's maxTokens, which is how providers count a request against TPM.
+ *
+ * A 429 or overloaded response pauses the whole limiter, not just the failed
+ * call, then retries with backoff (LLM_MAX_RETRIES), so a burst of concurrent
+ * workflows backs off together instead of retrying into a 429 storm.
+ *
+ * Limits are per process: with several workers, give each its share of the
+ * account quota. Unset limits are unlimited.
+ */
+
+import { registry } from '@/lib/telemetry/metrics'
+
+const DEFAULT_MAX_RETRIES = 6
+const BACKOFF_BASE_MS = 1000
+const BACKOFF_MAX_MS = 60 * 1000
+// Buckets hold this much of a minute's quota, which bounds the initial burst
+const BURST_MS = 10 * 1000
+
+export interface RateLimits {
+  requestsPerMinute?: number
+  tokensPerMinute?: number
+  maxRetries?: number
+}
+
+export interface RateLimiterStats {
+  requests: number
+  queued: number
+  waitedMs: number
+  rateLimited: number
+  retries: number
+}
+
+export class TokenBucket {
+  readonly capacity: number
+  private available: number
+  private perMs: number
+  private updatedAt = Date.now()
+
+  constructor(perMinute: number) {
+    this.perMs = perMinute / 60000
+    this.capacity = Math.max(1, Math.floor(this.perMs * BURST_MS))
+    this.available = this.capacity
+  }
+
+  /** Milliseconds until `amount` can be taken; 0 if it can be now */
+  waitMs(amount: number): number {
+    this.refill()
+    const needed = Math.min(amount, this.capacity) - this.available
+    return needed <= 0 ? 0 : Math.ceil(needed / this.perMs)
+  }
+
+  take(amount: number): void {
+    this.refill()
+    this.available -= Math.min(amount, this.capacity)
+  }
+
+  /** Empty the bucket, e.g. after the provider reports the limit was hit */
+  drain(): void {
+    this.refill()
+    this.available = Math.min(this.available, 0)
+  }
+
+  private refill(): void {
+    const now = Date.now()
+    this.available = Math.min(this.capacity, this.available + (now - this.updatedAt) * this.perMs)
+    this.updatedAt = now
+  }
+}
+
+interface Waiter {
+  tokens: number
+  queuedAt: number
+  resolve: () => void
+}
+
+function errorStatus(error: unknown): number | undefined {
+  const e = error as { status?: number; response?: { status?: number } } | null
+  return e?.status ?? e?.response?.status
+}
+
+function retryAfterMs(error: unknown): number | undefined {
+  const headers = (error as { headers?: Record<string, string> } | null)?.headers
+  const value = headers?.['retry-after']
+  const seconds = value ? Number(value) : NaN
+  return Number.isFinite(seconds) ? seconds * 1000 : undefined
+}
+
+export function isRateLimitError(error: unknown): boolean {
+  const status = errorStatus(error)
+  if (status === 429) return true
+  return error instanceof Error && /\b429\b|rate limit/i.test(error.message)
+}
+
+// Rate limits, overload and server/network errors are worth another attempt;
+// other client errors (bad request, auth) are not
+function isRetryable(error: unknown): boolean {
+  if (isRateLimitError(error)) return true
+  const status = errorStatus(error)
+  return status === undefined || status >= 500
+}
+
+export class RateLimiter {
+  private requests: TokenBucket | null
+  private tokens: TokenBucket | null
+  private maxRetries: number
+  private queue: Waiter[] = []
+  private timer: ReturnType<typeof setTimeout> | null = null
+  private pausedUntil = 0
+  private counters = { requests: 0, waitedMs: 0, rateLimited: 0, retries: 0 }
+
+  constructor(limits: RateLimits = {}) {
+    this.requests = limits.requestsPerMinute ? new TokenBucket(limits.requestsPerMinute) : null
+    this.tokens = limits.tokensPerMinute ? new TokenBucket(limits.tokensPerMinute) : null
+    this.maxRetries = limits.maxRetries ?? DEFAULT_MAX_RETRIES
+  }
+
+  /**
+   * Run `call` once the limiter has room for one request of `estimatedTokens`,
+   * retrying rate-limited and transient failures.
+   */
+  async schedule<T>(estimatedTokens: number, call: () => Promise<T>): Promise<T> {
+    for (let attempt = 0; ; attempt++) {
+      await this.acquire(estimatedTokens)
+      try {
+        return await call()
+      } catch (error) {
+        if (!isRetryable(error) || attempt >= this.maxRetries) throw error
+        this.counters.retries++
+
+        const backoff = Math.min(BACKOFF_BASE_MS * 2 ** attempt, BACKOFF_MAX_MS)
+        const delay = retryAfterMs(error) ?? Math.round(backoff * (0.75 + Math.random() * 0.5))
+        if (isRateLimitError(error)) {
+          // Everyone waits: the quota is shared
+          this.counters.rateLimited++
+          this.requests?.drain()
+          this.tokens?.drain()
+          this.pausedUntil = Math.max(this.pausedUntil, Date.now() + delay)
+        } else {
+          await new Promise((resolve) => setTimeout(resolve, delay))
+        }
+      }
+    }
+  }
+
+  stats(): RateLimiterStats {
+    return { ...this.counters, queued: this.queue.length }
+  }
+
+  private acquire(tokens: number): Promise<void> {
+    return new Promise((resolve) => {
+      this.queue.push({ tokens, queuedAt: Date.now(), resolve })
+      this.drainQueue()
+    })
+  }
+
+  private drainQueue(): void {
+    if (this.timer) {
+      clearTimeout(this.timer)
+      this.timer = null
+    }
+
+    while (this.queue.length) {
+      const waiter = this.queue[0]
+      const wait = Math.max(
+        this.pausedUntil - Date.now(),
+        this.requests?.waitMs(1) ?? 0,
+        this.tokens?.waitMs(waiter.tokens) ?? 0
+      )
+      if (wait > 0) {
+        this.timer = setTimeout(() => this.drainQueue(), wait)
+        return
+      }
+
+      this.queue.shift()
+      this.requests?.take(1)
+      this.tokens?.take(waiter.tokens)
+      this.counters.requests++
+      this.counters.waitedMs += Date.now() - waiter.queuedAt
+      waiter.resolve()
+    }
+  }
+}
+
+const globalForLimiter = globalThis as unknown as {
+  rateLimiter: RateLimiter | undefined
+}
+
+export const rateLimiter =
+  globalForLimiter.rateLimiter ??
+  new RateLimiter({
+    requestsPerMinute: Number(process.env.LLM_RPM) || undefined,
+    tokensPerMinute: Number(process.env.LLM_TPM) || undefined,
+    maxRetries: process.env.LLM_MAX_RETRIES ? Number(process.env.LLM_MAX_RETRIES) : undefined,
+  })
+
+if (process.env.NODE_ENV !== 'production') globalForLimiter.rateLimiter = rateLimiter
+
+registry.gauge('tprm_llm_rate_limiter_queued', 'LLM requests waiting on the shared rate limiter', () => [
+  { labels: {}, value: rateLimiter.stats().queued },
+])
@@ -13,17 +13,28 @@
 
 import { BaseAgent } from './base-agent'
 import prisma from '@/lib/db'
+import { getPortfolioVersion } from '@/lib/dashboard/metrics'
 import type { AgentConfig, AgentResult, ReportInput, ReportOutput } from './types'
 
+// Portfolio report data is reused while the portfolio version (bumped on
+// every recorded write) and the day are unchanged. Identical data gives an
+// identical prompt, so the LLM response cache also skips the model call.
+const REPORT_DATA_TTL_MS = Number(process.env.REPORT_DATA_CACHE_TTL_MS) || 15 * 60 * 1000
+const TOP_CRITICAL_VENDORS = 5
+
 const RITA_CONFIG: AgentConfig = {
   name: 'RITA',
   description: 'Report Intelligence & Threat Assessment Agent',
   model: 'gpt-4-turbo',
   temperature: 0.3,
   maxTokens: 4000,
+  // Reports are regenerated, not accumulated; short-lived reuse is safe
+  cacheTtlMs: 15 * 60 * 1000,
 }
 
 export class RITAAgent extends BaseAgent {
+  private portfolioData: { key: string; data: string; expiresAt: number } | null = null
+
   constructor() {
     super(RITA_CONFIG)
   }
@@ -147,22 +158,33 @@ Create a comprehensive report in the following JSON format:
   }
 
   private async gatherReportData(input: ReportInput): Promise<string> {
-    let data = ''
+    if (input.vendorId) return this.gatherVendorData(input.vendorId)
 
-    if (input.vendorId) {
-      // Single vendor report
-      const vendor = await prisma.vendor.findUnique({
-        where: { id: input.vendorId },
-        include: {
-          riskProfiles: { orderBy: { createdAt: 'desc' }, take: 1 },
-          riskAssessments: { orderBy: { createdAt: 'desc' }, take: 5 },
-          riskFindings: { where: { status: { not: 'CLOSED' } } },
-          documents: { where: { isCurrent: true } },
-        },
-      })
+    const version = await getPortfolioVersion()
+    const key = `${version}:${new Date().toISOString().split('T')[0]}`
+    const cached = this.portfolioData
+    if (cached && cached.key === key && cached.expiresAt > Date.now()) return cached.data
+
+    const data = await this.gatherPortfolioData()
+    this.portfolioData = { key, data, expiresAt: Date.now() + REPORT_DATA_TTL_MS }
+    return data
+  }
 
-      if (vendor) {
-        data = `
+  private async gatherVendorData(vendorId: string): Promise<string> {
+    let data = ''
+
+    const vendor = await prisma.vendor.findUnique({
+      where: { id: vendorId },
+      include: {
+        riskProfiles: { orderBy: { createdAt: 'desc' }, take: 1 },
+        riskAssessments: { orderBy: { createdAt: 'desc' }, take: 5 },
+        riskFindings: { where: { status: { not: 'CLOSED' } } },
+        documents: { where: { isCurrent: true } },
+      },
+    })
+
+    if (vendor) {
+      data = `
 VENDOR INFORMATION:
 - Name: ${vendor.name}
 - Industry: ${vendor.industry || 'N/A'}
@@ -183,51 +205,68 @@ ${vendor.riskFindings.map((f) => `- [${f.severity}] ${f.title}`).join('\n')}
 DOCUMENTS ON FILE (${vendor.documents.length}):
 ${vendor.documents.map((d) => `- ${d.documentType}: ${d.status}`).join('\n')}
 `
-      }
-    } else {
-      // Portfolio report
-      const [vendors, findings, assessments] = await Promise.all([
-        prisma.vendor.findMany({
-          include: {
-            riskProfiles: { orderBy: { createdAt: 'desc' }, take: 1 },
-          },
-        }),
-        prisma.riskFinding.groupBy({
-          by: ['severity'],
-          _count: true,
-          where: { status: { not: 'CLOSED' } },
-        }),
-        prisma.riskAssessment.count({
-          where: {
-            createdAt: {
-              gte: new Date(Date.now() - 90 * 24 * 60 * 60 * 1000),
-            },
-          },
-        }),
-      ])
-
-      const riskDistribution = {
-        critical: vendors.filter((v) => v.riskProfiles[0]?.riskTier === 'CRITICAL').length,
-        high: vendors.filter((v) => v.riskProfiles[0]?.riskTier === 'HIGH').length,
-        medium: vendors.filter((v) => v.riskProfiles[0]?.riskTier === 'MEDIUM').length,
-        low: vendors.filter((v) => v.riskProfiles[0]?.riskTier === 'LOW').length,
-      }
+    }
 
-      const findingsBySeverity: Record<string, number> = {}
-      findings.forEach((f) => {
-        findingsBySeverity[f.severity] = f._count
-      })
+    return data
+  }
 
-      data = `
+  /**
+   * Portfolio data from grouped aggregates and an indexed top-N query, so
+   * memory use does not grow with the number of vendors.
+   */
+  private async gatherPortfolioData(): Promise<string> {
+    const [vendorsByStatus, vendorsByTier, findings, assessments, topCritical] = await Promise.all([
+      prisma.vendor.groupBy({
+        by: ['status'],
+        _count: true,
+      }),
+      prisma.vendor.groupBy({
+        by: ['currentRiskTier'],
+        _count: true,
+      }),
+      prisma.riskFinding.groupBy({
+        by: ['severity'],
+        _count: true,
+        where: { status: { not: 'CLOSED' } },
+      }),
+      prisma.riskAssessment.count({
+        where: {
+          createdAt: {
+            gte: new Date(Date.now() - 90 * 24 * 60 * 60 * 1000),
+          },
+        },
+      }),
+      prisma.vendor.findMany({
+        where: { currentRiskTier: 'CRITICAL', currentRiskScore: { not: null } },
+        orderBy: [{ currentRiskScore: 'desc' }, { id: 'desc' }],
+        take: TOP_CRITICAL_VENDORS,
+        select: { name: true, currentRiskScore: true },
+      }),
+    ])
+
+    const totalVendors = vendorsByStatus.reduce((sum, v) => sum + v._count, 0)
+    const activeVendors = vendorsByStatus.find((v) => v.status === 'ACTIVE')?._count || 0
+
+    const riskDistribution: Record<string, number> = {}
+    vendorsByTier.forEach((v) => {
+      if (v.currentRiskTier) riskDistribution[v.currentRiskTier] = v._count
+    })
+
+    const findingsBySeverity: Record<string, number> = {}
+    findings.forEach((f) => {
+      findingsBySeverity[f.severity] = f._count
+    })
+
+    return `
 PORTFOLIO OVERVIEW:
-- Total Vendors: ${vendors.length}
-- Active Vendors: ${vendors.filter((v) => v.status === 'ACTIVE').length}
+- Total Vendors: ${totalVendors}
+- Active Vendors: ${activeVendors}
 
 RISK DISTRIBUTION:
-- Critical: ${riskDistribution.critical}
-- High: ${riskDistribution.high}
-- Medium: ${riskDistribution.medium}
-- Low: ${riskDistribution.low}
+- Critical: ${riskDistribution['CRITICAL'] || 0}
+- High: ${riskDistribution['HIGH'] || 0}
+- Medium: ${riskDistribution['MEDIUM'] || 0}
+- Low: ${riskDistribution['LOW'] || 0}
 
 OPEN FINDINGS BY SEVERITY:
 - Critical: ${findingsBySeverity['CRITICAL'] || 0}
@@ -239,15 +278,8 @@ ASSESSMENT ACTIVITY (Last 90 Days):
 - Assessments Completed: ${assessments}
 
 TOP CRITICAL VENDORS:
-${vendors
-  .filter((v) => v.riskProfiles[0]?.riskTier === 'CRITICAL')
-  .slice(0, 5)
-  .map((v) => `- ${v.name} (Score: ${v.riskProfiles[0]?.overallRiskScore})`)
-  .join('\n')}
+${topCritical.map((v) => `- ${v.name} (Score: ${v.currentRiskScore})`).join('\n')}
 `
-    }
-
-    return data
   }
 
   async generateExecutiveDashboard(): Promise<
@@ -9,10 +9,18 @@
  * - Map vendor risks to SNBR risk framework
  * - Identify potential compliance violations
  * - Correlate findings across multiple documents
+ *
+ * Large documents are analyzed map-reduce style: the content is split into
+ * overlapping section/page chunks, chunks are analyzed concurrently (at most
+ * SARA_CHUNK_CONCURRENCY at a time), and the partial results are merged and
+ * deduplicated before any finding is persisted.
  */
 
 import { BaseAgent } from './base-agent'
+import type { BulkWriter } from './bulk-writer'
+import { chunkDocument, type DocumentChunk } from './document-chunker'
 import prisma from '@/lib/db'
+import { mapWithConcurrency } from '@/lib/utils'
 import type {
   AgentConfig,
   AgentResult,
@@ -29,6 +37,23 @@ const SARA_CONFIG: AgentConfig = {
   maxTokens: 4000,
 }
 
+const CHUNK_CONCURRENCY = Number(process.env.SARA_CHUNK_CONCURRENCY) || 4
+
+const SEVERITY_ORDER = ['INFORMATIONAL', 'LOW', 'MEDIUM', 'HIGH', 'CRITICAL']
+
+function normalize(text: string | undefined): string {
+  return (text || '').toLowerCase().replace(/[^a-z0-9]+/g, ' ').trim()
+}
+
+function unique(values: string[]): string[] {
+  const seen = new Map<string, string>()
+  for (const value of values) {
+    const key = normalize(value)
+    if (key && !seen.has(key)) seen.set(key, value)
+  }
+  return Array.from(seen.values())
+}
+
 export class SARAAgent extends BaseAgent {
   constructor() {
     super(SARA_CONFIG)
@@ -70,11 +95,18 @@ When analyzing documents:
 Provide specific, actionable findings with clear remediation guidance.`
   }
 
-  async execute(input: SecurityAnalysisInput): Promise<AgentResult<SecurityAnalysisOutput>> {
-    const startTime = Date.now()
+  private buildPrompt(input: SecurityAnalysisInput, chunk: DocumentChunk, totalChunks: number): string {
+    const part = totalChunks > 1
+      ? `
+- Part: ${chunk.index + 1} of ${totalChunks} (${chunk.label})
 
-    try {
-      const prompt = `Analyze the following security document for vendor risk findings:
+This is one part of a longer document; other parts are analyzed separately.
+Report only findings evidenced in this part, and reference the section/page
+within it. Text marked [...continued] repeats the end of the previous part.
+`
+      : ''
+
+    return `Analyze the following security document for vendor risk findings:
 
 Vendor Context:
 - Vendor ID: ${input.vendorId}
@@ -84,10 +116,10 @@ Vendor Context:
 
 Document Information:
 - Document ID: ${input.documentId}
-- Document Type: ${input.documentType}
+- Document Type: ${input.documentType}${part}
 
 Document Content:
-${input.documentContent}
+${chunk.content}
 
 ---
 
@@ -111,52 +143,165 @@ Analyze this document and provide findings in the following JSON format:
   "complianceGaps": ["List of compliance gaps identified"],
   "strengthAreas": ["List of strong security controls noted"]
 }`
+  }
+
+  /**
+   * Map step: analyze every chunk, at most CHUNK_CONCURRENCY at a time.
+   * A failed chunk does not fail the document unless every chunk fails.
+   * Responses are streamed and each finding goes to onFinding as soon as the
+   * model has finished writing it.
+   */
+  private async analyzeChunks(
+    input: SecurityAnalysisInput,
+    chunks: DocumentChunk[],
+    onFinding: (finding: SecurityFinding, chunk: DocumentChunk) => void
+  ): Promise<{ chunk: DocumentChunk; analysis: SecurityAnalysisOutput }[]> {
+    const errors: string[] = []
+    const results = await mapWithConcurrency(chunks, CHUNK_CONCURRENCY, async (chunk) => {
+      try {
+        const analysis = await this.invokeWithJSONStream<SecurityAnalysisOutput>(
+          this.buildPrompt(input, chunk, chunks.length),
+          ['findings'],
+          (_, finding) => onFinding(finding as SecurityFinding, chunk)
+        )
+        return { chunk, analysis }
+      } catch (error) {
+        errors.push(`${chunk.label}: ${error instanceof Error ? error.message : 'Unknown error'}`)
+        return null
+      }
+    })
+
+    const analyzed = results.filter((r): r is { chunk: DocumentChunk; analysis: SecurityAnalysisOutput } => r !== null)
+    if (!analyzed.length) {
+      throw new Error(`Document analysis failed: ${errors[0]}`)
+    }
+    return analyzed
+  }
 
-      const result = await this.invokeWithJSON<SecurityAnalysisOutput>(prompt)
-      result.vendorId = input.vendorId
-      result.documentId = input.documentId
+  /**
+   * Reduce step: merge chunk results, collapsing findings with the same title
+   * and category (from overlapping text or repeated sections) into one with
+   * the highest severity and the union of controls and references.
+   */
+  private mergeAnalyses(
+    input: SecurityAnalysisInput,
+    analyzed: { chunk: DocumentChunk; analysis: SecurityAnalysisOutput }[],
+    totalChunks: number
+  ): SecurityAnalysisOutput {
+    const merged = new Map<string, SecurityFinding>()
+
+    for (const { chunk, analysis } of analyzed) {
+      for (const finding of analysis.findings || []) {
+        const reference = totalChunks > 1 && !finding.sourceReference
+          ? chunk.label
+          : finding.sourceReference
+        const key = `${normalize(finding.title)}|${normalize(finding.category)}`
+        const existing = merged.get(key)
+
+        if (!existing) {
+          merged.set(key, { ...finding, affectedControls: finding.affectedControls || [], sourceReference: reference })
+          continue
+        }
+
+        const escalate = SEVERITY_ORDER.indexOf(finding.severity) > SEVERITY_ORDER.indexOf(existing.severity)
+        merged.set(key, {
+          ...existing,
+          severity: escalate ? finding.severity : existing.severity,
+          description: (finding.description || '').length > (existing.description || '').length
+            ? finding.description
+            : existing.description,
+          recommendedAction: escalate ? finding.recommendedAction : existing.recommendedAction,
+          affectedControls: unique([...existing.affectedControls, ...(finding.affectedControls || [])]),
+          sourceReference: unique([existing.sourceReference, reference].filter(Boolean)).join('; '),
+        })
+      }
+    }
+
+    const overallRiskAssessment = analyzed.length === 1 && totalChunks === 1
+      ? analyzed[0].analysis.overallRiskAssessment
+      : [
+          `Analyzed in ${totalChunks} parts${analyzed.length < totalChunks ? ` (${totalChunks - analyzed.length} failed)` : ''}.`,
+          ...analyzed.map(({ chunk, analysis }) => `${chunk.label}: ${analysis.overallRiskAssessment}`),
+        ].join('\n\n')
+
+    return {
+      vendorId: input.vendorId,
+      documentId: input.documentId,
+      findings: Array.from(merged.values()).sort(
+        (a, b) => SEVERITY_ORDER.indexOf(b.severity) - SEVERITY_ORDER.indexOf(a.severity)
+      ),
+      overallRiskAssessment,
+      complianceGaps: unique(analyzed.flatMap(({ analysis }) => analysis.complianceGaps || [])),
+      strengthAreas: unique(analyzed.flatMap(({ analysis }) => analysis.strengthAreas || [])),
+    }
+  }
+
+  private queueFinding(writer: BulkWriter, input: SecurityAnalysisInput, finding: SecurityFinding): string {
+    return writer.addFinding({
+      vendorId: input.vendorId,
+      documentId: input.documentId,
+      findingType: input.documentType,
+      findingCategory: finding.category,
+      severity: finding.severity as any,
+      title: finding.title,
+      description: finding.description,
+      snbrRiskMapping: finding.snbrRiskMapping,
+      affectedControls: finding.affectedControls || [],
+      sourceReference: finding.sourceReference,
+      identifiedBy: 'SARA',
+      identifiedDate: new Date(),
+      status: 'OPEN',
+      dueDate: this.calculateDueDate(finding.severity),
+    })
+  }
+
+  /**
+   * Analyze a document and persist its findings.
+   *
+   * options.onFinding receives findings while the model is still generating,
+   * e.g. to stream them to the client. For a multi-chunk document they are
+   * provisional: the reduce step may merge them. Nothing is written until
+   * every response has parsed, so a failed or retried analysis leaves no
+   * findings behind.
+   */
+  async execute(
+    input: SecurityAnalysisInput,
+    options: { onFinding?: (finding: SecurityFinding) => void } = {}
+  ): Promise<AgentResult<SecurityAnalysisOutput>> {
+    const startTime = Date.now()
+
+    try {
+      const chunks = chunkDocument(input.documentContent)
+      const analyzed = await this.analyzeChunks(input, chunks, (finding) => options.onFinding?.(finding))
+      const result = this.mergeAnalyses(input, analyzed, chunks.length)
+      const partial = analyzed.length < chunks.length
 
       // Save findings to database
+      const writer = this.createWriter()
       for (const finding of result.findings) {
-        await prisma.riskFinding.create({
-          data: {
-            vendorId: input.vendorId,
-            documentId: input.documentId,
-            findingType: input.documentType,
-            findingCategory: finding.category,
-            severity: finding.severity as any,
-            title: finding.title,
-            description: finding.description,
-            snbrRiskMapping: finding.snbrRiskMapping,
-            affectedControls: finding.affectedControls,
-            sourceReference: finding.sourceReference,
-            identifiedBy: 'SARA',
-            identifiedDate: new Date(),
-            status: 'OPEN',
-            dueDate: this.calculateDueDate(finding.severity),
-          },
-        })
+        finding.id = this.queueFinding(writer, input, finding)
       }
 
       // Update document status
-      await prisma.document.update({
+      writer.add(prisma.document.update({
         where: { id: input.documentId },
         data: {
           status: 'ANALYZED',
           analysisResult: result.overallRiskAssessment,
         },
-      })
+      }))
 
-      await this.logActivity({
+      writer.logActivity({
         activityType: 'DOCUMENT_ANALYSIS',
         entityType: 'Document',
         entityId: input.documentId,
         actionTaken: `Analyzed ${input.documentType} document`,
-        inputSummary: `Vendor: ${input.vendorContext.name}`,
-        outputSummary: `Found ${result.findings.length} findings (${result.findings.filter((f) => f.severity === 'CRITICAL' || f.severity === 'HIGH').length} critical/high)`,
-        status: 'SUCCESS',
+        inputSummary: `Vendor: ${input.vendorContext.name}; ${input.documentContent.length} chars in ${chunks.length} chunk(s)`,
+        outputSummary: `Found ${result.findings.length} findings (${result.findings.filter((f) => f.severity === 'CRITICAL' || f.severity === 'HIGH').length} critical/high)${partial ? `; ${chunks.length - analyzed.length} chunk(s) failed` : ''}`,
+        status: partial ? 'PARTIAL' : 'SUCCESS',
         processingTimeMs: Date.now() - startTime,
       })
+      await writer.commit()
 
       return this.createResult(true, result, undefined, startTime)
     } catch (error) {
@@ -8,6 +8,7 @@ export interface AgentConfig {
   model: 'gpt-4' | 'gpt-4-turbo' | 'claude-3-opus' | 'claude-3-sonnet'
   temperature: number
   maxTokens: number
+  cacheTtlMs?: number // default LLM response cache lifetime; unset or 0 disables caching
 }
 
 export interface AgentResult<T = unknown> {
@@ -49,6 +50,7 @@ export interface VendorProfileInput {
 
 export interface VendorProfileOutput {
   vendorId: string
+  riskProfileId?: string
   riskTier: 'CRITICAL' | 'HIGH' | 'MEDIUM' | 'LOW'
   overallRiskScore: number
   dataSensitivityLevel: string
@@ -116,6 +118,7 @@ export interface SecurityAnalysisInput {
 }
 
 export interface SecurityFinding {
+  id?: string // riskFinding row, once persisted
   title: string
   description: string
   severity: 'CRITICAL' | 'HIGH' | 'MEDIUM' | 'LOW' | 'INFORMATIONAL'
@@ -175,6 +178,7 @@ export interface RemediationInput {
 export interface RemediationPlan {
   findingId: string
   actions: {
+    id?: string // remediationAction row, once persisted
     title: string
     description: string
     actionType: 'REMEDIATE' | 'MITIGATE' | 'ACCEPT' | 'TRANSFER'
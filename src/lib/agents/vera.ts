@@ -13,6 +13,7 @@
 
 import { BaseAgent } from './base-agent'
 import prisma from '@/lib/db'
+import { recordRiskProfile } from '@/lib/dashboard/metrics'
 import type {
   AgentConfig,
   AgentResult,
@@ -26,6 +27,7 @@ const VERA_CONFIG: AgentConfig = {
   model: 'gpt-4-turbo',
   temperature: 0.3,
   maxTokens: 2000,
+  cacheTtlMs: 60 * 60 * 1000,
 }
 
 export class VERAAgent extends BaseAgent {
@@ -114,24 +116,35 @@ Provide a risk assessment in the following JSON format:
       result.nextAssessmentDate = nextDate
       result.vendorId = input.vendorId
 
-      // Save risk profile to database
-      await prisma.riskProfile.create({
-        data: {
-          vendorId: input.vendorId,
-          riskTier: result.riskTier,
-          overallRiskScore: result.overallRiskScore,
-          dataSensitivityLevel: result.dataSensitivityLevel,
-          dataTypesAccessed: input.dataTypesAccessed,
-          systemIntegrations: input.systemIntegrations,
-          hasPiiAccess: input.hasPiiAccess,
-          hasPhiAccess: input.hasPhiAccess,
-          hasPciAccess: input.hasPciAccess,
-          businessCriticality: input.businessCriticality as any,
-          assessmentFrequency: result.assessmentFrequency,
-          nextAssessmentDate: result.nextAssessmentDate,
-          calculatedBy: 'VERA',
-        },
-      })
+      // Save risk profile to database, and make it the vendor's current risk
+      const [profile] = await prisma.$transaction([
+        prisma.riskProfile.create({
+          data: {
+            vendorId: input.vendorId,
+            riskTier: result.riskTier,
+            overallRiskScore: result.overallRiskScore,
+            dataSensitivityLevel: result.dataSensitivityLevel,
+            dataTypesAccessed: input.dataTypesAccessed,
+            systemIntegrations: input.systemIntegrations,
+            hasPiiAccess: input.hasPiiAccess,
+            hasPhiAccess: input.hasPhiAccess,
+            hasPciAccess: input.hasPciAccess,
+            businessCriticality: input.businessCriticality as any,
+            assessmentFrequency: result.assessmentFrequency,
+            nextAssessmentDate: result.nextAssessmentDate,
+            calculatedBy: 'VERA',
+          },
+        }),
+        prisma.vendor.update({
+          where: { id: input.vendorId },
+          data: {
+            currentRiskTier: result.riskTier,
+            currentRiskScore: result.overallRiskScore,
+          },
+        }),
+      ])
+      await recordRiskProfile(input.vendorId, profile.riskTier)
+      result.riskProfileId = profile.id
 
       // Log activity
       await this.logActivity({
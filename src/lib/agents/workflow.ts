@@ -0,0 +1,219 @@
+/**
+ * Workflow Runner
+ *
+ * Runs orchestrator workflows as a dependency graph of stages. A stage starts
+ * as soon as every stage it depends on has succeeded, so independent stages
+ * overlap and a workflow takes as long as its critical path. A stage whose
+ * dependency failed or was skipped is skipped too, as is a stage whose
+ * `when` guard returns false. Stages listed in `after` only order the run:
+ * they must have finished (or been skipped) but need not have succeeded.
+ *
+ * Workflows can resume: successful stages are reported to onStageComplete
+ * as checkpoints, and passing those back as `resume` skips them on the next
+ * attempt, reusing their outcomes.
+ *
+ * A stage may return several records (e.g. one per finding for a fan-out);
+ * fan-out inside a stage should use mapWithConcurrency with the workflow's
+ * concurrency limit.
+ *
+ * Each run is traced: a workflow span with one child span per stage, in a
+ * trace keyed on workflowId (the job ID when run by the worker), and stage
+ * and workflow durations feed the /api/metrics histograms.
+ */
+
+import { randomUUID } from 'crypto'
+import { stageDuration, workflowDuration } from '@/lib/telemetry/metrics'
+import { currentSpan, traceIdFor, withSpan } from '@/lib/telemetry/tracing'
+
+export interface StageRecord {
+  stage: string
+  agent: string
+  success: boolean
+  summary: string
+  timestamp: Date
+  startedAt: Date
+  durationMs: number
+}
+
+export interface StageOutcome<T = unknown> {
+  success: boolean
+  summary: string
+  data?: T
+  // Extra rows for WorkflowResult.stages, e.g. one per fanned-out item
+  records?: Omit<StageRecord, 'timestamp' | 'startedAt' | 'durationMs'>[]
+}
+
+export interface Stage<C> {
+  id: string
+  name: string
+  agent: string
+  dependsOn?: string[]
+  after?: string[]
+  // Report only the outcome's records, not a row for the stage itself
+  expand?: boolean
+  when?: (context: C, outcomes: Record<string, StageOutcome>) => boolean
+  run: (context: C, outcomes: Record<string, StageOutcome>) => Promise<StageOutcome>
+}
+
+export interface StageCheckpoint {
+  outcome: StageOutcome
+  records: StageRecord[]
+}
+
+export interface WorkflowOptions {
+  // Names the workflow in traces and metrics, e.g. onboard_vendor
+  name?: string
+  // Links spans across attempts, e.g. the job ID; random if not given
+  workflowId?: string
+  // Successful stages from an earlier attempt; they are not run again
+  resume?: Record<string, StageCheckpoint>
+  // Called after each stage succeeds, e.g. to persist a checkpoint
+  onStageComplete?: (id: string, checkpoint: StageCheckpoint) => Promise<void> | void
+}
+
+export interface WorkflowRun {
+  outcomes: Record<string, StageOutcome>
+  records: StageRecord[]
+  skipped: string[]
+  totalMs: number
+}
+
+export async function runWorkflow<C>(
+  stages: Stage<C>[],
+  context: C,
+  options: WorkflowOptions = {}
+): Promise<WorkflowRun> {
+  const name = options.name || 'workflow'
+  const workflowId = options.workflowId || randomUUID()
+  return withSpan(
+    `workflow ${name}`,
+    async (span) => {
+      const run = await executeWorkflow(stages, context, options, name, workflowId)
+      const success = Object.values(run.outcomes).every((outcome) => outcome.success)
+      span.setAttribute('workflow.success', success)
+      span.setAttribute('workflow.skipped_stages', run.skipped.join(','))
+      workflowDuration.observe({ workflow: name, success: String(success) }, run.totalMs / 1000)
+      return run
+    },
+    {
+      // Continue the caller's trace (e.g. the worker's job span) if there is one
+      traceId: currentSpan() ? undefined : traceIdFor(workflowId),
+      attributes: {
+        'workflow.id': workflowId,
+        'workflow.name': name,
+        'workflow.resumed_stages': Object.keys(options.resume || {}).join(','),
+      },
+    }
+  )
+}
+
+async function executeWorkflow<C>(
+  stages: Stage<C>[],
+  context: C,
+  options: WorkflowOptions,
+  name: string,
+  workflowId: string
+): Promise<WorkflowRun> {
+  const started = Date.now()
+  const outcomes: Record<string, StageOutcome> = {}
+  const records: StageRecord[] = []
+  const skipped: string[] = []
+  const settled = new Set<string>()
+  const running = new Map<string, Promise<void>>()
+
+  const known = new Set(stages.map((s) => s.id))
+  for (const stage of stages) {
+    for (const dep of [...(stage.dependsOn || []), ...(stage.after || [])]) {
+      if (!known.has(dep)) throw new Error(`Stage ${stage.id} depends on unknown stage ${dep}`)
+    }
+  }
+
+  // Checkpoints may have been through JSON, so dates are revived
+  for (const stage of stages) {
+    const saved = options.resume?.[stage.id]
+    if (!saved?.outcome.success) continue
+    outcomes[stage.id] = saved.outcome
+    records.push(...saved.records.map((r) => ({
+      ...r,
+      timestamp: new Date(r.timestamp),
+      startedAt: new Date(r.startedAt),
+    })))
+    settled.add(stage.id)
+  }
+
+  const execute = async (stage: Stage<C>) => {
+    const startedAt = new Date()
+    const outcome = await withSpan(
+      `stage ${stage.id}`,
+      async (span): Promise<StageOutcome> => {
+        let result: StageOutcome
+        try {
+          result = await stage.run(context, outcomes)
+        } catch (error) {
+          result = { success: false, summary: error instanceof Error ? error.message : 'Failed' }
+        }
+        span.setAttribute('stage.success', result.success)
+        if (!result.success) span.recordError(result.summary)
+        return result
+      },
+      { attributes: { 'workflow.id': workflowId, 'stage.id': stage.id, 'stage.name': stage.name, 'stage.agent': stage.agent } }
+    )
+    const timestamp = new Date()
+    const durationMs = timestamp.getTime() - startedAt.getTime()
+    stageDuration.observe(
+      { workflow: name, stage: stage.id, agent: stage.agent, success: String(outcome.success) },
+      durationMs / 1000
+    )
+    outcomes[stage.id] = outcome
+    const stageRecords: StageRecord[] = []
+    if (!stage.expand) {
+      stageRecords.push({ stage: stage.name, agent: stage.agent, success: outcome.success, summary: outcome.summary, timestamp, startedAt, durationMs })
+    }
+    for (const record of outcome.records || []) {
+      stageRecords.push({ ...record, timestamp, startedAt, durationMs })
+    }
+    records.push(...stageRecords)
+
+    if (outcome.success && options.onStageComplete) {
+      try {
+        await options.onStageComplete(stage.id, { outcome, records: stageRecords })
+      } catch (error) {
+        console.error(`Failed to checkpoint stage ${stage.id}:`, error)
+      }
+    }
+  }
+
+  while (settled.size < stages.length) {
+    let progressed = false
+    for (const stage of stages) {
+      if (settled.has(stage.id) || running.has(stage.id)) continue
+      const deps = stage.dependsOn || []
+      if (![...deps, ...(stage.after || [])].every((dep) => settled.has(dep))) continue
+
+      progressed = true
+      const blocked = deps.some((dep) => !outcomes[dep]?.success)
+      if (blocked || (stage.when && !stage.when(context, outcomes))) {
+        skipped.push(stage.id)
+        settled.add(stage.id)
+        continue
+      }
+      running.set(
+        stage.id,
+        execute(stage).then(() => {
+          running.delete(stage.id)
+          settled.add(stage.id)
+        })
+      )
+    }
+
+    if (settled.size === stages.length) break
+    if (!running.size) {
+      if (progressed) continue
+      throw new Error('Workflow has a dependency cycle')
+    }
+    await Promise.race(Array.from(running.values()))
+  }
+
+  records.sort((a, b) => a.startedAt.getTime() - b.startedAt.getTime())
+  return { outcomes, records, skipped, totalMs: Date.now() - started }
+}
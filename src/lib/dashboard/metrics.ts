@@ -0,0 +1,392 @@
+/**
+ * Dashboard Metrics
+ *
+ * Summary counters for /api/dashboard, kept in the dashboard_metrics table so
+ * serving the dashboard reads a few dozen rows instead of running counts and
+ * groupBys over every vendor, finding and action.
+ *
+ * - Writes that change a counter (vendor status, risk profiles, findings,
+ *   assessments) apply a delta with metricDelta(), in the same transaction
+ *   where they can
+ * - reconcileMetrics() recomputes every counter from source tables. It
+ *   corrects drift and refreshes the time-window counts (overdue actions,
+ *   expiring documents, recent assessments) that change without any write.
+ *   The worker runs it every DASHBOARD_RECONCILE_MS, and the dashboard kicks
+ *   one off itself if the snapshot is older than that
+ * - getDashboard() serves from an in-process cache (DASHBOARD_CACHE_TTL_MS)
+ *   with an ETag, so polling clients mostly get 304s
+ * - Every delta also bumps the portfolio data version, which report caches
+ *   (RITA) key on to know when portfolio data may have changed
+ */
+
+import { createHash } from 'crypto'
+import { Prisma } from '@prisma/client'
+import prisma from '@/lib/db'
+
+const CACHE_TTL_MS = Number(process.env.DASHBOARD_CACHE_TTL_MS) || 30 * 1000
+export const RECONCILE_INTERVAL_MS = Number(process.env.DASHBOARD_RECONCILE_MS) || 5 * 60 * 1000
+const DAY_MS = 24 * 60 * 60 * 1000
+
+// Written by reconcileMetrics; its updatedAt is the snapshot's age
+const RECONCILED_KEY = '_reconciled'
+
+const RISK_TIERS = ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW'] as const
+const SEVERITIES = ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW', 'INFORMATIONAL'] as const
+
+export const metricKeys = {
+  vendorStatus: (status: string) => `vendors.status.${status}`,
+  riskTier: (tier: string) => `vendors.tier.${tier}`,
+  openFindings: (severity: string) => `findings.open.${severity}`,
+  recentAssessments: 'assessments.recent',
+  overdueActions: 'actions.overdue',
+  expiringDocuments: 'documents.expiring',
+  portfolioVersion: 'portfolio.version',
+}
+
+export type MetricDeltas = Record<string, number>
+
+/**
+ * A query adding `deltas` to the counters and bumping the portfolio version,
+ * or null if there is nothing to add. Prisma queries are lazy: pass it to
+ * $transaction or BulkWriter.add to apply it with the write it accounts for,
+ * then call invalidateDashboard().
+ */
+export function metricDelta(deltas: MetricDeltas): Prisma.PrismaPromise<number> | null {
+  const changed = Object.entries(deltas).filter(([, value]) => value !== 0)
+  if (!changed.length) return null
+  const entries = Object.entries({ [metricKeys.portfolioVersion]: 1, ...Object.fromEntries(changed) })
+  return prisma.$executeRaw`
+    INSERT INTO dashboard_metrics (key, value, "updatedAt")
+    VALUES ${Prisma.join(entries.map(([key, value]) => Prisma.sql`(${key}, ${value}, now())`))}
+    ON CONFLICT (key) DO UPDATE
+    SET value = dashboard_metrics.value + EXCLUDED.value, "updatedAt" = now()`
+}
+
+/**
+ * Apply deltas outside a transaction. Counters are advisory, so a failure is
+ * logged rather than failing the write they describe; reconciliation fixes it.
+ */
+export async function recordMetrics(deltas: MetricDeltas): Promise<void> {
+  try {
+    await metricDelta(deltas)
+    invalidateDashboard()
+  } catch (error) {
+    console.error('Failed to update dashboard metrics:', error)
+  }
+}
+
+/**
+ * Record a write to a vendor, possibly changing its status (from is null for
+ * a new vendor). Risk tiers only count active vendors, so entering or
+ * leaving ACTIVE also moves the vendor's risk profiles.
+ */
+export async function recordVendorStatus(vendorId: string, from: string | null, to: string): Promise<void> {
+  if (from === to) return recordMetrics({ [metricKeys.portfolioVersion]: 1 })
+  try {
+    const deltas: MetricDeltas = { [metricKeys.vendorStatus(to)]: 1 }
+    if (from) deltas[metricKeys.vendorStatus(from)] = -1
+    if ((from === 'ACTIVE') !== (to === 'ACTIVE')) {
+      const sign = to === 'ACTIVE' ? 1 : -1
+      const tiers = await prisma.riskProfile.groupBy({
+        by: ['riskTier'],
+        _count: true,
+        where: { vendorId },
+      })
+      tiers.forEach((item) => {
+        deltas[metricKeys.riskTier(item.riskTier)] = sign * item._count
+      })
+    }
+    await recordMetrics(deltas)
+  } catch (error) {
+    console.error('Failed to update dashboard metrics:', error)
+  }
+}
+
+/**
+ * Record a new risk profile; it counts toward the tier only if the vendor
+ * is active, but always changes the portfolio.
+ */
+export async function recordRiskProfile(vendorId: string, riskTier: string): Promise<void> {
+  try {
+    const vendor = await prisma.vendor.findUnique({
+      where: { id: vendorId },
+      select: { status: true },
+    })
+    await recordMetrics(
+      vendor?.status === 'ACTIVE'
+        ? { [metricKeys.riskTier(riskTier)]: 1 }
+        : { [metricKeys.portfolioVersion]: 1 }
+    )
+  } catch (error) {
+    console.error('Failed to update dashboard metrics:', error)
+  }
+}
+
+/**
+ * Current portfolio data version; changes whenever a recorded write does.
+ */
+export async function getPortfolioVersion(): Promise<number> {
+  const row = await prisma.dashboardMetric.findUnique({ where: { key: metricKeys.portfolioVersion } })
+  return row?.value ?? 0
+}
+
+let reconciling: Promise<void> | null = null
+
+/**
+ * Recompute every counter from the source tables and overwrite the snapshot,
+ * keeping the portfolio version. Counters are upserted in place rather than
+ * deleted and re-inserted, so metricDelta() writes running at the same time
+ * never hit a missing row or a duplicate key; counters with no source rows
+ * left are zeroed. Concurrent calls in one process share a run.
+ */
+export function reconcileMetrics(): Promise<void> {
+  if (!reconciling) {
+    reconciling = computeMetrics()
+      .then(async (values) => {
+        const entries = Object.entries({ ...values, [RECONCILED_KEY]: 0 })
+        const keys = entries.map(([key]) => key)
+        await prisma.$transaction([
+          prisma.$executeRaw`
+            INSERT INTO dashboard_metrics (key, value, "updatedAt")
+            VALUES ${Prisma.join(entries.map(([key, value]) => Prisma.sql`(${key}, ${value}, now())`))}
+            ON CONFLICT (key) DO UPDATE
+            SET value = EXCLUDED.value, "updatedAt" = now()`,
+          prisma.dashboardMetric.updateMany({
+            where: { key: { notIn: [...keys, metricKeys.portfolioVersion] }, value: { not: 0 } },
+            data: { value: 0 },
+          }),
+        ])
+        invalidateDashboard()
+      })
+      .finally(() => {
+        reconciling = null
+      })
+  }
+  return reconciling
+}
+
+async function computeMetrics(): Promise<MetricDeltas> {
+  const now = Date.now()
+  const [
+    vendorsByStatus,
+    vendorsByRiskTier,
+    findingsBySeverity,
+    recentAssessments,
+    overdueActions,
+    expiringDocuments,
+  ] = await Promise.all([
+    prisma.vendor.groupBy({
+      by: ['status'],
+      _count: true,
+    }),
+    prisma.riskProfile.groupBy({
+      by: ['riskTier'],
+      _count: true,
+      where: { vendor: { status: 'ACTIVE' } },
+    }),
+    prisma.riskFinding.groupBy({
+      by: ['severity'],
+      _count: true,
+      where: { status: { not: 'CLOSED' } },
+    }),
+    prisma.riskAssessment.count({
+      where: { createdAt: { gte: new Date(now - 30 * DAY_MS) } },
+    }),
+    // Escalated actions (OVERDUE) plus open ones past due that have not been
+    // escalated yet
+    prisma.remediationAction.count({
+      where: {
+        OR: [
+          { status: 'OVERDUE' },
+          { status: { in: ['OPEN', 'IN_PROGRESS'] }, dueDate: { lt: new Date(now) } },
+        ],
+      },
+    }),
+    prisma.document.count({
+      where: {
+        expirationDate: { lte: new Date(now + 30 * DAY_MS), gt: new Date(now) },
+        status: { not: 'EXPIRED' },
+      },
+    }),
+  ])
+
+  const values: MetricDeltas = {
+    [metricKeys.recentAssessments]: recentAssessments,
+    [metricKeys.overdueActions]: overdueActions,
+    [metricKeys.expiringDocuments]: expiringDocuments,
+  }
+  vendorsByStatus.forEach((item) => {
+    values[metricKeys.vendorStatus(item.status)] = item._count
+  })
+  vendorsByRiskTier.forEach((item) => {
+    values[metricKeys.riskTier(item.riskTier)] = item._count
+  })
+  findingsBySeverity.forEach((item) => {
+    values[metricKeys.openFindings(item.severity)] = item._count
+  })
+  return values
+}
+
+interface CachedDashboard {
+  body: string
+  etag: string
+  expiresAt: number
+}
+
+let cached: CachedDashboard | null = null
+let loading: Promise<CachedDashboard> | null = null
+
+export function invalidateDashboard(): void {
+  cached = null
+}
+
+/**
+ * The dashboard payload as JSON with its ETag, from cache when fresh.
+ */
+export async function getDashboard(): Promise<{ body: string; etag: string }> {
+  if (cached && cached.expiresAt > Date.now()) return cached
+  if (!loading) {
+    loading = buildDashboard()
+      .then((result) => {
+        cached = result
+        return result
+      })
+      .finally(() => {
+        loading = null
+      })
+  }
+  return loading
+}
+
+async function buildDashboard(): Promise<CachedDashboard> {
+  let rows = await prisma.dashboardMetric.findMany()
+  let reconciledAt = rows.find((row) => row.key === RECONCILED_KEY)?.updatedAt
+
+  if (!reconciledAt) {
+    // First request on an empty snapshot
+    await reconcileMetrics()
+    rows = await prisma.dashboardMetric.findMany()
+    reconciledAt = new Date()
+  } else if (Date.now() - reconciledAt.getTime() > RECONCILE_INTERVAL_MS) {
+    // No worker has refreshed the snapshot recently; serve it and refresh
+    reconcileMetrics().catch((error) => console.error('Dashboard reconciliation failed:', error))
+  }
+
+  const value = (key: string) => rows.find((row) => row.key === key)?.value ?? 0
+
+  const recentActivity = await prisma.agentActivityLog.findMany({
+    orderBy: { createdAt: 'desc' },
+    take: 10,
+    select: {
+      id: true,
+      agentName: true,
+      activityType: true,
+      entityType: true,
+      actionTaken: true,
+      status: true,
+      createdAt: true,
+    },
+  })
+
+  // Transform data for frontend
+  const riskDistribution = Object.fromEntries(
+    RISK_TIERS.map((tier) => [tier, value(metricKeys.riskTier(tier))])
+  ) as Record<(typeof RISK_TIERS)[number], number>
+
+  const findingsDistribution = Object.fromEntries(
+    SEVERITIES.map((severity) => [severity, value(metricKeys.openFindings(severity))])
+  ) as Record<(typeof SEVERITIES)[number], number>
+
+  const statusPrefix = metricKeys.vendorStatus('')
+  const statusDistribution: Record<string, number> = {}
+  rows
+    .filter((row) => row.key.startsWith(statusPrefix))
+    .forEach((row) => {
+      statusDistribution[row.key.slice(statusPrefix.length)] = row.value
+    })
+
+  // Calculate key metrics
+  const totalVendors = statusDistribution['ACTIVE'] || 0
+  const openFindings = SEVERITIES.reduce((sum, severity) => sum + findingsDistribution[severity], 0)
+  const criticalFindings = findingsDistribution.CRITICAL + findingsDistribution.HIGH
+  const overdueActions = value(metricKeys.overdueActions)
+  const expiringDocuments = value(metricKeys.expiringDocuments)
+  const complianceScore = totalVendors > 0
+    ? Math.round(((totalVendors - riskDistribution.CRITICAL) / totalVendors) * 100)
+    : 100
+
+  const body = JSON.stringify({
+    summary: {
+      totalVendors,
+      activeVendors: totalVendors,
+      criticalVendors: riskDistribution.CRITICAL,
+      highRiskVendors: riskDistribution.HIGH,
+      openFindings,
+      criticalFindings,
+      overdueActions,
+      expiringDocuments,
+      recentAssessments: value(metricKeys.recentAssessments),
+      complianceScore,
+    },
+    riskDistribution,
+    findingsDistribution,
+    statusDistribution,
+    recentActivity,
+    alerts: generateAlerts({
+      criticalVendors: riskDistribution.CRITICAL,
+      criticalFindings,
+      overdueActions,
+      expiringDocuments,
+    }),
+    metricsAsOf: reconciledAt,
+  })
+
+  return {
+    body,
+    etag: `"${createHash('sha1').update(body).digest('base64url')}"`,
+    expiresAt: Date.now() + CACHE_TTL_MS,
+  }
+}
+
+function generateAlerts(data: {
+  criticalVendors: number
+  criticalFindings: number
+  overdueActions: number
+  expiringDocuments: number
+}) {
+  const alerts: { type: string; message: string; severity: string }[] = []
+
+  if (data.criticalVendors > 0) {
+    alerts.push({
+      type: 'CRITICAL_VENDORS',
+      message: `${data.criticalVendors} vendor(s) classified as critical risk`,
+      severity: 'critical',
+    })
+  }
+
+  if (data.criticalFindings > 0) {
+    alerts.push({
+      type: 'CRITICAL_FINDINGS',
+      message: `${data.criticalFindings} critical/high findings require attention`,
+      severity: 'high',
+    })
+  }
+
+  if (data.overdueActions > 0) {
+    alerts.push({
+      type: 'OVERDUE_ACTIONS',
+      message: `${data.overdueActions} remediation action(s) are overdue`,
+      severity: 'high',
+    })
+  }
+
+  if (data.expiringDocuments > 0) {
+    alerts.push({
+      type: 'EXPIRING_DOCS',
+      message: `${data.expiringDocuments} document(s) expiring within 30 days`,
+      severity: 'medium',
+    })
+  }
+
+  return alerts
+}
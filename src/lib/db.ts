@@ -1,10 +1,17 @@
 import { PrismaClient } from '@prisma/client'
+import { queryTimingMiddleware } from '@/lib/telemetry/prisma'
 
 const globalForPrisma = globalThis as unknown as {
   prisma: PrismaClient | undefined
 }
 
-export const prisma = globalForPrisma.prisma ?? new PrismaClient()
+function createClient(): PrismaClient {
+  const client = new PrismaClient()
+  client.$use(queryTimingMiddleware)
+  return client
+}
+
+export const prisma = globalForPrisma.prisma ?? createClient()
 
 if (process.env.NODE_ENV !== 'production') globalForPrisma.prisma = prisma
 
@@ -0,0 +1,284 @@
+/**
+ * Bulk Vendor Onboarding
+ *
+ * Queues one ONBOARD_VENDOR job per vendor in a batch (from a JSON list or a
+ * CSV upload) and reports the batch's progress and aggregate results. Jobs
+ * are prioritised by business criticality, so mission-critical vendors are
+ * claimed first; throughput is bounded by the workers' concurrency and the
+ * shared LLM rate limiter (see agents/rate-limiter.ts).
+ */
+
+import type { JobStatus } from '@prisma/client'
+import prisma from '@/lib/db'
+import type { VendorProfileInput, WorkflowResult } from '@/lib/agents'
+import { enqueueJobs } from './queue'
+
+export const CRITICALITY_PRIORITY: Record<string, number> = {
+  MISSION_CRITICAL: 30,
+  BUSINESS_CRITICAL: 20,
+  IMPORTANT: 10,
+  STANDARD: 0,
+}
+
+export interface BatchVendor {
+  vendorId?: string
+  vendorName?: string
+  businessCriticality: string
+  dataTypesAccessed: string[]
+  systemIntegrations: string[]
+  hasPiiAccess: boolean
+  hasPhiAccess: boolean
+  hasPciAccess: boolean
+}
+
+export interface BatchRejection {
+  row: number
+  vendor: string
+  error: string
+}
+
+export interface BatchCounts {
+  total: number
+  queued: number
+  running: number
+  succeeded: number
+  failed: number
+  done: boolean
+}
+
+// CSV header aliases, compared lowercase without spaces or punctuation
+const CSV_COLUMNS: Record<string, keyof BatchVendor> = {
+  vendorid: 'vendorId',
+  id: 'vendorId',
+  vendorname: 'vendorName',
+  vendor: 'vendorName',
+  name: 'vendorName',
+  businesscriticality: 'businessCriticality',
+  criticality: 'businessCriticality',
+  datatypesaccessed: 'dataTypesAccessed',
+  datatypes: 'dataTypesAccessed',
+  systemintegrations: 'systemIntegrations',
+  integrations: 'systemIntegrations',
+  haspiiaccess: 'hasPiiAccess',
+  pii: 'hasPiiAccess',
+  hasphiaccess: 'hasPhiAccess',
+  phi: 'hasPhiAccess',
+  haspciaccess: 'hasPciAccess',
+  pci: 'hasPciAccess',
+}
+
+const LIST_COLUMNS = new Set<string>(['dataTypesAccessed', 'systemIntegrations'])
+const FLAG_COLUMNS = new Set<string>(['hasPiiAccess', 'hasPhiAccess', 'hasPciAccess'])
+
+/**
+ * Split CSV text into rows of fields (RFC 4180 quoting).
+ */
+export function parseCsv(text: string): string[][] {
+  const rows: string[][] = []
+  let row: string[] = []
+  let field = ''
+  let quoted = false
+
+  for (let i = 0; i < text.length; i++) {
+    const ch = text[i]
+    if (quoted) {
+      if (ch === '"' && text[i + 1] === '"') {
+        field += '"'
+        i++
+      } else if (ch === '"') {
+        quoted = false
+      } else {
+        field += ch
+      }
+    } else if (ch === '"') {
+      quoted = true
+    } else if (ch === ',') {
+      row.push(field)
+      field = ''
+    } else if (ch === '\n' || ch === '\r') {
+      if (ch === '\r' && text[i + 1] === '\n') i++
+      row.push(field)
+      if (row.some((value) => value.trim())) rows.push(row)
+      row = []
+      field = ''
+    } else {
+      field += ch
+    }
+  }
+  row.push(field)
+  if (row.some((value) => value.trim())) rows.push(row)
+  return rows
+}
+
+/**
+ * Map a vendor CSV to batch items. List columns are separated by ';' or '|',
+ * and flags accept true/yes/y/1. Unknown columns are ignored. Items are
+ * returned unvalidated.
+ */
+export function vendorsFromCsv(text: string): Record<string, unknown>[] {
+  const [header, ...rows] = parseCsv(text)
+  if (!header) return []
+  const columns = header.map((name) => CSV_COLUMNS[name.toLowerCase().replace(/[^a-z]/g, '')])
+
+  return rows.map((fields) => {
+    const item: Record<string, unknown> = {}
+    columns.forEach((column, index) => {
+      const value = (fields[index] || '').trim()
+      if (!column || !value) return
+      if (LIST_COLUMNS.has(column)) {
+        item[column] = value.split(/[;|]/).map((v) => v.trim()).filter(Boolean)
+      } else if (FLAG_COLUMNS.has(column)) {
+        item[column] = /^(true|yes|y|1)$/i.test(value)
+      } else if (column === 'businessCriticality') {
+        item[column] = value.toUpperCase().replace(/[\s-]+/g, '_')
+      } else {
+        item[column] = value
+      }
+    })
+    return item
+  })
+}
+
+/**
+ * Queue onboarding for every vendor in the batch. Vendors are matched by id
+ * or exact name; unmatched and repeated vendors are rejected with their row
+ * number. Re-submitting the same batchId does not queue vendors twice.
+ */
+export async function enqueueOnboardingBatch(batchId: string, vendors: BatchVendor[]) {
+  const ids = vendors.map((v) => v.vendorId).filter((id): id is string => !!id)
+  const names = vendors.map((v) => v.vendorName).filter((name): name is string => !!name)
+  const found = await prisma.vendor.findMany({
+    where: { OR: [{ id: { in: ids } }, { name: { in: names } }] },
+    select: { id: true, name: true, industry: true, annualSpend: true },
+  })
+  const byId = new Map(found.map((v) => [v.id, v]))
+  const byName = new Map(found.map((v) => [v.name, v]))
+
+  const rejected: BatchRejection[] = []
+  const seen = new Set<string>()
+  const items = []
+
+  for (let i = 0; i < vendors.length; i++) {
+    const item = vendors[i]
+    const label = item.vendorId || item.vendorName || ''
+    const vendor = item.vendorId ? byId.get(item.vendorId) : byName.get(item.vendorName || '')
+    if (!vendor) {
+      rejected.push({ row: i + 1, vendor: label, error: 'Vendor not found' })
+      continue
+    }
+    if (seen.has(vendor.id)) {
+      rejected.push({ row: i + 1, vendor: label, error: 'Duplicate vendor in batch' })
+      continue
+    }
+    seen.add(vendor.id)
+
+    const payload: VendorProfileInput = {
+      vendorId: vendor.id,
+      vendorName: vendor.name,
+      industry: vendor.industry || undefined,
+      dataTypesAccessed: item.dataTypesAccessed,
+      systemIntegrations: item.systemIntegrations,
+      hasPiiAccess: item.hasPiiAccess,
+      hasPhiAccess: item.hasPhiAccess,
+      hasPciAccess: item.hasPciAccess,
+      businessCriticality: item.businessCriticality,
+      annualSpend: vendor.annualSpend ? Number(vendor.annualSpend) : undefined,
+    }
+    items.push({
+      payload: JSON.parse(JSON.stringify(payload)),
+      idempotencyKey: `batch:${batchId}:${vendor.id}`,
+      priority: CRITICALITY_PRIORITY[item.businessCriticality] ?? 0,
+    })
+  }
+
+  const { jobs, created } = items.length
+    ? await enqueueJobs('ONBOARD_VENDOR', items, batchId)
+    : { jobs: [], created: 0 }
+
+  return { batchId, queued: jobs.length, created, rejected }
+}
+
+/**
+ * Job counts by status; cheap enough to poll.
+ */
+export async function getBatchCounts(batchId: string): Promise<BatchCounts> {
+  const groups = await prisma.workflowJob.groupBy({
+    by: ['status'],
+    where: { batchId },
+    _count: { _all: true },
+  })
+  const count = (status: JobStatus) => groups.find((g) => g.status === status)?._count._all ?? 0
+  const counts = {
+    total: groups.reduce((sum, g) => sum + g._count._all, 0),
+    queued: count('QUEUED'),
+    running: count('RUNNING'),
+    succeeded: count('SUCCEEDED'),
+    failed: count('FAILED'),
+  }
+  return { ...counts, done: counts.total > 0 && counts.queued + counts.running === 0 }
+}
+
+/**
+ * Per-vendor status and the batch's aggregate results: risk tier
+ * distribution, failures and the most common next actions.
+ */
+export async function getBatchSummary(batchId: string) {
+  const jobs = await prisma.workflowJob.findMany({
+    where: { batchId },
+    select: {
+      id: true,
+      status: true,
+      attempts: true,
+      payload: true,
+      result: true,
+      lastError: true,
+      completedAt: true,
+    },
+    orderBy: [{ priority: 'desc' }, { createdAt: 'asc' }],
+  })
+  if (!jobs.length) return null
+
+  const vendorIds = jobs.map((job) => (job.payload as unknown as VendorProfileInput).vendorId)
+  const profiles = await prisma.riskProfile.findMany({
+    where: { vendorId: { in: vendorIds } },
+    select: { vendorId: true, riskTier: true, overallRiskScore: true },
+    orderBy: { createdAt: 'desc' },
+    distinct: ['vendorId'],
+  })
+  const profileOf = new Map(profiles.map((p) => [p.vendorId, p]))
+
+  const byTier: Record<string, number> = {}
+  const actionCounts = new Map<string, number>()
+  const vendors = jobs.map((job) => {
+    const payload = job.payload as unknown as VendorProfileInput
+    const result = job.result as unknown as WorkflowResult | null
+    const profile = job.status === 'SUCCEEDED' ? profileOf.get(payload.vendorId) : undefined
+    if (profile) byTier[profile.riskTier] = (byTier[profile.riskTier] || 0) + 1
+    for (const action of result?.nextActions || []) {
+      actionCounts.set(action, (actionCounts.get(action) || 0) + 1)
+    }
+    return {
+      jobId: job.id,
+      vendorId: payload.vendorId,
+      vendorName: payload.vendorName,
+      businessCriticality: payload.businessCriticality,
+      status: job.status,
+      attempts: job.attempts,
+      riskTier: profile?.riskTier ?? null,
+      riskScore: profile?.overallRiskScore ?? null,
+      error: job.status === 'FAILED' ? job.lastError : null,
+      completedAt: job.completedAt,
+    }
+  })
+
+  return {
+    batchId,
+    counts: await getBatchCounts(batchId),
+    byTier,
+    topActions: Array.from(actionCounts.entries())
+      .sort((a, b) => b[1] - a[1])
+      .slice(0, 10)
+      .map(([action, vendorCount]) => ({ action, vendors: vendorCount })),
+    vendors,
+  }
+}
@@ -0,0 +1,79 @@
+/**
+ * Job Handlers
+ *
+ * Maps each job type to the orchestrator workflow it runs. Workflows receive
+ * the job's checkpoint as `resume` and save every completed stage back to the
+ * job, so a retry continues after the last stage that succeeded.
+ */
+
+import type { Prisma, WorkflowJob } from '@prisma/client'
+import { orchestrator, type WorkflowResult } from '@/lib/agents/orchestrator'
+import type { WorkflowOptions } from '@/lib/agents/workflow'
+import type { VendorProfileInput } from '@/lib/agents/types'
+import { saveCheckpoint, type JobCheckpoint, type JobType } from './queue'
+
+export interface ProcessDocumentPayload {
+  vendorId: string
+  documentId: string
+  documentType: string
+  documentContent: string
+}
+
+/**
+ * A workflow that ran but did not succeed; the result is kept on the job
+ * and the attempt is retried.
+ */
+export class WorkflowFailedError extends Error {
+  constructor(public result: WorkflowResult) {
+    super(
+      result.stages
+        .filter((s) => !s.success)
+        .map((s) => `${s.agent} ${s.stage}: ${s.summary}`)
+        .join('; ') || 'Workflow did not succeed'
+    )
+  }
+}
+
+function checkpointing(job: WorkflowJob, workerId: string): WorkflowOptions {
+  const checkpoint: JobCheckpoint = { ...((job.checkpoint as unknown as JobCheckpoint) || {}) }
+  return {
+    workflowId: job.id,
+    resume: checkpoint,
+    onStageComplete: async (id, stage) => {
+      checkpoint[id] = stage
+      await saveCheckpoint(job.id, workerId, checkpoint)
+    },
+  }
+}
+
+function toJson(value: unknown): Prisma.InputJsonValue {
+  return JSON.parse(JSON.stringify(value))
+}
+
+export const handlers: Record<JobType, (job: WorkflowJob, workerId: string) => Promise<Prisma.InputJsonValue>> = {
+  async ONBOARD_VENDOR(job, workerId) {
+    const result = await orchestrator.onboardVendor(
+      job.payload as unknown as VendorProfileInput,
+      checkpointing(job, workerId)
+    )
+    if (!result.overallSuccess) throw new WorkflowFailedError(result)
+    return toJson(result)
+  },
+
+  async PROCESS_DOCUMENT(job, workerId) {
+    const payload = job.payload as unknown as ProcessDocumentPayload
+    const result = await orchestrator.processDocument(
+      payload.vendorId,
+      payload.documentId,
+      payload.documentType,
+      payload.documentContent,
+      checkpointing(job, workerId)
+    )
+    if (!result.overallSuccess) throw new WorkflowFailedError(result)
+    return toJson(result)
+  },
+
+  async MAINTENANCE() {
+    return toJson(await orchestrator.runMaintenanceCycle())
+  },
+}
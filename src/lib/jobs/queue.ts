@@ -0,0 +1,236 @@
+/**
+ * Workflow Job Queue
+ *
+ * Durable queue for long-running orchestrator workflows, stored in the
+ * workflow_jobs table. Workers claim jobs with FOR UPDATE SKIP LOCKED, so any
+ * number of worker processes can poll the same table without handing out a
+ * job twice or blocking each other.
+ *
+ * - Idempotency: enqueueing with an idempotencyKey that already exists
+ *   returns the existing job instead of creating another
+ * - Retries: a failed attempt is re-queued with exponential backoff until
+ *   maxAttempts is reached
+ * - Checkpoints: workflows save completed stages to the job, and a retry
+ *   resumes from them instead of starting over
+ * - Leases: a RUNNING job whose lock has not been renewed within the lease
+ *   (its worker died) is re-queued. Checkpoints, completion and failure are
+ *   only recorded by the worker that still holds the lock, so a worker that stalled past
+ *   its lease cannot overwrite the run of the worker that re-claimed the job
+ */
+
+import { Prisma, type WorkflowJob } from '@prisma/client'
+import prisma from '@/lib/db'
+import type { StageCheckpoint } from '@/lib/agents/workflow'
+
+export type JobType = 'ONBOARD_VENDOR' | 'PROCESS_DOCUMENT' | 'MAINTENANCE'
+
+export type JobCheckpoint = Record<string, StageCheckpoint>
+
+export const DEFAULT_MAX_ATTEMPTS = 5
+const BACKOFF_BASE_MS = 30 * 1000
+const BACKOFF_MAX_MS = 60 * 60 * 1000
+export const LEASE_MS = 5 * 60 * 1000
+
+export interface EnqueueOptions {
+  idempotencyKey?: string
+  maxAttempts?: number
+  runAt?: Date
+  priority?: number
+  batchId?: string
+}
+
+export async function enqueueJob(
+  type: JobType,
+  payload: Prisma.InputJsonValue,
+  options: EnqueueOptions = {}
+): Promise<{ job: WorkflowJob; created: boolean }> {
+  if (options.idempotencyKey) {
+    const existing = await prisma.workflowJob.findUnique({
+      where: { idempotencyKey: options.idempotencyKey },
+    })
+    if (existing) return { job: existing, created: false }
+  }
+
+  try {
+    const job = await prisma.workflowJob.create({
+      data: {
+        type,
+        payload,
+        idempotencyKey: options.idempotencyKey,
+        maxAttempts: options.maxAttempts ?? DEFAULT_MAX_ATTEMPTS,
+        runAt: options.runAt ?? new Date(),
+        priority: options.priority ?? 0,
+        batchId: options.batchId,
+      },
+    })
+    return { job, created: true }
+  } catch (error) {
+    // Lost a race with a concurrent request using the same key
+    if (
+      options.idempotencyKey &&
+      error instanceof Prisma.PrismaClientKnownRequestError &&
+      error.code === 'P2002'
+    ) {
+      const job = await prisma.workflowJob.findUniqueOrThrow({
+        where: { idempotencyKey: options.idempotencyKey },
+      })
+      return { job, created: false }
+    }
+    throw error
+  }
+}
+
+export interface BatchItem {
+  payload: Prisma.InputJsonValue
+  idempotencyKey: string
+  priority?: number
+}
+
+/**
+ * Enqueue many jobs of one type in a single insert. Items whose idempotency
+ * key already exists are not queued again; the existing jobs are returned
+ * with created: false.
+ */
+export async function enqueueJobs(
+  type: JobType,
+  items: BatchItem[],
+  batchId: string
+): Promise<{ jobs: WorkflowJob[]; created: number }> {
+  const keys = items.map((item) => item.idempotencyKey)
+  const { count } = await prisma.workflowJob.createMany({
+    data: items.map((item) => ({
+      type,
+      payload: item.payload,
+      idempotencyKey: item.idempotencyKey,
+      priority: item.priority ?? 0,
+      batchId,
+      maxAttempts: DEFAULT_MAX_ATTEMPTS,
+    })),
+    skipDuplicates: true,
+  })
+  const jobs = await prisma.workflowJob.findMany({
+    where: { idempotencyKey: { in: keys } },
+  })
+  return { jobs, created: count }
+}
+
+/**
+ * Atomically claim up to `limit` due jobs for a worker, highest priority
+ * first.
+ */
+export async function claimJobs(workerId: string, limit: number): Promise<WorkflowJob[]> {
+  if (limit <= 0) return []
+  return prisma.$queryRaw<WorkflowJob[]>`
+    UPDATE workflow_jobs
+    SET status = 'RUNNING',
+        "lockedAt" = now(),
+        "lockedBy" = ${workerId},
+        attempts = attempts + 1,
+        "updatedAt" = now()
+    WHERE id IN (
+      SELECT id FROM workflow_jobs
+      WHERE status = 'QUEUED' AND "runAt" <= now()
+      ORDER BY priority DESC, "runAt"
+      LIMIT ${limit}
+      FOR UPDATE SKIP LOCKED
+    )
+    RETURNING *`
+}
+
+/**
+ * Extend the lease on jobs a worker is still running.
+ */
+export async function renewLeases(workerId: string, jobIds: string[]): Promise<void> {
+  if (!jobIds.length) return
+  await prisma.workflowJob.updateMany({
+    where: { id: { in: jobIds }, lockedBy: workerId, status: 'RUNNING' },
+    data: { lockedAt: new Date() },
+  })
+}
+
+/**
+ * Re-queue jobs whose worker stopped renewing its lease.
+ */
+export async function requeueExpired(leaseMs: number = LEASE_MS): Promise<number> {
+  const { count } = await prisma.workflowJob.updateMany({
+    where: { status: 'RUNNING', lockedAt: { lt: new Date(Date.now() - leaseMs) } },
+    data: { status: 'QUEUED', lockedAt: null, lockedBy: null, runAt: new Date() },
+  })
+  return count
+}
+
+/**
+ * Save a job's completed stages. Throws if the worker no longer owns the job,
+ * so a worker that stalled past its lease cannot overwrite the checkpoint of
+ * the one that re-claimed it.
+ */
+export async function saveCheckpoint(jobId: string, workerId: string, checkpoint: JobCheckpoint): Promise<void> {
+  const { count } = await prisma.workflowJob.updateMany({
+    where: { id: jobId, lockedBy: workerId, status: 'RUNNING' },
+    data: { checkpoint: checkpoint as unknown as Prisma.InputJsonValue },
+  })
+  if (!count) throw new Error(`Job ${jobId} is no longer owned by ${workerId}`)
+}
+
+/**
+ * Mark a job succeeded. Returns false if the worker no longer owns the job
+ * (its lease expired and the job was re-queued or re-claimed), in which case
+ * nothing is written.
+ */
+export async function completeJob(
+  jobId: string,
+  workerId: string,
+  result: Prisma.InputJsonValue
+): Promise<boolean> {
+  const { count } = await prisma.workflowJob.updateMany({
+    where: { id: jobId, lockedBy: workerId, status: 'RUNNING' },
+    data: {
+      status: 'SUCCEEDED',
+      result,
+      lastError: null,
+      lockedAt: null,
+      lockedBy: null,
+      completedAt: new Date(),
+    },
+  })
+  return count > 0
+}
+
+export function backoffMs(attempts: number): number {
+  const delay = Math.min(BACKOFF_BASE_MS * 2 ** Math.max(0, attempts - 1), BACKOFF_MAX_MS)
+  // Jitter so jobs that failed together do not retry together
+  return Math.round(delay * (0.75 + Math.random() * 0.5))
+}
+
+/**
+ * Record a failed attempt: re-queue with backoff, or fail for good once
+ * maxAttempts is used up. Returns the new status, or null if the worker no
+ * longer owns the job and nothing was written.
+ */
+export async function failJob(
+  job: WorkflowJob,
+  workerId: string,
+  error: unknown,
+  result?: Prisma.InputJsonValue
+): Promise<'QUEUED' | 'FAILED' | null> {
+  const message = error instanceof Error ? error.message : String(error)
+  const exhausted = job.attempts >= job.maxAttempts
+  const { count } = await prisma.workflowJob.updateMany({
+    where: { id: job.id, lockedBy: workerId, status: 'RUNNING' },
+    data: {
+      status: exhausted ? 'FAILED' : 'QUEUED',
+      lastError: message,
+      result,
+      lockedAt: null,
+      lockedBy: null,
+      runAt: exhausted ? job.runAt : new Date(Date.now() + backoffMs(job.attempts)),
+      completedAt: exhausted ? new Date() : null,
+    },
+  })
+  if (!count) return null
+  return exhausted ? 'FAILED' : 'QUEUED'
+}
+
+export async function getJob(jobId: string): Promise<WorkflowJob | null> {
+  return prisma.workflowJob.findUnique({ where: { id: jobId } })
+}
@@ -0,0 +1,143 @@
+/**
+ * Job Worker
+ *
+ * Runs up to `concurrency` workflow jobs at once in this process. Start as
+ * many worker processes as needed (npm run worker); they share the queue
+ * through SKIP LOCKED claims, so throughput scales with workers until the LLM
+ * provider's rate limits are reached.
+ */
+
+import { hostname } from 'os'
+import type { WorkflowJob } from '@prisma/client'
+import { reconcileMetrics, RECONCILE_INTERVAL_MS } from '@/lib/dashboard/metrics'
+import { currentSpan, traceIdFor, withSpan } from '@/lib/telemetry/tracing'
+import { handlers, WorkflowFailedError } from './handlers'
+import {
+  claimJobs,
+  completeJob,
+  failJob,
+  LEASE_MS,
+  renewLeases,
+  requeueExpired,
+  type JobType,
+} from './queue'
+
+export interface WorkerOptions {
+  concurrency?: number
+  pollMs?: number
+  workerId?: string
+}
+
+function sleep(ms: number): Promise<void> {
+  return new Promise((resolve) => setTimeout(resolve, ms))
+}
+
+export class JobWorker {
+  readonly workerId: string
+  private concurrency: number
+  private pollMs: number
+  private running = new Map<string, Promise<void>>()
+  private stopping = false
+
+  constructor(options: WorkerOptions = {}) {
+    this.concurrency = options.concurrency ?? 8
+    this.pollMs = options.pollMs ?? 1000
+    this.workerId = options.workerId ?? `${hostname()}:${process.pid}`
+  }
+
+  /**
+   * Poll and run jobs until stop() is called, then wait for running jobs.
+   */
+  async run(): Promise<void> {
+    const heartbeat = setInterval(() => {
+      renewLeases(this.workerId, Array.from(this.running.keys())).catch((error) =>
+        console.error('Failed to renew job leases:', error)
+      )
+      requeueExpired().catch((error) => console.error('Failed to requeue expired jobs:', error))
+    }, LEASE_MS / 3)
+
+    // Keep dashboard counters fresh and correct drift
+    const reconcile = setInterval(() => {
+      reconcileMetrics().catch((error) => console.error('Dashboard reconciliation failed:', error))
+    }, RECONCILE_INTERVAL_MS)
+
+    try {
+      while (!this.stopping) {
+        const free = this.concurrency - this.running.size
+        let claimed: WorkflowJob[] = []
+        if (free > 0) {
+          try {
+            claimed = await claimJobs(this.workerId, free)
+          } catch (error) {
+            console.error('Failed to claim jobs:', error)
+          }
+        }
+
+        for (const job of claimed) {
+          this.running.set(job.id, this.process(job).finally(() => this.running.delete(job.id)))
+        }
+
+        // Poll again at once while there is work and capacity; otherwise wait
+        // for a slot to free up or the poll interval, whichever comes first
+        if (claimed.length && claimed.length === free) {
+          await Promise.race(Array.from(this.running.values()))
+        } else if (!claimed.length) {
+          await Promise.race([sleep(this.pollMs), ...Array.from(this.running.values())])
+        }
+      }
+      await Promise.all(Array.from(this.running.values()))
+    } finally {
+      clearInterval(heartbeat)
+      clearInterval(reconcile)
+    }
+  }
+
+  stop(): void {
+    this.stopping = true
+  }
+
+  // One trace per job, keyed on the job ID so retries share it
+  private process(job: WorkflowJob): Promise<void> {
+    return withSpan(
+      `job ${job.type}`,
+      async (span) => {
+        const startTime = Date.now()
+        const handler = handlers[job.type as JobType]
+
+        try {
+          if (!handler) throw new Error(`Unknown job type: ${job.type}`)
+          const result = await handler(job, this.workerId)
+          if (!(await completeJob(job.id, this.workerId, result))) {
+            console.error(`Job ${job.id} (${job.type}) finished after its lease was lost; result discarded`)
+            return
+          }
+          console.log(`Job ${job.id} (${job.type}) succeeded in ${Date.now() - startTime}ms`)
+        } catch (error) {
+          const result = error instanceof WorkflowFailedError
+            ? JSON.parse(JSON.stringify(error.result))
+            : undefined
+          span.recordError(error)
+          try {
+            const status = await failJob(job, this.workerId, error, result)
+            if (!status) {
+              console.error(`Job ${job.id} (${job.type}) failed after its lease was lost; failure not recorded`)
+              return
+            }
+            console.error(
+              `Job ${job.id} (${job.type}) attempt ${job.attempts}/${job.maxAttempts} failed` +
+                `${status === 'QUEUED' ? ', will retry' : ''}:`,
+              error instanceof Error ? error.message : error
+            )
+          } catch (updateError) {
+            // The lease will expire and the job will be re-queued
+            console.error(`Failed to record failure of job ${job.id}:`, updateError)
+          }
+        }
+      },
+      {
+        traceId: currentSpan() ? undefined : traceIdFor(job.id),
+        attributes: { 'job.id': job.id, 'job.type': job.type, 'job.attempt': job.attempts },
+      }
+    )
+  }
+}
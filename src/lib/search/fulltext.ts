@@ -0,0 +1,150 @@
+/**
+ * Full-Text Search
+ *
+ * Ranked search across vendors, findings, documents and reports, backed by
+ * the trigger-maintained "searchVector" columns and their GIN indexes (see
+ * prisma/setup-search.ts). Vendor names and industries are also matched by
+ * substring through trigram indexes, so "soft" finds "Microsoft".
+ *
+ * - Full queries use websearch syntax: "quoted phrases", OR, -excluded
+ * - Prefix queries (type-ahead) match the last word as a prefix
+ * - Snippets are HTML-escaped source text with matches wrapped in <mark>
+ */
+
+import { Prisma } from '@prisma/client'
+import prisma from '@/lib/db'
+
+export const SEARCH_TYPES = ['vendor', 'finding', 'document', 'report'] as const
+export type SearchType = (typeof SEARCH_TYPES)[number]
+
+export interface SearchOptions {
+  types?: SearchType[]
+  vendorId?: string
+  limit?: number
+  prefix?: boolean
+}
+
+export interface SearchHit {
+  type: SearchType
+  id: string
+  title: string
+  vendorId: string | null
+  vendorName: string | null
+  snippet: string
+  rank: number
+}
+
+// Headlines are computed for the top hits only, over at most this much text
+const HEADLINE_MAX_CHARS = 50000
+const HEADLINE_OPTIONS = 'StartSel=<mark>, StopSel=</mark>, MaxWords=30, MinWords=10, MaxFragments=2'
+
+/**
+ * The tsquery for `input`, or null if it has no searchable words. Prefix
+ * queries AND the words together and match the last one as a prefix.
+ */
+function tsQuery(input: string, prefix: boolean): Prisma.Sql | null {
+  if (!prefix) {
+    return /[\p{L}\p{N}]/u.test(input) ? Prisma.sql`websearch_to_tsquery('english', ${input})` : null
+  }
+  const words = input.match(/[\p{L}\p{N}]+/gu)
+  if (!words) return null
+  const query = words.map((word, i) => (i === words.length - 1 ? `${word}:*` : word)).join(' & ')
+  return Prisma.sql`to_tsquery('english', ${query})`
+}
+
+// HTML-escape text before ts_headline adds its <mark> tags
+function escaped(text: Prisma.Sql): Prisma.Sql {
+  return Prisma.sql`replace(replace(replace(left(${text}, ${HEADLINE_MAX_CHARS}), '&', '&amp;'), '<', '&lt;'), '>', '&gt;')`
+}
+
+// Trigram substring match on vendor name/industry; needs at least one
+// trigram, so shorter input relies on the tsquery alone
+function vendorSubstring(input: string): Prisma.Sql {
+  const text = input.trim()
+  if (text.length < 3) return Prisma.empty
+  const pattern = `%${text.replace(/[\\%_]/g, (ch) => `\\${ch}`)}%`
+  return Prisma.sql`OR v.name ILIKE ${pattern} OR v.industry ILIKE ${pattern}`
+}
+
+function vendorFilter(column: Prisma.Sql, vendorId?: string): Prisma.Sql {
+  return vendorId ? Prisma.sql`AND ${column} = ${vendorId}` : Prisma.empty
+}
+
+function searchType(type: SearchType, query: Prisma.Sql, input: string, options: SearchOptions, limit: number) {
+  // Inner queries pick the top hits by rank using the GIN index; headlines
+  // are then built for those rows only. ts_rank_cd normalization 32 scales
+  // ranks to 0-1 so the types can be merged. Every type is ranked by
+  // ts_rank_cd alone: trigram similarity is on another scale (a substring
+  // hit on a short name easily beats a relevant body-text match), so it only
+  // orders vendors that tie, such as substring-only hits at rank 0.
+  switch (type) {
+    case 'vendor':
+      return prisma.$queryRaw<SearchHit[]>`
+        SELECT 'vendor' AS type, id, name AS title, id AS "vendorId", name AS "vendorName", rank,
+          ts_headline('english', ${escaped(Prisma.sql`concat_ws(' · ', name, "legalName", industry, country)`)},
+            q.query, ${HEADLINE_OPTIONS}) AS snippet
+        FROM (
+          SELECT v.id, v.name, v."legalName", v.industry, v.country,
+            ts_rank_cd(v."searchVector", ${query}, 32)::float AS rank,
+            similarity(v.name, ${input.trim()}) AS similarity
+          FROM vendors v
+          WHERE (v."searchVector" @@ ${query} ${vendorSubstring(input)})
+            ${vendorFilter(Prisma.sql`v.id`, options.vendorId)}
+          ORDER BY rank DESC, similarity DESC
+          LIMIT ${limit}
+        ) hits, (SELECT ${query} AS query) q`
+    case 'finding':
+      return prisma.$queryRaw<SearchHit[]>`
+        SELECT 'finding' AS type, hits.id, title, "vendorId", v.name AS "vendorName", rank,
+          ts_headline('english', ${escaped(Prisma.sql`coalesce(description, title)`)}, q.query, ${HEADLINE_OPTIONS}) AS snippet
+        FROM (
+          SELECT f.id, f.title, f.description, f."vendorId", ts_rank_cd(f."searchVector", ${query}, 32)::float AS rank
+          FROM risk_findings f
+          WHERE f."searchVector" @@ ${query} ${vendorFilter(Prisma.sql`f."vendorId"`, options.vendorId)}
+          ORDER BY rank DESC
+          LIMIT ${limit}
+        ) hits
+        JOIN vendors v ON v.id = hits."vendorId", (SELECT ${query} AS query) q`
+    case 'document':
+      return prisma.$queryRaw<SearchHit[]>`
+        SELECT 'document' AS type, hits.id, "documentName" AS title, "vendorId", v.name AS "vendorName", rank,
+          ts_headline('english', ${escaped(Prisma.sql`coalesce("analysisResult", "documentName")`)}, q.query, ${HEADLINE_OPTIONS}) AS snippet
+        FROM (
+          SELECT d.id, d."documentName", d."analysisResult", d."vendorId", ts_rank_cd(d."searchVector", ${query}, 32)::float AS rank
+          FROM documents d
+          WHERE d."searchVector" @@ ${query} ${vendorFilter(Prisma.sql`d."vendorId"`, options.vendorId)}
+          ORDER BY rank DESC
+          LIMIT ${limit}
+        ) hits
+        JOIN vendors v ON v.id = hits."vendorId", (SELECT ${query} AS query) q`
+    case 'report':
+      return prisma.$queryRaw<SearchHit[]>`
+        SELECT 'report' AS type, hits.id, "reportName" AS title, "vendorId", v.name AS "vendorName", rank,
+          ts_headline('english', ${escaped(Prisma.sql`coalesce(content, "reportName")`)}, q.query, ${HEADLINE_OPTIONS}) AS snippet
+        FROM (
+          SELECT r.id, r."reportName", r.content, r."vendorId", ts_rank_cd(r."searchVector", ${query}, 32)::float AS rank
+          FROM reports r
+          WHERE r."searchVector" @@ ${query} ${vendorFilter(Prisma.sql`r."vendorId"`, options.vendorId)}
+          ORDER BY rank DESC
+          LIMIT ${limit}
+        ) hits
+        LEFT JOIN vendors v ON v.id = hits."vendorId", (SELECT ${query} AS query) q`
+  }
+}
+
+/**
+ * Search the given types (all by default) and return the best `limit` hits
+ * across them, highest rank first.
+ */
+export async function search(input: string, options: SearchOptions = {}): Promise<SearchHit[]> {
+  const query = tsQuery(input, !!options.prefix)
+  if (!query) return []
+  const limit = options.limit || 20
+  const types = options.types?.length ? options.types : SEARCH_TYPES
+
+  const results = await Promise.all(types.map((type) => searchType(type, query, input, options, limit)))
+  return results
+    .flat()
+    .sort((a, b) => b.rank - a.rank)
+    .slice(0, limit)
+}
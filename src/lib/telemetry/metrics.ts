@@ -0,0 +1,221 @@
+/**
+ * Telemetry Metrics
+ *
+ * In-process counters, gauges and latency histograms, rendered in the
+ * Prometheus text format by /api/metrics and pushed to an OTLP collector by
+ * otlp.ts when one is configured. Each process keeps its own registry: the
+ * web server serves it on /api/metrics and each worker on METRICS_PORT.
+ *
+ * The instruments the app records are defined at the bottom of this file.
+ */
+
+export type Labels = Record<string, string>
+
+// Seconds; covers sub-millisecond queries through multi-minute LLM calls
+const DEFAULT_BUCKETS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300]
+
+interface Series<T> {
+  labels: Labels
+  value: T
+}
+
+function seriesKey(labels: Labels): string {
+  return JSON.stringify(Object.keys(labels).sort().map((k) => [k, labels[k]]))
+}
+
+function formatLabels(labels: Labels): string {
+  const pairs = Object.entries(labels).map(
+    ([k, v]) => `${k}="${String(v).replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n')}"`
+  )
+  return pairs.length ? `{${pairs.join(',')}}` : ''
+}
+
+export class Counter {
+  readonly type = 'counter'
+  private series = new Map<string, Series<number>>()
+
+  constructor(readonly name: string, readonly help: string) {}
+
+  inc(labels: Labels = {}, by = 1): void {
+    const key = seriesKey(labels)
+    const entry = this.series.get(key)
+    if (entry) entry.value += by
+    else this.series.set(key, { labels, value: by })
+  }
+
+  collect(): Series<number>[] {
+    return Array.from(this.series.values())
+  }
+
+  render(): string[] {
+    return this.collect().map((s) => `${this.name}${formatLabels(s.labels)} ${s.value}`)
+  }
+}
+
+export interface HistogramValue {
+  // Per-bucket (not cumulative) counts; the last entry is the overflow bucket
+  counts: number[]
+  sum: number
+  count: number
+}
+
+export class Histogram {
+  readonly type = 'histogram'
+  private series = new Map<string, Series<HistogramValue>>()
+
+  constructor(readonly name: string, readonly help: string, readonly buckets: number[] = DEFAULT_BUCKETS) {}
+
+  observe(labels: Labels, value: number): void {
+    const key = seriesKey(labels)
+    let entry = this.series.get(key)
+    if (!entry) {
+      entry = { labels, value: { counts: new Array(this.buckets.length + 1).fill(0), sum: 0, count: 0 } }
+      this.series.set(key, entry)
+    }
+    const index = this.buckets.findIndex((bound) => value <= bound)
+    entry.value.counts[index === -1 ? this.buckets.length : index]++
+    entry.value.sum += value
+    entry.value.count++
+  }
+
+  collect(): Series<HistogramValue>[] {
+    return Array.from(this.series.values())
+  }
+
+  render(): string[] {
+    const lines: string[] = []
+    for (const { labels, value } of this.collect()) {
+      let cumulative = 0
+      this.buckets.forEach((bound, i) => {
+        cumulative += value.counts[i]
+        lines.push(`${this.name}_bucket${formatLabels({ ...labels, le: String(bound) })} ${cumulative}`)
+      })
+      lines.push(`${this.name}_bucket${formatLabels({ ...labels, le: '+Inf' })} ${value.count}`)
+      lines.push(`${this.name}_sum${formatLabels(labels)} ${value.sum}`)
+      lines.push(`${this.name}_count${formatLabels(labels)} ${value.count}`)
+    }
+    return lines
+  }
+}
+
+/**
+ * A value read when metrics are collected, e.g. a queue length.
+ */
+export class Gauge {
+  readonly type = 'gauge'
+
+  constructor(readonly name: string, readonly help: string, private read: () => Series<number>[]) {}
+
+  collect(): Series<number>[] {
+    return this.read()
+  }
+
+  render(): string[] {
+    return this.collect().map((s) => `${this.name}${formatLabels(s.labels)} ${s.value}`)
+  }
+}
+
+export type Metric = Counter | Histogram | Gauge
+
+export class MetricsRegistry {
+  private metrics = new Map<string, Metric>()
+  readonly startedAt = Date.now()
+
+  counter(name: string, help: string): Counter {
+    return this.register(new Counter(name, help))
+  }
+
+  histogram(name: string, help: string, buckets?: number[]): Histogram {
+    return this.register(new Histogram(name, help, buckets))
+  }
+
+  /**
+   * Register (or replace) a gauge whose values are read at collection time.
+   */
+  gauge(name: string, help: string, read: () => Series<number>[]): Gauge {
+    const gauge = new Gauge(name, help, read)
+    this.metrics.set(name, gauge)
+    return gauge
+  }
+
+  all(): Metric[] {
+    return Array.from(this.metrics.values())
+  }
+
+  // Prometheus text exposition format 0.0.4
+  render(): string {
+    const lines: string[] = []
+    for (const metric of this.all()) {
+      const samples = metric.render()
+      if (!samples.length) continue
+      lines.push(`# HELP ${metric.name} ${metric.help}`, `# TYPE ${metric.name} ${metric.type}`, ...samples)
+    }
+    return `${lines.join('\n')}\n`
+  }
+
+  // Instruments survive module reloads in development
+  private register<T extends Counter | Histogram>(metric: T): T {
+    const existing = this.metrics.get(metric.name)
+    if (existing) return existing as T
+    this.metrics.set(metric.name, metric)
+    return metric
+  }
+}
+
+const globalForMetrics = globalThis as unknown as {
+  metricsRegistry: MetricsRegistry | undefined
+}
+
+export const registry = globalForMetrics.metricsRegistry ?? new MetricsRegistry()
+
+if (process.env.NODE_ENV !== 'production') globalForMetrics.metricsRegistry = registry
+
+// ============================================
+// INSTRUMENTS
+// ============================================
+
+export const agentDuration = registry.histogram(
+  'tprm_agent_duration_seconds',
+  'Agent operation duration by agent and outcome'
+)
+
+export const llmRequestDuration = registry.histogram(
+  'tprm_llm_request_duration_seconds',
+  'LLM request duration including rate-limit queueing, by agent, model and cache hit/miss'
+)
+
+export const llmQueueWait = registry.histogram(
+  'tprm_llm_queue_wait_seconds',
+  'Time an LLM request waited on the shared rate limiter'
+)
+
+export const llmTimeToFirstToken = registry.histogram(
+  'tprm_llm_time_to_first_token_seconds',
+  'Time from sending a streamed LLM request to its first token'
+)
+
+export const llmTokens = registry.counter(
+  'tprm_llm_tokens_total',
+  'LLM tokens by agent, model and type (prompt/completion); estimated where the provider reports none'
+)
+
+export const jsonParseDuration = registry.histogram(
+  'tprm_llm_json_parse_seconds',
+  'Time spent extracting and parsing JSON from LLM responses',
+  [0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5]
+)
+
+export const dbQueryDuration = registry.histogram(
+  'tprm_db_query_duration_seconds',
+  'Prisma query duration by model and operation'
+)
+
+export const stageDuration = registry.histogram(
+  'tprm_workflow_stage_duration_seconds',
+  'Orchestrator stage duration by workflow, stage, agent and outcome'
+)
+
+export const workflowDuration = registry.histogram(
+  'tprm_workflow_duration_seconds',
+  'Orchestrator workflow duration by workflow and outcome'
+)
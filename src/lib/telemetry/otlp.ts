@@ -0,0 +1,202 @@
+/**
+ * OTLP Exporter
+ *
+ * Sends finished spans and the metrics registry to an OpenTelemetry
+ * collector over OTLP/HTTP with JSON encoding, e.g. a local collector at
+ * http://localhost:4318. Off unless OTEL_EXPORTER_OTLP_ENDPOINT is set.
+ *
+ * - Spans are queued and sent in batches every OTEL_EXPORT_INTERVAL_MS; when
+ *   the collector falls behind the oldest spans are dropped (counted)
+ * - Metrics are sent cumulatively on the same interval
+ * - Failed exports are logged and dropped, never retried
+ */
+
+import { registry, type Labels, type Metric } from './metrics'
+import { onSpanEnd, type AttributeValue, type SpanData } from './tracing'
+
+const EXPORT_INTERVAL_MS = Number(process.env.OTEL_EXPORT_INTERVAL_MS) || 5000
+const MAX_QUEUED_SPANS = 2048
+const MAX_BATCH_SPANS = 512
+const SCOPE = { name: 'tprm-ai' }
+
+// OTLP/JSON: 64-bit integers are strings, attributes are typed key/values
+function attributes(values: Record<string, AttributeValue> | Labels) {
+  return Object.entries(values).map(([key, value]) => ({
+    key,
+    value:
+      typeof value === 'number'
+        ? Number.isInteger(value) ? { intValue: String(value) } : { doubleValue: value }
+        : typeof value === 'boolean'
+          ? { boolValue: value }
+          : { stringValue: value },
+  }))
+}
+
+const nanos = (us: number) => `${us}000`
+
+function spanJSON(span: SpanData) {
+  return {
+    traceId: span.traceId,
+    spanId: span.spanId,
+    parentSpanId: span.parentSpanId || '',
+    name: span.name,
+    kind: span.kind === 'client' ? 3 : 1,
+    startTimeUnixNano: nanos(span.startUs),
+    endTimeUnixNano: nanos(span.endUs),
+    attributes: attributes(span.attributes),
+    status: span.error ? { code: 2, message: span.error } : { code: 1 },
+  }
+}
+
+function metricJSON(metric: Metric, startNanos: string, nowNanos: string) {
+  const base = { name: metric.name, description: metric.help }
+  if (metric.type === 'histogram') {
+    return {
+      ...base,
+      unit: 's',
+      histogram: {
+        aggregationTemporality: 2, // cumulative
+        dataPoints: metric.collect().map(({ labels, value }) => ({
+          attributes: attributes(labels),
+          startTimeUnixNano: startNanos,
+          timeUnixNano: nowNanos,
+          count: String(value.count),
+          sum: value.sum,
+          bucketCounts: value.counts.map(String),
+          explicitBounds: metric.buckets,
+        })),
+      },
+    }
+  }
+  const dataPoints = metric.collect().map(({ labels, value }) => ({
+    attributes: attributes(labels),
+    startTimeUnixNano: startNanos,
+    timeUnixNano: nowNanos,
+    asDouble: value,
+  }))
+  return metric.type === 'counter'
+    ? { ...base, sum: { aggregationTemporality: 2, isMonotonic: true, dataPoints } }
+    : { ...base, gauge: { dataPoints } }
+}
+
+// OTEL_EXPORTER_OTLP_HEADERS: comma-separated key=value pairs
+function parseHeaders(value: string | undefined): Record<string, string> {
+  const headers: Record<string, string> = {}
+  for (const pair of (value || '').split(',')) {
+    const index = pair.indexOf('=')
+    if (index > 0) headers[pair.slice(0, index).trim()] = decodeURIComponent(pair.slice(index + 1).trim())
+  }
+  return headers
+}
+
+export class OTLPExporter {
+  private spans: SpanData[] = []
+  private timer: NodeJS.Timeout | null = null
+  private flushing: Promise<void> | null = null
+  private droppedSpans = 0
+
+  constructor(
+    private endpoint: string,
+    private serviceName: string,
+    private headers: Record<string, string> = {}
+  ) {}
+
+  start(): void {
+    onSpanEnd((span) => this.enqueue(span))
+    this.timer = setInterval(() => {
+      this.flush().catch(() => undefined)
+    }, EXPORT_INTERVAL_MS)
+    // Never keep a process alive just to export
+    this.timer.unref()
+  }
+
+  enqueue(span: SpanData): void {
+    this.spans.push(span)
+    if (this.spans.length > MAX_QUEUED_SPANS) {
+      this.droppedSpans += this.spans.length - MAX_QUEUED_SPANS
+      this.spans.splice(0, this.spans.length - MAX_QUEUED_SPANS)
+    }
+  }
+
+  /**
+   * Send queued spans and current metrics. Concurrent calls share a flush.
+   */
+  flush(): Promise<void> {
+    if (!this.flushing) {
+      this.flushing = this.export().finally(() => {
+        this.flushing = null
+      })
+    }
+    return this.flushing
+  }
+
+  async shutdown(): Promise<void> {
+    if (this.timer) clearInterval(this.timer)
+    this.timer = null
+    await this.flush()
+  }
+
+  private async export(): Promise<void> {
+    const resource = {
+      attributes: attributes({ 'service.name': this.serviceName, 'process.pid': process.pid }),
+    }
+
+    while (this.spans.length) {
+      const batch = this.spans.splice(0, MAX_BATCH_SPANS)
+      await this.post('/v1/traces', {
+        resourceSpans: [{ resource, scopeSpans: [{ scope: SCOPE, spans: batch.map(spanJSON) }] }],
+      })
+    }
+    if (this.droppedSpans) {
+      console.error(`OTLP exporter dropped ${this.droppedSpans} spans; collector is not keeping up`)
+      this.droppedSpans = 0
+    }
+
+    const startNanos = nanos(registry.startedAt * 1000)
+    const nowNanos = nanos(Date.now() * 1000)
+    const metrics = registry
+      .all()
+      .filter((metric) => metric.collect().length)
+      .map((metric) => metricJSON(metric, startNanos, nowNanos))
+    if (!metrics.length) return
+    await this.post('/v1/metrics', {
+      resourceMetrics: [{ resource, scopeMetrics: [{ scope: SCOPE, metrics }] }],
+    })
+  }
+
+  private async post(path: string, body: unknown): Promise<void> {
+    try {
+      const res = await fetch(`${this.endpoint.replace(/\/$/, '')}${path}`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', ...this.headers },
+        body: JSON.stringify(body),
+      })
+      if (!res.ok) console.error(`OTLP export to ${path} failed: HTTP ${res.status}`)
+    } catch (error) {
+      console.error(`OTLP export to ${path} failed:`, error instanceof Error ? error.message : error)
+    }
+  }
+}
+
+const globalForExporter = globalThis as unknown as {
+  otlpExporter: OTLPExporter | null | undefined
+}
+
+/**
+ * Start exporting if OTEL_EXPORTER_OTLP_ENDPOINT is set; returns the
+ * exporter (to flush on shutdown) or null. Safe to call more than once.
+ */
+export function startTelemetryExport(serviceName?: string): OTLPExporter | null {
+  if (globalForExporter.otlpExporter !== undefined) return globalForExporter.otlpExporter
+  const endpoint = process.env.OTEL_EXPORTER_OTLP_ENDPOINT
+  const exporter = endpoint
+    ? new OTLPExporter(
+        endpoint,
+        process.env.OTEL_SERVICE_NAME || serviceName || 'tprm-ai',
+        parseHeaders(process.env.OTEL_EXPORTER_OTLP_HEADERS)
+      )
+    : null
+  exporter?.start()
+  globalForExporter.otlpExporter = exporter
+  return exporter
+}
@@ -0,0 +1,36 @@
+/**
+ * Prisma Query Instrumentation
+ *
+ * Middleware recording every query's duration by model and operation. Inside
+ * a traced operation (a workflow stage, an LLM call) each query also gets a
+ * child span, so a trace shows time spent in the database; queries outside
+ * any trace only feed the histogram.
+ */
+
+import type { Prisma } from '@prisma/client'
+import { dbQueryDuration } from './metrics'
+import { currentSpan, startSpan } from './tracing'
+
+export const queryTimingMiddleware: Prisma.Middleware = async (params, next) => {
+  const model = params.model || 'raw'
+  const span = currentSpan()
+    ? startSpan(`prisma ${model}.${params.action}`, {
+        kind: 'client',
+        attributes: {
+          'db.system': 'postgresql',
+          'db.operation': params.action,
+          'db.prisma.model': model,
+        },
+      })
+    : null
+  const start = performance.now()
+  try {
+    return await next(params)
+  } catch (error) {
+    span?.recordError(error)
+    throw error
+  } finally {
+    dbQueryDuration.observe({ model, operation: params.action }, (performance.now() - start) / 1000)
+    span?.end()
+  }
+}
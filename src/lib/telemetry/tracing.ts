@@ -0,0 +1,137 @@
+/**
+ * Tracing
+ *
+ * Minimal spans with async context propagation: a span started inside
+ * withSpan() becomes the parent of spans started anywhere in the awaited
+ * call tree (LLM calls, Prisma queries, nested stages). Finished spans are
+ * handed to listeners registered with onSpanEnd; otlp.ts exports them.
+ *
+ * Workflow spans take their trace ID from the workflow (job) ID, so every
+ * attempt of a job, and everything it did, lands in the same trace.
+ */
+
+import { AsyncLocalStorage } from 'async_hooks'
+import { createHash, randomBytes } from 'crypto'
+
+export type AttributeValue = string | number | boolean
+
+export type SpanKind = 'internal' | 'client'
+
+export interface SpanData {
+  traceId: string
+  spanId: string
+  parentSpanId?: string
+  name: string
+  kind: SpanKind
+  // Microseconds since the epoch
+  startUs: number
+  endUs: number
+  attributes: Record<string, AttributeValue>
+  error?: string
+}
+
+export interface SpanOptions {
+  attributes?: Record<string, AttributeValue>
+  kind?: SpanKind
+  // Start a new trace with this ID instead of continuing the current one
+  traceId?: string
+}
+
+// performance.now() is monotonic; anchor it to the epoch once
+const epochUs = () => Math.round((performance.timeOrigin + performance.now()) * 1000)
+
+export class Span {
+  readonly traceId: string
+  readonly spanId = randomBytes(8).toString('hex')
+  readonly parentSpanId?: string
+  readonly attributes: Record<string, AttributeValue>
+  private readonly startUs = epochUs()
+  private endUs = 0
+  private error?: string
+
+  constructor(readonly name: string, private kind: SpanKind, parent: Span | undefined, options: SpanOptions) {
+    this.traceId = options.traceId || parent?.traceId || randomBytes(16).toString('hex')
+    // A traceId only starts a new trace when it differs from the parent's
+    this.parentSpanId = options.traceId && options.traceId !== parent?.traceId ? undefined : parent?.spanId
+    this.attributes = { ...options.attributes }
+  }
+
+  setAttribute(key: string, value: AttributeValue | undefined): void {
+    if (value !== undefined) this.attributes[key] = value
+  }
+
+  recordError(error: unknown): void {
+    this.error = error instanceof Error ? error.message : String(error)
+  }
+
+  /**
+   * End the span and return its duration in milliseconds. Ending twice is a
+   * no-op.
+   */
+  end(): number {
+    if (!this.endUs) {
+      this.endUs = epochUs()
+      const data = this.toData()
+      listeners.forEach((listener) => listener(data))
+    }
+    return (this.endUs - this.startUs) / 1000
+  }
+
+  toData(): SpanData {
+    return {
+      traceId: this.traceId,
+      spanId: this.spanId,
+      parentSpanId: this.parentSpanId,
+      name: this.name,
+      kind: this.kind,
+      startUs: this.startUs,
+      endUs: this.endUs,
+      attributes: this.attributes,
+      error: this.error,
+    }
+  }
+}
+
+const storage = new AsyncLocalStorage<Span>()
+const listeners: ((span: SpanData) => void)[] = []
+
+export function onSpanEnd(listener: (span: SpanData) => void): void {
+  listeners.push(listener)
+}
+
+export function currentSpan(): Span | undefined {
+  return storage.getStore()
+}
+
+/**
+ * Start a span as a child of the current one without making it current;
+ * for leaf operations such as a single query. Call end() when done.
+ */
+export function startSpan(name: string, options: SpanOptions = {}): Span {
+  return new Span(name, options.kind || 'internal', currentSpan(), options)
+}
+
+/**
+ * Run fn inside a new span: spans started during fn are its children. A
+ * thrown error is recorded on the span and rethrown.
+ */
+export async function withSpan<T>(
+  name: string,
+  fn: (span: Span) => Promise<T>,
+  options: SpanOptions = {}
+): Promise<T> {
+  const span = startSpan(name, options)
+  try {
+    return await storage.run(span, () => fn(span))
+  } catch (error) {
+    span.recordError(error)
+    throw error
+  } finally {
+    span.end()
+  }
+}
+
+// Stable trace ID for a workflow or job ID
+export function traceIdFor(id: string): string {
+  return createHash('sha256').update(id).digest('hex').slice(0, 32)
+}
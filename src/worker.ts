@@ -0,0 +1,65 @@
+/**
+ * Background worker for orchestrator workflow jobs
+ *
+ * Usage: npm run worker
+ *   JOB_WORKER_CONCURRENCY  workflows run at once per process (default 8)
+ *   JOB_POLL_MS             idle poll interval (default 1000)
+ *   METRICS_PORT            Prometheus scrape port (default 9464, 0 to disable)
+ *   OTEL_EXPORTER_OTLP_ENDPOINT  export traces and metrics (optional)
+ *
+ * Workflows run here, not in the web server, so the agent, stage and
+ * workflow histograms are only in this process's registry: scrape
+ * http://<worker>:METRICS_PORT/metrics alongside /api/metrics.
+ */
+
+import { createServer } from 'http'
+import { JobWorker } from '@/lib/jobs/worker'
+import { registry } from '@/lib/telemetry/metrics'
+import { startTelemetryExport } from '@/lib/telemetry/otlp'
+
+const exporter = startTelemetryExport('tprm-worker')
+
+const metricsPort = Number(process.env.METRICS_PORT ?? 9464)
+const metricsServer = metricsPort
+  ? createServer((request, response) => {
+      if (request.method !== 'GET' || request.url?.split('?')[0] !== '/metrics') {
+        response.writeHead(404).end()
+        return
+      }
+      response.writeHead(200, {
+        'Content-Type': 'text/plain; version=0.0.4; charset=utf-8',
+        'Cache-Control': 'no-store',
+      })
+      response.end(registry.render())
+    })
+  : null
+// Another worker on the same host may hold the port; run without metrics
+metricsServer?.on('error', (error) => console.error(`Metrics server on port ${metricsPort} failed:`, error.message))
+metricsServer?.listen(metricsPort, () => console.log(`Metrics on http://localhost:${metricsPort}/metrics`))
+
+const worker = new JobWorker({
+  concurrency: Number(process.env.JOB_WORKER_CONCURRENCY) || 8,
+  pollMs: Number(process.env.JOB_POLL_MS) || 1000,
+})
+
+for (const signal of ['SIGINT', 'SIGTERM'] as const) {
+  process.on(signal, () => {
+    console.log(`${signal} received, finishing running jobs...`)
+    worker.stop()
+  })
+}
+
+console.log(`Worker ${worker.workerId} started`)
+worker
+  .run()
+  .then(async () => {
+    metricsServer?.close()
+    await exporter?.shutdown()
+    process.exit(0)
+  })
+  .catch(async (error) => {
+    console.error('Worker crashed:', error)
+    metricsServer?.close()
+    await exporter?.shutdown()
+    process.exit(1)
+  })